@@ -2,17 +2,21 @@ import copy
 import datetime
 import time
 import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Literal
+from itertools import batched
+from typing import Literal
+from urllib.parse import urlencode
 
 import pytz
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.http import QueryDict
 from django.utils import timezone
-from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ApiError, RequestError, TransportError
-from elasticsearch_dsl import connections
+from elasticsearch_dsl import MultiSearch, Search, connections
 from elasticsearch_dsl.response import Hit, Response
 from elasticsearch_dsl.utils import AttrList
 from redis import Redis
@@ -23,10 +27,12 @@ from cl.alerts.management.commands.cl_send_scheduled_alerts import (
 from cl.alerts.models import Alert, ScheduledAlertHit
 from cl.alerts.tasks import send_search_alert_emails
 from cl.alerts.utils import (
-    TaskCompletionStatus,
     add_document_hit_to_alert_set,
+    compute_estimated_remaining_time,
+    get_task_status,
     has_document_alert_hit_been_triggered,
     override_alert_query,
+    retrieve_task_info,
     scheduled_alert_hits_limit_reached,
 )
 from cl.api.models import WebhookEventType
@@ -34,8 +40,13 @@ from cl.api.tasks import send_search_alert_webhook_es
 from cl.lib.argparse_types import valid_date_time
 from cl.lib.command_utils import VerboseCommand, logger
 from cl.lib.date_time import dt_as_local_date
-from cl.lib.elasticsearch_utils import do_es_sweep_alert_query
+from cl.lib.elasticsearch_utils import (
+    build_es_sweep_alert_query,
+    do_es_sweep_alert_query,
+    process_es_sweep_alert_responses,
+)
 from cl.lib.redis_utils import get_redis_interface
+from cl.lib.types import EsSweepAlertQuery
 from cl.search.documents import (
     DocketDocument,
     ESRECAPSweepDocument,
@@ -73,78 +84,41 @@ class AlertHitsToProcess:
     case_only_alert: bool
 
 
-def get_task_status(task_id: str, es: Elasticsearch) -> dict[str, Any]:
-    """Fetch the status of a task from Elasticsearch.
-
-    :param task_id: The ID of the task to fetch the status for.
-    :param es: The Elasticsearch client instance.
-    :return: The status of the task if successful, or an empty dictionary if
-    an error occurs.
-    """
-    try:
-        return es.tasks.get(task_id=task_id)
-    except (
-        TransportError,
-        ConnectionError,
-        RequestError,
-    ) as e:
-        logger.warning("Error getting sweep alert index task status: %s", e)
-        return {}
+AlertQueryResults = tuple[list[Hit] | None, Response | None, Response | None]
 
 
-def compute_estimated_remaining_time(
-    initial_wait: float, task_status: TaskCompletionStatus
-) -> float:
-    """Compute the estimated remaining time for the re_index task to complete.
+@dataclass
+class SweepAlertsResults:
+    """Dataclass for storing the results of the unique alert queries, shared
+    by the alerts that saved the same query.
 
-    :param initial_wait: The default wait time in seconds.
-    :param task_status: An instance of `TaskCompletionStatus` containing task
-    information.
-    :return: The estimated remaining time in seconds. If the start time,
-    created, or total are invalid, the initial default time is returned.
+    :param alerts_keys: A dict mapping each alert ID to its normalized query.
+    :param queries_results: A dict mapping each normalized query to the main
+    results, the parent-only results and the child-only results of the query.
     """
 
-    if (
-        task_status.start_time_millis is None
-        or not task_status.created
-        or not task_status.total
-    ):
-        return initial_wait
+    alerts_keys: dict[int, str]
+    queries_results: dict[str, AlertQueryResults]
 
-    start_time = datetime.datetime.fromtimestamp(
-        task_status.start_time_millis / 1000.0
-    )
-    time_now = datetime.datetime.now()
-    estimated_time_remaining = max(
-        datetime.timedelta(
-            seconds=(
-                (time_now - start_time).total_seconds() / task_status.created
-            )
-            * (task_status.total - task_status.created)
-        ).total_seconds(),
-        initial_wait,
-    )
+    def __post_init__(self) -> None:
+        self.remaining_alerts = Counter(self.alerts_keys.values())
 
-    return estimated_time_remaining
+    def pop_alert_results(self, alert_id: int) -> AlertQueryResults:
+        """Get the results of an alert's query, to be processed once.
 
+        process_alert_hits modifies the hits, so alerts get a copy of the
+        results while other alerts with the same query are still to be
+        processed. The last one gets the shared results, which are dropped.
 
-def retrieve_task_info(task_info: dict[str, Any]) -> TaskCompletionStatus:
-    """Retrieve task information from the given task dict.
-
-    :param task_info: A dictionary containing the task status information.
-    :return: A `TaskCompletionStatus` object representing the extracted task
-    information.
-    """
-
-    if task_info:
-        status = task_info["task"]["status"]
-        return TaskCompletionStatus(
-            completed=task_info["completed"],
-            created=status["created"],
-            total=status["total"],
-            start_time_millis=task_info["task"]["start_time_in_millis"],
-        )
-    return TaskCompletionStatus()
+        :param alert_id: The ID of the alert.
+        :return: The main results, the parent-only results and the child-only
+        results of the alert's query.
+        """
+        key = self.alerts_keys.pop(alert_id)
+        self.remaining_alerts[key] -= 1
+        if self.remaining_alerts[key]:
+            return copy.deepcopy(self.queries_results[key])
+        return self.queries_results.pop(key)
 
 
 def index_daily_recap_documents(
@@ -506,6 +480,147 @@ def query_alerts(
         return None, None, None
 
 
+def normalize_alert_query(search_params: QueryDict) -> str:
+    """Normalize the search params of an alert, so equivalent queries saved
+    by different users share the same key. Params are sorted, whitespace in
+    values is collapsed and empty values are dropped.
+
+    :param search_params: The alert search params.
+    :return: The normalized query string.
+    """
+    params = []
+    for key in sorted(search_params):
+        values = sorted(
+            normalized
+            for value in search_params.getlist(key)
+            if (normalized := " ".join(value.split()))
+        )
+        params.extend((key, value) for value in values)
+    return urlencode(params)
+
+
+def execute_multi_search(searches: list[Search]) -> list[Response] | None:
+    """Execute several searches in a single multi-search request.
+
+    :param searches: The searches to execute.
+    :return: The responses of the searches, in the same order, or None if the
+    request or any of the searches failed.
+    """
+    multi_search = MultiSearch()
+    for search in searches:
+        multi_search = multi_search.add(search)
+    try:
+        return multi_search.execute()
+    except (TransportError, ConnectionError, RequestError, ApiError) as e:
+        logger.warning("Sweep index multi-search request failed: %s", e)
+        return None
+
+
+def query_alerts_in_bulk(
+    alerts_queries: list[tuple[int, QueryDict]],
+) -> SweepAlertsResults:
+    """Query the sweep index for many alerts at once.
+
+    Alert queries are normalized and deduplicated, so each unique query runs
+    once no matter how many users saved it. Unique queries are sent in
+    multi-search requests of ALERTS_SWEEP_MSEARCH_BATCH_SIZE queries, running
+    up to ALERTS_SWEEP_MAX_WORKERS requests at once. If a request fails, its
+    queries are run one by one so a failing query doesn't affect the rest.
+
+    :param alerts_queries: A list of two-tuples containing the alert ID and
+    its search params.
+    :return: A SweepAlertsResults holding the results of each unique query,
+    as returned by query_alerts, to be popped for each alert.
+    """
+
+    start_time = time.monotonic()
+    unique_queries: dict[str, QueryDict] = {}
+    alerts_keys: dict[int, str] = {}
+    for alert_id, search_params in alerts_queries:
+        key = normalize_alert_query(search_params)
+        unique_queries.setdefault(key, search_params)
+        alerts_keys[alert_id] = key
+
+    search_query = RECAPSweepDocument.search()
+    child_search_query = ESRECAPSweepDocument.search()
+    sweep_queries: dict[str, EsSweepAlertQuery] = {}
+    queries_results = {}
+    for key, search_params in unique_queries.items():
+        try:
+            sweep_query = build_es_sweep_alert_query(
+                search_query, child_search_query, search_params
+            )
+        except (
+            UnbalancedParenthesesQuery,
+            UnbalancedQuotesQuery,
+            BadProximityQuery,
+            DisallowedWildcardPattern,
+            InvalidRelativeDateSyntax,
+        ):
+            traceback.print_exc()
+            logger.info(f"Search for this alert failed: {search_params}\n")
+            sweep_query = None
+        if sweep_query:
+            sweep_queries[key] = sweep_query
+        else:
+            queries_results[key] = (None, None, None)
+
+    batches = list(
+        batched(sweep_queries, settings.ALERTS_SWEEP_MSEARCH_BATCH_SIZE)
+    )
+    with ThreadPoolExecutor(
+        max_workers=settings.ALERTS_SWEEP_MAX_WORKERS
+    ) as executor:
+        batches_responses = executor.map(
+            lambda batch: execute_multi_search(
+                [
+                    search
+                    for key in batch
+                    for search in sweep_queries[key].searches
+                ]
+            ),
+            batches,
+        )
+        # Responses are processed in this thread as they arrive, while the
+        # next requests are still running.
+        for batch, responses in zip(batches, batches_responses):
+            if responses is None:
+                for key in batch:
+                    queries_results[key] = query_alerts(unique_queries[key])
+                continue
+            offset = 0
+            for key in batch:
+                sweep_query = sweep_queries[key]
+                searches_count = len(sweep_query.searches)
+                try:
+                    queries_results[key] = process_es_sweep_alert_responses(
+                        sweep_query,
+                        responses[offset : offset + searches_count],
+                    )
+                except (
+                    TransportError,
+                    ConnectionError,
+                    RequestError,
+                    ApiError,
+                ):
+                    traceback.print_exc()
+                    logger.info(
+                        f"Search for this alert failed: {unique_queries[key]}\n"
+                    )
+                    queries_results[key] = (None, None, None)
+                offset += searches_count
+
+    logger.info(
+        "Queried %s alerts with %s unique queries in %s multi-search "
+        "requests in %.2f seconds.",
+        len(alerts_keys),
+        len(unique_queries),
+        len(batches),
+        time.monotonic() - start_time,
+    )
+    return SweepAlertsResults(alerts_keys, queries_results)
+
+
 def process_alert_hits(
     r: Redis, hits_to_process: AlertHitsToProcess
 ) -> list[Hit]:
@@ -641,16 +756,28 @@ def query_and_send_alerts(
     ).distinct()
     total_alerts_sent_count = 0
     sent_time = datetime.datetime.now() if not custom_date else query_date
+    users_alerts = []
+    alerts_queries = []
     for user in alert_users:
         if (
             rate == Alert.REAL_TIME
             and not user.profile.is_eligible_for_rt_search_alerts
         ):
             continue
-        alerts = user.alerts.filter(
-            rate=rate,
-            alert_type__in=[SEARCH_TYPES.RECAP, SEARCH_TYPES.DOCKETS],
+        alerts = list(
+            user.alerts.filter(
+                rate=rate,
+                alert_type__in=[SEARCH_TYPES.RECAP, SEARCH_TYPES.DOCKETS],
+            )
         )
+        users_alerts.append((user, alerts))
+        for alert in alerts:
+            search_params = QueryDict(alert.query.encode(), mutable=True)
+            search_params["type"] = SEARCH_TYPES.RECAP
+            alerts_queries.append((alert.pk, search_params))
+    alerts_results = query_alerts_in_bulk(alerts_queries)
+
+    for user, alerts in users_alerts:
         logger.info(
             "Running '%s' alerts for user '%s': %s", rate, user, alerts
         )
@@ -665,8 +792,8 @@ def query_and_send_alerts(
             # Override the alert type to RECAP, since DOCKETS alerts should
             # behave exactly like RECAP alerts.
             search_params["type"] = SEARCH_TYPES.RECAP
-            results, parent_results, child_results = query_alerts(
-                search_params
+            results, parent_results, child_results = (
+                alerts_results.pop_alert_results(alert.pk)
             )
             if not results:
                 continue
@@ -739,19 +866,30 @@ def query_and_schedule_alerts(
     docket_content_type = ContentType.objects.get(
         app_label="search", model="docket"
     )
+    users_alerts = []
+    alerts_queries = []
     for user in alert_users:
-        alerts = user.alerts.filter(
-            rate=rate,
-            alert_type__in=[SEARCH_TYPES.RECAP, SEARCH_TYPES.DOCKETS],
+        alerts = list(
+            user.alerts.filter(
+                rate=rate,
+                alert_type__in=[SEARCH_TYPES.RECAP, SEARCH_TYPES.DOCKETS],
+            )
         )
+        users_alerts.append((user, alerts))
+        for alert in alerts:
+            search_params = QueryDict(alert.query.encode(), mutable=True)
+            alerts_queries.append((alert.pk, search_params))
+    alerts_results = query_alerts_in_bulk(alerts_queries)
+
+    for user, alerts in users_alerts:
         logger.info(
             "Running '%s' alerts for user '%s': %s", rate, user, alerts
         )
         scheduled_hits_to_create = []
         for alert in alerts:
             search_params = QueryDict(alert.query.encode(), mutable=True)
-            results, parent_results, child_results = query_alerts(
-                search_params
+            results, parent_results, child_results = (
+                alerts_results.pop_alert_results(alert.pk)
             )
             case_only_alert = (
                 True if alert.alert_type == SEARCH_TYPES.DOCKETS else False
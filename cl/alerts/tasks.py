@@ -2,6 +2,7 @@ import copy
 from dataclasses import dataclass
 from datetime import datetime
 from importlib import import_module
+from itertools import batched
 from urllib.parse import urlencode
 
 from celery import Task
@@ -14,6 +15,7 @@ from django.template import loader
 from django.urls import reverse
 from django.utils.timezone import now
 from elasticsearch.exceptions import ConnectionError
+from redis.exceptions import ResponseError
 from waffle import switch_is_active
 
 from cl.alerts.models import Alert, DocketAlert, ScheduledAlertHit
@@ -25,6 +27,8 @@ from cl.alerts.utils import (
     include_recap_document_hit,
     override_alert_query,
     percolate_es_document,
+    percolate_es_documents,
+    prepare_percolator_batch_content,
     prepare_percolator_content,
     scheduled_alert_hits_limit_reached,
     transform_percolator_child_document,
@@ -787,6 +791,13 @@ def send_or_schedule_search_alerts(
         self.request.chain = None
         return None
 
+    if settings.PERCOLATOR_BATCH_WINDOW:
+        # Percolate the document along with the others indexed within the
+        # batch window.
+        queue_document_percolation(response.app_label, response.document_id)
+        self.request.chain = None
+        return None
+
     app_label = response.app_label
     document_id = response.document_id
     document_content = response.document_content
@@ -852,6 +863,99 @@ def send_or_schedule_search_alerts(
     )
 
 
+def compose_percolator_batch_redis_keys(app_label: str) -> tuple[str, str]:
+    """Compose the redis keys for the documents waiting to be percolated in
+    batch and for the lock of their scheduled percolation.
+
+    :param app_label: The app label and model of the documents.
+    :return: A two-tuple of the pending set key and the scheduled batch key.
+    """
+    return (
+        f"percolator_batch:{app_label}:pending",
+        f"percolator_batch:{app_label}:scheduled",
+    )
+
+
+def queue_document_percolation(app_label: str, document_id: str) -> None:
+    """Add a document to the ones waiting to be percolated together, and
+    schedule percolate_documents_in_batch at the end of the batch window
+    unless it's already scheduled.
+
+    :param app_label: The app label and model of the document.
+    :param document_id: The ID of the document to percolate.
+    :return: None
+    """
+    window = settings.PERCOLATOR_BATCH_WINDOW
+    r = get_redis_interface("CACHE")
+    pending_key, scheduled_key = compose_percolator_batch_redis_keys(app_label)
+    r.sadd(pending_key, document_id)
+    # The lock expires in case the scheduled task is lost.
+    if r.set(scheduled_key, 1, nx=True, ex=window + 60):
+        percolate_documents_in_batch.apply_async(
+            args=(app_label,), countdown=window
+        )
+
+
+@app.task(
+    bind=True,
+    autoretry_for=(ConnectionError,),
+    max_retries=3,
+    interval_start=5,
+    ignore_result=True,
+    queue=settings.CELERY_ETL_TASK_QUEUE,
+)
+def percolate_documents_in_batch(self: Task, app_label: str) -> None:
+    """Percolate the documents queued by queue_document_percolation in
+    batches of PERCOLATOR_BATCH_SIZE documents, and process the alerts
+    triggered by each document with percolator_response_processing.
+
+    :param self: The celery task
+    :param app_label: The app label and model of the documents.
+    :return: None
+    """
+
+    r = get_redis_interface("CACHE")
+    pending_key, scheduled_key = compose_percolator_batch_redis_keys(app_label)
+    # Documents queued from now on are percolated in the next batch.
+    r.delete(scheduled_key)
+    # Retries of this task percolate the same documents.
+    processing_key = f"{pending_key}:{self.request.id}"
+    if not r.exists(processing_key):
+        try:
+            r.rename(pending_key, processing_key)
+        except ResponseError:
+            # Nothing pending.
+            return None
+
+    document_ids = sorted(r.smembers(processing_key), key=int)
+    percolator_index, documents = prepare_percolator_batch_content(
+        app_label, document_ids
+    )
+    for batch in batched(documents, settings.PERCOLATOR_BATCH_SIZE):
+        results = percolate_es_documents(
+            percolator_index,
+            [documents_to_percolate for _, _, documents_to_percolate in batch],
+            app_label,
+        )
+        for (_, document_content, _), (
+            main_alerts_triggered,
+            rd_alerts_triggered,
+            d_alerts_triggered,
+        ) in zip(batch, results):
+            if not main_alerts_triggered:
+                continue
+            percolator_response_processing.delay(
+                SendAlertsResponse(
+                    main_alerts_triggered=main_alerts_triggered,
+                    rd_alerts_triggered=rd_alerts_triggered,
+                    d_alerts_triggered=d_alerts_triggered,
+                    document_content=document_content,
+                    app_label_model=app_label,
+                )
+            )
+    r.delete(processing_key)
+
+
 # New task
 @app.task(
     bind=True,
@@ -39,7 +39,9 @@ from cl.alerts.models import (
     ScheduledAlertHit,
 )
 from cl.alerts.tasks import (
+    compose_percolator_batch_redis_keys,
     get_docket_notes_and_tags_by_user,
+    percolate_documents_in_batch,
     send_alert_and_webhook,
 )
 from cl.alerts.utils import (
@@ -3837,6 +3839,63 @@ class SearchAlertsOAESTests(ESIndexTestCase, TestCase, SearchAlertsAssertions):
         for alert in alerts_created:
             alert.delete()
 
+    @override_settings(PERCOLATOR_BATCH_WINDOW=60)
+    def test_percolate_documents_in_batch(self, mock_abort_audio):
+        """Confirm the documents queued within the batch window are percolated
+        together and each alert hit is stored for the right document.
+        """
+
+        # Simulate a batch already scheduled, so documents are only queued.
+        r = get_redis_interface("CACHE")
+        pending_key, scheduled_key = compose_percolator_batch_redis_keys(
+            "audio.Audio"
+        )
+        r.set(scheduled_key, 1)
+        self.addCleanup(r.delete, pending_key, scheduled_key)
+        audios = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for docket_number in ["19-5739", "19-5740"]:
+                audios.append(
+                    AudioWithParentsFactory.create(
+                        case_name="DLY Test OA",
+                        docket__court=self.court_1,
+                        docket__date_argued=now().date(),
+                        docket__docket_number=docket_number,
+                    )
+                )
+
+        # No alerts are triggered until the batch is percolated.
+        scheduled_alerts = ScheduledAlertHit.objects.filter(
+            alert=self.search_alert_3
+        )
+        self.assertEqual(scheduled_alerts.count(), 0)
+        self.assertEqual(r.scard(pending_key), 2)
+
+        with mock.patch(
+            "cl.api.webhooks.requests.post",
+            side_effect=lambda *args, **kwargs: MockResponse(
+                200, mock_raw=True
+            ),
+        ):
+            percolate_documents_in_batch.delay("audio.Audio")
+
+        self.assertFalse(r.exists(pending_key))
+        self.assertEqual(scheduled_alerts.count(), 2)
+        hits_content = {
+            hit.document_content["id"]: hit.document_content
+            for hit in scheduled_alerts
+        }
+        self.assertEqual(set(hits_content), {audio.pk for audio in audios})
+        for content in hits_content.values():
+            # Highlights are mapped back without the document slot prefix.
+            self.assertIn(
+                "<strong>Test</strong>",
+                content["meta"]["highlight"]["caseName"][0],
+            )
+
+        for audio in audios:
+            audio.delete()
+
     @override_settings(ELASTICSEARCH_PAGINATION_BATCH_SIZE=5)
     def test_percolate_document_in_batches(self, mock_abort_audio):
         """Confirm when getting alerts in batches and an alert previously
@@ -5,6 +5,7 @@ import time_machine
 from django.conf import settings
 from django.core import mail
 from django.core.management import call_command
+from django.http import QueryDict
 from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils.dateformat import format
@@ -14,8 +15,10 @@ from waffle.testutils import override_switch
 
 from cl.alerts.factories import AlertFactory
 from cl.alerts.management.commands.cl_send_recap_alerts import (
+    SweepAlertsResults,
     get_day_before_query_date,
     index_daily_recap_documents,
+    normalize_alert_query,
 )
 from cl.alerts.models import (
     SCHEDULED_ALERT_HIT_STATUS,
@@ -39,6 +42,7 @@ from cl.donate.models import (
     NeonMembershipLevel,
 )
 from cl.lib.date_time import midnight_pt
+from cl.lib.elasticsearch_utils import build_es_sweep_alert_query
 from cl.lib.redis_utils import get_redis_interface
 from cl.lib.test_helpers import RECAPSearchTestCase
 from cl.people_db.factories import (
@@ -1239,6 +1243,81 @@ class RECAPAlertsSweepIndexTest(
         self.assertFalse(self.r.exists("alert_sweep:main_re_index_completed"))
         self.assertFalse(self.r.exists("alert_sweep:rd_re_index_completed"))
 
+    def test_alerts_sharing_a_query_get_their_own_results(
+        self, mock_prefix
+    ) -> None:
+        """Confirm alerts sharing a query get a copy of its results while
+        other alerts are still to be processed, and the last one gets the
+        shared results.
+        """
+        shared_results = ([{"child_docs": [1, 2]}], None, None)
+        other_results = ([{"child_docs": [3]}], None, None)
+        sweep_results = SweepAlertsResults(
+            alerts_keys={1: "shared", 2: "shared", 3: "other"},
+            queries_results={"shared": shared_results, "other": other_results},
+        )
+
+        first_results = sweep_results.pop_alert_results(1)
+        self.assertEqual(first_results, shared_results)
+        self.assertIsNot(first_results[0], shared_results[0])
+        first_results[0][0]["child_docs"] = []
+
+        self.assertIs(sweep_results.pop_alert_results(2), shared_results)
+        self.assertEqual(shared_results[0][0]["child_docs"], [1, 2])
+        self.assertIs(sweep_results.pop_alert_results(3), other_results)
+        self.assertEqual(sweep_results.queries_results, {})
+
+    def test_dedupe_alert_queries_across_users(self, mock_prefix) -> None:
+        """Confirm equivalent alert queries saved by different users are
+        queried once and their results are sent to every alert.
+        """
+
+        self.assertEqual(
+            normalize_alert_query(
+                QueryDict("type=r&q=SUBPOENAS   SERVED OFF&court=")
+            ),
+            normalize_alert_query(QueryDict("q=SUBPOENAS SERVED OFF&type=r")),
+        )
+        alerts = []
+        for user_profile, query in [
+            (self.user_profile, "q=SUBPOENAS SERVED OFF&type=r"),
+            (self.user_profile_2, "type=r&q=SUBPOENAS  SERVED OFF"),
+        ]:
+            alerts.append(
+                AlertFactory(
+                    user=user_profile.user,
+                    rate=Alert.REAL_TIME,
+                    name="Test Alert Same Query",
+                    query=query,
+                    alert_type=SEARCH_TYPES.RECAP,
+                )
+            )
+
+        with (
+            mock.patch(
+                "cl.api.webhooks.requests.post",
+                side_effect=lambda *args, **kwargs: MockResponse(
+                    200, mock_raw=True
+                ),
+            ),
+            mock.patch(
+                "cl.alerts.management.commands.cl_send_recap_alerts.build_es_sweep_alert_query",
+                wraps=build_es_sweep_alert_query,
+            ) as mock_build_query,
+            time_machine.travel(self.mock_date, tick=False),
+        ):
+            call_command("cl_send_recap_alerts", testing_mode=True)
+
+        # The query is built once for both alerts.
+        self.assertEqual(mock_build_query.call_count, 1)
+        # Each user receives their alert.
+        self.assertEqual(
+            len(mail.outbox), 2, msg="Outgoing emails don't match."
+        )
+        for alert in alerts:
+            alert.refresh_from_db()
+            self.assertEqual(alert.date_last_hit, self.mock_date)
+
     def test_send_alerts_on_custom_date(self, mock_prefix) -> None:
         """This test confirms that the cl_send_recap_alerts --query-date
         argument works correctly to send alerts for the specified date.
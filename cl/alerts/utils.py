@@ -1,13 +1,16 @@
 import copy
 from dataclasses import dataclass
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import Any
 from urllib.parse import parse_qs
 
 from django.apps import apps
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
 from django.http import QueryDict
+from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import RequestError, TransportError
 from elasticsearch_dsl import MultiSearch, Q, Search
 from elasticsearch_dsl.query import Query
 from elasticsearch_dsl.response import Hit
@@ -78,6 +81,79 @@ class TaskCompletionStatus:
     start_time_millis: int | None = None
 
 
+def get_task_status(task_id: str, es: Elasticsearch) -> dict[str, Any]:
+    """Fetch the status of a task from Elasticsearch.
+
+    :param task_id: The ID of the task to fetch the status for.
+    :param es: The Elasticsearch client instance.
+    :return: The status of the task if successful, or an empty dictionary if
+    an error occurs.
+    """
+    try:
+        return es.tasks.get(task_id=task_id)
+    except (
+        TransportError,
+        ConnectionError,
+        RequestError,
+    ) as e:
+        logger.warning("Error getting Elasticsearch task status: %s", e)
+        return {}
+
+
+def compute_estimated_remaining_time(
+    initial_wait: float, task_status: TaskCompletionStatus
+) -> float:
+    """Compute the estimated remaining time for an Elasticsearch task to
+    complete.
+
+    :param initial_wait: The default wait time in seconds.
+    :param task_status: An instance of `TaskCompletionStatus` containing task
+    information.
+    :return: The estimated remaining time in seconds. If the start time,
+    created, or total are invalid, the initial default time is returned.
+    """
+
+    if (
+        task_status.start_time_millis is None
+        or not task_status.created
+        or not task_status.total
+    ):
+        return initial_wait
+
+    start_time = datetime.fromtimestamp(task_status.start_time_millis / 1000.0)
+    time_now = datetime.now()
+    estimated_time_remaining = max(
+        timedelta(
+            seconds=(
+                (time_now - start_time).total_seconds() / task_status.created
+            )
+            * (task_status.total - task_status.created)
+        ).total_seconds(),
+        initial_wait,
+    )
+
+    return estimated_time_remaining
+
+
+def retrieve_task_info(task_info: dict[str, Any]) -> TaskCompletionStatus:
+    """Retrieve task information from the given task dict.
+
+    :param task_info: A dictionary containing the task status information.
+    :return: A `TaskCompletionStatus` object representing the extracted task
+    information.
+    """
+
+    if task_info:
+        status = task_info["task"]["status"]
+        return TaskCompletionStatus(
+            completed=task_info["completed"],
+            created=status["created"],
+            total=status["total"],
+            start_time_millis=task_info["task"]["start_time_in_millis"],
+        )
+    return TaskCompletionStatus()
+
+
 class OldAlertReport:
     def __init__(self):
         self.old_alerts = []
@@ -129,6 +205,52 @@ def create_percolator_search_query(
     return s
 
 
+def add_percolator_highlighting(s: Search, app_label: str) -> Search:
+    """Add the alerts highlighting options of a document type to a percolator
+    search query.
+
+    :param s: The percolator search query.
+    :param app_label: The app label and model that belongs to the document
+    being percolated.
+    :return: The search query with highlighting.
+    """
+    match app_label:
+        case "search.RECAPDocument":
+            child_highlight_options, _ = build_highlights_dict(
+                SEARCH_RECAP_CHILD_HL_FIELDS, ALERTS_HL_TAG
+            )
+            parent_highlight_options, _ = build_highlights_dict(
+                SEARCH_RECAP_HL_FIELDS, ALERTS_HL_TAG
+            )
+            child_highlight_options["fields"].update(
+                parent_highlight_options["fields"]
+            )
+            return s.extra(highlight=child_highlight_options)
+        case "search.Docket":
+            return add_es_highlighting(
+                s, {"type": SEARCH_TYPES.RECAP}, alerts=True
+            )
+        case "audio.Audio":
+            return add_es_highlighting(
+                s, {"type": SEARCH_TYPES.ORAL_ARGUMENT}, alerts=True
+            )
+        case "search.Opinion":
+            child_highlight_options, _ = build_highlights_dict(
+                SEARCH_OPINION_CHILD_HL_FIELDS, ALERTS_HL_TAG
+            )
+            parent_highlight_options, _ = build_highlights_dict(
+                SEARCH_OPINION_HL_FIELDS, ALERTS_HL_TAG
+            )
+            child_highlight_options["fields"].update(
+                parent_highlight_options["fields"]
+            )
+            return s.extra(highlight=child_highlight_options)
+        case _:
+            raise NotImplementedError(
+                "Percolator search alerts not supported for %s", app_label
+            )
+
+
 def percolate_es_document(
     document_id: str,
     percolator_index: str,
@@ -217,55 +339,19 @@ def percolate_es_document(
     s = create_percolator_search_query(
         percolator_index, final_query, search_after=main_search_after
     )
-    match app_label:
-        case "search.RECAPDocument":
-            child_highlight_options, _ = build_highlights_dict(
-                SEARCH_RECAP_CHILD_HL_FIELDS, ALERTS_HL_TAG
-            )
-            parent_highlight_options, _ = build_highlights_dict(
-                SEARCH_RECAP_HL_FIELDS, ALERTS_HL_TAG
-            )
-            child_highlight_options["fields"].update(
-                parent_highlight_options["fields"]
-            )
-            extra_options = {"highlight": child_highlight_options}
-            s = s.extra(**extra_options)
-
-            if (main_search_after is None) == (rd_search_after is None):
-                s_rd = create_percolator_search_query(
-                    percolator_index,
-                    percolate_query_child,
-                    search_after=rd_search_after,
-                )
-            if (main_search_after is None) == (d_search_after is None):
-                s_d = create_percolator_search_query(
-                    percolator_index,
-                    percolate_query_parent,
-                    search_after=d_search_after,
-                )
-        case "search.Docket":
-            s = add_es_highlighting(
-                s, {"type": SEARCH_TYPES.RECAP}, alerts=True
-            )
-        case "audio.Audio":
-            s = add_es_highlighting(
-                s, {"type": SEARCH_TYPES.ORAL_ARGUMENT}, alerts=True
+    s = add_percolator_highlighting(s, app_label)
+    if app_label == "search.RECAPDocument":
+        if (main_search_after is None) == (rd_search_after is None):
+            s_rd = create_percolator_search_query(
+                percolator_index,
+                percolate_query_child,
+                search_after=rd_search_after,
             )
-        case "search.Opinion":
-            child_highlight_options, _ = build_highlights_dict(
-                SEARCH_OPINION_CHILD_HL_FIELDS, ALERTS_HL_TAG
-            )
-            parent_highlight_options, _ = build_highlights_dict(
-                SEARCH_OPINION_HL_FIELDS, ALERTS_HL_TAG
-            )
-            child_highlight_options["fields"].update(
-                parent_highlight_options["fields"]
-            )
-            extra_options = {"highlight": child_highlight_options}
-            s = s.extra(**extra_options)
-        case _:
-            raise NotImplementedError(
-                "Percolator search alerts not supported for %s", app_label
+        if (main_search_after is None) == (d_search_after is None):
+            s_d = create_percolator_search_query(
+                percolator_index,
+                percolate_query_parent,
+                search_after=d_search_after,
             )
 
     s = s.source(excludes=["percolator_query"])
@@ -369,6 +455,128 @@ def fetch_all_search_alerts_results(
     return all_main_alert_hits, all_rd_alert_hits, all_d_alert_hits
 
 
+def split_percolator_hits(
+    hits: list[Hit], documents_count: int
+) -> list[list[Hit]]:
+    """Map the hits of a multi-document percolator query back to the
+    documents that matched them, through their _percolator_document_slot.
+
+    When several documents are percolated, ES prefixes the highlighted fields
+    with the document slot, so the prefix is removed to return hits shaped
+    like the ones of a single document percolation.
+
+    :param hits: The hits returned by the percolator query.
+    :param documents_count: The number of documents percolated.
+    :return: A list containing the hits of each document, in slot order.
+    """
+
+    documents_hits: list[list[Hit]] = [[] for _ in range(documents_count)]
+    for hit in hits:
+        source = hit.to_dict()
+        source.pop("_percolator_document_slot", None)
+        meta = hit.meta.to_dict()
+        highlight = meta.get("highlight", {})
+        for slot in hit.meta.fields["_percolator_document_slot"]:
+            if documents_count > 1:
+                prefix = f"{slot}_"
+                slot_highlight = {
+                    field.removeprefix(prefix): fragments
+                    for field, fragments in highlight.items()
+                    if field.startswith(prefix)
+                }
+            else:
+                slot_highlight = highlight
+            raw_hit = {
+                "_index": meta["index"],
+                "_id": meta["id"],
+                "_score": meta.get("score"),
+                "_source": source,
+                "sort": meta.get("sort"),
+            }
+            if slot_highlight:
+                raw_hit["highlight"] = slot_highlight
+            documents_hits[slot].append(Hit(raw_hit))
+    return documents_hits
+
+
+def percolate_es_documents(
+    percolator_index: str,
+    documents_to_percolate: list[
+        tuple[ESDictDocument, ESDictDocument | None, ESDictDocument | None]
+    ],
+    app_label: str,
+) -> list[tuple[list[Hit], list[Hit], list[Hit]]]:
+    """Percolate several documents in a single request, using the percolate
+    query documents form, and fetch all the alerts each of them matched.
+
+    :param percolator_index: The ES percolator index name.
+    :param documents_to_percolate: A list of three-tuples containing the
+    documents to percolate: the full document, the document with only child
+    fields, and the document with only parent fields.
+    :param app_label: The app label and model that belongs to the documents
+    being percolated.
+    :return: A list with a three-tuple for each document, containing the main
+    percolator hits, the RECAPDocument percolator hits, and the Docket
+    percolator hits.
+    """
+
+    results: list[tuple[list[Hit], list[Hit], list[Hit]]] = [
+        ([], [], []) for _ in documents_to_percolate
+    ]
+    # The main, child-only and parent-only queries. The last two are only
+    # used by RECAPDocuments.
+    positions = [0, 1, 2] if app_label == "search.RECAPDocument" else [0]
+    searches = []
+    for position in positions:
+        slots = [
+            i
+            for i, documents in enumerate(documents_to_percolate)
+            if documents[position]
+        ]
+        if not slots:
+            continue
+        percolate_query = Q(
+            "percolate",
+            field="percolator_query",
+            documents=[documents_to_percolate[i][position] for i in slots],
+        )
+        if position == 0:
+            final_query = Q(
+                "bool",
+                must=[percolate_query],
+                must_not=[Q("term", rate=Alert.OFF)],
+            )
+            s = create_percolator_search_query(percolator_index, final_query)
+            s = add_percolator_highlighting(s, app_label)
+            s = s.source(excludes=["percolator_query"])
+        else:
+            s = create_percolator_search_query(
+                percolator_index, percolate_query
+            )
+        searches.append((position, slots, s))
+    if not searches:
+        return results
+
+    multi_search = MultiSearch()
+    for _, _, s in searches:
+        multi_search = multi_search.add(s)
+    responses = multi_search.execute()
+
+    for (position, slots, s), response in zip(searches, responses):
+        hits = list(response.hits)
+        page_hits = len(hits)
+        # Fetch the next pages of alerts until a page is not full.
+        while page_hits == settings.ELASTICSEARCH_PAGINATION_BATCH_SIZE:
+            page = s.extra(search_after=list(hits[-1].meta.sort)).execute()
+            hits.extend(page.hits)
+            page_hits = len(page.hits)
+        for i, document_hits in enumerate(
+            split_percolator_hits(hits, len(slots))
+        ):
+            results[slots[i]][position].extend(document_hits)
+    return results
+
+
 def add_cutoff_timestamp_filter(
     query: str, cut_off_date: date | datetime | None
 ) -> str:
@@ -759,6 +967,91 @@ def prepare_percolator_content(
     return percolator_index, es_document_index, documents_to_percolate
 
 
+def prepare_percolator_batch_content(
+    app_label: str, document_ids: list[str]
+) -> tuple[
+    str,
+    list[
+        tuple[
+            str,
+            ESDictDocument,
+            tuple[
+                ESDictDocument, ESDictDocument | None, ESDictDocument | None
+            ],
+        ]
+    ],
+]:
+    """Prepare the content of several documents to percolate them together.
+
+    Unlike prepare_percolator_content, the documents are always percolated by
+    content, since the percolate query can't refer to several stored
+    documents.
+
+    :param app_label: The app label and model that belongs to the documents.
+    :param document_ids: The IDs of the documents to prepare.
+    :return: A two-tuple containing the percolator index name and a list of
+    three-tuples with the ID of each document that still exists, the content
+    to render in alerts and the documents to percolate.
+    """
+
+    documents = []
+    match app_label:
+        case "audio.Audio" | "search.Docket":
+            if app_label == "audio.Audio":
+                percolator_index = AudioPercolator._index._name
+                es_document_class = AudioDocument
+            else:
+                percolator_index = RECAPPercolator._index._name
+                es_document_class = DocketDocument
+            model = apps.get_model(app_label)
+            for pk, instance in model.objects.in_bulk(document_ids).items():
+                document_content = es_document_class().prepare(instance)
+                # Remove the join field to avoid document parsing errors.
+                percolator_content = {
+                    field: value
+                    for field, value in document_content.items()
+                    if field != "docket_child"
+                }
+                documents.append(
+                    (
+                        str(pk),
+                        document_content,
+                        (percolator_content, None, None),
+                    )
+                )
+        case "search.RECAPDocument" | "search.Opinion":
+            percolator_index = (
+                RECAPPercolator._index._name
+                if app_label == "search.RECAPDocument"
+                else OpinionPercolator._index._name
+            )
+            for document_id in document_ids:
+                try:
+                    _, _, documents_to_percolate = prepare_percolator_content(
+                        app_label, document_id
+                    )
+                except ObjectDoesNotExist:
+                    logger.warning(
+                        "%s %s missing during alert trigger.",
+                        app_label,
+                        document_id,
+                    )
+                    continue
+                documents.append(
+                    (
+                        document_id,
+                        documents_to_percolate[0],
+                        documents_to_percolate,
+                    )
+                )
+        case _:
+            raise NotImplementedError(
+                "Percolator search alerts not supported for %s", app_label
+            )
+
+    return percolator_index, documents
+
+
 def set_skip_percolation_if_bankruptcy_data(
     docket_data: dict[str, Any], d: Docket
 ) -> None:
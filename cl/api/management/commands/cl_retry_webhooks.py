@@ -2,11 +2,12 @@ import sys
 import time
 from datetime import timedelta
 
+from django.conf import settings
 from django.db import transaction
 from django.utils.timezone import now
 
 from cl.api.models import WEBHOOK_EVENT_STATUS, Webhook, WebhookEvent
-from cl.api.webhooks import send_webhook_event
+from cl.api.webhooks import send_webhook_event, send_webhook_events
 from cl.lib.command_utils import VerboseCommand
 from cl.lib.redis_utils import get_redis_interface
 from cl.users.tasks import send_webhook_still_disabled_email
@@ -55,8 +56,15 @@ def retry_webhook_events() -> int:
             ],
             date_created__gte=created_date_cut_off,
         ).order_by("date_created")
-        for webhook_event in webhook_events_to_retry:
-            send_webhook_event(webhook_event)
+        if settings.WEBHOOK_DELIVERY_ENGINE_ENABLED:
+            # Drain the backlog concurrently.
+            webhook_events_to_retry = list(
+                webhook_events_to_retry.prefetch_related("webhook")
+            )
+            send_webhook_events(webhook_events_to_retry)
+        else:
+            for webhook_event in webhook_events_to_retry:
+                send_webhook_event(webhook_event)
     return len(webhook_events_to_retry)
 
 
@@ -12,7 +12,7 @@ from cl.api.models import (
     WebhookVersions,
 )
 from cl.api.utils import generate_webhook_key_content
-from cl.api.webhooks import send_webhook_event
+from cl.api.webhooks import send_webhook_event, send_webhook_events
 from cl.celery_init import app
 from cl.corpus_importer.api_serializers import DocketEntrySerializer
 from cl.favorites.api_serializers import PrayerSerializer
@@ -71,6 +71,7 @@ def send_docket_alert_webhook_events(
     for de in docket_entries:
         serialized_docket_entries.append(DocketEntrySerializer(de).data)
 
+    webhook_events, contents = [], []
     for webhook in webhooks:
         post_content = {
             "webhook": generate_webhook_key_content(webhook),
@@ -88,7 +89,9 @@ def send_docket_alert_webhook_events(
             webhook=webhook,
             content=post_content,
         )
-        send_webhook_event(webhook_event, json_bytes)
+        webhook_events.append(webhook_event)
+        contents.append(json_bytes)
+    send_webhook_events(webhook_events, contents)
 
 
 @app.task()
@@ -7,6 +7,7 @@ from unittest import mock
 from unittest.mock import MagicMock, patch
 from urllib.parse import parse_qs, urlparse
 
+import httpx
 from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Permission
@@ -37,9 +38,14 @@ from cl.api.api_permissions import V3APIPermission
 from cl.api.factories import WebhookEventFactory, WebhookFactory
 from cl.api.models import WEBHOOK_EVENT_STATUS, WebhookEvent, WebhookEventType
 from cl.api.pagination import VersionBasedPagination
-from cl.api.utils import LoggingMixin, get_logging_prefix, invert_user_logs
+from cl.api.utils import (
+    WEBHOOK_MAX_RETRY_COUNTER,
+    LoggingMixin,
+    get_logging_prefix,
+    invert_user_logs,
+)
 from cl.api.views import build_chart_data, coverage_data, make_court_variable
-from cl.api.webhooks import send_webhook_event
+from cl.api.webhooks import send_webhook_event, send_webhook_events
 from cl.audio.api_views import AudioViewSet
 from cl.audio.factories import AudioFactory
 from cl.disclosures.api_views import (
@@ -3096,6 +3102,182 @@ class WebhooksProxySecurityTest(TestCase):
             HTTPStatus.FORBIDDEN,
         )
 
+    @override_settings(WEBHOOK_DELIVERY_ENGINE_ENABLED=True)
+    def test_avoid_sending_concurrent_webhooks_to_internal_ips(self):
+        """Are webhooks sent concurrently also blocked for internal IPs?"""
+
+        webhook_events = [
+            WebhookEventFactory(
+                webhook=webhook,
+                content="{'message': 'ok_1'}",
+                event_status=WEBHOOK_EVENT_STATUS.IN_PROGRESS,
+            )
+            for webhook in [
+                self.webhook_https,
+                self.webhook_http,
+                self.webhook_0_0_0_0,
+            ]
+        ]
+        send_webhook_events(webhook_events)
+
+        for webhook_event, ip in zip(
+            webhook_events, ["127.0.0.1", "127.0.0.1", "0.0.0.0"]
+        ):
+            webhook_event.refresh_from_db()
+            self.assertIn(f"IP {ip} is blocked", webhook_event.response)
+            self.assertEqual(webhook_event.status_code, HTTPStatus.FORBIDDEN)
+
+
+@override_settings(WEBHOOK_DELIVERY_ENGINE_ENABLED=True)
+class WebhookDeliveryEngineTest(TestCase):
+    """Test the concurrent webhook delivery engine"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_profile = UserProfileWithParentsFactory()
+        cls.webhook_ok = WebhookFactory(
+            user=cls.user_profile.user,
+            event_type=WebhookEventType.DOCKET_ALERT,
+            url="https://example.com/ok",
+            enabled=True,
+        )
+        cls.webhook_failing = WebhookFactory(
+            user=cls.user_profile.user,
+            event_type=WebhookEventType.DOCKET_ALERT,
+            url="https://example.com/failing",
+            enabled=True,
+        )
+
+    @staticmethod
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/ok":
+            return httpx.Response(HTTPStatus.OK, text="OK")
+        return httpx.Response(HTTPStatus.INTERNAL_SERVER_ERROR, text="Error")
+
+    def test_send_webhook_events_in_batches(self):
+        """Are webhook events sent concurrently and updated in bulk with the
+        same backoff as events sent one by one?
+        """
+        webhook_events = [
+            WebhookEventFactory(
+                webhook=webhook,
+                content={"message": "ok"},
+                event_status=WEBHOOK_EVENT_STATUS.IN_PROGRESS,
+            )
+            for webhook in [self.webhook_ok, self.webhook_failing] * 2
+        ]
+        with (
+            override_settings(WEBHOOK_DELIVERY_BATCH_SIZE=3),
+            mock.patch(
+                "cl.api.webhooks.get_webhook_client",
+                side_effect=lambda proxy: httpx.AsyncClient(
+                    transport=httpx.MockTransport(self.handle_request)
+                ),
+            ),
+        ):
+            send_webhook_events(webhook_events)
+
+        for webhook_event in webhook_events:
+            webhook_event.refresh_from_db()
+            if webhook_event.webhook_id == self.webhook_ok.pk:
+                self.assertEqual(
+                    webhook_event.event_status,
+                    WEBHOOK_EVENT_STATUS.SUCCESSFUL,
+                )
+                self.assertEqual(webhook_event.response, "OK")
+                self.assertEqual(webhook_event.retry_counter, 0)
+            else:
+                self.assertEqual(
+                    webhook_event.event_status,
+                    WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY,
+                )
+                self.assertEqual(
+                    webhook_event.status_code,
+                    HTTPStatus.INTERNAL_SERVER_ERROR,
+                )
+                self.assertEqual(webhook_event.retry_counter, 1)
+                self.assertGreater(webhook_event.next_retry_date, now())
+
+    def test_request_errors_only_fail_their_event(self):
+        """Does an error raised while sending an event only fail that event,
+        while the rest of the batch is sent and updated?
+        """
+        webhook_broken = WebhookFactory(
+            user=self.user_profile.user,
+            event_type=WebhookEventType.DOCKET_ALERT,
+            url="https://example.com/broken",
+            enabled=True,
+        )
+
+        def handle_request(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/broken":
+                raise httpx.DecodingError("Malformed response")
+            return self.handle_request(request)
+
+        webhook_events = [
+            WebhookEventFactory(
+                webhook=webhook,
+                content={"message": "ok"},
+                event_status=WEBHOOK_EVENT_STATUS.IN_PROGRESS,
+            )
+            for webhook in [webhook_broken, self.webhook_ok]
+        ]
+        with mock.patch(
+            "cl.api.webhooks.get_webhook_client",
+            side_effect=lambda proxy: httpx.AsyncClient(
+                transport=httpx.MockTransport(handle_request)
+            ),
+        ):
+            send_webhook_events(webhook_events)
+
+        for webhook_event in webhook_events:
+            webhook_event.refresh_from_db()
+        self.assertEqual(
+            webhook_events[0].event_status,
+            WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY,
+        )
+        self.assertIn("DecodingError", webhook_events[0].error_message)
+        self.assertEqual(
+            webhook_events[1].event_status, WEBHOOK_EVENT_STATUS.SUCCESSFUL
+        )
+
+    def test_keep_events_of_disabled_webhooks_disabled(self):
+        """Are the events of a webhook disabled while its batch is sent kept
+        as ENDPOINT_DISABLED instead of being enqueued for retry again?
+        """
+        webhook_events = [
+            WebhookEventFactory(
+                webhook=self.webhook_failing,
+                content={"message": "ok"},
+                event_status=WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY,
+                retry_counter=WEBHOOK_MAX_RETRY_COUNTER,
+            ),
+            WebhookEventFactory(
+                webhook=self.webhook_failing,
+                content={"message": "ok"},
+                event_status=WEBHOOK_EVENT_STATUS.IN_PROGRESS,
+            ),
+        ]
+        with mock.patch(
+            "cl.api.webhooks.get_webhook_client",
+            side_effect=lambda proxy: httpx.AsyncClient(
+                transport=httpx.MockTransport(self.handle_request)
+            ),
+        ):
+            send_webhook_events(webhook_events)
+
+        self.webhook_failing.refresh_from_db()
+        self.assertFalse(self.webhook_failing.enabled)
+        for webhook_event in webhook_events:
+            webhook_event.refresh_from_db()
+        self.assertEqual(
+            [webhook_event.event_status for webhook_event in webhook_events],
+            [
+                WEBHOOK_EVENT_STATUS.FAILED,
+                WEBHOOK_EVENT_STATUS.ENDPOINT_DISABLED,
+            ],
+        )
+
 
 class WebhooksMilestoneEventsTest(TestCase):
     """Test Webhook milestone events tracking"""
@@ -1060,40 +1060,29 @@ def check_webhook_failure_count_and_notify(
     webhook.save(update_fields=update_fields)
 
 
-def update_webhook_event_after_request(
+def set_webhook_event_result(
     webhook_event: WebhookEvent,
-    response: Response | None = None,
+    status_code: int | None = None,
+    data: str = "",
     error: str | None = "",
 ) -> None:
-    """Update the webhook event after sending the POST request. If the webhook
-    event fails, increase the retry counter, next retry date and increase its
-    parent webhook failure count. If the webhook event reaches the max retry
-    counter marks it as Failed. If there is no error marks it as Successful.
+    """Set the outcome of a webhook event request without saving the event.
+    If the webhook event fails, increase the retry counter, next retry date
+    and increase its parent webhook failure count. If the webhook event
+    reaches the max retry counter marks it as Failed. If there is no error
+    marks it as Successful.
 
     :param webhook_event: The WebhookEvent to update.
-    :param response: Optional in case we receive a requests Response object, to
-    update the WebhookEvent accordingly.
-    :param error: Optional, if we don't receive a request Response we'll
-    receive an error to log it.
+    :param status_code: The response status code, or None if there was no
+    response.
+    :param data: The beginning of the response body.
+    :param error: Optional, the error to log if there was no response.
     :return: None
     """
 
-    failed_request = False
-    data = ""
-    status_code = None
-    if response is not None:
-        # The webhook response is consumed as a stream to avoid blocking the
-        # process and overflowing memory on huge responses. We only read and
-        # store the first 4KB
-        for chunk in response.iter_content(1024 * 4, decode_unicode=True):
-            data = chunk
-            break
-        response.close()
-        status_code = response.status_code
-        # If the response status code is not 2xx. It's considered a failed
-        # attempt, and it'll be enqueued for retry.
-        if not 200 <= response.status_code < 300:
-            failed_request = True
+    # If the response status code is not 2xx. It's considered a failed
+    # attempt, and it'll be enqueued for retry.
+    failed_request = status_code is not None and not 200 <= status_code < 300
     webhook_event.status_code = status_code
     webhook_event.response = data
 
@@ -1106,7 +1095,6 @@ def update_webhook_event_after_request(
             # If the webhook has reached the max retry counter, mark as failed
             webhook_event.event_status = WEBHOOK_EVENT_STATUS.FAILED
             webhook_event.retry_counter = F("retry_counter") + 1
-            webhook_event.save()
             return
 
         webhook_event.next_retry_date = get_next_webhook_retry_date(
@@ -1123,6 +1111,36 @@ def update_webhook_event_after_request(
             # Only log successful webhook events and not debug.
             results = log_webhook_event(webhook_event.webhook.user.pk)
             handle_webhook_events(results, webhook_event.webhook.user)
+
+
+def update_webhook_event_after_request(
+    webhook_event: WebhookEvent,
+    response: Response | None = None,
+    error: str | None = "",
+) -> None:
+    """Update the webhook event after sending the POST request. See
+    set_webhook_event_result for the details.
+
+    :param webhook_event: The WebhookEvent to update.
+    :param response: Optional in case we receive a requests Response object, to
+    update the WebhookEvent accordingly.
+    :param error: Optional, if we don't receive a request Response we'll
+    receive an error to log it.
+    :return: None
+    """
+
+    data = ""
+    status_code = None
+    if response is not None:
+        # The webhook response is consumed as a stream to avoid blocking the
+        # process and overflowing memory on huge responses. We only read and
+        # store the first 4KB
+        for chunk in response.iter_content(1024 * 4, decode_unicode=True):
+            data = chunk
+            break
+        response.close()
+        status_code = response.status_code
+    set_webhook_event_result(webhook_event, status_code, data, error)
     webhook_event.save()
 
 
@@ -1,9 +1,15 @@
+import asyncio
 import json
 import random
+import re
+from collections import defaultdict
+from itertools import batched
 
 import requests
 from django.conf import settings
+from django.utils.timezone import now
 from elasticsearch_dsl.response import Response
+from httpx import AsyncClient, HTTPError, InvalidURL, Limits, Timeout
 from rest_framework.renderers import JSONRenderer
 
 from cl.alerts.api_serializers import (
@@ -13,6 +19,7 @@ from cl.alerts.api_serializers import (
 from cl.alerts.models import Alert
 from cl.alerts.utils import OldAlertReport
 from cl.api.models import (
+    WEBHOOK_EVENT_STATUS,
     Webhook,
     WebhookEvent,
     WebhookEventType,
@@ -20,8 +27,10 @@ from cl.api.models import (
 )
 from cl.api.utils import (
     generate_webhook_key_content,
+    set_webhook_event_result,
     update_webhook_event_after_request,
 )
+from cl.lib.microservice_utils import run_on_worker_event_loop
 from cl.lib.string_utils import trunc
 from cl.recap.api_serializers import PacerFetchQueueSerializer
 from cl.recap.models import PROCESSING_STATUS, PacerFetchQueue
@@ -30,19 +39,23 @@ from cl.search.api_serializers import (
     V3OpinionESResultSerializer,
 )
 
+EMPTY_JSON_OBJECT = re.compile(rb"\s*\{\s*\}\s*")
 
-def send_webhook_event(
+# The long-lived clients used to send webhook events from worker event loops,
+# keyed by event loop and egress proxy.
+_webhook_clients: dict[tuple[asyncio.AbstractEventLoop, str], AsyncClient] = {}
+
+
+def get_webhook_request(
     webhook_event: WebhookEvent, content_bytes: bytes | None = None
-) -> None:
-    """Send the webhook POST request.
+) -> tuple[str, dict[str, str], bytes]:
+    """Build the URL, headers and JSON body of a webhook event request.
 
     :param webhook_event: An WebhookEvent to send.
     :param content_bytes: Optional, the bytes JSON content to send the first time
     the webhook is sent.
+    :return: A three tuple of the URL, the headers and the JSON body.
     """
-    proxy_server = {
-        "http": random.choice(settings.WEBHOOK_EGRESS_PROXY_HOSTS),  # type: ignore
-    }
     headers = {
         "Content-type": "application/json",
         "Idempotency-Key": str(webhook_event.event_id),
@@ -57,18 +70,35 @@ def send_webhook_event(
             accepted_media_type="application/json;",
         )
 
-    json_data = json.loads(json_bytes)
-    if json_data == {}:
+    if EMPTY_JSON_OBJECT.fullmatch(json_bytes):
         raise ValueError("Webhook payload is empty.")
+    # To send a POST to an HTTPS target and using webhook-sentry as proxy,
+    # you needed to change the protocol to HTTP and set the X-WhSentry-TLS
+    # header to true. See https://github.com/juggernaut/webhook-sentry#https-target
+    url = webhook_event.webhook.url.replace("https://", "http://")
+    return url, headers, json_bytes
+
+
+def send_webhook_event(
+    webhook_event: WebhookEvent, content_bytes: bytes | None = None
+) -> None:
+    """Send the webhook POST request.
+
+    :param webhook_event: An WebhookEvent to send.
+    :param content_bytes: Optional, the bytes JSON content to send the first time
+    the webhook is sent.
+    """
+    proxy_server = {
+        "http": random.choice(settings.WEBHOOK_EGRESS_PROXY_HOSTS),  # type: ignore
+    }
+    url, headers, json_bytes = get_webhook_request(
+        webhook_event, content_bytes
+    )
     try:
-        # To send a POST to an HTTPS target and using webhook-sentry as proxy,
-        # you needed to change the protocol to HTTP and set the X-WhSentry-TLS
-        # header to true. See https://github.com/juggernaut/webhook-sentry#https-target
-        url = webhook_event.webhook.url.replace("https://", "http://")
         response = requests.post(
             url,
             proxies=proxy_server,
-            json=json_data,
+            json=json.loads(json_bytes),
             timeout=(3, 3),
             headers=headers,
             allow_redirects=False,
@@ -80,6 +110,146 @@ def send_webhook_event(
         update_webhook_event_after_request(webhook_event, error=error_str)
 
 
+def get_webhook_client(proxy: str) -> AsyncClient:
+    """Get the long-lived client that sends webhook events through an egress
+    proxy from the running event loop, creating it on first use. Connections
+    to the proxy are kept alive and shared by all the webhook endpoints.
+
+    :param proxy: The egress proxy URL.
+    :return: The AsyncClient for the proxy.
+    """
+    key = (asyncio.get_running_loop(), proxy)
+    client = _webhook_clients.get(key)
+    if client is None:
+        max_connections = settings.WEBHOOK_DELIVERY_MAX_CONCURRENCY
+        client = AsyncClient(
+            proxy=proxy,
+            # Waiting for a free connection doesn't count against the
+            # endpoint.
+            timeout=Timeout(3.0, pool=None),
+            limits=Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            follow_redirects=False,
+        )
+        _webhook_clients[key] = client
+    return client
+
+
+async def post_webhook_requests(
+    webhook_requests: list[tuple[str, dict[str, str], bytes]],
+) -> list[tuple[int | None, str, str]]:
+    """POST webhook event requests concurrently through the egress proxies,
+    bounding the number of requests in flight overall and per endpoint, so a
+    slow endpoint can't hold up the rest.
+
+    :param webhook_requests: A list of (URL, headers, JSON body) tuples.
+    :return: A list of (status code, beginning of the response body, error)
+    tuples, in the same order as the requests.
+    """
+    in_flight = asyncio.Semaphore(settings.WEBHOOK_DELIVERY_MAX_CONCURRENCY)
+    per_endpoint = settings.WEBHOOK_DELIVERY_MAX_CONCURRENCY_PER_ENDPOINT
+    endpoints: defaultdict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(per_endpoint)
+    )
+
+    async def post(
+        url: str, headers: dict[str, str], json_bytes: bytes
+    ) -> tuple[int | None, str, str]:
+        client = get_webhook_client(
+            random.choice(settings.WEBHOOK_EGRESS_PROXY_HOSTS)  # type: ignore
+        )
+        async with endpoints[url], in_flight:
+            try:
+                async with client.stream(
+                    "POST", url, content=json_bytes, headers=headers
+                ) as response:
+                    # Only read and store the first 4KB of the response.
+                    data = ""
+                    async for chunk in response.aiter_text(1024 * 4):
+                        data = chunk
+                        break
+                    return response.status_code, data, ""
+            except (HTTPError, InvalidURL, ValueError) as exc:
+                error_str = f"{type(exc).__name__}: {exc}"
+                return None, "", trunc(error_str, 500)
+
+    return await asyncio.gather(
+        *(post(*webhook_request) for webhook_request in webhook_requests)
+    )
+
+
+def send_webhook_events(
+    webhook_events: list[WebhookEvent],
+    contents: list[bytes | None] | None = None,
+) -> None:
+    """Send webhook events concurrently from the event loop of the worker,
+    and update the events in bulk after each batch.
+
+    If WEBHOOK_DELIVERY_ENGINE_ENABLED is off, the events are sent one by one.
+
+    :param webhook_events: The WebhookEvents to send.
+    :param contents: Optional, the bytes JSON content of each event to send
+    the first time the webhooks are sent.
+    :return: None
+    """
+    if contents is None:
+        contents = [None] * len(webhook_events)
+    if not settings.WEBHOOK_DELIVERY_ENGINE_ENABLED:
+        for webhook_event, content_bytes in zip(webhook_events, contents):
+            send_webhook_event(webhook_event, content_bytes)
+        return
+
+    for batch in batched(
+        zip(webhook_events, contents), settings.WEBHOOK_DELIVERY_BATCH_SIZE
+    ):
+        webhook_requests = [
+            get_webhook_request(webhook_event, content_bytes)
+            for webhook_event, content_bytes in batch
+        ]
+        results = run_on_worker_event_loop(
+            post_webhook_requests(webhook_requests)
+        )
+        events_to_update = []
+        for (webhook_event, _), (status_code, data, error) in zip(
+            batch, results
+        ):
+            set_webhook_event_result(webhook_event, status_code, data, error)
+            webhook_event.date_modified = now()
+            events_to_update.append(webhook_event)
+        # Webhooks disabled after too many failures have their events marked
+        # as ENDPOINT_DISABLED by a queryset update. Don't enqueue them for
+        # retry again.
+        disabled_webhook_ids = set(
+            Webhook.objects.filter(
+                pk__in={event.webhook_id for event in events_to_update},
+                enabled=False,
+            ).values_list("pk", flat=True)
+        )
+        for webhook_event in events_to_update:
+            if (
+                webhook_event.webhook_id in disabled_webhook_ids
+                and webhook_event.event_status
+                == WEBHOOK_EVENT_STATUS.ENQUEUED_RETRY
+            ):
+                webhook_event.event_status = (
+                    WEBHOOK_EVENT_STATUS.ENDPOINT_DISABLED
+                )
+        WebhookEvent.objects.bulk_update(
+            events_to_update,
+            [
+                "status_code",
+                "response",
+                "error_message",
+                "event_status",
+                "next_retry_date",
+                "retry_counter",
+                "date_modified",
+            ],
+        )
+
+
 def send_old_alerts_webhook_event(
     webhook: Webhook, report: OldAlertReport
 ) -> None:
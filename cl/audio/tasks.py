@@ -1,6 +1,5 @@
 from math import ceil
 
-from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.db import transaction
 from django.utils.text import slugify
@@ -31,7 +30,7 @@ from cl.custom_filters.templatetags.text_filters import best_case_name
 from cl.lib.celery_utils import throttle_task
 from cl.lib.command_utils import logger
 from cl.lib.decorators import retry
-from cl.lib.microservice_utils import microservice
+from cl.lib.microservice_utils import microservice_sync
 from cl.lib.recap_utils import get_bucket_name
 
 
@@ -92,7 +91,7 @@ def downsize_audio_file(audio: Audio) -> Response:
     :param audio: the audio file to downsize
     :return: Response object
     """
-    response = async_to_sync(microservice)(
+    response = microservice_sync(
         service="downsize-audio",
         item=audio,
     )
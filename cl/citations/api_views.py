@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 from asgiref.sync import async_to_sync
 from django.conf import settings
-from django.db.models import QuerySet
+from django.db.models import QuerySet, prefetch_related_objects
 from django.utils.safestring import SafeString
 from eyecite.models import FullCaseCitation, ShortCaseCitation
 from rest_framework.exceptions import NotFound
@@ -18,6 +18,7 @@ from cl.citations.api_serializers import (
     CitationAPIRequestSerializer,
     CitationAPIResponseSerializer,
 )
+from cl.citations.lookup_index import get_citation_lookup_index
 from cl.citations.types import CitationAPIResponse
 from cl.citations.utils import (
     SLUGIFIED_EDITIONS,
@@ -27,6 +28,8 @@ from cl.citations.utils import (
 from cl.search.models import OpinionCluster
 from cl.search.selectors import get_clusters_from_citation_str
 
+type IndexLookupKey = tuple[str, str, str]
+
 
 class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
     queryset = OpinionCluster.objects.all()
@@ -34,6 +37,7 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
     permission_classes = [IsAuthenticated, V3APIPermission]
     throttle_classes = [CitationCountRateThrottle]
     citation_list: list[FullCaseCitation | ShortCaseCitation] = []
+    index_clusters: dict[IndexLookupKey, list[OpinionCluster]] = {}
 
     def validate_request_data(self, request: Request):
         # Perform object level validations before extracting citations
@@ -53,6 +57,18 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
             if not self.citation_list:
                 return Response([])
 
+            self._load_clusters_from_index(
+                [
+                    (
+                        citation.groups["reporter"],
+                        citation.groups["volume"],
+                        citation.groups["page"],
+                    )
+                    for citation in self.citation_list[
+                        : settings.MAX_CITATIONS_PER_REQUEST
+                    ]
+                ]
+            )
             for idx, citation in enumerate(self.citation_list):
                 start_index, end_index = citation.span()
                 citation_data = {
@@ -87,6 +103,7 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
             reporter = data.get("reporter")
             volume = data.get("volume")
             page = data.get("page")
+            self._load_clusters_from_index([(reporter, volume, page)])
 
             citation_str = " ".join([volume, reporter, page])
             citation_data = {
@@ -129,6 +146,103 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
 
         return potential_canonicals
 
+    def _get_normalized_reporters(self, reporter: str) -> list[str]:
+        """Get the reporters a citation can be normalized to, in the same way
+        _citation_handler does.
+
+        Args:
+            reporter (str): The name of the reporter.
+
+        Returns:
+            list[str]: The canonical reporter abbreviations. Empty if the
+            reporter is unknown.
+        """
+        proper_reporter = SLUGIFIED_EDITIONS.get(
+            slugify_reporter(reporter), None
+        )
+        if proper_reporter:
+            return [proper_reporter]
+        try:
+            canonicals = self._attempt_reporter_variation(reporter)
+        except NotFound:
+            return []
+        return [
+            proper_reporter
+            for canonical in canonicals
+            if (proper_reporter := SLUGIFIED_EDITIONS.get(canonical, None))
+        ]
+
+    def _load_clusters_from_index(
+        self, citations: list[tuple[str, str, str]]
+    ) -> None:
+        """Look up a batch of citations in the local citation lookup index
+        and fetch all the candidate clusters in a single query.
+
+        Candidates are confirmed against the prefetched citations of each
+        cluster, so stale index entries are ignored. Citations that are not
+        confirmed fall back to get_clusters_from_citation_str, which also
+        handles pincites.
+
+        Args:
+            citations (list[tuple[str, str, str]]): A list of (reporter,
+                volume, page) tuples as provided by the user.
+        """
+        self.index_clusters = {}
+        index = get_citation_lookup_index()
+        if index is None:
+            return
+
+        candidates: dict[IndexLookupKey, set[int]] = {}
+        for reporter, volume, page in citations:
+            for proper_reporter in self._get_normalized_reporters(reporter):
+                key = (volume, proper_reporter, page)
+                if key not in candidates:
+                    candidates[key] = index.get_cluster_ids(*key)
+
+        cluster_ids = set().union(*candidates.values())
+        if not cluster_ids:
+            return
+        clusters = (
+            OpinionCluster.objects.filter(pk__in=cluster_ids)
+            .select_related("docket__court")
+            .prefetch_related(
+                "sub_opinions",
+                "panel",
+                "non_participating_judges",
+                "citations",
+            )
+            .in_bulk()
+        )
+        for key, ids in candidates.items():
+            volume, reporter, page = key
+            matches = [
+                clusters[cluster_id]
+                for cluster_id in ids
+                if cluster_id in clusters
+                and any(
+                    (c.volume, c.reporter, c.page) == (volume, reporter, page)
+                    for c in clusters[cluster_id].citations.all()
+                )
+            ]
+            if matches:
+                self.index_clusters[key] = matches
+
+    def _get_clusters_from_citation_str(
+        self, reporter: str, volume: str, page: str
+    ) -> tuple[
+        QuerySet[OpinionCluster, OpinionCluster] | list[OpinionCluster] | None,
+        int,
+    ]:
+        """Get the clusters for a citation from the clusters loaded from the
+        index, or from the database if the index didn't confirm any match.
+        """
+        clusters = self.index_clusters.get((volume, reporter, page))
+        if clusters:
+            return clusters, len(clusters)
+        return async_to_sync(get_clusters_from_citation_str)(
+            reporter, volume, page
+        )
+
     def _citation_handler(
         self, request: Request, reporter: str, volume: str, page: str
     ) -> CitationAPIResponse:
@@ -168,9 +282,9 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
             normalized_citations.append(
                 " ".join([volume, proper_reporter, page])
             )
-            clusters, cluster_count = async_to_sync(
-                get_clusters_from_citation_str
-            )(proper_reporter, volume, page)
+            clusters, cluster_count = self._get_clusters_from_citation_str(
+                proper_reporter, volume, page
+            )
         else:
             clusters, cluster_count, normalized_citations = (
                 self._get_clusters_for_canonical_list(
@@ -194,7 +308,9 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
     def _get_clusters_for_canonical_list(
         self, reporters: list[SafeString], volume: str, page: str
     ) -> tuple[
-        QuerySet[OpinionCluster, OpinionCluster] | None, int, list[str]
+        QuerySet[OpinionCluster, OpinionCluster] | list[OpinionCluster] | None,
+        int,
+        list[str],
     ]:
         """
         Retrieves opinion clusters associated with a list of reporter slugs.
@@ -221,20 +337,27 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
             if not reporter:
                 continue
             citations.append(" ".join([volume, reporter, page]))
-            opinions, _count = async_to_sync(get_clusters_from_citation_str)(
+            opinions, _count = self._get_clusters_from_citation_str(
                 reporter, volume, page
             )
 
             if not _count:
                 continue
 
-            clusters = clusters | opinions if clusters else opinions
+            if isinstance(clusters, list) or isinstance(opinions, list):
+                # At least one of them was loaded from the index
+                clusters = list(
+                    {c.pk: c for c in [*(clusters or []), *opinions]}.values()
+                )
+            else:
+                clusters = clusters | opinions if clusters else opinions
             cluster_count += _count
         return clusters, cluster_count, citations
 
     def _format_cluster_response(
         self,
-        clusters: QuerySet[OpinionCluster, OpinionCluster],
+        clusters: QuerySet[OpinionCluster, OpinionCluster]
+        | list[OpinionCluster],
         cluster_count: int,
     ) -> CitationAPIResponse:
         """
@@ -243,8 +366,8 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
 
         Args:
             request (Request): The HTTP request object.
-            clusters (QuerySet[OpinionCluster]): The queryset containing
-            opinion clusters.
+            clusters (QuerySet[OpinionCluster] | list[OpinionCluster]): The
+            queryset or list containing opinion clusters.
             cluster_count (int): The expected number of clusters.
 
         Returns:
@@ -253,9 +376,20 @@ class CitationLookupViewSet(LoggingMixin, CreateModelMixin, GenericViewSet):
                 - clusters (Queryset): queryset of cluster that contains relevant
                     data from the cluster model and its associated models.
         """
-        clusters = clusters.prefetch_related(
-            "sub_opinions", "panel", "non_participating_judges", "citations"
-        ).order_by("-id")
+        related_lookups = (
+            "sub_opinions",
+            "panel",
+            "non_participating_judges",
+            "citations",
+        )
+        if isinstance(clusters, list):
+            # Clusters loaded from the index are usually prefetched already.
+            prefetch_related_objects(clusters, *related_lookups)
+            clusters = sorted(clusters, key=lambda c: c.pk, reverse=True)
+        else:
+            clusters = clusters.prefetch_related(*related_lookups).order_by(
+                "-id"
+            )
         return {
             "status": (
                 HTTPStatus.MULTIPLE_CHOICES
@@ -19,6 +19,13 @@ are above a certain threshold of similarity to each other. To do this
 efficiently, we make use of the datasketch library's implementation of MinHash,
 an algorithm known as a locality-sensitive hashing (LSH) algorithm.
 
+The MinHash signatures are computed in batch with NumPy using the same hash
+function and permutations as datasketch, and are stored on each Parenthetical
+so that they don't need to be recomputed every time a case gets a new
+parenthetical. The LSH bucketing is also done with NumPy, using the band
+layout of datasketch's MinHashLSH, which lets us update only the groups
+connected to new parentheticals instead of regrouping the whole case.
+
 For information about MinHash, here are a couple of good resources:
 https://medium.com/@jonathankoren/near-duplicate-detection-b6694e807f7a
 https://ekzhu.com/datasketch/lsh.html
@@ -30,13 +37,16 @@ https://github.com/freelawproject/courtlistener/pull/1941
 """
 
 import re
-from collections import deque
-from copy import deepcopy
+from collections import defaultdict, deque
+from collections.abc import Callable, Collection, Sequence
 from dataclasses import dataclass
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from math import ceil
 
+import numpy as np
 from datasketch import MinHash, MinHashLSH
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import connected_components
 from Stemmer import Stemmer
 
 from cl.lib.stop_words import STOP_WORDS
@@ -47,16 +57,26 @@ Graph = dict[str, list[str]]
 GERUND_WORD = re.compile(r"(?:\S+ing)", re.IGNORECASE)
 
 SIMILARITY_THRESHOLD = 0.5
+NUM_PERM = 64
 
 # Initializing the LSH/Minhashes is very slow because it has to generate
-# a ton of random numbers. But we can avoid repeating that work
-# every time we compute groups by simply using python's deepcopy
-# method to clone this reference object. It really seems too stupid
-# to work, but it does, perfectly, and gives us a huge speed-up.
+# a ton of random numbers. We do it once and only use these reference objects
+# for their parameters: the hash function and permutations of the MinHash,
+# and the band layout of the LSH index. MinHash uses a fixed seed, so these
+# are the same in every process and stored signatures remain valid.
 _EMPTY_SIMILARITY_INDEX = MinHashLSH(
-    threshold=SIMILARITY_THRESHOLD, num_perm=64
+    threshold=SIMILARITY_THRESHOLD, num_perm=NUM_PERM
 )
-_EMPTY_MHASH = MinHash(num_perm=64)
+_EMPTY_MHASH = MinHash(num_perm=NUM_PERM)
+
+# The constants datasketch uses to permute token hashes.
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# The number of texts whose token hashes are permuted in a single operation
+SIGNATURE_BATCH_SIZE = 1000
+# The size in bytes of a stored signature
+SIGNATURE_SIZE = NUM_PERM * 8
 
 # We initialize the stemmer once and reuse it because it internally caches
 # frequently seen tokens, giving us a performance benefit if we reuse it.
@@ -72,6 +92,166 @@ class ComputedParentheticalGroup:
     score: float
 
 
+class SimilarityIndex:
+    """
+    A NumPy equivalent of a MinHashLSH index containing a list of MinHash
+    signatures.
+
+    Like MinHashLSH, every signature is split into bands and two signatures are
+    candidates to be similar when any of their bands are identical. Instead of
+    inserting the signatures one by one into hash tables, the rows of every
+    band are bucketed at once.
+    """
+
+    def __init__(self, signatures: np.ndarray) -> None:
+        self.size = len(signatures)
+        # For every band, the bucket of each row
+        self.band_buckets: list[np.ndarray] = []
+        # For every band, the first row of the bucket of each row
+        self.bucket_heads: list[np.ndarray] = []
+        for start, end in _EMPTY_SIMILARITY_INDEX.hashranges:
+            band = np.ascontiguousarray(signatures[:, start:end])
+            _, first_rows, buckets = np.unique(
+                band, axis=0, return_index=True, return_inverse=True
+            )
+            buckets = buckets.reshape(-1)
+            self.band_buckets.append(buckets)
+            self.bucket_heads.append(first_rows[buckets])
+
+    @cached_property
+    def bucket_rows(self) -> list[list[np.ndarray]]:
+        """
+        For every band, the rows in each bucket. This holds an array per
+        bucket, so it is only built once the index is queried, and not when
+        only the component labels are needed.
+
+        :return: A list with the arrays of rows of every band
+        """
+        bucket_rows = []
+        for buckets in self.band_buckets:
+            order = np.argsort(buckets, kind="stable")
+            split_at = np.cumsum(np.bincount(buckets))[:-1]
+            bucket_rows.append(np.split(order, split_at))
+        return bucket_rows
+
+    def query(self, row: int) -> list[int]:
+        """
+        Get the rows that share a band with the given row, like
+        MinHashLSH.query. The row itself is included.
+
+        :param row: The row of the signature to query
+        :return: A list of rows sorted ascending
+        """
+        neighbors: set[int] = set()
+        for buckets, bucket_rows in zip(self.band_buckets, self.bucket_rows):
+            neighbors.update(bucket_rows[buckets[row]].tolist())
+        return sorted(neighbors)
+
+    def get_component_labels(self) -> np.ndarray:
+        """
+        Label the connected components of the similarity graph. Linking every
+        row to the first row of each of its buckets is enough to connect all
+        the rows of a bucket.
+
+        :return: An array with the component label of each row
+        """
+        rows = np.tile(np.arange(self.size), len(self.bucket_heads))
+        heads = np.concatenate(self.bucket_heads)
+        graph = coo_array(
+            (np.ones(len(rows), dtype=np.int8), (rows, heads)),
+            shape=(self.size, self.size),
+        )
+        _, labels = connected_components(graph, directed=False)
+        return labels
+
+
+def compute_minhash_signatures(
+    texts: Sequence[str],
+    tokenize: Callable[[str], Collection[str]] | None = None,
+) -> np.ndarray:
+    """
+    Compute the MinHash signatures of a list of parenthetical texts.
+
+    The signatures are identical to the hashvalues of a datasketch MinHash
+    updated with the tokens of each text, but the token hashes of a whole batch
+    of texts are permuted in a single NumPy operation and reduced per text.
+
+    :param texts: A list of parenthetical texts
+    :param tokenize: The function that splits a text into tokens. Defaults to
+    get_parenthetical_tokens
+    :return: An array of shape (len(texts), NUM_PERM) with a signature per row
+    """
+    tokenize = tokenize or get_parenthetical_tokens
+    signatures = np.tile(_EMPTY_MHASH.hashvalues, (len(texts), 1))
+    a, b = _EMPTY_MHASH.permutations
+    token_hashes: dict[str, int] = {}
+    for batch_start in range(0, len(texts), SIGNATURE_BATCH_SIZE):
+        batch = texts[batch_start : batch_start + SIGNATURE_BATCH_SIZE]
+        hashes: list[int] = []
+        rows: list[int] = []
+        offsets: list[int] = []
+        for row, text in enumerate(batch, start=batch_start):
+            tokens = tokenize(text)
+            if not tokens:
+                continue
+            rows.append(row)
+            offsets.append(len(hashes))
+            for token in tokens:
+                if token not in token_hashes:
+                    token_hashes[token] = _EMPTY_MHASH.hashfunc(
+                        token.encode("utf-8")
+                    )
+                hashes.append(token_hashes[token])
+        if not hashes:
+            continue
+        hash_values = np.array(hashes, dtype=np.uint64)[:, np.newaxis]
+        permuted = (hash_values * a + b) % _MERSENNE_PRIME & _MAX_HASH
+        signatures[rows] = np.minimum(
+            signatures[rows], np.minimum.reduceat(permuted, offsets, axis=0)
+        )
+    return signatures
+
+
+def set_minhash_signatures(parentheticals: list[Parenthetical]) -> None:
+    """
+    Compute the MinHash signatures of a list of parentheticals and set them
+    on their minhash_signature field, without saving them.
+
+    :param parentheticals: A list of parentheticals
+    :return: None
+    """
+    signatures = compute_minhash_signatures(
+        [par.text for par in parentheticals]
+    )
+    for par, signature in zip(parentheticals, signatures):
+        par.minhash_signature = signature.astype("<u8").tobytes()
+
+
+def get_parenthetical_signatures(
+    parentheticals: list[Parenthetical],
+) -> np.ndarray:
+    """
+    Get the MinHash signatures of a list of parentheticals, using their stored
+    signatures when available and computing the missing ones.
+
+    :param parentheticals: A list of parentheticals
+    :return: An array of shape (len(parentheticals), NUM_PERM)
+    """
+    signatures = np.empty((len(parentheticals), NUM_PERM), dtype=np.uint64)
+    missing: list[int] = []
+    for row, par in enumerate(parentheticals):
+        stored = getattr(par, "minhash_signature", None)
+        if stored is not None and len(stored) == SIGNATURE_SIZE:
+            signatures[row] = np.frombuffer(stored, dtype="<u8")
+        else:
+            missing.append(row)
+    if missing:
+        signatures[missing] = compute_minhash_signatures(
+            [parentheticals[row].text for row in missing]
+        )
+    return signatures
+
+
 def compute_parenthetical_groups(
     parentheticals: list[Parenthetical],
 ) -> list[ComputedParentheticalGroup]:
@@ -97,65 +277,107 @@ def compute_parenthetical_groups(
     if len(parentheticals) == 0:
         return []
 
-    similarity_index = deepcopy(_EMPTY_SIMILARITY_INDEX)
-    parenthetical_objects: dict[str, Parenthetical] = {}
-    parenthetical_minhashes: dict[str, MinHash] = {}
-
-    for par in parentheticals:
-        mhash = deepcopy(_EMPTY_MHASH)
-        tokens = get_parenthetical_tokens(par.text)
-        mhash.update_batch([gram.encode("utf-8") for gram in tokens])
+    similarity_index = SimilarityIndex(
+        get_parenthetical_signatures(parentheticals)
+    )
+    labels = similarity_index.get_component_labels()
+    return get_groups_from_components(
+        parentheticals, similarity_index, labels, set(labels.tolist())
+    )
 
-        par_key = str(par.id)
-        parenthetical_objects[par_key] = par
-        parenthetical_minhashes[par_key] = mhash
-        similarity_index.insert(par_key, mhash)
 
-    similarity_graph = get_similarity_graph(
-        parenthetical_minhashes, similarity_index
+def compute_parenthetical_group_updates(
+    parentheticals: list[Parenthetical], group_sizes: dict[int, int]
+) -> tuple[list[ComputedParentheticalGroup], set[int]]:
+    """
+    Given all the parentheticals for a case and the sizes of its existing
+    groups, compute only the groups that changed.
+
+    Adding parentheticals to a case only adds edges to its similarity graph,
+    so the existing groups that aren't connected to a new parenthetical are
+    still valid. The new parentheticals are those without a group. Groups that
+    lost members are also recomputed, since they may have split.
+
+    :param parentheticals: All the parentheticals for a case
+    :param group_sizes: A dict mapping the IDs of the existing groups for the
+    case to their stored size
+    :return: A two tuple, the new ComputedParentheticalGroup's and the set of
+    existing group IDs they replace
+    """
+    get_parenthetical_tokens.cache_clear()
+    group_rows: defaultdict[int, list[int]] = defaultdict(list)
+    for row, par in enumerate(parentheticals):
+        if par.group_id is not None:
+            group_rows[par.group_id].append(row)
+    stale_groups = {
+        group_id
+        for group_id, rows in group_rows.items()
+        if group_sizes.get(group_id) != len(rows)
+    }
+    # Groups without members left must be removed too
+    stale_groups |= group_sizes.keys() - group_rows.keys()
+    seeds = [
+        row
+        for row, par in enumerate(parentheticals)
+        if par.group_id is None or par.group_id in stale_groups
+    ]
+    if not seeds:
+        return [], stale_groups
+
+    similarity_index = SimilarityIndex(
+        get_parenthetical_signatures(parentheticals)
     )
-
-    parenthetical_groups: list[ComputedParentheticalGroup] = []
-    # start the visited_nodes set here to prevent recomputing components, since
-    # the same component will be found when starting from any of it's nodes
-    visited_nodes: set[str] = set()
-    for node, neighbors in similarity_graph.items():
-        if component := get_graph_component(
-            node, similarity_graph, visited_nodes
-        ):
-            parenthetical_groups.append(
-                get_group_from_component(
-                    component,
-                    parenthetical_objects,
-                    similarity_graph,
-                )
-            )
-    return sorted(
-        parenthetical_groups, key=lambda group: group.score, reverse=True
+    labels = similarity_index.get_component_labels()
+    # A component that touches an existing group must be recomputed along
+    # with all the components the members of that group belong to.
+    affected_labels = {int(labels[row]) for row in seeds}
+    queue = deque(affected_labels)
+    while queue:
+        label = queue.popleft()
+        for row in np.flatnonzero(labels == label):
+            group_id = parentheticals[row].group_id
+            if group_id is None or group_id in stale_groups:
+                continue
+            stale_groups.add(group_id)
+            for member in group_rows[group_id]:
+                member_label = int(labels[member])
+                if member_label not in affected_labels:
+                    affected_labels.add(member_label)
+                    queue.append(member_label)
+
+    groups = get_groups_from_components(
+        parentheticals, similarity_index, labels, affected_labels
     )
+    return groups, stale_groups
 
 
-def get_similarity_graph(
-    parenthetical_minhashes: dict[str, MinHash], similarity_index: MinHashLSH
-) -> Graph:
+def get_groups_from_components(
+    parentheticals: list[Parenthetical],
+    similarity_index: SimilarityIndex,
+    labels: np.ndarray,
+    selected_labels: set[int],
+) -> list[ComputedParentheticalGroup]:
     """
-    From the MinHashLSH index, create a dictionary representation of a graph
-    where the nodes represent parentheticals and the edges represent that
-    two nodes are sufficiently similar to each other to be clustered into
-    the same group.
-
-    :param parenthetical_minhashes: A dictionary mapping parenthetical IDs to
-    the MinHash object corresponding to the parenthetical's text's tokens
-    :param similarity_index: The MinHashLSH data structure containing all of
-    the MinHash's that we can query
-    :return: A dictionary representation of a graph/network where the nodes/keys
-    are parenthetical IDs and the neighbors/values are the other parentheticals
-    above the defined similarity threshold.
+    Create a ComputedParentheticalGroup for each of the selected components
+    of the similarity graph.
+
+    :param parentheticals: All the parentheticals for a case
+    :param similarity_index: The SimilarityIndex of the parentheticals
+    :param labels: The component label of each parenthetical
+    :param selected_labels: The labels of the components to create groups for
+    :return: A list of ComputedParentheticalGroup's sorted by score, descending
     """
-    similarity_graph: Graph = {}
-    for par_key, mhash in parenthetical_minhashes.items():
-        similarity_graph[par_key] = similarity_index.query(mhash)
-    return similarity_graph
+    components: defaultdict[int, list[int]] = defaultdict(list)
+    for row, label in enumerate(labels.tolist()):
+        if label in selected_labels:
+            components[label].append(row)
+    parenthetical_groups = [
+        get_group_from_component(component, parentheticals, similarity_index)
+        for component in components.values()
+    ]
+    return sorted(
+        parenthetical_groups, key=lambda group: group.score, reverse=True
+    )
 
 
 def get_graph_component(
@@ -191,33 +413,43 @@ def get_graph_component(
 
 
 def get_group_from_component(
-    component: list[str],
-    parenthetical_objects: dict[str, Parenthetical],
-    similarity_graph: Graph,
+    component: list[int],
+    parentheticals: list[Parenthetical],
+    similarity_index: SimilarityIndex,
 ) -> ComputedParentheticalGroup:
     """
-    Given a list of parenthetical IDs representing a component, create a
+    Given a list of rows representing a component, create a
     ComputedParentheticalGroup containing the corresponding parenthetical objects,
     the most representative parenthetical from among the component, and
     sort the parentheticals by their descriptiveness score.
 
-    :param component: A list of parenthetical IDs to turn into a ComputedParentheticalGroup
-    :param parenthetical_objects: A dictionary mapping parenthetical IDs to the
-    corresponding parenthetical objects
-    :param similarity_graph: A dictionary containing similarity relationships
-    between parentheticals
+    :param component: A list of parenthetical rows to turn into a ComputedParentheticalGroup
+    :param parentheticals: All the parentheticals for a case, the component rows
+    are indexes into this list
+    :param similarity_index: The SimilarityIndex of the parentheticals
     :return: A ComputedParentheticalGroup corresponding to the given component
     """
-    pars_in_group = sorted(
-        (parenthetical_objects[par_id] for par_id in component),
-        key=lambda par: par.score,
-        reverse=True,
+    rows = sorted(
+        component, key=lambda row: parentheticals[row].score, reverse=True
     )
+    pars_in_group = [parentheticals[row] for row in rows]
     # Score of the top-ranked parenthetical times the proportion of
     # total parentheticals in this group
     group_score = pars_in_group[0].score * (
-        len(pars_in_group) / len(parenthetical_objects)
+        len(pars_in_group) / len(parentheticals)
+    )
+    # Only the parentheticals considered to be the representative need their
+    # neighbors
+    num_parentheticals_to_consider = ceil(
+        len(rows) * BEST_PARENTHETICAL_SEARCH_THRESHOLD
     )
+    similarity_graph: Graph = {
+        str(parentheticals[row].id): [
+            str(parentheticals[neighbor].id)
+            for neighbor in similarity_index.query(row)
+        ]
+        for row in rows[:num_parentheticals_to_consider]
+    }
     representative = get_representative_parenthetical(
         pars_in_group, similarity_graph
     )
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+
+from cl.search.models import Citation, CitationEvent
+
+logger = logging.getLogger(__name__)
+
+KEYS_FILE = "keys.npy"
+CLUSTER_IDS_FILE = "cluster_ids.npy"
+META_FILE = "meta.json"
+
+
+def make_citation_key(volume: str, reporter: str, page: str) -> int:
+    """Hash a volume, canonical reporter and page to a 64-bit integer key.
+
+    Hash collisions are possible but harmless, since callers must confirm
+    that candidate clusters actually have the requested citation.
+
+    :param volume: The volume of the citation.
+    :param reporter: The canonical reporter abbreviation.
+    :param page: The page of the citation.
+    :return: An unsigned 64-bit integer.
+    """
+    digest = hashlib.blake2b(
+        f"{volume} {reporter} {page}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+def build_citation_lookup_index(directory: Path, chunk_size: int = 50_000):
+    """Build the citation lookup index files from the Citation table.
+
+    The index is made of two aligned arrays stored as .npy files: the citation
+    keys sorted ascending and the cluster ID of each key. A metadata file
+    stores the last CitationEvent ID seen before the build, so that processes
+    using the index can replay newer events on top of it.
+
+    Files are written to a temporary name and then renamed, so processes
+    reading the index never see a partial build.
+
+    :param directory: The directory where the index files are stored.
+    :param chunk_size: The number of Citation rows to fetch at a time.
+    :return: The number of citations indexed.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    last_event_id = (
+        CitationEvent.objects.aggregate(Max("pgh_id"))["pgh_id__max"] or 0
+    )
+    citations = Citation.objects.values_list(
+        "volume", "reporter", "page", "cluster_id"
+    )
+    count = citations.count()
+    keys = np.empty(count, dtype=np.uint64)
+    cluster_ids = np.empty(count, dtype=np.int64)
+    i = 0
+    for volume, reporter, page, cluster_id in citations.iterator(
+        chunk_size=chunk_size
+    ):
+        if i >= count:
+            # Rows created after the count are picked up from the events.
+            break
+        keys[i] = make_citation_key(volume, reporter, page)
+        cluster_ids[i] = cluster_id
+        i += 1
+    keys, cluster_ids = keys[:i], cluster_ids[:i]
+    order = np.argsort(keys, kind="stable")
+
+    for name, array in (
+        (KEYS_FILE, keys[order]),
+        (CLUSTER_IDS_FILE, cluster_ids[order]),
+    ):
+        tmp_path = directory / f"{name}.tmp"
+        with tmp_path.open("wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, directory / name)
+
+    tmp_path = directory / f"{META_FILE}.tmp"
+    tmp_path.write_text(
+        json.dumps({"last_event_id": last_event_id, "count": i})
+    )
+    os.replace(tmp_path, directory / META_FILE)
+    return i
+
+
+class CitationLookupIndex:
+    """A read-only, memory-mapped (volume, reporter, page) to cluster IDs
+    index, with an in-memory overlay of the citations created or updated
+    since the index was built.
+
+    The overlay is refreshed from the CitationEvent table at most once every
+    CITATION_LOOKUP_INDEX_REFRESH_INTERVAL seconds. Events only carry the new
+    state of a citation, so keys of updated or deleted citations may still
+    point to their old clusters; lookups return candidates that callers must
+    confirm against the database.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.last_refresh = 0.0
+        self.load()
+
+    def load(self) -> None:
+        """Map the index files and reset the overlay.
+
+        :return: None
+        """
+        meta_path = self.directory / META_FILE
+        self.meta_mtime = meta_path.stat().st_mtime
+        meta = json.loads(meta_path.read_text())
+        self.keys = np.load(self.directory / KEYS_FILE, mmap_mode="r")
+        self.cluster_ids = np.load(
+            self.directory / CLUSTER_IDS_FILE, mmap_mode="r"
+        )
+        self.last_event_id: int = meta["last_event_id"]
+        self.overlay: defaultdict[int, set[int]] = defaultdict(set)
+
+    def refresh(self) -> None:
+        """Reload the index if it was rebuilt, then replay the CitationEvents
+        created since the last refresh into the overlay.
+
+        :return: None
+        """
+        self.last_refresh = time.monotonic()
+        if (self.directory / META_FILE).stat().st_mtime != self.meta_mtime:
+            self.load()
+        events = (
+            CitationEvent.objects.filter(pgh_id__gt=self.last_event_id)
+            .order_by("pgh_id")
+            .values_list("pgh_id", "volume", "reporter", "page", "cluster_id")
+        )
+        for pgh_id, volume, reporter, page, cluster_id in events.iterator():
+            key = make_citation_key(volume, reporter, page)
+            self.overlay[key].add(cluster_id)
+            self.last_event_id = pgh_id
+
+    def maybe_refresh(self) -> None:
+        interval = settings.CITATION_LOOKUP_INDEX_REFRESH_INTERVAL
+        if time.monotonic() - self.last_refresh >= interval:
+            self.refresh()
+
+    def get_cluster_ids(
+        self, volume: str, reporter: str, page: str
+    ) -> set[int]:
+        """Get the candidate cluster IDs for a citation.
+
+        :param volume: The volume of the citation.
+        :param reporter: The canonical reporter abbreviation.
+        :param page: The page of the citation.
+        :return: A set of cluster IDs, empty if the citation is not indexed.
+        """
+        self.maybe_refresh()
+        key = make_citation_key(volume, reporter, page)
+        needle = np.uint64(key)
+        start = np.searchsorted(self.keys, needle, side="left")
+        end = np.searchsorted(self.keys, needle, side="right")
+        cluster_ids = {int(c) for c in self.cluster_ids[start:end]}
+        return cluster_ids | self.overlay.get(key, set())
+
+
+_citation_lookup_index: CitationLookupIndex | None = None
+
+
+def get_citation_lookup_index() -> CitationLookupIndex | None:
+    """Get the per-process citation lookup index, loading it on first use.
+
+    :return: The CitationLookupIndex, or None if the index is disabled or has
+    not been built yet.
+    """
+    global _citation_lookup_index
+    if _citation_lookup_index is not None:
+        return _citation_lookup_index
+
+    directory = settings.CITATION_LOOKUP_INDEX_DIR
+    if not directory:
+        return None
+    directory = Path(directory)
+    if not (directory / META_FILE).exists():
+        return None
+    try:
+        _citation_lookup_index = CitationLookupIndex(directory)
+    except (OSError, ValueError, KeyError):
+        logger.error(
+            "Unable to load the citation lookup index from %s",
+            directory,
+            exc_info=True,
+        )
+        return None
+    return _citation_lookup_index
+
+
+def reset_citation_lookup_index() -> None:
+    """Drop the per-process index so the next lookup loads it again."""
+    global _citation_lookup_index
+    _citation_lookup_index = None
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import CommandError
+
+from cl.citations.lookup_index import build_citation_lookup_index
+from cl.lib.command_utils import VerboseCommand, logger
+
+
+class Command(VerboseCommand):
+    help = (
+        "Build the memory-mapped citation lookup index used by the citation "
+        "lookup API. Run it periodically; processes using the index pick up "
+        "newer citations from the CitationEvent table in the meantime."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--directory",
+            default=settings.CITATION_LOOKUP_INDEX_DIR,
+            help="Where to write the index files. Defaults to the "
+            "CITATION_LOOKUP_INDEX_DIR setting.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50_000,
+            help="The number of Citation rows to fetch at a time.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        if not options["directory"]:
+            raise CommandError(
+                "Provide --directory or set CITATION_LOOKUP_INDEX_DIR."
+            )
+        count = build_citation_lookup_index(
+            Path(options["directory"]), options["chunk_size"]
+        )
+        logger.info("Indexed %s citations in %s", count, options["directory"])
@@ -1,25 +1,156 @@
+import multiprocessing
 import sys
 import time
 from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from itertools import batched
 from typing import cast
 
 from django.core.management import CommandError
 from django.core.management.base import CommandParser
+from django.db import connections
+from django.db.models import Max, Min, QuerySet
+from django.db.models.sql import Query
 from localflavor.us.us_states import OBSOLETE_STATES, USPS_CHOICES
 
 from cl.citations.tasks import (
     find_citations_and_parentheticals_for_opinion_by_pks,
+    find_opinion_citations,
+    store_opinions_citations_in_bulk,
 )
+from cl.citations.types import OpinionCitations
 from cl.lib.argparse_types import valid_date_time
 from cl.lib.celery_utils import CeleryThrottle
-from cl.lib.command_utils import VerboseCommand
+from cl.lib.command_utils import VerboseCommand, logger
+from cl.lib.indexing_utils import (
+    get_last_parent_document_id_processed,
+    log_last_document_indexed,
+)
 from cl.lib.types import OptionsType
+from cl.search.documents import OpinionClusterDocument, OpinionDocument
 from cl.search.models import Courthouse, Opinion
+from cl.search.tasks import index_documents_in_bulk_from_queryset
 
 DEFAULT_THROTTLE_MIN_ITEMS = 50
 DEFAULT_OPINIONS_PER_TASK = 50
 
 
+@dataclass
+class CitationShard:
+    """A range of opinion ids processed by a single worker process."""
+
+    start_id: int
+    end_id: int
+    # Used to store the shard checkpoint in redis
+    checkpoint_name: str
+
+    @property
+    def checkpoint_key(self) -> str:
+        return (
+            f"find_citations:{self.checkpoint_name}:"
+            f"{self.start_id}-{self.end_id}:log"
+        )
+
+
+def make_shards(
+    query: QuerySet, processes: int, checkpoint_name: str
+) -> list[CitationShard]:
+    """Split the id range of a queryset into contiguous shards of equal size
+
+    :param query: the Opinion queryset to process
+    :param processes: the number of shards
+    :param checkpoint_name: the name used to compose the checkpoint keys
+    :return: a list of CitationShard
+    """
+    bounds = query.aggregate(min_id=Min("pk"), max_id=Max("pk"))
+    if bounds["min_id"] is None:
+        return []
+    min_id, max_id = bounds["min_id"], bounds["max_id"]
+    step = max((max_id - min_id + 1) // processes, 1)
+    shards = []
+    start_id = min_id
+    while start_id <= max_id:
+        end_id = start_id + step - 1
+        if len(shards) == processes - 1:
+            end_id = max_id
+        shards.append(CitationShard(start_id, end_id, checkpoint_name))
+        start_id = end_id + 1
+    return shards
+
+
+def find_citations_for_shard(
+    query: Query,
+    shard: CitationShard,
+    batch_size: int,
+    resume: bool,
+) -> int:
+    """Find citations for the opinions of a shard and store them in bulk.
+
+    Meant to run in a worker process. Opinions are processed in batches of
+    `batch_size`; the citations of a batch are written with
+    store_opinions_citations_in_bulk, the batch is re-indexed in ES, and the
+    last processed id is stored as the shard checkpoint.
+
+    :param query: the SQL query of the Opinion queryset to process. Pickling
+    a queryset evaluates it, so workers get its query and rebuild the
+    queryset from it.
+    :param shard: the range of ids to process
+    :param batch_size: the number of opinions stored at a time
+    :param resume: whether to skip the opinions up to the shard checkpoint
+    :return: the number of opinions processed
+    """
+    start_id = shard.start_id
+    if resume:
+        start_id = max(
+            start_id,
+            get_last_parent_document_id_processed(shard.checkpoint_key) + 1,
+        )
+    opinions = Opinion.objects.all()
+    opinions.query = query
+    opinions = opinions.filter(
+        pk__gte=start_id, pk__lte=shard.end_id
+    ).order_by("pk")
+    base_doc = {
+        "_op_type": "index",
+        "_index": OpinionClusterDocument._index._name,
+    }
+    processed_count = 0
+    for batch in batched(opinions.iterator(chunk_size=batch_size), batch_size):
+        results: list[tuple[Opinion, OpinionCitations]] = []
+        for opinion in batch:
+            try:
+                opinion_citations = find_opinion_citations(opinion)
+            except Exception as e:
+                logger.error(
+                    "Opinion failed: '%s' with %s",
+                    opinion.id,
+                    str(e),
+                    exc_info=True,
+                )
+                continue
+            if opinion_citations is not None:
+                results.append((opinion, opinion_citations))
+
+        store_opinions_citations_in_bulk(results)
+        if results:
+            failed_docs = index_documents_in_bulk_from_queryset(
+                Opinion.objects.filter(pk__in=[o.pk for o, _ in results]),
+                OpinionDocument,
+                base_doc,
+                child_id_property="OPINION",
+                use_streaming_bulk=True,
+            )
+            if failed_docs:
+                logger.error(
+                    "Error indexing opinions in ES. Document IDs: %s",
+                    failed_docs,
+                )
+        log_last_document_indexed(batch[-1].pk, shard.checkpoint_key)
+        processed_count += len(batch)
+    return processed_count
+
+
 class Command(VerboseCommand):
     help = "Parse citations and parentheticals from court opinions."
 
@@ -117,6 +248,35 @@ class Command(VerboseCommand):
                 "documents update"
             ),
         )
+        parser.add_argument(
+            "--processes",
+            default=0,
+            type=int,
+            help=(
+                "Process the opinions locally with this many worker "
+                "processes instead of sending them to Celery. Each worker "
+                "handles a contiguous range of ids and stores results in "
+                "bulk. Citation counts and parenthetical groups are not "
+                "updated in this mode; run count_citations afterwards."
+            ),
+        )
+        parser.add_argument(
+            "--checkpoint-name",
+            default="default",
+            help=(
+                "Name of the per-shard checkpoints used with --processes. "
+                "Use the same name and --resume to continue a previous run."
+            ),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            default=False,
+            help=(
+                "With --processes, skip the opinions each shard already "
+                "processed according to its checkpoint."
+            ),
+        )
 
     def handle(self, *args: list[str], **options: OptionsType) -> None:
         super().handle(*args, **options)
@@ -195,6 +355,16 @@ class Command(VerboseCommand):
                 bool, options["disable_citation_count_update"]
             )
 
+        if options["processes"]:
+            self.process_locally(
+                query,
+                cast(int, options["processes"]),
+                cast(int, options["opinions_per_task"]),
+                cast(str, options["checkpoint_name"]),
+                cast(bool, options["resume"]),
+            )
+            return
+
         self.count = query.count()
         self.average_per_s = 0.0
         self.timings: list[float] = []
@@ -208,6 +378,64 @@ class Command(VerboseCommand):
             disable_citation_count_update,
         )
 
+    def process_locally(
+        self,
+        query: QuerySet,
+        processes: int,
+        batch_size: int,
+        checkpoint_name: str,
+        resume: bool,
+    ) -> None:
+        """Find citations using a local pool of worker processes, one shard
+        of the id range per process.
+
+        :param query: the Opinion queryset to process
+        :param processes: the number of worker processes
+        :param batch_size: the number of opinions stored at a time
+        :param checkpoint_name: the name used to compose the checkpoint keys
+        :param resume: whether to continue from the shard checkpoints
+        :return: None
+        """
+        shards = make_shards(query, processes, checkpoint_name)
+        # Connections can't be shared with forked processes; each worker
+        # opens its own.
+        connections.close_all()
+        processed_count = 0
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("fork"),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    find_citations_for_shard,
+                    query.query,
+                    shard,
+                    batch_size,
+                    resume,
+                ): shard
+                for shard in shards
+            }
+            for future in as_completed(futures):
+                shard = futures[future]
+                try:
+                    shard_count = future.result()
+                except Exception:
+                    logger.exception(
+                        "Shard %s-%s failed. Run again with --resume to "
+                        "continue from its checkpoint.",
+                        shard.start_id,
+                        shard.end_id,
+                    )
+                    continue
+                processed_count += shard_count
+                logger.info(
+                    "Shard %s-%s done: %s opinions.",
+                    shard.start_id,
+                    shard.end_id,
+                    shard_count,
+                )
+        logger.info("Processed %s opinions.", processed_count)
+
     def log_progress(self, processed_count: int, last_pk: int) -> None:
         if processed_count % 1000 == 1:
             self.t1 = time.time()
@@ -17,7 +17,10 @@ from eyecite.models import (
 from eyecite.test_factories import case_citation
 from eyecite.utils import strip_punct
 
-from cl.citations.match_citations_queries import es_search_db_for_full_citation
+from cl.citations.match_citations_queries import (
+    es_search_db_for_full_citation,
+    es_search_db_for_full_citations,
+)
 from cl.citations.types import (
     MatchedResourceType,
     ResolvedFullCites,
@@ -39,6 +42,10 @@ MULTIPLE_MATCHES_RESOURCE = Resource(
 # to be used when storing unmatched citations
 MULTIPLE_MATCHES_FLAG = "is_ambiguous"
 
+type FullCitationKey = tuple[
+    str, int | None, str | None, str | None, str | None
+]
+
 
 def filter_by_matching_antecedent(
     opinion_candidates: Iterable[Opinion],
@@ -61,11 +68,14 @@ def filter_by_matching_antecedent(
 
 def resolve_fullcase_citation(
     full_citation: FullCaseCitation,
+    db_search_results: list[Hit] | None = None,
 ) -> MatchedResourceType:
     # Case 1: FullCaseCitation
     if type(full_citation) is FullCaseCitation:
-        db_search_results: list[Hit]
-        db_search_results, _ = es_search_db_for_full_citation(full_citation)
+        if db_search_results is None:
+            db_search_results, _ = es_search_db_for_full_citation(
+                full_citation
+            )
         # If there is more than one result, return a placeholder with the
         # citation with multiple results
 
@@ -172,11 +182,71 @@ def resolve_supra_citation(
     )
 
 
+def get_full_citation_key(full_citation: FullCaseCitation) -> FullCitationKey:
+    """Compute a key that identifies every input used to resolve a full case
+    citation, so that identical citations within a document are resolved
+    only once.
+
+    :param full_citation: A FullCaseCitation instance.
+    :return: A tuple with the corrected citation, year, court and parties.
+    """
+    return (
+        full_citation.corrected_citation(),
+        full_citation.year,
+        full_citation.metadata.court,
+        full_citation.metadata.plaintiff,
+        full_citation.metadata.defendant,
+    )
+
+
+def resolve_fullcase_citations_in_bulk(
+    citations: list[CitationBase],
+) -> dict[FullCitationKey, MatchedResourceType]:
+    """Resolve all the FullCaseCitations in a list at once.
+
+    Citations are deduplicated with get_full_citation_key and their ES
+    lookups are batched with es_search_db_for_full_citations, so a document
+    citing the same case many times, or citing hundreds of cases, costs a
+    handful of ES requests instead of one or more per citation.
+
+    The citing object must already be set on the citations, see
+    set_citing_object.
+
+    :param citations: A list of eyecite citations. Only FullCaseCitations
+    are resolved.
+    :return: A dict mapping each citation key to its resolved resource, to be
+    passed to do_resolve_citations.
+    """
+    unique_citations: dict[FullCitationKey, FullCaseCitation] = {}
+    for c in citations:
+        if type(c) is FullCaseCitation:
+            unique_citations.setdefault(get_full_citation_key(c), c)
+    if not unique_citations:
+        return {}
+
+    search_results = es_search_db_for_full_citations(
+        list(unique_citations.values())
+    )
+    return {
+        key: resolve_fullcase_citation(citation, db_search_results=results)
+        for (key, citation), (results, _) in zip(
+            unique_citations.items(), search_results
+        )
+    }
+
+
 @no_type_check
-def do_resolve_citations(
+def set_citing_object(
     citations: list[CitationBase], citing_object: Opinion | RECAPDocument
-) -> dict[MatchedResourceType, list[SupportedCitationType]]:
-    # Set the citing opinion on FullCaseCitation objects for later matching
+) -> None:
+    """Set the citing opinion or document on FullCaseCitation objects for
+    later matching.
+
+    :param citations: A list of eyecite citations.
+    :param citing_object: The Opinion or RECAPDocument the citations were
+    extracted from.
+    :return: None
+    """
     for c in citations:
         if type(c) is FullCaseCitation:
             if isinstance(citing_object, Opinion):
@@ -186,12 +256,50 @@ def do_resolve_citations(
                 # refer to it as a citing document.
                 c.citing_document = citing_object
             else:
-                raise "Unknown citing type."
+                raise TypeError("Unknown citing type.")
+
+
+@no_type_check
+def do_resolve_citations(
+    citations: list[CitationBase],
+    citing_object: Opinion | RECAPDocument,
+    resolved_full_citations: dict[FullCitationKey, MatchedResourceType]
+    | None = None,
+) -> dict[MatchedResourceType, list[SupportedCitationType]]:
+    """Resolve citations to Opinion objects using a variety of heuristics.
+
+    :param citations: A list of eyecite citations.
+    :param citing_object: The Opinion or RECAPDocument the citations were
+    extracted from.
+    :param resolved_full_citations: Optional, the output of
+    resolve_fullcase_citations_in_bulk. Full citations found in it are not
+    looked up again.
+    :return: A dict mapping each resource to the citations resolved to it.
+    """
+    set_citing_object(citations, citing_object)
+
+    resolve_full_citation = resolve_fullcase_citation
+    if resolved_full_citations is not None:
+
+        def resolve_full_citation(
+            full_citation: FullCaseCitation,
+        ) -> MatchedResourceType:
+            if type(full_citation) is not FullCaseCitation:
+                return resolve_fullcase_citation(full_citation)
+            key = get_full_citation_key(full_citation)
+            if key not in resolved_full_citations:
+                return resolve_fullcase_citation(full_citation)
+            resolution = resolved_full_citations[key]
+            if resolution is MULTIPLE_MATCHES_RESOURCE:
+                # The flag is read from each citation when storing
+                # unmatched citations
+                setattr(full_citation, MULTIPLE_MATCHES_FLAG, True)
+            return resolution
 
     # Call and return eyecite's resolve_citations() function
     return resolve_citations(
         citations=citations,
-        resolve_full_citation=resolve_fullcase_citation,
+        resolve_full_citation=resolve_full_citation,
         resolve_shortcase_citation=resolve_shortcase_citation,
         resolve_supra_citation=resolve_supra_citation,
     )
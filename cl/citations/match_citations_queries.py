@@ -1,7 +1,9 @@
 #!/usr/bin/env python
+from itertools import batched
 
+from django.conf import settings
 from django_elasticsearch_dsl.search import Search
-from elasticsearch_dsl import Q
+from elasticsearch_dsl import MultiSearch, Q
 from elasticsearch_dsl.query import Query
 from elasticsearch_dsl.response import Hit
 from eyecite import get_citations
@@ -21,15 +23,13 @@ from cl.search.models import Opinion
 HYPERSCAN_TOKENIZER = HyperscanTokenizer(cache_dir=".hyperscan")
 
 
-def fetch_citations(search_query: Search) -> list[Hit]:
-    """Fetches citation matches from Elasticsearch based on the provided
-    search query.
+def build_citation_search(search_query: Search) -> Search:
+    """Apply the sorting, source filtering and collapsing used by every
+    citation lookup query.
 
     :param search_query: The Elasticsearch DSL Search object.
-    :return: A list of ES Hits objects.
+    :return: The Search object ready to be executed.
     """
-
-    citation_hits = []
     #  Sorts by id, then ordering_key with missing values sorted last
     search_query = search_query.sort(
         {"ordering_key": {"order": "asc", "missing": "_last"}}, "id"
@@ -40,8 +40,19 @@ def fetch_citations(search_query: Search) -> list[Hit]:
     )
     # Citation resolution aims for a single match to show the tip. Setting up a size of 2 is
     # enough to determine if there is more than one match after cluster collapse
-    search_query = search_query.extra(size=2, collapse={"field": "cluster_id"})
-    response = search_query.execute()
+    return search_query.extra(size=2, collapse={"field": "cluster_id"})
+
+
+def fetch_citations(search_query: Search) -> list[Hit]:
+    """Fetches citation matches from Elasticsearch based on the provided
+    search query.
+
+    :param search_query: The Elasticsearch DSL Search object.
+    :return: A list of ES Hits objects.
+    """
+
+    citation_hits = []
+    response = build_citation_search(search_query).execute()
     citation_hits.extend(response.hits)
     return citation_hits
 
@@ -139,19 +150,15 @@ def es_case_name_query(
     return results
 
 
-def es_search_db_for_full_citation(
-    full_citation: FullCaseCitation,
-) -> tuple[list[Hit], bool]:
-    """For a citation object, try to match it to an item in the database using
-    a variety of heuristics.
+def build_full_citation_query(full_citation: FullCaseCitation) -> Query:
+    """Build the query used to look up a full case citation by its citation
+    string, date range and court.
+
     :param full_citation: A FullCaseCitation instance.
-    :return: A two tuple, the ElasticSearch Result object with the results, or an empty list if
-     no hits and a boolean indicating whether the citation was found.
+    :return: The ES bool Query.
     """
-
     if not hasattr(full_citation, "citing_opinion"):
         full_citation.citing_opinion = None
-    search_query = OpinionDocument.search()
     filters = [
         # Q(
         #     "term", **{"status.raw": "Published"}
@@ -199,10 +206,23 @@ def es_search_db_for_full_citation(
             **{"citation.exact": full_citation.corrected_citation()},
         )
     )
-    query = Q("bool", must_not=must_not, filter=filters)
-    citations_query = search_query.query(query)
-    results = fetch_citations(citations_query)
+    return Q("bool", must_not=must_not, filter=filters)
 
+
+def refine_full_citation_results(
+    full_citation: FullCaseCitation,
+    query: Query,
+    results: list[Hit],
+) -> tuple[list[Hit], bool]:
+    """Narrow down the results of a full citation lookup using the case name
+    when the citation string alone matched more than one cluster.
+
+    :param full_citation: The FullCaseCitation that was looked up.
+    :param query: The query returned by build_full_citation_query.
+    :param results: The hits returned by the citation string lookup.
+    :return: A two tuple, the list of hits and a boolean indicating whether
+    the citation was found.
+    """
     citation_found = True if len(results) > 0 else False
     if len(results) == 1:
         return results, citation_found
@@ -220,6 +240,57 @@ def es_search_db_for_full_citation(
     return results, citation_found
 
 
+def es_search_db_for_full_citation(
+    full_citation: FullCaseCitation,
+) -> tuple[list[Hit], bool]:
+    """For a citation object, try to match it to an item in the database using
+    a variety of heuristics.
+    :param full_citation: A FullCaseCitation instance.
+    :return: A two tuple, the ElasticSearch Result object with the results, or an empty list if
+     no hits and a boolean indicating whether the citation was found.
+    """
+    query = build_full_citation_query(full_citation)
+    citations_query = OpinionDocument.search().query(query)
+    results = fetch_citations(citations_query)
+    return refine_full_citation_results(full_citation, query, results)
+
+
+def es_search_db_for_full_citations(
+    full_citations: list[FullCaseCitation],
+) -> list[tuple[list[Hit], bool]]:
+    """Batched version of es_search_db_for_full_citation.
+
+    The citation string lookups for all the citations are sent together
+    using ES MultiSearch requests of up to
+    CITATION_RESOLUTION_MSEARCH_BATCH_SIZE queries each. Only citations that
+    match more than one cluster fall back to the sequential case name
+    queries.
+
+    :param full_citations: A list of FullCaseCitation instances. Callers
+    should dedupe them beforehand.
+    :return: A list of two tuples, in the same order as full_citations, as
+    returned by es_search_db_for_full_citation.
+    """
+    queries = [build_full_citation_query(c) for c in full_citations]
+    responses = []
+    for chunk in batched(
+        queries, settings.CITATION_RESOLUTION_MSEARCH_BATCH_SIZE
+    ):
+        multi_search = MultiSearch()
+        for query in chunk:
+            multi_search = multi_search.add(
+                build_citation_search(OpinionDocument.search().query(query))
+            )
+        responses.extend(multi_search.execute())
+
+    return [
+        refine_full_citation_results(citation, query, list(response.hits))
+        for citation, query, response in zip(
+            full_citations, queries, responses
+        )
+    ]
+
+
 def es_get_query_citation(
     cd: CleanData,
 ) -> tuple[Hit | None, list[FullCaseCitation]]:
@@ -5,8 +5,11 @@ from django.db import transaction
 from django.db.models import QuerySet
 from django.db.models.signals import post_delete, post_save
 
-from cl.citations.group_parentheticals import compute_parenthetical_groups
-from cl.search.models import OpinionCluster, ParentheticalGroup
+from cl.citations.group_parentheticals import (
+    compute_parenthetical_group_updates,
+    set_minhash_signatures,
+)
+from cl.search.models import OpinionCluster, Parenthetical, ParentheticalGroup
 
 logger = logging.getLogger(__name__)
 
@@ -34,15 +37,27 @@ def atomic_create_parenthetical_groups(cluster: OpinionCluster) -> None:
 
 def create_parenthetical_groups(cluster: OpinionCluster) -> None:
     """
-    Given a cluster, (re)computes the parenthetical groups for its parentheticals
+    Given a cluster, updates the parenthetical groups for its parentheticals
     and stores them in the database
 
+    Only the groups connected to parentheticals without a group, or that lost
+    some of their parentheticals, are recomputed. The other groups only have
+    their score updated, since it depends on the number of parentheticals.
+
     :param cluster: An OpinionCluster object
     """
     parentheticals = list(cluster.parentheticals)
-    computed_groups = compute_parenthetical_groups(parentheticals)
-    # Delete existing parenthetical groups for this cluster
-    cluster.parenthetical_groups.delete()
+    store_missing_minhash_signatures(parentheticals)
+    existing_groups = {
+        group.pk: group
+        for group in cluster.parenthetical_groups.only("pk", "size", "score")
+    }
+    computed_groups, stale_group_ids = compute_parenthetical_group_updates(
+        parentheticals,
+        {pk: group.size for pk, group in existing_groups.items()},
+    )
+    if stale_group_ids:
+        ParentheticalGroup.objects.filter(pk__in=stale_group_ids).delete()
     for cg in computed_groups:
         group_to_create = ParentheticalGroup(
             opinion=cg.representative.described_opinion,
@@ -53,6 +68,41 @@ def create_parenthetical_groups(cluster: OpinionCluster) -> None:
         group_to_create.save()
         group_to_create.parentheticals.set(cg.parentheticals)
 
+    top_scores: dict[int, float] = {}
+    for par in parentheticals:
+        if par.group_id in existing_groups:
+            top_scores.setdefault(par.group_id, par.score)
+    groups_to_update = []
+    for pk, group in existing_groups.items():
+        if pk in stale_group_ids:
+            continue
+        # Parentheticals are sorted by score, so the first one of each group
+        # is its top-ranked parenthetical
+        score = top_scores[pk] * (group.size / len(parentheticals))
+        if score != group.score:
+            group.score = score
+            groups_to_update.append(group)
+    ParentheticalGroup.objects.bulk_update(groups_to_update, ["score"])
+
+
+def store_missing_minhash_signatures(
+    parentheticals: list[Parenthetical],
+) -> None:
+    """
+    Compute and store the MinHash signatures of the parentheticals created
+    before signatures were stored.
+
+    :param parentheticals: A list of Parenthetical objects
+    :return: None
+    """
+    missing = [par for par in parentheticals if par.minhash_signature is None]
+    if not missing:
+        return
+    set_minhash_signatures(missing)
+    Parenthetical.objects.bulk_update(
+        missing, ["minhash_signature"], batch_size=1000
+    )
+
 
 def disconnect_parenthetical_group_signals() -> None:
     """Disconnect ParentheticalGroup ES indexing on save and delete
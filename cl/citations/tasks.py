@@ -5,6 +5,7 @@ from django.db import transaction
 from django.db.models import F
 from django.db.models.query import QuerySet
 from django.db.utils import OperationalError
+from django.utils import timezone
 from eyecite import get_citations
 from eyecite.models import CitationBase
 from eyecite.tokenizers import HyperscanTokenizer
@@ -15,10 +16,13 @@ from cl.citations.filter_parentheticals import (
     clean_parenthetical_text,
     is_parenthetical_descriptive,
 )
+from cl.citations.group_parentheticals import set_minhash_signatures
 from cl.citations.match_citations import (
     MULTIPLE_MATCHES_RESOURCE,
     NO_MATCH_RESOURCE,
     do_resolve_citations,
+    resolve_fullcase_citations_in_bulk,
+    set_citing_object,
 )
 from cl.citations.parenthetical_utils import (
     create_parenthetical_groups,
@@ -27,8 +31,15 @@ from cl.citations.parenthetical_utils import (
 )
 from cl.citations.recap_citations import store_recap_citations
 from cl.citations.score_parentheticals import parenthetical_score
-from cl.citations.types import MatchedResourceType, SupportedCitationType
-from cl.citations.unmatched_citations_utils import handle_unmatched_citations
+from cl.citations.types import (
+    MatchedResourceType,
+    OpinionCitations,
+    SupportedCitationType,
+)
+from cl.citations.unmatched_citations_utils import (
+    handle_unmatched_citations,
+    handle_unmatched_citations_in_bulk,
+)
 from cl.citations.utils import (
     get_cited_clusters_ids_to_update,
     make_get_citations_kwargs,
@@ -218,26 +229,15 @@ def find_citations_and_parentheticals_for_opinion_by_pks(
         )
 
 
-def store_opinion_citations_and_update_parentheticals(
-    opinion: Opinion,
-    update_citation_count: bool = True,
-    disable_parenthetical_groups: bool = False,
-    percolate_opinion: bool = False,
-) -> None:
-    """
-    Updates counts of citations to other opinions within a given court opinion,
-    parenthetical info for the cited opinions, and stores unmatched citations
+def find_opinion_citations(opinion: Opinion) -> OpinionCitations | None:
+    """Extract and resolve the citations of an opinion, build its
+    `html_with_citations` and the parentheticals describing the cited
+    opinions, without writing anything to the database.
 
-    :param opinion: A search.Opinion object
-    :param update_citation_count: if False, do NOT update the DB or Elastic:
-        - OpinionCluster.citation_count
-        - `index_related_cites_fields` that updates OpinionDocument and
-            OpinionClusterDocument
-        this is useful to prevent database overloading during bulk work
-    :param disable_parenthetical_groups: Skip creating ParentheticalGroups
-    :param percolate_opinion: Whether to percolate the related opinion document in
-    order to trigger search alerts.
-    :return: None
+    :param opinion: A search.Opinion object. Its `html_with_citations`
+        attribute is set, but not saved.
+    :return: An OpinionCitations object, or None if the opinion has no
+        content.
     """
     segments = make_get_citations_kwargs(opinion)
     if not segments:
@@ -248,27 +248,32 @@ def store_opinion_citations_and_update_parentheticals(
                 opinion=opinion,
             ),
         )
-        return
+        return None
 
     cited_html_segments = []
     citation_resolutions: dict[
         MatchedResourceType, list[SupportedCitationType]
     ] = {}
     has_single_segment = True if len(segments) == 1 else False
-    for kwarg_segment in segments:
-        # Extract citations
-        logger.debug("Extracting citations for opinion %s", opinion.pk)
-        citations: list[CitationBase] = get_citations(
-            tokenizer=HYPERSCAN_TOKENIZER,
-            **kwarg_segment,
-        )
-
+    # Extract citations from every segment first, so the full citations of
+    # the whole opinion can be resolved in a few batched ES requests
+    logger.debug("Extracting citations for opinion %s", opinion.pk)
+    segment_citations: list[list[CitationBase]] = [
+        get_citations(tokenizer=HYPERSCAN_TOKENIZER, **kwarg_segment)
+        for kwarg_segment in segments
+    ]
+    all_citations = [c for citations in segment_citations for c in citations]
+    set_citing_object(all_citations, opinion)
+    logger.debug("Resolving full citations in bulk %s", opinion.pk)
+    resolved_full_citations = resolve_fullcase_citations_in_bulk(all_citations)
+
+    for kwarg_segment, citations in zip(segments, segment_citations):
         logger.debug("Resolving citations %s", opinion.pk)
         # Resolve all those different citation objects to Opinion objects,
         # using a variety of heuristics.
         citation_segment_resolutions: dict[
             MatchedResourceType, list[SupportedCitationType]
-        ] = do_resolve_citations(citations, opinion)
+        ] = do_resolve_citations(citations, opinion, resolved_full_citations)
 
         for (
             resource_type,
@@ -292,14 +297,6 @@ def store_opinion_citations_and_update_parentheticals(
         created_html = f'<pre class="inline">{created_html}</pre>'
     opinion.html_with_citations = created_html
 
-    if not citation_resolutions:
-        # there was nothing to annotate, just save the `html_with_citations`
-        logger.debug("No annotations: Saving %s", opinion.pk)
-        opinion.save()
-        if percolate_opinion:
-            percolate_document(OpinionDocument, opinion.pk, opinion)
-        return
-
     # Put apart the unmatched citations and ambiguous citations
     unmatched_citations = citation_resolutions.pop(NO_MATCH_RESOURCE, [])
     ambiguous_matches = citation_resolutions.pop(MULTIPLE_MATCHES_RESOURCE, [])
@@ -330,6 +327,74 @@ def store_opinion_citations_and_update_parentheticals(
                         score=parenthetical_score(clean, opinion.cluster),
                     )
                 )
+    # Store the signatures used to group the parentheticals, so they don't
+    # need to be computed every time a parenthetical is added to a cluster
+    set_minhash_signatures(parentheticals)
+
+    return OpinionCitations(
+        citation_resolutions=citation_resolutions,
+        unmatched_citations=unmatched_citations + ambiguous_matches,
+        parentheticals=parentheticals,
+        clusters_to_update_par_groups_for=clusters_to_update_par_groups_for,
+    )
+
+
+def make_opinions_cited(
+    opinion: Opinion, opinion_citations: OpinionCitations
+) -> list[OpinionsCited]:
+    """Build the OpinionsCited rows for the citations found in an opinion,
+    excluding citations to its own cluster.
+
+    :param opinion: The citing opinion.
+    :param opinion_citations: The output of find_opinion_citations.
+    :return: A list of unsaved OpinionsCited objects.
+    """
+    return [
+        OpinionsCited(
+            citing_opinion_id=opinion.pk,
+            cited_opinion_id=_opinion.pk,
+            depth=len(_citations),
+        )
+        for _opinion, _citations in (
+            opinion_citations.citation_resolutions.items()
+        )
+        if opinion.cluster_id != _opinion.cluster_id
+    ]
+
+
+def store_opinion_citations_and_update_parentheticals(
+    opinion: Opinion,
+    update_citation_count: bool = True,
+    disable_parenthetical_groups: bool = False,
+    percolate_opinion: bool = False,
+) -> None:
+    """
+    Updates counts of citations to other opinions within a given court opinion,
+    parenthetical info for the cited opinions, and stores unmatched citations
+
+    :param opinion: A search.Opinion object
+    :param update_citation_count: if False, do NOT update the DB or Elastic:
+        - OpinionCluster.citation_count
+        - `index_related_cites_fields` that updates OpinionDocument and
+            OpinionClusterDocument
+        this is useful to prevent database overloading during bulk work
+    :param disable_parenthetical_groups: Skip creating ParentheticalGroups
+    :param percolate_opinion: Whether to percolate the related opinion document in
+    order to trigger search alerts.
+    :return: None
+    """
+    opinion_citations = find_opinion_citations(opinion)
+    if opinion_citations is None:
+        return
+
+    citation_resolutions = opinion_citations.citation_resolutions
+    if not citation_resolutions and not opinion_citations.unmatched_citations:
+        # there was nothing to annotate, just save the `html_with_citations`
+        logger.debug("No annotations: Saving %s", opinion.pk)
+        opinion.save()
+        if percolate_opinion:
+            percolate_document(OpinionDocument, opinion.pk, opinion)
+        return
 
     # need to update the citation_count of cited clusters
     cluster_ids_to_update: list[int] = []
@@ -352,7 +417,7 @@ def store_opinion_citations_and_update_parentheticals(
 
         handle_unmatched_citations(
             opinion,
-            unmatched_citations + ambiguous_matches,
+            opinion_citations.unmatched_citations,
             citation_resolutions,
         )
         logger.debug("Recreate OpCited and Parens: %s", opinion.pk)
@@ -363,23 +428,17 @@ def store_opinion_citations_and_update_parentheticals(
 
         # Create the new ones
         OpinionsCited.objects.bulk_create(
-            [
-                OpinionsCited(
-                    citing_opinion_id=opinion.pk,
-                    cited_opinion_id=_opinion.pk,
-                    depth=len(_citations),
-                )
-                for _opinion, _citations in citation_resolutions.items()
-                if opinion.cluster_id != _opinion.cluster_id
-            ]
+            make_opinions_cited(opinion, opinion_citations)
         )
-        Parenthetical.objects.bulk_create(parentheticals)
+        Parenthetical.objects.bulk_create(opinion_citations.parentheticals)
 
         if disable_parenthetical_groups is False:
             # Update parenthetical groups for clusters that we have added
             # parentheticals for from this opinion
             logger.debug("Create parenthetical groups: %s", opinion.pk)
-            for cluster_id in clusters_to_update_par_groups_for:
+            for (
+                cluster_id
+            ) in opinion_citations.clusters_to_update_par_groups_for:
                 create_parenthetical_groups(
                     OpinionCluster.objects.get(pk=cluster_id)
                 )
@@ -402,3 +461,71 @@ def store_opinion_citations_and_update_parentheticals(
         )
 
     logger.debug("Finished %s", opinion.pk)
+
+
+def store_opinions_citations_in_bulk(
+    opinions_citations: list[tuple[Opinion, OpinionCitations]],
+) -> None:
+    """Store the citations found in a batch of opinions with a few bulk
+    queries, for backfills.
+
+    Unlike store_opinion_citations_and_update_parentheticals, this doesn't
+    update citation counts, parenthetical groups or percolate the opinions,
+    and it doesn't send the Opinion post_save signals. Callers are in charge
+    of re-indexing the opinions in ES.
+
+    :param opinions_citations: A list of two tuples, the citing opinion with
+        its `html_with_citations` already set and the output of
+        find_opinion_citations for it.
+    :return: None
+    """
+    if not opinions_citations:
+        return
+
+    opinion_ids = [opinion.pk for opinion, _ in opinions_citations]
+    now = timezone.now()
+    with transaction.atomic():
+        handle_unmatched_citations_in_bulk(
+            [
+                (
+                    opinion,
+                    opinion_citations.unmatched_citations,
+                    opinion_citations.citation_resolutions,
+                )
+                for opinion, opinion_citations in opinions_citations
+            ]
+        )
+
+        # Nuke existing citations and parentheticals
+        OpinionsCited.objects.filter(
+            citing_opinion_id__in=opinion_ids
+        ).delete()
+        Parenthetical.objects.filter(
+            describing_opinion_id__in=opinion_ids
+        ).delete()
+
+        # Create the new ones
+        OpinionsCited.objects.bulk_create(
+            [
+                opinion_cited
+                for opinion, opinion_citations in opinions_citations
+                for opinion_cited in make_opinions_cited(
+                    opinion, opinion_citations
+                )
+            ]
+        )
+        Parenthetical.objects.bulk_create(
+            [
+                parenthetical
+                for _, opinion_citations in opinions_citations
+                for parenthetical in opinion_citations.parentheticals
+            ]
+        )
+
+        opinions = []
+        for opinion, _ in opinions_citations:
+            opinion.date_modified = now
+            opinions.append(opinion)
+        Opinion.objects.bulk_update(
+            opinions, ["html_with_citations", "date_modified"]
+        )
@@ -1,15 +1,20 @@
 import itertools
 import json
+import pickle
+import tempfile
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, timedelta
 from http import HTTPStatus
+from pathlib import Path
 from unittest import mock
 from unittest.mock import Mock, patch
 
+import numpy as np
 import time_machine
 from asgiref.sync import async_to_sync, sync_to_async
 from bs4 import BeautifulSoup
 from celery.exceptions import Retry
+from datasketch import MinHash
 from django.contrib.auth.hashers import make_password
 from django.core.cache import cache as default_cache
 from django.core.management import call_command
@@ -18,6 +23,7 @@ from django.db.models.signals import post_delete, post_save
 from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from elasticsearch import NotFoundError
+from elasticsearch_dsl import MultiSearch
 from eyecite import get_citations
 from eyecite.test_factories import (
     case_citation,
@@ -37,17 +43,31 @@ from cl.citations.filter_parentheticals import (
     is_parenthetical_descriptive,
 )
 from cl.citations.group_parentheticals import (
+    NUM_PERM,
+    compute_minhash_signatures,
+    compute_parenthetical_group_updates,
     compute_parenthetical_groups,
     get_graph_component,
     get_parenthetical_tokens,
     get_representative_parenthetical,
 )
+from cl.citations.lookup_index import (
+    build_citation_lookup_index,
+    reset_citation_lookup_index,
+)
+from cl.citations.management.commands.find_citations import (
+    CitationShard,
+    find_citations_for_shard,
+    make_shards,
+)
 from cl.citations.match_citations import (
     MULTIPLE_MATCHES_FLAG,
     MULTIPLE_MATCHES_RESOURCE,
     NO_MATCH_RESOURCE,
     do_resolve_citations,
     resolve_fullcase_citation,
+    resolve_fullcase_citations_in_bulk,
+    set_citing_object,
 )
 from cl.citations.match_citations_queries import es_search_db_for_full_citation
 from cl.citations.models import UnmatchedCitation
@@ -1387,6 +1407,45 @@ class CitationObjectTest(ESIndexTestCase, TestCase):
         expected_citation_annotation = '<pre class="inline">Lorem ipsum, </pre><span class="citation multiple-matches"><a href="/c/F.3d/114/1182/">114 F.3d 1182</a></span><pre class="inline">, consectetur adipiscing elit, </pre><span class="citation multiple-matches"><a href="/c/F.3d/114/1181/">114 F.3d 1181</a></span><pre class="inline"></pre>'
         self.assertIn(expected_citation_annotation, new_html)
 
+    def test_resolve_fullcase_citations_in_bulk(self) -> None:
+        """Do full citations resolved in bulk match the ones resolved one by
+        one, using a single MultiSearch request for repeated citations?
+        """
+        citing_opinion = Opinion.objects.get(
+            cluster__pk=self.citation5.cluster_id
+        )
+        citation_str = (
+            "1 U.S. 1 and 1 U.S. 1, also 114 F.3d 1182 and 1 F. 9 (1795)"
+        )
+        citations = get_citations(citation_str, tokenizer=HYPERSCAN_TOKENIZER)
+        expected_resolutions = do_resolve_citations(citations, citing_opinion)
+
+        citations = get_citations(citation_str, tokenizer=HYPERSCAN_TOKENIZER)
+        set_citing_object(citations, citing_opinion)
+        with mock.patch(
+            "cl.citations.match_citations_queries.MultiSearch.execute",
+            side_effect=MultiSearch.execute,
+            autospec=True,
+        ) as mock_execute:
+            resolved_full_citations = resolve_fullcase_citations_in_bulk(
+                citations
+            )
+        self.assertEqual(mock_execute.call_count, 1)
+        self.assertEqual(len(resolved_full_citations), 3)
+
+        with mock.patch(
+            "cl.citations.match_citations.es_search_db_for_full_citation"
+        ) as mock_search:
+            citation_resolutions = do_resolve_citations(
+                citations, citing_opinion, resolved_full_citations
+            )
+        mock_search.assert_not_called()
+        self.assertEqual(citation_resolutions, expected_resolutions)
+        ambiguous = [
+            c for c in citations if getattr(c, MULTIPLE_MATCHES_FLAG, False)
+        ]
+        self.assertEqual(len(ambiguous), 1)
+
     def test_citation_increment(self) -> None:
         """Make sure that found citations update the increment on the cited
         opinion's citation count"""
@@ -1848,6 +1907,43 @@ class CitationCommandTest(ESIndexTestCase, TestCase):
         ]
         self.call_command_and_test_it(args)
 
+    def test_find_citations_for_shard(self) -> None:
+        """Can we find and store citations for a shard of opinions in bulk,
+        and resume it from its checkpoint?
+        """
+        query = Opinion.objects.filter(main_version__isnull=True)
+        shards = make_shards(query, 2, "test")
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(shards[-1].end_id, query.order_by("-pk")[0].pk)
+
+        # Workers get the SQL query, which pickles without evaluating the
+        # queryset.
+        with self.assertNumQueries(0):
+            pickle.dumps(query.query)
+
+        shard = CitationShard(self.opinion_id2, self.opinion_id2, "test")
+        processed = find_citations_for_shard(
+            query.query, shard, batch_size=10, resume=False
+        )
+        self.assertEqual(processed, 1)
+
+        cited = Opinion.objects.get(cluster__pk=self.citation1.cluster_id)
+        self.assertTrue(
+            OpinionsCited.objects.filter(
+                citing_opinion_id=self.opinion_id2, cited_opinion=cited
+            ).exists()
+        )
+        citing = Opinion.objects.get(pk=self.opinion_id2)
+        self.assertIn(
+            cited.cluster.get_absolute_url(), citing.html_with_citations
+        )
+
+        # Nothing left to do for the shard after its checkpoint
+        processed = find_citations_for_shard(
+            query.query, shard, batch_size=10, resume=True
+        )
+        self.assertEqual(processed, 0)
+
     def test_filed_after(self) -> None:
         args = [
             "--filed-after",
@@ -2148,6 +2244,7 @@ class DummyParenthetical:
     id: int
     text: str
     score: float
+    group_id: int | None = None
 
     def __hash__(self):
         return self.id
@@ -2280,6 +2377,66 @@ class GroupParentheticalsTest(SimpleTestCase):
                     f"Got incorrect result from get_parenthetical_groups for: {groups}",
                 )
 
+    def test_compute_minhash_signatures(self) -> None:
+        """Are the batched signatures identical to datasketch's MinHashes?"""
+        texts = [
+            "Holding that a prisoner must show an actual injury to state a claim for denial of access to courts",
+            "The loss of First Amendment freedoms, for even minimal period of time, unquestionably constitutes irreparable injury.",
+            "Holding",
+            "",
+        ]
+        signatures = compute_minhash_signatures(texts)
+        self.assertEqual(signatures.shape, (len(texts), NUM_PERM))
+        for text, signature in zip(texts, signatures):
+            with self.subTest(text=text):
+                mhash = MinHash(num_perm=NUM_PERM)
+                mhash.update_batch(
+                    [
+                        token.encode("utf-8")
+                        for token in get_parenthetical_tokens(text)
+                    ]
+                )
+                self.assertTrue(np.array_equal(signature, mhash.hashvalues))
+
+    def test_compute_parenthetical_group_updates(self) -> None:
+        """Are only the groups connected to new parentheticals or that lost
+        members recomputed?
+        """
+        injury = "Holding that a prisoner must show an actual injury to state a claim for denial of access to courts"
+        fines = 'Finding that forfeitures are fines "if they constitute punishment for an offense"'
+        parentheticals = [
+            DummyParenthetical(id=1, text=injury, score=1, group_id=10),
+            DummyParenthetical(id=2, text=fines, score=1, group_id=20),
+            DummyParenthetical(id=3, text=injury, score=0.5),
+        ]
+        groups, stale_group_ids = compute_parenthetical_group_updates(
+            parentheticals, {10: 1, 20: 1}
+        )
+        self.assertEqual(stale_group_ids, {10})
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(
+            groups[0].parentheticals, [parentheticals[0], parentheticals[2]]
+        )
+        self.assertAlmostEqual(groups[0].score, 2 / 3)
+
+        with self.subTest("Nothing to update"):
+            self.assertEqual(
+                compute_parenthetical_group_updates(
+                    parentheticals[:2], {10: 1, 20: 1}
+                ),
+                ([], set()),
+            )
+
+        with self.subTest("Groups that lost members are recomputed"):
+            groups, stale_group_ids = compute_parenthetical_group_updates(
+                parentheticals[:1], {10: 2, 20: 1}
+            )
+            self.assertEqual(stale_group_ids, {10, 20})
+            self.assertEqual(
+                [group.parentheticals for group in groups],
+                [[parentheticals[0]]],
+            )
+
     def test_get_representative_parenthetical(self):
         """
         Tests whether get_representative parenthetical identifies the correct
@@ -2928,6 +3085,46 @@ class CitationLookUpApiTest(
         clusters = second_citation["clusters"]
         self.assertEqual(len(clusters), 0)
 
+    async def test_can_look_up_citations_from_the_lookup_index(
+        self, cache_key_mock
+    ) -> None:
+        """Are citations resolved from the local lookup index, including the
+        ones created after the index was built?
+        """
+        la_rue_citation = await sync_to_async(
+            CitationWithParentsFactory.create
+        )(volume="139", reporter="U.S.", page="601", type=1)
+        with tempfile.TemporaryDirectory() as index_dir:
+            await sync_to_async(build_citation_lookup_index)(Path(index_dir))
+            potts_citation = await sync_to_async(
+                CitationWithParentsFactory.create
+            )(volume="155", reporter="U.S.", page="597", type=1)
+
+            reset_citation_lookup_index()
+            with (
+                override_settings(CITATION_LOOKUP_INDEX_DIR=index_dir),
+                mock.patch(
+                    "cl.citations.api_views.get_clusters_from_citation_str",
+                ) as mock_db_lookup,
+            ):
+                r = await self.async_client.post(
+                    reverse("citation-lookup-list", kwargs={"version": "v3"}),
+                    {"text": "La Rue, 139 U.S. 601; Potts, 155 U.S. 597."},
+                )
+            reset_citation_lookup_index()
+
+        mock_db_lookup.assert_not_called()
+        self.assertEqual(r.status_code, HTTPStatus.OK)
+        data = json.loads(r.content)
+        self.assertEqual(len(data), 2)
+        for citation, expected in zip(data, [la_rue_citation, potts_citation]):
+            self.assertEqual(citation["status"], HTTPStatus.OK)
+            self.assertEqual(len(citation["clusters"]), 1)
+            self.assertEqual(
+                citation["clusters"][0]["absolute_url"],
+                expected.get_absolute_url(),
+            )
+
     @override_settings(MAX_CITATIONS_PER_REQUEST=10)
     async def test_can_look_up_max_citations_per_request(
         self, cache_key_mock
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import NotRequired, TypedDict
 
 from django.db.models import QuerySet
@@ -9,7 +10,7 @@ from eyecite.models import (
     SupraCitation,
 )
 
-from cl.search.models import Opinion, OpinionCluster
+from cl.search.models import Opinion, OpinionCluster, Parenthetical
 
 SupportedCitationType = (
     FullCaseCitation | ShortCaseCitation | SupraCitation | IdCitation
@@ -23,4 +24,20 @@ class CitationAPIResponse(TypedDict):
     status: int
     normalized_citations: NotRequired[list[str]]
     error_message: NotRequired[str]
-    clusters: NotRequired[QuerySet[OpinionCluster, OpinionCluster]]
+    clusters: NotRequired[
+        QuerySet[OpinionCluster, OpinionCluster] | list[OpinionCluster]
+    ]
+
+
+@dataclass
+class OpinionCitations:
+    """The citations found in an opinion, ready to be stored."""
+
+    # Matched opinions and the citations resolved to each of them
+    citation_resolutions: dict[
+        MatchedResourceType, list[SupportedCitationType]
+    ]
+    # Citations with no match or more than one match
+    unmatched_citations: list[SupportedCitationType]
+    parentheticals: list[Parenthetical]
+    clusters_to_update_par_groups_for: set[int]
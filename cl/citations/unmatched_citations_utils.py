@@ -1,11 +1,12 @@
 import logging
+from collections import defaultdict
 
 from eyecite.models import CitationBase, FullCaseCitation
 
 from cl.citations.match_citations import MULTIPLE_MATCHES_FLAG
 from cl.citations.models import UnmatchedCitation
 from cl.citations.types import MatchedResourceType, SupportedCitationType
-from cl.search.models import Opinion
+from cl.search.models import Citation, Opinion
 
 logger = logging.getLogger(__name__)
 
@@ -47,19 +48,17 @@ def unmatched_citation_is_valid(
     return True
 
 
-def update_unmatched_citations_status(
+def get_unmatched_citations_status_updates(
     resolved_citations: set[str],
     existing_unmatched_citations: list[UnmatchedCitation],
-) -> None:
+) -> list[UnmatchedCitation]:
     """Check if previously unmatched citations have been resolved and
-    updates UnmatchedCitation.status accordingly
-
-    We assume no new UnmatchedCitations will be created after the first run
+    set UnmatchedCitation.status accordingly, without saving them
 
-    :param citation_resolutions: strings of resolved citations
+    :param resolved_citations: strings of resolved citations
     :param existing_unmatched_citations: list of existing UnmatchedCitation
         objects
-    :return None:
+    :return: the UnmatchedCitation objects that need to be saved
     """
     # try to update the status of FOUND and FAILED_* UnmatchedCitations
     found_citations = [
@@ -69,6 +68,7 @@ def update_unmatched_citations_status(
         not in [UnmatchedCitation.UNMATCHED, UnmatchedCitation.RESOLVED]
     ]
 
+    to_update = []
     for found in found_citations:
         if found.citation_string in resolved_citations:
             found.status = UnmatchedCitation.RESOLVED
@@ -79,21 +79,40 @@ def update_unmatched_citations_status(
             ]:
                 continue
             found.status = UnmatchedCitation.FAILED
+        to_update.append(found)
+    return to_update
+
+
+def update_unmatched_citations_status(
+    resolved_citations: set[str],
+    existing_unmatched_citations: list[UnmatchedCitation],
+) -> None:
+    """Check if previously unmatched citations have been resolved and
+    updates UnmatchedCitation.status accordingly
+
+    We assume no new UnmatchedCitations will be created after the first run
+
+    :param citation_resolutions: strings of resolved citations
+    :param existing_unmatched_citations: list of existing UnmatchedCitation
+        objects
+    :return None:
+    """
+    for found in get_unmatched_citations_status_updates(
+        resolved_citations, existing_unmatched_citations
+    ):
         found.save()
 
 
-def store_unmatched_citations(
+def make_unmatched_citations(
     unmatched_citations: list[CitationBase],
     opinion: Opinion,
-) -> None:
-    """Bulk create UnmatchedCitation instances cited by an opinion
-
-    Only FullCaseCitations provide useful information for resolution
-    updates. Other types are discarded
+) -> list[UnmatchedCitation]:
+    """Build the unsaved UnmatchedCitation instances cited by an opinion,
+    without duplicates
 
     :param unmatched_citations: citations with 0 matches or more than 1 match
     :param opinion: the citing opinion
-    :return None:
+    :return: a list of UnmatchedCitation objects
     """
     unmatched_citations_to_store = []
     seen_citations = set()
@@ -114,7 +133,25 @@ def store_unmatched_citations(
         seen_citations.add(citation_str)
 
         unmatched_citations_to_store.append(citation_object)
+    return unmatched_citations_to_store
+
+
+def store_unmatched_citations(
+    unmatched_citations: list[CitationBase],
+    opinion: Opinion,
+) -> None:
+    """Bulk create UnmatchedCitation instances cited by an opinion
 
+    Only FullCaseCitations provide useful information for resolution
+    updates. Other types are discarded
+
+    :param unmatched_citations: citations with 0 matches or more than 1 match
+    :param opinion: the citing opinion
+    :return None:
+    """
+    unmatched_citations_to_store = make_unmatched_citations(
+        unmatched_citations, opinion
+    )
     if unmatched_citations_to_store:
         UnmatchedCitation.objects.bulk_create(
             unmatched_citations_to_store, ignore_conflicts=True
@@ -178,3 +215,81 @@ def handle_unmatched_citations(
     ]
     if new_unmatched:
         store_unmatched_citations(new_unmatched, citing_opinion)
+
+
+def handle_unmatched_citations_in_bulk(
+    opinions_unmatched_citations: list[
+        tuple[
+            Opinion,
+            list[CitationBase],
+            dict[MatchedResourceType, list[SupportedCitationType]],
+        ]
+    ],
+) -> None:
+    """Batched version of handle_unmatched_citations. Loads the self
+    citations and existing UnmatchedCitations of every citing opinion in two
+    queries and writes the changes with one bulk_create and one bulk_update
+
+    :param opinions_unmatched_citations: a list of three tuples, the citing
+        opinion, its unmatched citations and its valid resolutions
+    :return None
+    """
+    cluster_ids = {o.cluster_id for o, _, _ in opinions_unmatched_citations}
+    opinion_ids = [o.pk for o, _, _ in opinions_unmatched_citations]
+    self_citations: defaultdict[int, list[str]] = defaultdict(list)
+    for citation in Citation.objects.filter(cluster_id__in=cluster_ids):
+        self_citations[citation.cluster_id].append(str(citation))
+    existing: defaultdict[int, list[UnmatchedCitation]] = defaultdict(list)
+    for unmatched in UnmatchedCitation.objects.filter(
+        citing_opinion_id__in=opinion_ids
+    ):
+        existing[unmatched.citing_opinion_id].append(unmatched)
+
+    to_create: list[UnmatchedCitation] = []
+    to_update: list[UnmatchedCitation] = []
+    for (
+        citing_opinion,
+        unmatched_citations,
+        citation_resolutions,
+    ) in opinions_unmatched_citations:
+        valid_unmatched = [
+            c
+            for c in unmatched_citations
+            if unmatched_citation_is_valid(
+                c, self_citations[citing_opinion.cluster_id]
+            )
+        ]
+        if not valid_unmatched:
+            continue
+
+        existing_unmatched_citations = existing[citing_opinion.pk]
+        if not existing_unmatched_citations:
+            to_create.extend(
+                make_unmatched_citations(valid_unmatched, citing_opinion)
+            )
+            continue
+
+        resolved_citations = {
+            c.matched_text() for v in citation_resolutions.values() for c in v
+        }
+        to_update.extend(
+            get_unmatched_citations_status_updates(
+                resolved_citations, existing_unmatched_citations
+            )
+        )
+        existing_unmatched_strings = {
+            i.citation_string for i in existing_unmatched_citations
+        }
+        new_unmatched = [
+            c
+            for c in valid_unmatched
+            if c.matched_text() not in existing_unmatched_strings
+        ]
+        to_create.extend(
+            make_unmatched_citations(new_unmatched, citing_opinion)
+        )
+
+    if to_create:
+        UnmatchedCitation.objects.bulk_create(to_create, ignore_conflicts=True)
+    if to_update:
+        UnmatchedCitation.objects.bulk_update(to_update, ["status"])
@@ -97,7 +97,7 @@ from cl.lib.celery_utils import throttle_task
 from cl.lib.crypto import sha1
 from cl.lib.decorators import retry
 from cl.lib.llm import call_llm
-from cl.lib.microservice_utils import microservice, rd_page_count_service
+from cl.lib.microservice_utils import microservice_sync, rd_page_count_service
 from cl.lib.pacer import (
     get_blocked_status,
     get_first_missing_de_date,
@@ -2291,21 +2291,20 @@ def get_document_number_for_appellate(
     empty string if not.
     """
 
-    pdf_bytes = None
     document_number = ""
     # Try to get the document number for appellate documents from the PDF first
     if pq.filepath_local:
         with pq.filepath_local.open(mode="rb") as local_path:
-            pdf_bytes = local_path.read()
-    if pdf_bytes:
-        # For other jurisdictions try first to get it from the PDF document.
-        dn_response = async_to_sync(microservice)(
-            service="document-number",
-            file_type="pdf",
-            file=pdf_bytes,
-        )
-        if dn_response.is_success and dn_response.text:
-            document_number = dn_response.text
+            if local_path.size:
+                # For other jurisdictions try first to get it from the PDF
+                # document. The PDF is streamed rather than read into memory.
+                dn_response = microservice_sync(
+                    service="document-number",
+                    file_type="pdf",
+                    file=local_path,
+                )
+                if dn_response.is_success and dn_response.text:
+                    document_number = dn_response.text
 
     if not document_number and pacer_doc_id and not acms:
         # If we still don't have the document number fall back on the
@@ -2950,7 +2949,7 @@ def extract_recap_document_for_opinions(rd: RECAPDocument) -> Response:
     :param rd: the recap document to extract
     :return: Response object
     """
-    response = async_to_sync(microservice)(
+    response = microservice_sync(
         service="recap-extract",
         item=rd,
         params={"strip_margin": True},
@@ -96,6 +96,7 @@ from cl.corpus_importer.utils import (
 from cl.favorites.models import PrayerAvailability
 from cl.lib.pacer import process_docket_data
 from cl.lib.redis_utils import get_redis_interface
+from cl.lib.string_diff import SuffixAutomaton
 from cl.people_db.factories import (
     ABARatingFactory,
     EducationFactory,
@@ -744,6 +745,30 @@ Appeals, No. 19667-4-III, October 31, 2002. Denied September 30, 2003."
         bad_match = compare_documents(harvard_characters, bad_characters)
         self.assertEqual(bad_match, 81)
 
+    def test_compare_documents_overlaps(self) -> None:
+        """Are contained and repeated overlaps counted once?"""
+        tests = (
+            # The whole file text is found in the CL text.
+            ("abcdefghij", "xxabcdefghijxx", 100),
+            # A stretch contained in another one is filtered out.
+            ("abcdefghZcdefgh", "abcdefghij", 80),
+            # A stretch found twice is filtered out with its copy.
+            ("abcdefgXabcdefg", "abcdefgY", 0),
+            # Stretches of five characters or less are ignored.
+            ("abcdefghZcdefgh", "abcd", 0),
+        )
+        for file_characters, cl_characters, expected in tests:
+            with self.subTest(file_characters=file_characters):
+                self.assertEqual(
+                    compare_documents(file_characters, cl_characters),
+                    expected,
+                )
+
+        automaton = SuffixAutomaton("xxabcabcd")
+        self.assertEqual(automaton.longest_match("zabcd", 1), (4, 5))
+        self.assertEqual(automaton.longest_match("abcz", 0), (3, 2))
+        self.assertEqual(automaton.longest_match("zz", 0), (0, 0))
+
     def test_new_case(self):
         """Can we import a new case?"""
         case_law = CaseLawFactory()
@@ -2,8 +2,7 @@ import itertools
 import math
 import random
 import re
-from collections import defaultdict
-from collections.abc import Iterator
+from collections import Counter, defaultdict
 from datetime import date
 from difflib import SequenceMatcher
 from typing import Any
@@ -22,7 +21,7 @@ from juriscraper.lib.string_utils import harmonize, titlecase
 
 from cl.citations.utils import map_reporter_db_cite_type
 from cl.lib.command_utils import logger
-from cl.lib.string_diff import get_cosine_similarity
+from cl.lib.string_diff import SuffixAutomaton, get_cosine_similarity
 from cl.people_db.lookup_utils import (
     find_all_judges,
     lookup_judges_by_last_name_list,
@@ -183,56 +182,27 @@ def get_start_of_quarter(d: date | None = None) -> date:
     return max([q for q in quarter_dates if q <= d])
 
 
-def make_subset_range(cl_characters: str, max_string: str) -> list[int]:
-    """Find indices for matching max_string in CL opinion
-
-    :param cl_characters: The stripped down CL characters
-    :param max_string: The current largest identified substring
-    :return: Range of indices of match to CL as list
-    """
-    string_index_start = cl_characters.find(max_string)
-    string_index_end = string_index_start + len(max_string)
-    return list(range(string_index_start, string_index_end))
-
-
-def filter_subsets(lists: list[list[int]]) -> Iterator[list[int]]:
-    """Filter subsets from matches
-
-    Given list of lists, return new list of lists without subsets
-
-    :param lists: List of matched lists ranges
-    :return: Reduced list of matches
-    """
-
-    for match in lists:
-        if not any(
-            is_subset(match, other_matches)
-            for other_matches in lists
-            if match is not other_matches
-        ):
-            yield match
+def filter_overlaps(overlaps: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Filter out overlaps contained in other overlaps
 
+    An overlap found more than once is contained in its copies, so all of its
+    copies are filtered out too.
 
-def is_subset(match: list[int], other_match: list[int]) -> bool:
-    """Check if match is a subset of other matches
-
-    Check if needle is ordered subset of haystack in O(n)
-
-    :param match: Matching range of text as the indices
-    :param other_match: Other matching range of text as indices
-    :return: Is match a subset of other match
+    :param overlaps: A list of (start, end) ranges of matched CL characters
+    :return: The overlaps that aren't contained in any other overlap
     """
-
-    if len(other_match) < len(match):
-        return False
-    index = 0
-    for element in match:
-        try:
-            index = other_match.index(element, index) + 1
-        except ValueError:
-            return False
-    else:
-        return True
+    counts = Counter(overlaps)
+    filtered = []
+    max_end = -1
+    for start, end in sorted(
+        counts, key=lambda overlap: (overlap[0], -overlap[1])
+    ):
+        # Ranges sorted before this one start at or before it, and the ones
+        # starting at the same index are longer.
+        if counts[(start, end)] == 1 and max_end < end:
+            filtered.append((start, end))
+        max_end = max(max_end, end)
+    return filtered
 
 
 def compare_documents(file_characters: str, cl_characters: str) -> int:
@@ -241,35 +211,33 @@ def compare_documents(file_characters: str, cl_characters: str) -> int:
     This code iterates over two opinions logging similar stretches and then
     returns a percentage of the total overlapping characters
 
+    The longest stretch of the file text starting at each position that
+    occurs in the CL text is found with a suffix automaton of the CL text, so
+    the comparison takes linear time in the length of both texts.
+
     :param file_characters: The stripped down opinion text from file/source
     :param cl_characters: The stripped down opinion text on Courtlistener
     :return: Percentage (as integer) overlapping content
     """
 
-    start, stop, count = 0, 0, 0
-    matched_substring = ""
+    automaton = SuffixAutomaton(cl_characters)
     found_overlaps = []
-    while stop < len(file_characters):
-        stop += 1
-        source_substring = file_characters[start:stop]
-        if source_substring in cl_characters:
-            matched_substring = source_substring
+    # The first stretch is extended from a single character, the next ones
+    # from the last character of the previous stretch plus one.
+    start, min_length = 0, 1
+    while start + min_length <= len(file_characters):
+        length, cl_start = automaton.longest_match(file_characters, start)
+        if length < min_length:
+            start += min_length - 1
         else:
-            if len(matched_substring) > 5:
-                subset = make_subset_range(cl_characters, matched_substring)
-                found_overlaps.append(subset)
-            matched_substring = ""
-            start = stop - 1
-    if len(matched_substring) > 5:
-        subset = make_subset_range(cl_characters, matched_substring)
-        found_overlaps.append(subset)
-
-    # If we checked our subsets as we parsed-we wouldn't need to do this
-    # filtering here. This is a good candidate for refactoring.
-    filtered_subset = list(filter_subsets(found_overlaps))
-    for overlap in filtered_subset:
-        count += len(overlap)
-
+            if length > 5:
+                found_overlaps.append((cl_start, cl_start + length))
+            if start + length == len(file_characters):
+                break
+            start += length
+        min_length = 2
+
+    count = sum(end - start for start, end in filter_overlaps(found_overlaps))
     percent_match = int(
         100 * (count / min([len(file_characters), len(cl_characters)]))
     )
@@ -1,7 +1,6 @@
 import datetime
 
 import requests
-from asgiref.sync import async_to_sync
 from dateutil.parser import ParserError, parse
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -27,7 +26,7 @@ from cl.disclosures.models import (
 )
 from cl.lib.command_utils import logger
 from cl.lib.crypto import sha1
-from cl.lib.microservice_utils import microservice
+from cl.lib.microservice_utils import microservice_sync
 from cl.lib.models import THUMBNAIL_STATUSES
 from cl.lib.redis_utils import create_redis_semaphore, get_redis_interface
 
@@ -53,13 +52,12 @@ def make_financial_disclosure_thumbnail_from_pdf(self, pk: int) -> None:
     :return: None
     """
     disclosure = FinancialDisclosure.objects.select_for_update().get(pk=pk)
-    pdf_content = disclosure.filepath.read()
-
-    response = async_to_sync(microservice)(
-        service="generate-thumbnail",
-        file_type="pdf",
-        file=pdf_content,
-    )
+    with disclosure.filepath.open(mode="rb") as pdf_file:
+        response = microservice_sync(
+            service="generate-thumbnail",
+            file_type="pdf",
+            file=pdf_file,
+        )
     if not response.is_success:
         if self.request.retries == self.max_retries:
             disclosure.thumbnail_status = THUMBNAIL_STATUSES.FAILED
@@ -88,7 +86,7 @@ def extract_content(
 
     # Extraction takes between 7 seconds and 80 minutes for super
     # long Trump extraction with ~5k investments
-    response = async_to_sync(microservice)(
+    response = microservice_sync(
         service="extract-disclosure",
         file_type="pdf",
         file=pdf_bytes,
@@ -330,7 +328,7 @@ def save_and_upload_disclosure(
         return disclosure[0]
 
     page_count = int(
-        async_to_sync(microservice)(
+        microservice_sync(
             service="page-count",
             file_type="pdf",
             file=response.content,
@@ -34,7 +34,7 @@ from cl.audio.models import Audio
 from cl.custom_filters.templatetags.text_filters import html_decode
 from cl.lib.courts import lookup_child_courts_cache
 from cl.lib.date_time import midnight_pt
-from cl.lib.microservice_utils import microservice
+from cl.lib.microservice_utils import microservice_sync
 from cl.lib.string_utils import trunc
 from cl.lib.types import (
     ApiPositionMapping,
@@ -43,6 +43,7 @@ from cl.lib.types import (
     EsJoinQueries,
     EsMainQueries,
     ESRangeQueryParams,
+    EsSweepAlertQuery,
 )
 from cl.lib.utils import (
     check_for_proximity_tokens,
@@ -145,6 +146,23 @@ class CSVSerializableDocumentMixin:
         )
 
 
+class BulkIndexingQuerysetMixin:
+    @classmethod
+    def get_bulk_indexing_queryset(cls, queryset: QuerySet) -> QuerySet:
+        """
+        Returns the queryset used to prepare documents in bulk.
+
+        Documents whose prepare methods read related objects override this
+        method to add the select_related and prefetch_related lookups they
+        need, so that each chunk of rows takes a fixed number of queries
+        instead of a few queries per document.
+
+        :param queryset: The queryset of instances to index.
+        :return: The queryset with its related lookups.
+        """
+        return queryset
+
+
 def build_numeric_range_query(
     field: str,
     lower_bound: int | float,
@@ -2828,7 +2846,7 @@ def build_semantic_query(
             raise InputTooLongError(QueryType.QUERY_STRING)
 
         # Generate embedding vector using external microservice
-        embedding_request = async_to_sync(microservice)(
+        embedding_request = microservice_sync(
             service="inception-query",
             data=json.dumps({"text": cleaned_text_query}),
         )
@@ -3576,27 +3594,28 @@ def do_es_alert_estimation_query(
     return estimation_query.count(), total_recap_case_only_estimation
 
 
-def do_es_sweep_alert_query(
+def build_es_sweep_alert_query(
     search_query: Search,
     child_search_query: Search,
     cd: CleanData,
-) -> tuple[list[Hit] | None, Response | None, Response | None]:
-    """Build an ES query for its use in the daily RECAP sweep index.
+) -> EsSweepAlertQuery | None:
+    """Build the ES queries of an alert for its use in the daily RECAP sweep
+    index, without executing them.
 
     :param search_query: Elasticsearch DSL Search object.
     :param child_search_query: The Elasticsearch DSL search query to perform
     the child-only query.
     :param cd: The query CleanedData
-    :return: A two-tuple, the Elasticsearch search query object and an ES
-    Query for child documents, or None if there is no need to query
-    child documents.
+    :return: An EsSweepAlertQuery containing the searches to execute in a
+    single multi-search request: the main query and, if required, the
+    parent-only and child-only queries. None if the query is not valid.
     """
 
     search_form = SearchForm(cd)
     if search_form.is_valid():
         cd = search_form.cleaned_data
     else:
-        return None, None, None
+        return None
     es_queries = build_es_base_query(search_query, cd, True, alerts=True)
     s = es_queries.search_query
     parent_query = es_queries.parent_query
@@ -3607,8 +3626,7 @@ def do_es_sweep_alert_query(
         from_=0, size=settings.SCHEDULED_ALERT_HITS_LIMIT
     )
 
-    multi_search = MultiSearch()
-    multi_search = multi_search.add(main_query)
+    searches = [main_query]
     if parent_query:
         parent_search = search_query.query(parent_query)
         # Ensure accurate tracking of total hit count for up to 10,001 query results
@@ -3617,9 +3635,9 @@ def do_es_sweep_alert_query(
             track_total_hits=settings.ELASTICSEARCH_MAX_RESULT_COUNT + 1,
         )
         parent_search = parent_search.source(includes=["docket_id"])
-        multi_search = multi_search.add(parent_search)
+        searches.append(parent_search)
 
-    query_with_parties = cd.get("party_name") or cd.get("atty_name")
+    query_with_parties = bool(cd.get("party_name") or cd.get("atty_name"))
     # Avoid performing a child query on the ESRECAPSweepDocument index if the query
     # contains party-related fields, as they're not compatible with this index.
     # This query doesn't need to filter out child hits, since a RECAPDocument matched
@@ -3632,16 +3650,45 @@ def do_es_sweep_alert_query(
             track_total_hits=settings.ELASTICSEARCH_MAX_RESULT_COUNT + 1,
         )
         child_search = child_search.source(includes=["id"])
-        multi_search = multi_search.add(child_search)
+        searches.append(child_search)
+
+    return EsSweepAlertQuery(
+        cd=cd,
+        search_query=search_query,
+        child_search_query=child_search_query,
+        searches=searches,
+        parent_query=parent_query,
+        child_query=child_query,
+        query_with_parties=query_with_parties,
+    )
+
+
+def process_es_sweep_alert_responses(
+    sweep_query: EsSweepAlertQuery, responses: list[Response]
+) -> tuple[list[Hit], Response | None, Response | None]:
+    """Process the responses of the searches built by
+    build_es_sweep_alert_query.
+
+    :param sweep_query: The EsSweepAlertQuery whose searches were executed.
+    :param responses: The responses of the searches, in the same order.
+    :return: A three-tuple, the main results, the parent-only results and the
+    child-only results, or None if they weren't required.
+    """
+
+    cd = sweep_query.cd
+    search_query = sweep_query.search_query
+    child_search_query = sweep_query.child_search_query
+    parent_query = sweep_query.parent_query
+    child_query = sweep_query.child_query
+    query_with_parties = sweep_query.query_with_parties
 
-    responses = multi_search.execute()
     main_results = responses[0]
     rd_results = None
     docket_results = None
     if parent_query:
         docket_results = responses[1]
     if child_query and not query_with_parties:
-        rd_results = responses[2]
+        rd_results = responses[2] if parent_query else responses[1]
 
     # Re-run parent query to fetch potentially missed docket IDs due to large
     # result sets.
@@ -3686,6 +3733,35 @@ def do_es_sweep_alert_query(
     return main_results, docket_results, rd_results
 
 
+def do_es_sweep_alert_query(
+    search_query: Search,
+    child_search_query: Search,
+    cd: CleanData,
+) -> tuple[list[Hit] | None, Response | None, Response | None]:
+    """Build and execute an ES query for its use in the daily RECAP sweep
+    index.
+
+    :param search_query: Elasticsearch DSL Search object.
+    :param child_search_query: The Elasticsearch DSL search query to perform
+    the child-only query.
+    :param cd: The query CleanedData
+    :return: A three-tuple, the main results, the parent-only results and the
+    child-only results, or None if they weren't required.
+    """
+
+    sweep_query = build_es_sweep_alert_query(
+        search_query, child_search_query, cd
+    )
+    if not sweep_query:
+        return None, None, None
+
+    multi_search = MultiSearch()
+    for search in sweep_query.searches:
+        multi_search = multi_search.add(search)
+    responses = multi_search.execute()
+    return process_es_sweep_alert_responses(sweep_query, responses)
+
+
 def compute_lowest_possible_estimate(precision_threshold: int) -> int:
     """Estimates can be below reality by as much as 6%. Round numbers below that threshold.
     :return: The lowest possible estimate.
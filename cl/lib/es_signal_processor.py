@@ -1,5 +1,12 @@
-from functools import partial
-
+import inspect
+import threading
+from collections.abc import AsyncGenerator, Callable, Generator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
 from celery.canvas import chain
 from django.conf import settings
 from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
@@ -45,11 +52,431 @@ from cl.search.tasks import (
     compute_single_opinion_embeddings,
     es_save_document,
     get_es_doc_id_and_parent_id,
+    queue_children_docs_update,
     remove_document_from_es_index,
     update_children_docs_by_query,
     update_es_document,
+    update_es_documents_in_bulk,
+)
+from cl.search.types import (
+    ESDocumentClassType,
+    ESDocumentNameType,
+    ESModelType,
 )
-from cl.search.types import ESDocumentClassType, ESModelType
+
+
+@dataclass
+class BufferedESUpdate:
+    """The merged fields of the updates of a document waiting in a buffer."""
+
+    fields_to_update: list[str]
+    fields_map: dict | None = None
+    skip_percolator_request: bool = True
+    should_compute_embeddings: bool = False
+
+    def merge(
+        self,
+        fields_to_update: list[str],
+        skip_percolator_request: bool = True,
+        should_compute_embeddings: bool = False,
+    ) -> None:
+        for field in fields_to_update:
+            if field not in self.fields_to_update:
+                self.fields_to_update.append(field)
+        self.skip_percolator_request &= skip_percolator_request
+        self.should_compute_embeddings |= should_compute_embeddings
+
+
+class ESUpdateBuffer:
+    """Collect the ES updates triggered by model signals and merge the ones
+    targeting the same document, so a burst of saves of the same instances
+    dispatches a single task per document.
+
+    Updates that don't trigger percolation are dispatched together in a
+    single bulk update task.
+    """
+
+    def __init__(
+        self,
+        savepoint_ids: frozenset[str] | None = None,
+        target: "ESUpdateBuffer | None" = None,
+    ) -> None:
+        # The savepoints active when the buffer was opened, None if it was
+        # opened outside a transaction.
+        self.savepoint_ids = savepoint_ids
+        # The buffer that receives the updates on flush instead of
+        # dispatching them, if any.
+        self.target = target
+        # Keyed by document name, main instance, related instance, fields
+        # map and whether the update is percolated.
+        self.updates: dict[tuple, BufferedESUpdate] = {}
+        # Keyed by child document name, parent ID and fields map.
+        self.children_updates: dict[tuple, BufferedESUpdate] = {}
+
+    def add_update(
+        self,
+        es_document_name: ESDocumentNameType,
+        fields_to_update: list[str],
+        main_instance_data: tuple[str, int],
+        related_instance_data: tuple[str, int] | None,
+        fields_map: dict | None,
+        percolate: bool = False,
+        skip_percolator_request: bool = False,
+        should_compute_embeddings: bool = False,
+    ) -> None:
+        """Add an update_es_document call to the buffer.
+
+        :param es_document_name: The Elasticsearch document type name.
+        :param fields_to_update: A list containing the fields to update.
+        :param main_instance_data: The main instance app label and ID.
+        :param related_instance_data: The related instance app label and ID,
+        or None.
+        :param fields_map: A dict containing fields that can be updated or
+        None.
+        :param percolate: Whether the update is followed by the percolator
+        and search alerts tasks.
+        :param skip_percolator_request: Whether to skip the percolator request.
+        :param should_compute_embeddings: Whether to compute the opinion
+        embeddings before the update.
+        :return: None
+        """
+        key = (
+            es_document_name,
+            main_instance_data,
+            related_instance_data,
+            repr(fields_map),
+            percolate,
+        )
+        if key not in self.updates:
+            self.updates[key] = BufferedESUpdate([], fields_map)
+        self.updates[key].merge(
+            fields_to_update,
+            skip_percolator_request,
+            should_compute_embeddings,
+        )
+
+    def add_children_update(
+        self,
+        es_document_name: ESDocumentNameType,
+        parent_instance_id: int,
+        fields_to_update: list[str],
+        fields_map: dict | None = None,
+    ) -> None:
+        """Add an update_children_docs_by_query call to the buffer.
+
+        :param es_document_name: The child Elasticsearch document type name.
+        :param parent_instance_id: The parent instance ID.
+        :param fields_to_update: A list containing the fields to update.
+        :param fields_map: A dict containing fields that can be updated or
+        None.
+        :return: None
+        """
+        key = (es_document_name, parent_instance_id, repr(fields_map))
+        if key not in self.children_updates:
+            self.children_updates[key] = BufferedESUpdate([], fields_map)
+        self.children_updates[key].merge(fields_to_update)
+
+    def flush(self) -> None:
+        """Dispatch the buffered updates, or hand them over to the target
+        buffer if there is one, and empty the buffer.
+
+        :return: None
+        """
+        updates, self.updates = self.updates, {}
+        children_updates, self.children_updates = self.children_updates, {}
+        if self.target is not None:
+            for key, update in updates.items():
+                if key not in self.target.updates:
+                    self.target.updates[key] = update
+                    continue
+                self.target.updates[key].merge(
+                    update.fields_to_update,
+                    update.skip_percolator_request,
+                    update.should_compute_embeddings,
+                )
+            for key, update in children_updates.items():
+                if key not in self.target.children_updates:
+                    self.target.children_updates[key] = update
+                    continue
+                self.target.children_updates[key].merge(
+                    update.fields_to_update
+                )
+            return
+
+        bulk_updates = []
+        for key, update in updates.items():
+            (
+                es_document_name,
+                main_instance_data,
+                related_instance_data,
+                _,
+                percolate,
+            ) = key
+            update_args = (
+                es_document_name,
+                update.fields_to_update,
+                main_instance_data,
+                related_instance_data,
+                update.fields_map,
+            )
+            if not percolate:
+                bulk_updates.append(update_args)
+                continue
+            c = chain(
+                update_es_document.si(
+                    *update_args,
+                    update.skip_percolator_request,
+                    update.should_compute_embeddings,
+                ),
+                send_or_schedule_search_alerts.s(),
+                percolator_response_processing.s(),
+            )
+            if update.should_compute_embeddings:
+                c = (
+                    compute_single_opinion_embeddings.si(main_instance_data[1])
+                    | c
+                )
+            c.apply_async()
+
+        if len(bulk_updates) == 1:
+            update_es_document.delay(*bulk_updates[0])
+        elif bulk_updates:
+            update_es_documents_in_bulk.delay(bulk_updates)
+
+        for (
+            es_document_name,
+            parent_instance_id,
+            _,
+        ), update in children_updates.items():
+            update_args = (
+                es_document_name,
+                parent_instance_id,
+                update.fields_to_update,
+                update.fields_map,
+            )
+            if settings.ELASTICSEARCH_UBQ_AGGREGATION_WINDOW:
+                queue_children_docs_update(*update_args)
+            else:
+                update_children_docs_by_query.delay(*update_args)
+
+
+_es_update_buffer: ContextVar[ESUpdateBuffer | None] = ContextVar(
+    "es_update_buffer", default=None
+)
+# The buffers of the current transaction and its savepoints, per thread like
+# DB connections.
+_transaction_buffers = threading.local()
+
+
+def get_savepoint_ids() -> frozenset[str] | None:
+    """Get the savepoints of the current transaction.
+
+    :return: The IDs of the active savepoints, or None outside a transaction.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return None
+    return frozenset(connection.savepoint_ids)
+
+
+def can_add_to_buffer(buffer: ESUpdateBuffer) -> bool:
+    """Check whether an update can be added to a buffer opened earlier in the
+    current transaction. That is the case when rolling back any of the active
+    savepoints also drops the buffer, so updates made within a savepoint that
+    is rolled back are never dispatched.
+
+    :param buffer: The buffer to check.
+    :return: True if the update can be added to the buffer.
+    """
+    savepoint_ids = get_savepoint_ids()
+    if savepoint_ids is None:
+        return True
+    return (
+        buffer.savepoint_ids is not None
+        and savepoint_ids <= buffer.savepoint_ids
+    )
+
+
+def add_to_es_update_buffer(add: Callable[[ESUpdateBuffer], None]) -> None:
+    """Add an update to the active buffer, or to a new one dispatched on
+    commit.
+
+    The active buffer is the one of the enclosing buffer_es_updates block or,
+    inside a transaction, one whose flush is still pending on commit. A
+    buffer is dropped along with its on_commit callback if the transaction,
+    or the savepoint it was opened in, is rolled back. Updates made within a
+    transaction or savepoint opened after the active buffer go to a new
+    buffer registered within it. Within a buffer_es_updates block, that
+    buffer hands its updates over to the block's one on commit.
+
+    :param add: A callable that adds the update to a buffer.
+    :return: None
+    """
+    if not settings.ELASTICSEARCH_COALESCE_SIGNAL_UPDATES:
+        buffer = ESUpdateBuffer()
+        add(buffer)
+        transaction.on_commit(buffer.flush)
+        return
+
+    block_buffer = _es_update_buffer.get()
+    if block_buffer is not None and can_add_to_buffer(block_buffer):
+        add(block_buffer)
+        return
+
+    connection = transaction.get_connection()
+    buffers = []
+    if connection.in_atomic_block:
+        pending = {func for _, func, _ in connection.run_on_commit}
+        buffers = [
+            buffer
+            for buffer in getattr(_transaction_buffers, "buffers", [])
+            if buffer.flush in pending
+        ]
+        for buffer in reversed(buffers):
+            if buffer.target is block_buffer and can_add_to_buffer(buffer):
+                add(buffer)
+                return
+
+    buffer = ESUpdateBuffer(
+        savepoint_ids=get_savepoint_ids(), target=block_buffer
+    )
+    add(buffer)
+    if connection.in_atomic_block:
+        _transaction_buffers.buffers = [*buffers, buffer]
+    transaction.on_commit(buffer.flush)
+
+
+@contextmanager
+def buffer_es_updates() -> Generator[ESUpdateBuffer]:
+    """Collect the ES updates triggered by signals within the block and
+    dispatch them once when it exits, or on commit if it's within a
+    transaction. Useful for code that saves many instances in autocommit
+    mode, where transaction-scoped buffering doesn't apply.
+
+    :return: Yields the buffer.
+    """
+    buffer = _es_update_buffer.get()
+    if buffer is not None:
+        # Nested blocks share the outermost buffer.
+        yield buffer
+        return
+
+    buffer = ESUpdateBuffer(savepoint_ids=get_savepoint_ids())
+    token = _es_update_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _es_update_buffer.reset(token)
+        transaction.on_commit(buffer.flush)
+
+
+@asynccontextmanager
+async def abuffer_es_updates() -> AsyncGenerator[ESUpdateBuffer]:
+    """The async version of buffer_es_updates.
+
+    The DB connection and the dispatch of the buffer are sync-only, so they're
+    handled in the sync thread the ORM calls of the block run in.
+
+    :return: Yields the buffer.
+    """
+    buffer = _es_update_buffer.get()
+    if buffer is not None:
+        yield buffer
+        return
+
+    savepoint_ids = await sync_to_async(get_savepoint_ids)()
+    buffer = ESUpdateBuffer(savepoint_ids=savepoint_ids)
+    token = _es_update_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _es_update_buffer.reset(token)
+        await sync_to_async(transaction.on_commit)(buffer.flush)
+
+
+def coalesce_es_updates(func: Callable) -> Callable:
+    """A decorator to run a sync or async function within buffer_es_updates."""
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper_func(*args, **kwargs):
+            async with abuffer_es_updates():
+                return await func(*args, **kwargs)
+
+        return async_wrapper_func
+
+    @wraps(func)
+    def wrapper_func(*args, **kwargs):
+        with buffer_es_updates():
+            return func(*args, **kwargs)
+
+    return wrapper_func
+
+
+def schedule_es_document_update(
+    es_document_name: ESDocumentNameType,
+    fields_to_update: list[str],
+    main_instance_data: tuple[str, int],
+    related_instance_data: tuple[str, int] | None = None,
+    fields_map: dict | None = None,
+    percolate: bool = False,
+    skip_percolator_request: bool = False,
+    should_compute_embeddings: bool = False,
+) -> None:
+    """Schedule an update_es_document task, merged with the other updates of
+    the same document in the active ESUpdateBuffer.
+
+    :param es_document_name: The Elasticsearch document type name.
+    :param fields_to_update: A list containing the fields to update.
+    :param main_instance_data: The main instance app label and ID.
+    :param related_instance_data: The related instance app label and ID, or
+    None.
+    :param fields_map: A dict containing fields that can be updated or None.
+    :param percolate: Whether the update is followed by the percolator and
+    search alerts tasks.
+    :param skip_percolator_request: Whether to skip the percolator request.
+    :param should_compute_embeddings: Whether to compute the opinion
+    embeddings before the update.
+    :return: None
+    """
+    add_to_es_update_buffer(
+        lambda buffer: buffer.add_update(
+            es_document_name,
+            fields_to_update,
+            main_instance_data,
+            related_instance_data,
+            fields_map,
+            percolate,
+            skip_percolator_request,
+            should_compute_embeddings,
+        )
+    )
+
+
+def schedule_children_docs_update(
+    es_document_name: ESDocumentNameType,
+    parent_instance_id: int,
+    fields_to_update: list[str],
+    fields_map: dict | None = None,
+) -> None:
+    """Schedule an update_children_docs_by_query task, merged with the other
+    updates of the same children in the active ESUpdateBuffer.
+
+    :param es_document_name: The child Elasticsearch document type name.
+    :param parent_instance_id: The parent instance ID.
+    :param fields_to_update: A list containing the fields to update.
+    :param fields_map: A dict containing fields that can be updated or None.
+    :return: None
+    """
+    add_to_es_update_buffer(
+        lambda buffer: buffer.add_children_update(
+            es_document_name,
+            parent_instance_id,
+            fields_to_update,
+            fields_map,
+        )
+    )
 
 
 def check_fields_that_changed(
@@ -198,50 +625,35 @@ def update_es_documents(
                     and "html_with_citations" in fields_to_update
                     and settings.ENABLE_EMBEDDING_COMPUTATION
                 )
-                c = chain(
-                    update_es_document.si(
-                        es_document.__name__,
-                        fields_to_update,
-                        (
-                            compose_app_label(instance),
-                            instance.pk,
-                        ),
-                        (compose_app_label(instance), instance.pk),
-                        fields_map,
-                        getattr(instance, "skip_percolator_request", False),
-                        should_compute_embeddings,
+                schedule_es_document_update(
+                    es_document.__name__,
+                    fields_to_update,
+                    (compose_app_label(instance), instance.pk),
+                    (compose_app_label(instance), instance.pk),
+                    fields_map,
+                    percolate=True,
+                    skip_percolator_request=getattr(
+                        instance, "skip_percolator_request", False
                     ),
-                    send_or_schedule_search_alerts.s(),
-                    percolator_response_processing.s(),
+                    should_compute_embeddings=should_compute_embeddings,
                 )
-                # Prepend embedding computation task when html_with_citations
-                # is updated
-                if should_compute_embeddings:
-                    c = compute_single_opinion_embeddings.si(instance.pk) | c
-                transaction.on_commit(partial(c.apply_async))
             case OpinionCluster() if es_document is OpinionDocument:  # type: ignore
-                transaction.on_commit(
-                    partial(
-                        update_children_docs_by_query.delay,
-                        es_document.__name__,
-                        instance.pk,
-                        fields_to_update,
-                        fields_map,
-                    )
+                schedule_children_docs_update(
+                    es_document.__name__,
+                    instance.pk,
+                    fields_to_update,
+                    fields_map,
                 )
             case Docket() if es_document is OpinionDocument:  # type: ignore
                 related_record = OpinionCluster.objects.filter(
                     **{query: instance}
                 )
                 for cluster in related_record:
-                    transaction.on_commit(
-                        partial(
-                            update_children_docs_by_query.delay,
-                            es_document.__name__,
-                            cluster.pk,
-                            fields_to_update,
-                            fields_map,
-                        )
+                    schedule_children_docs_update(
+                        es_document.__name__,
+                        cluster.pk,
+                        fields_to_update,
+                        fields_map,
                     )
             case Person() if (
                 es_document is PositionDocument and query == "person"
@@ -254,14 +666,11 @@ def update_es_documents(
                 # doesn't have any positions or is not a Judge.
                 if not instance.positions.exists() or not instance.is_judge:
                     continue
-                transaction.on_commit(
-                    partial(
-                        update_children_docs_by_query.delay,
-                        es_document.__name__,
-                        instance.pk,
-                        fields_to_update,
-                        fields_map,
-                    )
+                schedule_children_docs_update(
+                    es_document.__name__,
+                    instance.pk,
+                    fields_to_update,
+                    fields_map,
                 )
             case School() if es_document is PositionDocument:  # type: ignore
                 """
@@ -277,28 +686,22 @@ def update_es_documents(
                     # doesn't have any positions or is not a Judge.
                     if not person.positions.exists() or not person.is_judge:
                         continue
-                    transaction.on_commit(
-                        partial(
-                            update_children_docs_by_query.delay,
-                            es_document.__name__,
-                            person.pk,
-                            fields_to_update,
-                            fields_map,
-                        )
+                    schedule_children_docs_update(
+                        es_document.__name__,
+                        person.pk,
+                        fields_to_update,
+                        fields_map,
                     )
             case Docket() if es_document is ESRECAPDocument:  # type: ignore
                 # Avoid calling update_children_docs_by_query if the Docket
                 # doesn't have any docket entries.
                 if not instance.docket_entries.exists():
                     continue
-                transaction.on_commit(
-                    partial(
-                        update_children_docs_by_query.delay,
-                        es_document.__name__,
-                        instance.pk,
-                        fields_to_update,
-                        fields_map,
-                    )
+                schedule_children_docs_update(
+                    es_document.__name__,
+                    instance.pk,
+                    fields_to_update,
+                    fields_map,
                 )
             case Person() if es_document is ESRECAPDocument:  # type: ignore
                 related_dockets = Docket.objects.filter(**{query: instance})
@@ -307,14 +710,11 @@ def update_es_documents(
                     # doesn't have any docket entries.
                     if not rel_docket.docket_entries.exists():
                         continue
-                    transaction.on_commit(
-                        partial(
-                            update_children_docs_by_query.delay,
-                            es_document.__name__,
-                            rel_docket.pk,
-                            fields_to_update,
-                            fields_map,
-                        )
+                    schedule_children_docs_update(
+                        es_document.__name__,
+                        rel_docket.pk,
+                        fields_to_update,
+                        fields_map,
                     )
             case _:
                 main_objects = main_model.objects.filter(**{query: instance})
@@ -322,18 +722,15 @@ def update_es_documents(
                     if fields_to_update:
                         # Update main document in ES, including fields to be
                         # extracted from a related instance.
-                        transaction.on_commit(
-                            partial(
-                                update_es_document.delay,
-                                es_document.__name__,
-                                fields_to_update,
-                                (
-                                    compose_app_label(main_object),
-                                    main_object.pk,
-                                ),
-                                (compose_app_label(instance), instance.pk),
-                                fields_map,
-                            )
+                        schedule_es_document_update(
+                            es_document.__name__,
+                            fields_to_update,
+                            (
+                                compose_app_label(main_object),
+                                main_object.pk,
+                            ),
+                            (compose_app_label(instance), instance.pk),
+                            fields_map,
                         )
 
 
@@ -380,31 +777,25 @@ def update_m2m_field_in_es_document(
     relationships with the instance.
     :return: None
     """
-    transaction.on_commit(
-        partial(
-            update_es_document.delay,
-            es_document.__name__,
-            [
-                affected_field,
-            ],
-            (compose_app_label(instance), instance.pk),
-            None,
-            None,
-        )
+    schedule_es_document_update(
+        es_document.__name__,
+        [
+            affected_field,
+        ],
+        (compose_app_label(instance), instance.pk),
+        None,
+        None,
     )
 
     if es_document is OpinionClusterDocument and isinstance(
         instance, OpinionCluster
     ):
-        transaction.on_commit(
-            partial(
-                update_children_docs_by_query.delay,
-                es_document.__name__,
-                instance.pk,
-                [
-                    affected_field,
-                ],
-            )
+        schedule_children_docs_update(
+            es_document.__name__,
+            instance.pk,
+            [
+                affected_field,
+            ],
         )
 
 
@@ -444,20 +835,13 @@ def update_reverse_related_documents(
         # Avoid calling update_es_document if the Person is not a Judge.
         if isinstance(main_object, Person) and not main_object.is_judge:
             continue
-        transaction.on_commit(
-            partial(
-                chain(
-                    update_es_document.si(
-                        es_document.__name__,
-                        affected_fields,
-                        (compose_app_label(main_object), main_object.pk),
-                        related_instance,
-                        fields_map_to_pass,
-                    ),
-                    send_or_schedule_search_alerts.s(),
-                    percolator_response_processing.s(),
-                ).apply_async
-            )
+        schedule_es_document_update(
+            es_document.__name__,
+            affected_fields,
+            (compose_app_label(main_object), main_object.pk),
+            related_instance,
+            fields_map_to_pass,
+            percolate=True,
         )
 
     match instance:
@@ -472,23 +856,17 @@ def update_reverse_related_documents(
                 if not person.positions.exists() or not person.is_judge:
                     continue
 
-                transaction.on_commit(
-                    partial(
-                        update_children_docs_by_query.delay,
-                        PositionDocument.__name__,
-                        person.pk,
-                        affected_fields,
-                    )
-                )
-        case Citation() | Opinion() if es_document is OpinionClusterDocument:  # type: ignore
-            transaction.on_commit(
-                partial(
-                    update_children_docs_by_query.delay,
-                    OpinionDocument.__name__,
-                    instance.cluster.pk,
+                schedule_children_docs_update(
+                    PositionDocument.__name__,
+                    person.pk,
                     affected_fields,
-                    fields_map_to_pass,
                 )
+        case Citation() | Opinion() if es_document is OpinionClusterDocument:  # type: ignore
+            schedule_children_docs_update(
+                OpinionDocument.__name__,
+                instance.cluster.pk,
+                affected_fields,
+                fields_map_to_pass,
             )
         case BankruptcyInformation() if es_document is DocketDocument:  # type: ignore
             # bulk update RECAP documents when a reverse related record is created/updated.
@@ -496,13 +874,10 @@ def update_reverse_related_documents(
             # doesn't have any entries.
             if not instance.docket.docket_entries.exists():
                 return
-            transaction.on_commit(
-                partial(
-                    update_children_docs_by_query.delay,
-                    ESRECAPDocument.__name__,
-                    instance.docket.pk,
-                    affected_fields,
-                )
+            schedule_children_docs_update(
+                ESRECAPDocument.__name__,
+                instance.docket.pk,
+                affected_fields,
             )
 
 
@@ -529,76 +904,58 @@ def delete_reverse_related_documents(
         case Person() if es_document is PersonDocument:  # type: ignore
             # Update the Person document after the reverse instanced is deleted
             # Update parent document in ES.
-            transaction.on_commit(
-                partial(
-                    update_es_document.delay,
-                    es_document.__name__,
-                    affected_fields,
-                    (compose_app_label(instance), instance.pk),
-                    None,
-                    None,
-                )
+            schedule_es_document_update(
+                es_document.__name__,
+                affected_fields,
+                (compose_app_label(instance), instance.pk),
+                None,
+                None,
             )
             # Avoid calling update_children_docs_by_query if the Person
             # doesn't have any positions or is not a Judge.
             if not instance.positions.exists() or not instance.is_judge:
                 return
             # Then update all their child documents (Positions)
-            transaction.on_commit(
-                partial(
-                    update_children_docs_by_query.delay,
-                    PositionDocument.__name__,
-                    instance.pk,
-                    affected_fields,
-                )
+            schedule_children_docs_update(
+                PositionDocument.__name__,
+                instance.pk,
+                affected_fields,
             )
         case Docket() if es_document is DocketDocument:  # type: ignore
             # Update the Docket document after the reverse instanced is deleted
 
             # Update parent document in ES.
-            transaction.on_commit(
-                partial(
-                    update_es_document.delay,
-                    es_document.__name__,
-                    affected_fields,
-                    (compose_app_label(instance), instance.pk),
-                    None,
-                    None,
-                )
+            schedule_es_document_update(
+                es_document.__name__,
+                affected_fields,
+                (compose_app_label(instance), instance.pk),
+                None,
+                None,
             )
             # Avoid calling update_children_docs_by_query if the Docket
             # doesn't have any entries.
             if not instance.docket_entries.exists():
                 return
             # Then update all their child documents (RECAPDocuments)
-            transaction.on_commit(
-                partial(
-                    update_children_docs_by_query.delay,
-                    ESRECAPDocument.__name__,
-                    instance.pk,
-                    affected_fields,
-                )
+            schedule_children_docs_update(
+                ESRECAPDocument.__name__,
+                instance.pk,
+                affected_fields,
             )
         case OpinionCluster() if es_document is OpinionClusterDocument:  # type: ignore
             # Update parent document in ES.
-            transaction.on_commit(
-                partial(
-                    update_es_document.delay,
-                    es_document.__name__,
-                    affected_fields,
-                    (compose_app_label(instance), instance.pk),
-                    None,
-                    None,
-                )
+            schedule_es_document_update(
+                es_document.__name__,
+                affected_fields,
+                (compose_app_label(instance), instance.pk),
+                None,
+                None,
             )
             # Then update all their child documents (Positions)
-            transaction.on_commit(
-                partial(
-                    update_children_docs_by_query.delay,
-                    OpinionDocument.__name__,
-                    instance.pk,
-                    affected_fields,
-                )
+            schedule_children_docs_update(
+                OpinionDocument.__name__,
+                instance.pk,
+                affected_fields,
             )
         case _:
             main_objects = main_model.objects.filter(
@@ -606,15 +963,12 @@ def delete_reverse_related_documents(
             )
             for main_object in main_objects:
                 # Update main document in ES.
-                transaction.on_commit(
-                    partial(
-                        update_es_document.delay,
-                        es_document.__name__,
-                        affected_fields,
-                        (compose_app_label(main_object), main_object.pk),
-                        None,
-                        None,
-                    )
+                schedule_es_document_update(
+                    es_document.__name__,
+                    affected_fields,
+                    (compose_app_label(main_object), main_object.pk),
+                    None,
+                    None,
                 )
 
 
@@ -1,13 +1,17 @@
+import asyncio
 import json
 import logging
-from io import BufferedReader
-from typing import Any
+import os
+import threading
+from collections.abc import Coroutine
+from typing import IO, Any
 
-from asgiref.sync import sync_to_async
+from asgiref.sync import async_to_sync, sync_to_async
 from botocore.exceptions import ClientError
 from django.conf import settings
 from httpx import (
     AsyncClient,
+    Limits,
     NetworkError,
     Response,
     TimeoutException,
@@ -57,37 +61,100 @@ async def clean_up_recap_document_file(item: RECAPDocument) -> None:
         await item.asave()
 
 
-async def microservice(
+# The event loop of the worker process, which runs in a background thread,
+# and the microservice clients pooled on it.
+_worker_lock = threading.Lock()
+_worker_loop: asyncio.AbstractEventLoop | None = None
+_worker_pid: int | None = None
+_pooled_clients: dict[str, AsyncClient] = {}
+
+
+def get_worker_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop of the current worker process, starting it in a
+    background thread on first use. Unlike asyncio.run or async_to_sync, the
+    loop is never closed, so the clients bound to it keep their connections
+    open between calls. A new loop is started in forked processes, which
+    don't inherit the thread running the loop of their parent.
+
+    :return: The event loop of the current process.
+    """
+    global _worker_loop, _worker_pid
+    with _worker_lock:
+        if _worker_loop is None or _worker_pid != os.getpid():
+            _worker_loop = asyncio.new_event_loop()
+            _worker_pid = os.getpid()
+            _pooled_clients.clear()
+            threading.Thread(
+                target=_worker_loop.run_forever,
+                name="worker-event-loop",
+                daemon=True,
+            ).start()
+        return _worker_loop
+
+
+def run_on_worker_event_loop(coro: Coroutine) -> Any:
+    """Run a coroutine on the worker event loop from sync code and wait for
+    its result.
+
+    :param coro: The coroutine to run.
+    :return: The result of the coroutine.
+    """
+    return asyncio.run_coroutine_threadsafe(
+        coro, get_worker_event_loop()
+    ).result()
+
+
+def get_pooled_client(service: str) -> AsyncClient:
+    """Get the long-lived client for a microservice, creating it on first
+    use. The keep-alive and connection limits are read from the service
+    settings in MICROSERVICE_URLS, falling back to the MICROSERVICE_* defaults.
+
+    Clients are bound to the worker event loop, so this must be called from
+    it.
+
+    :param service: The service to call.
+    :return: The pooled AsyncClient.
+    """
+    client = _pooled_clients.get(service)
+    if client is None:
+        config = settings.MICROSERVICE_URLS[service]
+        limits = Limits(
+            max_connections=config.get(
+                "max_connections", settings.MICROSERVICE_MAX_CONNECTIONS
+            ),
+            max_keepalive_connections=config.get(
+                "max_keepalive_connections",
+                settings.MICROSERVICE_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            keepalive_expiry=config.get(
+                "keepalive_expiry", settings.MICROSERVICE_KEEPALIVE_EXPIRY
+            ),
+        )
+        client = AsyncClient(follow_redirects=True, http2=True, limits=limits)
+        _pooled_clients[service] = client
+    return client
+
+
+def get_microservice_files(
     service: str,
-    method: str = "POST",
     item: RECAPDocument | Opinion | Audio | None = None,
-    file: BufferedReader | None = None,
+    file: bytes | IO[bytes] | None = None,
     file_type: str | None = None,
     filepath: str | None = None,
-    data=None,
-    params=None,
-) -> Response:
-    """Call a Microservice endpoint
-
-    This is a helper utility to call our microservices.  To see a list of Endpoints
-    check out the settings file cl/settings/public.py.
+) -> dict[str, tuple[str, bytes | IO[bytes]]] | None:
+    """Get the file to upload to a microservice.
 
-    Because of the various ways our db is setup we have a few different params we use
-    in this function.
+    Files are passed to httpx as file objects whenever possible, so they are
+    streamed in chunks instead of being read fully into memory.
 
     :param service: The service to call
-    :param method: The method to use (defaults to POST)
     :param item: The document as a db object
-    :param file: The file as a byte array
+    :param file: The file as a byte array or a file object
     :param file_type: The sometimes you just need the extension of the file
     :param filepath: The filepath of the file
-    :param data: The data to send
-    :param params: The params to send
-    :return: The response from the microservice
+    :return: A files dict for httpx, or None if there's no file to upload.
+    :raises FileNotFoundError: If the file of the item is missing.
     """
-
-    services = settings.MICROSERVICE_URLS
-
     files = None
     # Add file from filepath
     if filepath:
@@ -97,16 +164,12 @@ async def microservice(
     # Sadly these are not uniform
     if item:
         if isinstance(item, RECAPDocument):
-            try:
-                files = {
-                    "file": (
-                        item.filepath_local.name,
-                        item.filepath_local.open(mode="rb"),
-                    )
-                }
-            except FileNotFoundError:
-                # The file is no longer available, clean it up in DB
-                await clean_up_recap_document_file(item)
+            files = {
+                "file": (
+                    item.filepath_local.name,
+                    item.filepath_local.open(mode="rb"),
+                )
+            }
         elif isinstance(item, Opinion):
             files = {
                 "file": (
@@ -137,18 +200,140 @@ async def microservice(
         files = {"file": (f"dummy.{file_type}", file)}
     elif file:
         files = {"file": ("filename", file)}
+    return files
 
-    async with AsyncClient(follow_redirects=True, http2=True) as client:
-        req = client.build_request(
-            method=method,
-            url=services[service]["url"],  # type: ignore
-            data=data,
-            files=files,
-            params=params,
-            timeout=services[service]["timeout"],
+
+async def send_microservice_request(
+    service: str,
+    method: str = "POST",
+    files: dict[str, tuple[str, bytes | IO[bytes]]] | None = None,
+    data=None,
+    params=None,
+) -> Response:
+    """Send a request to a microservice through its pooled client.
+
+    The request always runs on the worker event loop. When awaited on
+    another loop, like the ones async_to_sync creates for every call, it's
+    handed over to the worker loop and awaited from there.
+
+    :param service: The service to call
+    :param method: The method to use
+    :param files: The files dict for httpx
+    :param data: The data to send
+    :param params: The params to send
+    :return: The response from the microservice
+    """
+    loop = get_worker_event_loop()
+    if asyncio.get_running_loop() is not loop:
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(
+                send_microservice_request(
+                    service, method, files, data, params
+                ),
+                loop,
+            )
         )
 
-        return await client.send(req)
+    services = settings.MICROSERVICE_URLS
+    client = get_pooled_client(service)
+    req = client.build_request(
+        method=method,
+        url=services[service]["url"],  # type: ignore
+        data=data,
+        files=files,
+        params=params,
+        timeout=services[service]["timeout"],
+    )
+    return await client.send(req)
+
+
+async def microservice(
+    service: str,
+    method: str = "POST",
+    item: RECAPDocument | Opinion | Audio | None = None,
+    file: bytes | IO[bytes] | None = None,
+    file_type: str | None = None,
+    filepath: str | None = None,
+    data=None,
+    params=None,
+) -> Response:
+    """Call a Microservice endpoint
+
+    This is a helper utility to call our microservices.  To see a list of Endpoints
+    check out the settings file cl/settings/public.py.
+
+    Because of the various ways our db is setup we have a few different params we use
+    in this function.
+
+    :param service: The service to call
+    :param method: The method to use (defaults to POST)
+    :param item: The document as a db object
+    :param file: The file as a byte array or a file object
+    :param file_type: The sometimes you just need the extension of the file
+    :param filepath: The filepath of the file
+    :param data: The data to send
+    :param params: The params to send
+    :return: The response from the microservice
+    """
+    try:
+        files = get_microservice_files(
+            service, item, file, file_type, filepath
+        )
+    except FileNotFoundError:
+        if not isinstance(item, RECAPDocument):
+            raise
+        # The file is no longer available, clean it up in DB
+        await clean_up_recap_document_file(item)
+        files = get_microservice_files(
+            service, None, file, file_type, filepath
+        )
+    return await send_microservice_request(
+        service, method, files, data, params
+    )
+
+
+def microservice_sync(
+    service: str,
+    method: str = "POST",
+    item: RECAPDocument | Opinion | Audio | None = None,
+    file: bytes | IO[bytes] | None = None,
+    file_type: str | None = None,
+    filepath: str | None = None,
+    data=None,
+    params=None,
+) -> Response:
+    """Call a Microservice endpoint from sync code, like Celery tasks.
+
+    The request runs on the event loop of the worker process, so the pooled
+    client of the service is reused across calls instead of paying a new
+    event loop, connection and TLS/HTTP2 handshake for every request.
+    Database work stays in the calling thread.
+
+    :param service: The service to call
+    :param method: The method to use (defaults to POST)
+    :param item: The document as a db object
+    :param file: The file as a byte array or a file object
+    :param file_type: The sometimes you just need the extension of the file
+    :param filepath: The filepath of the file
+    :param data: The data to send
+    :param params: The params to send
+    :return: The response from the microservice
+    """
+    try:
+        files = get_microservice_files(
+            service, item, file, file_type, filepath
+        )
+    except FileNotFoundError:
+        if not isinstance(item, RECAPDocument):
+            raise
+        # The file is no longer available, clean it up in DB
+        async_to_sync(clean_up_recap_document_file)(item)
+        files = get_microservice_files(
+            service, None, file, file_type, filepath
+        )
+    return run_on_worker_event_loop(
+        send_microservice_request(service, method, files, data, params)
+    )
 
 
 @retry(
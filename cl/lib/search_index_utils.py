@@ -1,9 +1,16 @@
 import re
+import threading
+import time
+from collections import deque
+from collections.abc import Generator, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date
 from typing import Any
 
-from elasticsearch.exceptions import ConflictError
-from elasticsearch.helpers import BulkIndexError, bulk
+from django.conf import settings
+from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import ApiError, ConflictError
+from elasticsearch.helpers import BulkIndexError, bulk, expand_action
 from elasticsearch_dsl import connections
 
 from cl.lib.command_utils import logger
@@ -35,6 +42,23 @@ def extract_field_values(m2m_list, field):
     return new_list
 
 
+def get_related_values(instance: Any, relation: str, field: str) -> list:
+    """Get the values of a field from a related manager.
+
+    Reads the prefetched objects when the relation was prefetched, like when
+    indexing in bulk, or does a values_list query otherwise.
+
+    :param instance: The model instance.
+    :param relation: The name of the related manager on the instance.
+    :param field: The field to get from each related object.
+    :return: A list of the field values.
+    """
+    manager = getattr(instance, relation)
+    if relation in getattr(instance, "_prefetched_objects_cache", {}):
+        return [getattr(obj, field) for obj in manager.all()]
+    return list(manager.all().values_list(field, flat=True))
+
+
 class InvalidDocumentError(Exception):
     """The document could not be formed"""
 
@@ -177,3 +201,286 @@ def index_documents_in_bulk(documents_to_index: list[dict[str, Any]]) -> None:
             # If the error is of any other type, raises the original
             # BulkIndexError for debugging.
             raise exc
+
+
+# A serialized bulk action: its metadata and source lines, and its size in bytes
+type BulkItem = tuple[list[bytes], int]
+
+
+def serialize_bulk_action(action: dict[str, Any], serializer: Any) -> BulkItem:
+    """Serialize a bulk action to the lines of a bulk request body.
+
+    :param action: A bulk action, as accepted by
+    elasticsearch.helpers.streaming_bulk.
+    :param serializer: The client's JSON serializer.
+    :return: A BulkItem.
+    """
+    action_line, source = expand_action(action)
+    lines = [serializer.dumps(action_line)]
+    if source is not None:
+        lines.append(serializer.dumps(source))
+    # Each line is followed by a newline in the request body
+    return lines, sum(len(line) + 1 for line in lines)
+
+
+class AdaptiveBulkIndexer:
+    """Index documents in Elasticsearch using the bulk API, with chunks sized
+    by payload bytes instead of by number of documents.
+
+    The byte budget of each chunk adapts to how the cluster is doing: it grows
+    additively while requests complete under the target latency without
+    rejections, and it's halved when a request is slow or ES rejects items
+    (HTTP 429, either because the write queue is full or a circuit breaker
+    tripped). Only the rejected items are retried, after an exponential
+    backoff.
+
+    Actions are read from the generator in the calling thread, so querysets
+    are always evaluated on the caller's DB connection. Chunks can be sent
+    from a pool of threads, with at most thread_count chunks in flight, which
+    stops reading documents from the DB when ES falls behind.
+    """
+
+    retry_on_status = (429,)
+
+    def __init__(
+        self,
+        min_chunk_bytes: int,
+        max_chunk_bytes: int,
+        max_chunk_docs: int,
+        target_latency: float,
+        max_retries: int,
+        initial_backoff: float,
+        max_backoff: float,
+    ) -> None:
+        self.min_chunk_bytes = min_chunk_bytes
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_chunk_docs = max_chunk_docs
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.chunk_bytes = min_chunk_bytes
+        self._lock = threading.Lock()
+
+    def bulk(
+        self,
+        client: Elasticsearch,
+        actions: Iterable[dict[str, Any]],
+        thread_count: int = 1,
+        raise_on_error: bool = True,
+    ) -> Generator[tuple[bool, dict[str, Any]]]:
+        """Index the actions in bulk, yielding a result per action like the
+        elasticsearch bulk helpers do.
+
+        :param client: The Elasticsearch client to use.
+        :param actions: An iterable of bulk actions, as accepted by
+        elasticsearch.helpers.streaming_bulk.
+        :param thread_count: The number of chunks to send concurrently.
+        :param raise_on_error: Whether to raise a BulkIndexError with the
+        failed items of a chunk, like the elasticsearch bulk helpers do.
+        :return: Yields two-tuples: whether the action succeeded and the item
+        returned by ES, e.g. {"index": {"_id": ..., "status": ...}}.
+        """
+        serializer = client.transport.serializers.get_serializer(
+            "application/json"
+        )
+        items = (
+            serialize_bulk_action(action, serializer) for action in actions
+        )
+        yield from self.bulk_items(client, items, thread_count, raise_on_error)
+
+    def bulk_items(
+        self,
+        client: Elasticsearch,
+        items: Iterable[BulkItem],
+        thread_count: int = 1,
+        raise_on_error: bool = True,
+    ) -> Generator[tuple[bool, dict[str, Any]]]:
+        """Index actions that were already serialized, e.g. by other
+        processes, in bulk.
+
+        :param client: The Elasticsearch client to use.
+        :param items: An iterable of BulkItem.
+        :param thread_count: The number of chunks to send concurrently.
+        :param raise_on_error: Whether to raise a BulkIndexError with the
+        failed items of a chunk, once its results are yielded.
+        :return: Yields two-tuples: whether the action succeeded and the item
+        returned by ES.
+        """
+        chunks = self.chunk_items(items)
+        if thread_count <= 1:
+            for chunk in chunks:
+                yield from self.check_results(
+                    self.send_chunk(client, chunk), raise_on_error
+                )
+            return
+
+        with ThreadPoolExecutor(max_workers=thread_count) as executor:
+            in_flight: deque[Future[list[tuple[bool, dict[str, Any]]]]] = (
+                deque()
+            )
+            for chunk in chunks:
+                in_flight.append(
+                    executor.submit(self.send_chunk, client, chunk)
+                )
+                if len(in_flight) >= thread_count:
+                    yield from self.check_results(
+                        in_flight.popleft().result(), raise_on_error
+                    )
+            while in_flight:
+                yield from self.check_results(
+                    in_flight.popleft().result(), raise_on_error
+                )
+
+    @staticmethod
+    def check_results(
+        results: list[tuple[bool, dict[str, Any]]], raise_on_error: bool
+    ) -> Generator[tuple[bool, dict[str, Any]]]:
+        """Yield the results of a chunk, then raise a BulkIndexError if some
+        of its items failed and raise_on_error is set.
+
+        :param results: The results of a chunk, as returned by send_chunk.
+        :param raise_on_error: Whether to raise on failed items.
+        :return: Yields the results of the chunk.
+        """
+        yield from results
+        errors = [info for success, info in results if not success]
+        if errors and raise_on_error:
+            raise BulkIndexError(
+                f"{len(errors)} document(s) failed to index.", errors
+            )
+
+    def chunk_actions(
+        self, actions: Iterable[dict[str, Any]], serializer: Any
+    ) -> Generator[list[BulkItem]]:
+        """Serialize the actions and group them in chunks that fit the
+        current byte budget.
+
+        :param actions: An iterable of bulk actions.
+        :param serializer: The client's JSON serializer.
+        :return: Yields lists of BulkItem.
+        """
+        yield from self.chunk_items(
+            serialize_bulk_action(action, serializer) for action in actions
+        )
+
+    def chunk_items(
+        self, items: Iterable[BulkItem]
+    ) -> Generator[list[BulkItem]]:
+        """Group serialized actions in chunks that fit the current byte
+        budget. A single action larger than the budget is sent in a chunk of
+        its own.
+
+        :param items: An iterable of BulkItem.
+        :return: Yields lists of BulkItem.
+        """
+        chunk: list[BulkItem] = []
+        chunk_size = 0
+        for lines, size in items:
+            if chunk and (
+                chunk_size + size > self.chunk_bytes
+                or len(chunk) >= self.max_chunk_docs
+            ):
+                yield chunk
+                chunk, chunk_size = [], 0
+            chunk.append((lines, size))
+            chunk_size += size
+        if chunk:
+            yield chunk
+
+    def send_chunk(
+        self, client: Elasticsearch, chunk: list[BulkItem]
+    ) -> list[tuple[bool, dict[str, Any]]]:
+        """Send a chunk to ES, retrying the rejected items with backoff.
+
+        :param client: The Elasticsearch client to use.
+        :param chunk: The list of BulkItem to send.
+        :return: A list of two-tuples, whether each action succeeded and the
+        item returned by ES.
+        """
+        results: list[tuple[bool, dict[str, Any]]] = []
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(
+                    min(
+                        self.max_backoff,
+                        self.initial_backoff * 2 ** (attempt - 1),
+                    )
+                )
+            start = time.monotonic()
+            try:
+                response = client.bulk(
+                    operations=[line for lines, _ in chunk for line in lines]
+                )
+            except ApiError as e:
+                if (
+                    e.status_code not in self.retry_on_status
+                    or attempt == self.max_retries
+                ):
+                    raise
+                # The whole request was rejected, retry all the items.
+                self.record_response(time.monotonic() - start, rejected=True)
+                continue
+
+            to_retry: list[BulkItem] = []
+            for item, result in zip(chunk, response["items"]):
+                op_type, info = next(iter(result.items()))
+                status = info.get("status", 500)
+                if 200 <= status < 300:
+                    results.append((True, {op_type: info}))
+                elif (
+                    status in self.retry_on_status
+                    and attempt < self.max_retries
+                ):
+                    to_retry.append(item)
+                else:
+                    results.append((False, {op_type: info}))
+            self.record_response(
+                time.monotonic() - start, rejected=bool(to_retry)
+            )
+            if not to_retry:
+                break
+            chunk = to_retry
+        return results
+
+    def record_response(self, latency: float, rejected: bool) -> None:
+        """Adapt the chunk byte budget to the latency and rejections of a
+        bulk request.
+
+        :param latency: The seconds the request took.
+        :param rejected: Whether ES rejected the request or some of its items.
+        :return: None
+        """
+        with self._lock:
+            if rejected or latency > self.target_latency:
+                self.chunk_bytes = max(
+                    self.min_chunk_bytes, self.chunk_bytes // 2
+                )
+            else:
+                self.chunk_bytes = min(
+                    self.max_chunk_bytes,
+                    self.chunk_bytes + self.min_chunk_bytes,
+                )
+
+
+_adaptive_bulk_indexer: AdaptiveBulkIndexer | None = None
+
+
+def get_adaptive_bulk_indexer() -> AdaptiveBulkIndexer:
+    """Get the per-process AdaptiveBulkIndexer, so the chunk size learned
+    while indexing is kept across tasks and commands.
+
+    :return: The AdaptiveBulkIndexer.
+    """
+    global _adaptive_bulk_indexer
+    if _adaptive_bulk_indexer is None:
+        _adaptive_bulk_indexer = AdaptiveBulkIndexer(
+            min_chunk_bytes=settings.ELASTICSEARCH_BULK_MIN_CHUNK_BYTES,
+            max_chunk_bytes=settings.ELASTICSEARCH_BULK_MAX_CHUNK_BYTES,
+            max_chunk_docs=settings.ELASTICSEARCH_BULK_BATCH_SIZE,
+            target_latency=settings.ELASTICSEARCH_BULK_TARGET_LATENCY,
+            max_retries=settings.ELASTICSEARCH_BULK_MAX_RETRIES,
+            initial_backoff=settings.ELASTICSEARCH_BULK_INITIAL_BACKOFF,
+            max_backoff=settings.ELASTICSEARCH_BULK_MAX_BACKOFF,
+        )
+    return _adaptive_bulk_indexer
@@ -1,20 +1,32 @@
+import csv
+import gzip
+import io
+import json
 import logging
 import pickle
 import re
-from collections.abc import Callable
-from typing import Any, TypedDict
+import time
+import uuid
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+from datetime import date
+from itertools import chain, islice
+from typing import Any, TextIO, TypedDict
 from urllib.parse import parse_qs, urlencode
 
 from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
+from django.core.files.storage import Storage
 from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
 from django.db.models import QuerySet
 from django.http import HttpRequest
 from django.http.request import QueryDict
 from django_elasticsearch_dsl.search import Search
-from elasticsearch_dsl.response import Response
+from elasticsearch_dsl import connections
+from elasticsearch_dsl.response import Hit, Response
 from eyecite.models import FullCaseCitation
 from eyecite.tokenizers import HyperscanTokenizer
 from waffle import flag_is_active
@@ -37,6 +49,8 @@ from cl.lib.elasticsearch_utils import (
     simplify_estimated_count,
 )
 from cl.lib.paginators import ESPaginator
+from cl.lib.redis_utils import get_redis_interface, release_redis_lock
+from cl.lib.string_utils import camel_to_snake
 from cl.lib.types import CleanData
 from cl.lib.utils import (
     sanitize_unbalanced_parenthesis,
@@ -339,11 +353,218 @@ class CachedESSearchResults(TypedDict):
     child_cardinality_count_response: Response | int | None
 
 
+# Cached search results start with this prefix followed by a format version
+# byte. Values without it are plain pickles from before compression was added.
+SEARCH_CACHE_MAGIC = b"CLSC"
+SEARCH_CACHE_VERSION = 1
+
+
 def get_micro_cache_key(key_prefix: str = "search_results_cache:") -> str:
     """Just a small wrapper useful for testing."""
     return key_prefix
 
 
+def _canonical_json_default(value: Any) -> Any:
+    """Serialize the values of the search params that JSON doesn't support,
+    in a stable way.
+
+    :param value: The value to serialize.
+    :return: A JSON serializable representation of the value.
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(str(v) for v in value)
+    return str(value)
+
+
+def get_search_cache_key(clean_params: dict, key_prefix: str) -> str:
+    """Compose the cache key for a search from a canonical JSON encoding of
+    its params, which doesn't depend on the order of the params or on the
+    pickle protocol in use.
+
+    :param clean_params: The cleaned search parameters provided by the user.
+    :param key_prefix: The key prefix used to generate the cache key.
+    :return: The cache key.
+    """
+    canonical_params = json.dumps(
+        clean_params,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_canonical_json_default,
+    )
+    return f"{key_prefix}{sha256(canonical_params)}"
+
+
+# The keys of each ES hit that search templates and API serializers read,
+# through the hit itself or its meta.
+CACHED_HIT_KEYS = frozenset(
+    {
+        "_id",
+        "_index",
+        "_nested",
+        "_routing",
+        "_score",
+        "_source",
+        "fields",
+        "highlight",
+        "inner_hits",
+        "sort",
+    }
+)
+
+
+def project_hits(hits: dict[str, Any]) -> dict[str, Any]:
+    """Keep only the CACHED_HIT_KEYS of each hit in an ES hits envelope,
+    including the hits of their inner hits. The other keys of the envelope,
+    like the total and the max_score read by kNN searches, are kept as is.
+
+    :param hits: The "hits" dict of an ES response.
+    :return: A new "hits" dict with the envelope keys and the projected hits.
+    """
+    projected_hits = []
+    for hit in hits.get("hits", []):
+        projected_hit = {k: v for k, v in hit.items() if k in CACHED_HIT_KEYS}
+        if "inner_hits" in projected_hit:
+            projected_hit["inner_hits"] = {
+                # Inner hits are replaced by Response objects in the raw
+                # response once the hits of their parent are read.
+                name: {
+                    "hits": project_hits(
+                        inner.to_dict()["hits"]
+                        if isinstance(inner, Response)
+                        else inner["hits"]
+                    )
+                }
+                for name, inner in projected_hit["inner_hits"].items()
+            }
+        projected_hits.append(projected_hit)
+    projected = {k: v for k, v in hits.items() if k != "hits"}
+    projected["hits"] = projected_hits
+    return projected
+
+
+def project_search_response(response: Response) -> Response:
+    """Keep only the parts of an ES response that search templates and API
+    serializers read: the total, the CACHED_HIT_KEYS of each hit and the
+    aggregations.
+
+    The search the response came from is replaced by a bare one that keeps
+    only what turning hits into documents and reading aggregations needs,
+    leaving out the query, highlighting and source options.
+
+    :param response: The ES response to project.
+    :return: A new Response with the projected data.
+    """
+    raw_response = response.to_dict()
+    data: dict[str, Any] = {}
+    if "hits" in raw_response:
+        data["hits"] = project_hits(raw_response["hits"])
+    if "aggregations" in raw_response:
+        data["aggregations"] = raw_response["aggregations"]
+
+    search = response._search
+    bare_search = search.__class__(
+        using=search._using, index=search._index, doc_type=search._doc_type
+    )
+    bare_search._doc_type_map = search._doc_type_map.copy()
+    bare_search.aggs._params = {"aggs": search.aggs._params["aggs"].copy()}
+    return Response(bare_search, data, doc_class=response._doc_class)
+
+
+def serialize_search_results(results: CachedESSearchResults) -> bytes:
+    """Serialize search results for the cache as a versioned, zlib
+    compressed pickle. ES responses are projected to the fields templates
+    and serializers read first. Highlights and inner hits are mostly text,
+    which compresses well.
+
+    :param results: The search results to cache.
+    :return: The bytes to store in the cache.
+    """
+    projected_results = {
+        key: (
+            project_search_response(value)
+            if isinstance(value, Response)
+            else value
+        )
+        for key, value in results.items()
+    }
+    return (
+        SEARCH_CACHE_MAGIC
+        + bytes([SEARCH_CACHE_VERSION])
+        + zlib.compress(
+            pickle.dumps(projected_results, protocol=pickle.HIGHEST_PROTOCOL),
+            settings.SEARCH_RESULTS_CACHE_COMPRESSION_LEVEL,
+        )
+    )
+
+
+def deserialize_search_results(data: bytes) -> CachedESSearchResults | None:
+    """Load search results stored by serialize_search_results or by the
+    previous plain pickle format.
+
+    :param data: The bytes retrieved from the cache.
+    :return: The search results, or None if they were stored in a format
+    version this release can't read.
+    """
+    if not data.startswith(SEARCH_CACHE_MAGIC):
+        return pickle.loads(data)
+    version = data[len(SEARCH_CACHE_MAGIC)]
+    if version != SEARCH_CACHE_VERSION:
+        return None
+    return pickle.loads(zlib.decompress(data[len(SEARCH_CACHE_MAGIC) + 1 :]))
+
+
+@contextmanager
+def search_single_flight(
+    cache_key: str,
+) -> Iterator[CachedESSearchResults | None]:
+    """Coalesce concurrent identical searches that missed the micro-cache.
+
+    The first request takes a short Redis lock on the cache key and runs the
+    search within the context, then caches the results and releases the lock
+    on exit. Concurrent requests for the same key wait for those results
+    instead of querying ES too. If the lock holder fails or the wait takes
+    longer than ELASTICSEARCH_SINGLE_FLIGHT_MAX_WAIT, waiters run the search
+    themselves.
+
+    :param cache_key: The micro-cache key of the search.
+    :return: A context manager yielding the search results cached by an
+    identical search, or None if the caller must run the search and cache it.
+    """
+    if not settings.ELASTICSEARCH_SINGLE_FLIGHT_ENABLED:
+        yield None
+        return
+
+    r = get_redis_interface("CACHE")
+    lock_key = f"{cache_key}:lock"
+    identifier = str(uuid.uuid4())
+    deadline = time.monotonic() + settings.ELASTICSEARCH_SINGLE_FLIGHT_MAX_WAIT
+    while True:
+        if r.set(
+            lock_key,
+            identifier,
+            nx=True,
+            px=settings.ELASTICSEARCH_SINGLE_FLIGHT_LOCK_TTL,
+        ):
+            try:
+                yield None
+            finally:
+                release_redis_lock(r, lock_key, identifier)
+            return
+
+        time.sleep(0.05)
+        cached_results = cache.get(cache_key)
+        results = (
+            deserialize_search_results(cached_results)
+            if cached_results
+            else None
+        )
+        if results is not None or time.monotonic() >= deadline:
+            yield results
+            return
+
+
 def retrieve_cached_search_results(
     clean_params: dict, key_prefix: str
 ) -> tuple[CachedESSearchResults | None, str]:
@@ -356,12 +577,10 @@ def retrieve_cached_search_results(
     cache key based on a prefix and the get parameters, or None and the cache key
     if no cached results were found.
     """
-    sorted_params = dict(sorted(clean_params.items()))
-    params_hash = sha256(pickle.dumps(sorted_params))
-    cache_key = f"{key_prefix}{params_hash}"
+    cache_key = get_search_cache_key(clean_params, key_prefix)
     cached_results = cache.get(cache_key)
     if cached_results:
-        return pickle.loads(cached_results), cache_key
+        return deserialize_search_results(cached_results), cache_key
     return None, cache_key
 
 
@@ -425,8 +644,12 @@ def fetch_and_paginate_results(
     # Check cache for displaying insights on the Home Page.
     if cache_key is not None:
         cache_data = cache.get(cache_key)
-        if cache_data is not None:
-            cached_data = pickle.loads(cache_data)
+        cached_data = (
+            deserialize_search_results(cache_data)
+            if cache_data is not None
+            else None
+        )
+        if cached_data is not None:
             # TODO: hits and main_total are deprecated.
             #  Remove after the current micro-cache has expired.
             use_es_items = "es_results_items" in cached_data
@@ -456,74 +679,88 @@ def fetch_and_paginate_results(
     results_dict, micro_cache_key = retrieve_cached_search_results(
         clean_params, key_prefix
     )
-    if results_dict:
-        # TODO: hits, main_total and child_total are deprecated.
-        #  Remove after the current micro-cache has expired.
-        use_es_items = "es_results_items" in results_dict
-        hits = (
-            results_dict["es_results_items"]
-            if use_es_items
-            else results_dict["hits"]  # type: ignore[typeddict-item]
-        )
-        main_total = (
-            results_dict["cardinality_count_response"]
-            if use_es_items
-            else results_dict["main_total"]  # type: ignore[typeddict-item]
-        )
-        child_total = (
-            results_dict["child_cardinality_count_response"]
-            if use_es_items
-            else results_dict["child_total"]  # type: ignore[typeddict-item]
+    with ExitStack() as stack:
+        if (
+            results_dict is None
+            and cache_key is None
+            and settings.ELASTICSEARCH_MICRO_CACHE_ENABLED
+        ):
+            # Wait for an identical search in progress, if any.
+            results_dict = stack.enter_context(
+                search_single_flight(micro_cache_key)
+            )
+        if results_dict:
+            # TODO: hits, main_total and child_total are deprecated.
+            #  Remove after the current micro-cache has expired.
+            use_es_items = "es_results_items" in results_dict
+            hits = (
+                results_dict["es_results_items"]
+                if use_es_items
+                else results_dict["hits"]  # type: ignore[typeddict-item]
+            )
+            main_total = (
+                results_dict["cardinality_count_response"]
+                if use_es_items
+                else results_dict["main_total"]  # type: ignore[typeddict-item]
+            )
+            child_total = (
+                results_dict["child_cardinality_count_response"]
+                if use_es_items
+                else results_dict["child_total"]  # type: ignore[typeddict-item]
+            )
+
+            # Create paginator from ES hits
+            paginator = ESPaginator(main_total, hits, rows_per_page)
+            # Get appropriate page
+            results = get_results_from_paginator(paginator, page)
+            # Enrich results
+            enrich_search_results(results, search_type, clean_params)
+
+            return results, 1, False, main_total, child_total
+
+        # Check pagination depth
+        check_pagination_depth(page)
+
+        # Fetch results from ES
+        hits, query_time, error, main_total, child_total = fetch_es_results(
+            clean_params,
+            search_query,
+            child_docs_count_query,
+            page,
+            rows_per_page,
         )
+        if error:
+            return [], query_time, error, main_total, child_total
 
         # Create paginator from ES hits
         paginator = ESPaginator(main_total, hits, rows_per_page)
+
         # Get appropriate page
         results = get_results_from_paginator(paginator, page)
+
         # Enrich results
         enrich_search_results(results, search_type, clean_params)
 
-        return results, 1, False, main_total, child_total
-
-    # Check pagination depth
-    check_pagination_depth(page)
-
-    # Fetch results from ES
-    hits, query_time, error, main_total, child_total = fetch_es_results(
-        clean_params, search_query, child_docs_count_query, page, rows_per_page
-    )
-    if error:
-        return [], query_time, error, main_total, child_total
-
-    # Create paginator from ES hits
-    paginator = ESPaginator(main_total, hits, rows_per_page)
-
-    # Get appropriate page
-    results = get_results_from_paginator(paginator, page)
-
-    # Enrich results
-    enrich_search_results(results, search_type, clean_params)
-
-    results_dict = {
-        "es_results_items": hits,
-        "main_query_hits": None,
-        "cardinality_count_response": main_total,
-        "child_cardinality_count_response": child_total,
-    }
-    if cache_key is not None:
-        # Cache only ES hits for displaying insights on the Home Page.
-        serialized_data = pickle.dumps(results_dict)
-        cache.set(cache_key, serialized_data, settings.QUERY_RESULTS_CACHE)
-    elif settings.ELASTICSEARCH_MICRO_CACHE_ENABLED:
-        # Cache ES hits and counts for all other search requests.
-        serialized_data = pickle.dumps(results_dict)
-        cache.set(
-            micro_cache_key,
-            serialized_data,
-            settings.SEARCH_RESULTS_MICRO_CACHE,
-        )
+        results_dict = {
+            "es_results_items": hits,
+            "main_query_hits": None,
+            "cardinality_count_response": main_total,
+            "child_cardinality_count_response": child_total,
+        }
+        if cache_key is not None:
+            # Cache only ES hits for displaying insights on the Home Page.
+            serialized_data = serialize_search_results(results_dict)
+            cache.set(cache_key, serialized_data, settings.QUERY_RESULTS_CACHE)
+        elif settings.ELASTICSEARCH_MICRO_CACHE_ENABLED:
+            # Cache ES hits and counts for all other search requests.
+            serialized_data = serialize_search_results(results_dict)
+            cache.set(
+                micro_cache_key,
+                serialized_data,
+                settings.SEARCH_RESULTS_MICRO_CACHE,
+            )
 
-    return results, query_time, error, main_total, child_total
+        return results, query_time, error, main_total, child_total
 
 
 def remove_missing_citations(
@@ -821,26 +1058,183 @@ def fetch_es_results_for_csv(
     if search["error"]:
         return csv_rows, True
 
-    results = search["results"]
+    flat_results = []
+    for result in search["results"].object_list:
+        flat_results.extend(flatten_es_result_for_csv(result, search_type))
+
+    return flat_results[: settings.MAX_SEARCH_RESULTS_EXPORTED], False
+
+
+def flatten_es_result_for_csv(
+    result: Hit, search_type: str
+) -> list[dict[str, Any]]:
+    """Turn a search result into CSV rows.
+
+    Opinion and RECAP results get a row for each of their child documents,
+    merged with the parent fields. Other results get a single row.
+
+    :param result: The search result, with its child documents already set.
+    :param search_type: The type of Elasticsearch search performed.
+    :return: A list of dictionaries, one for each CSV row.
+    """
+    parent_dict = result.to_dict(skip_empty=False)
     match search_type:
         case SEARCH_TYPES.OPINION | SEARCH_TYPES.RECAP | SEARCH_TYPES.DOCKETS:
-            flat_results = []
-            for result in results.object_list:
-                parent_dict = result.to_dict(skip_empty=False)
-                child_docs = parent_dict.get("child_docs")
-                if child_docs:
-                    flat_results.extend(
-                        [
-                            doc["_source"].to_dict() | parent_dict
-                            for doc in child_docs
-                        ]
-                    )
-                else:
-                    flat_results.extend([parent_dict])
-        case _:
-            flat_results = [
-                result.to_dict(skip_empty=False)
-                for result in results.object_list
-            ]
+            child_docs = parent_dict.get("child_docs")
+            if child_docs:
+                return [
+                    doc["_source"].to_dict() | parent_dict
+                    for doc in child_docs
+                ]
+    return [parent_dict]
+
+
+STREAMING_EXPORT_DOCUMENT_TYPES = {
+    SEARCH_TYPES.OPINION: OpinionClusterDocument,
+    SEARCH_TYPES.RECAP: DocketDocument,
+    SEARCH_TYPES.DOCKETS: DocketDocument,
+    SEARCH_TYPES.ORAL_ARGUMENT: AudioDocument,
+    SEARCH_TYPES.PEOPLE: PersonDocument,
+}
+
+
+def stream_es_results_for_csv(
+    cd: CleanData, page_size: int = settings.SEARCH_EXPORT_PAGE_SIZE
+) -> Iterator[dict[str, Any]]:
+    """Walk all the results of a search and yield them as flat CSV rows.
+
+    Results are fetched a page at a time with search_after on a point in
+    time, so pages stay consistent while the index changes, deep pages cost
+    the same as the first one and only one page is kept in memory. The query,
+    sorting and post-processing are the same as in fetch_es_results_for_csv.
+
+    Parenthetical searches group results in an aggregation that can't be
+    walked this way, so they're not supported.
+
+    :param cd: The cleaned search parameters.
+    :param page_size: The number of parent documents to fetch per page.
+    :return: Yields a dictionary for each CSV row.
+    """
+    search_type = cd["type"]
+    document_type = STREAMING_EXPORT_DOCUMENT_TYPES[search_type]
+    cd = cd.copy()
+    if search_type == SEARCH_TYPES.OPINION:
+        _, missing_citations = es_get_query_citation(cd)
+        _, suggested_query = remove_missing_citations(missing_citations, cd)
+        cd["q"] = suggested_query if suggested_query else cd["q"]
+    search_query, _, _ = build_es_main_query(document_type.search(), cd)
+    # Requests using a point in time must not target an index.
+    search_query = search_query.index().extra(
+        size=page_size, track_total_hits=False
+    )
 
-    return flat_results[: settings.MAX_SEARCH_RESULTS_EXPORTED], False
+    keep_alive = settings.SEARCH_EXPORT_PIT_KEEP_ALIVE
+    client = connections.get_connection()
+    pit_id = client.open_point_in_time(
+        index=document_type._index._name, keep_alive=keep_alive
+    )["id"]
+    search_after = None
+    try:
+        while True:
+            page_query = search_query.extra(
+                pit={"id": pit_id, "keep_alive": keep_alive}
+            )
+            if search_after:
+                page_query = page_query.extra(search_after=search_after)
+            response = page_query.execute()
+            # The point in time ID can change between requests.
+            pit_id = getattr(response, "pit_id", pit_id)
+            if not response.hits:
+                break
+
+            limit_inner_hits(cd, response, search_type)
+            set_results_highlights(response, search_type)
+            merge_unavailable_fields_on_parent_document(response, search_type)
+            for result in response:
+                yield from flatten_es_result_for_csv(result, search_type)
+
+            if len(response.hits) < page_size:
+                break
+            # Sort values include the implicit tiebreaker of the point in
+            # time, so they're unique across documents.
+            search_after = response.hits[-1].meta.sort
+    finally:
+        client.close_point_in_time(id=pit_id)
+
+
+def write_search_results_csv(
+    output: TextIO, rows: Iterable[dict[str, Any]], search_type: str
+) -> int:
+    """Write search results as CSV, using the headers and transformations of
+    the search type.
+
+    :param output: The text stream to write the CSV to.
+    :param rows: The flat search results, as dictionaries.
+    :param search_type: The type of Elasticsearch search performed.
+    :return: The number of rows written, not counting the header. Nothing is
+    written if the search type has no CSV headers.
+    """
+    csv_headers, csv_transformations = (
+        get_headers_and_transformations_for_search_export(search_type)
+    )
+    if not csv_headers:
+        return 0
+
+    csvwriter = csv.DictWriter(
+        output,
+        fieldnames=csv_headers,
+        extrasaction="ignore",
+        quotechar='"',
+        quoting=csv.QUOTE_ALL,
+    )
+    csvwriter.writeheader()
+    count = 0
+    for row in rows:
+        if csv_transformations:
+            for key, function in csv_transformations.items():
+                row[key] = function(row[key] if key in row else row)
+
+        clean_dict = {camel_to_snake(key): value for key, value in row.items()}
+        csvwriter.writerow(clean_dict)
+        count += 1
+    return count
+
+
+def export_es_results_to_storage(
+    cd: CleanData, storage: Storage, file_path: str, max_rows: int = 0
+) -> int:
+    """Stream the results of a search to a gzipped CSV file in storage.
+
+    Rows are compressed as they're fetched, and the storage uploads the file
+    in chunks, so memory use doesn't grow with the number of results.
+
+    :param cd: The cleaned search parameters.
+    :param storage: The storage to save the file to.
+    :param file_path: The path of the file in the storage.
+    :param max_rows: The maximum number of rows to export, or 0 for no limit.
+    :return: The number of rows exported. No file is saved if there are none.
+    """
+    results = stream_es_results_for_csv(
+        cd, page_size=settings.SEARCH_EXPORT_PAGE_SIZE
+    )
+    rows = islice(results, max_rows) if max_rows else results
+    try:
+        first_row = next(rows, None)
+        if first_row is None:
+            return 0
+        try:
+            with (
+                storage.open(file_path, "wb") as f,
+                gzip.GzipFile(fileobj=f, mode="wb") as gz,
+                io.TextIOWrapper(gz, encoding="utf-8", newline="") as output,
+            ):
+                return write_search_results_csv(
+                    output, chain([first_row], rows), cd["type"]
+                )
+        except Exception:
+            # Don't leave a partial export behind.
+            storage.delete(file_path)
+            raise
+    finally:
+        # Close the point in time right away when stopping at max_rows.
+        results.close()
@@ -118,6 +118,19 @@ class S3PrivateUUIDStorage(S3Storage):
         return os.path.join(dir_name, uuid.uuid4().hex + file_ext)
 
 
+class S3SearchExportStorage(S3Storage):
+    """Private storage for search exports, with signed URLs that expire, so
+    the file can only be downloaded through the link sent to the user.
+    """
+
+    default_acl = "private"
+    bucket_name = settings.AWS_PRIVATE_STORAGE_BUCKET_NAME
+    custom_domain = None
+    querystring_auth = True
+    querystring_expire = settings.SEARCH_EXPORT_URL_EXPIRATION
+    file_overwrite = True
+
+
 class S3GlacierInstantRetrievalStorage(S3Storage):
     """Uses S3 GlacierInstantRetrieval storage class with private ACL"""
 
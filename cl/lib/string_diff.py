@@ -126,3 +126,83 @@ def get_cosine_similarity(left_str: str, right_str: str) -> float:
         return 0.0
     else:
         return float(numerator) / denominator
+
+
+class SuffixAutomaton:
+    """A suffix automaton of a text.
+
+    It's built in linear time and memory, and finds the longest prefix of
+    another string that occurs anywhere in the text in time proportional to
+    the length of that prefix, along with the position of its first
+    occurrence.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.transitions: list[dict[str, int]] = [{}]
+        self.links = [-1]
+        self.lengths = [0]
+        # The index in text of the last character of the first occurrence
+        # of the strings of each state.
+        self.first_ends = [-1]
+        last = 0
+        for i, char in enumerate(text):
+            current = self._add_state({}, -1, self.lengths[last] + 1, i)
+            state = last
+            while state != -1 and char not in self.transitions[state]:
+                self.transitions[state][char] = current
+                state = self.links[state]
+            if state == -1:
+                self.links[current] = 0
+            else:
+                target = self.transitions[state][char]
+                if self.lengths[state] + 1 == self.lengths[target]:
+                    self.links[current] = target
+                else:
+                    clone = self._add_state(
+                        self.transitions[target].copy(),
+                        self.links[target],
+                        self.lengths[state] + 1,
+                        self.first_ends[target],
+                    )
+                    while (
+                        state != -1
+                        and self.transitions[state].get(char) == target
+                    ):
+                        self.transitions[state][char] = clone
+                        state = self.links[state]
+                    self.links[target] = clone
+                    self.links[current] = clone
+            last = current
+
+    def _add_state(
+        self,
+        transitions: dict[str, int],
+        link: int,
+        length: int,
+        first_end: int,
+    ) -> int:
+        self.transitions.append(transitions)
+        self.links.append(link)
+        self.lengths.append(length)
+        self.first_ends.append(first_end)
+        return len(self.lengths) - 1
+
+    def longest_match(self, text: str, start: int) -> tuple[int, int]:
+        """Find the longest prefix of text[start:] that occurs in the
+        automaton text.
+
+        :param text: The string to match.
+        :param start: The index in text where the match starts.
+        :return: A two-tuple: the length of the match and the index in the
+        automaton text where its first occurrence starts.
+        """
+        transitions = self.transitions
+        state = 0
+        length = 0
+        for char in text[start:]:
+            next_state = transitions[state].get(char)
+            if next_state is None:
+                break
+            state = next_state
+            length += 1
+        return length, self.first_ends[state] - length + 1
@@ -1,15 +1,22 @@
 import datetime
+import json
 import pickle
 from typing import TypedDict, cast
 from unittest import mock
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
 from django.core.files.base import ContentFile
+from django.db import transaction
 from django.test import RequestFactory, SimpleTestCase, override_settings
 from django.utils.functional import SimpleLazyObject
+from elastic_transport import JsonSerializer
+from elasticsearch.helpers import BulkIndexError
+from elasticsearch_dsl import A, Q
+from elasticsearch_dsl.response import Response as ESResponse
+from httpx import AsyncClient, Response
 from requests.cookies import RequestsCookieJar
 
 from cl.lib.courts import (
@@ -18,8 +25,23 @@ from cl.lib.courts import (
     lookup_child_courts_cache,
 )
 from cl.lib.date_time import midnight_pt
-from cl.lib.elasticsearch_utils import append_query_conjunctions
+from cl.lib.elasticsearch_utils import (
+    append_query_conjunctions,
+    limit_inner_hits,
+    set_child_docs_and_score,
+)
+from cl.lib.es_signal_processor import (
+    ESUpdateBuffer,
+    buffer_es_updates,
+    coalesce_es_updates,
+    schedule_children_docs_update,
+)
 from cl.lib.filesizes import convert_size_to_bytes
+from cl.lib.microservice_utils import (
+    get_worker_event_loop,
+    microservice,
+    microservice_sync,
+)
 from cl.lib.mime_types import lookup_mime_type
 from cl.lib.model_helpers import (
     clean_docket_number,
@@ -51,7 +73,17 @@ from cl.lib.redis_utils import (
     release_redis_lock,
 )
 from cl.lib.s3_cache import get_s3_cache, make_s3_cache_key
-from cl.lib.search_index_utils import get_parties_from_case_name_bankr
+from cl.lib.search_index_utils import (
+    AdaptiveBulkIndexer,
+    get_parties_from_case_name_bankr,
+)
+from cl.lib.search_utils import (
+    SEARCH_CACHE_MAGIC,
+    deserialize_search_results,
+    get_search_cache_key,
+    search_single_flight,
+    serialize_search_results,
+)
 from cl.lib.sqlcommenter import QueryWrapper, SqlCommenter, add_sql_comment
 from cl.lib.string_utils import normalize_dashes, trunc
 from cl.lib.utils import (
@@ -63,12 +95,19 @@ from cl.lib.utils import (
 )
 from cl.people_db.models import Role
 from cl.recap.models import UPLOAD_TYPE, PacerHtmlFiles
+from cl.search.documents import DocketDocument, OpinionClusterDocument
 from cl.search.factories import (
     CourtFactory,
     DocketFactory,
     OpinionClusterWithMultipleOpinionsFactory,
 )
-from cl.search.models import Court, Docket, Opinion, OpinionCluster
+from cl.search.models import (
+    SEARCH_TYPES,
+    Court,
+    Docket,
+    Opinion,
+    OpinionCluster,
+)
 from cl.tests.cases import TestCase
 from cl.users.factories import UserFactory
 
@@ -1457,6 +1496,260 @@ class TestElasticsearchUtils(SimpleTestCase):
                 )
 
 
+class TestAdaptiveBulkIndexer(SimpleTestCase):
+    """Test the byte-sized and adaptive ES bulk indexing engine."""
+
+    def setUp(self) -> None:
+        self.client = MagicMock()
+        self.client.transport.serializers.get_serializer.return_value = (
+            JsonSerializer()
+        )
+        self.indexer = AdaptiveBulkIndexer(
+            min_chunk_bytes=100,
+            max_chunk_bytes=1000,
+            max_chunk_docs=100,
+            target_latency=60,
+            max_retries=2,
+            initial_backoff=0,
+            max_backoff=0,
+        )
+        self.actions = [
+            {"_op_type": "index", "_index": "test", "_id": i, "text": "x" * 60}
+            for i in range(3)
+        ]
+
+    def test_chunk_actions_by_bytes(self) -> None:
+        """Are actions grouped in chunks that fit the byte budget?"""
+        serializer = JsonSerializer()
+        chunks = list(self.indexer.chunk_actions(self.actions, serializer))
+        # Each action is larger than the budget, so it gets its own chunk.
+        self.assertEqual([len(chunk) for chunk in chunks], [1, 1, 1])
+
+        self.indexer.chunk_bytes = 250
+        chunks = list(self.indexer.chunk_actions(self.actions, serializer))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+
+        self.indexer.max_chunk_docs = 1
+        chunks = list(self.indexer.chunk_actions(self.actions, serializer))
+        self.assertEqual([len(chunk) for chunk in chunks], [1, 1, 1])
+
+    def test_retry_only_rejected_items(self) -> None:
+        """Are only the rejected items retried, and is the chunk budget
+        adapted to the rejections?
+        """
+        self.indexer.chunk_bytes = 400
+        self.client.bulk.side_effect = [
+            {
+                "items": [
+                    {"index": {"_id": "0", "status": 201}},
+                    {"index": {"_id": "1", "status": 429}},
+                    {"index": {"_id": "2", "status": 400}},
+                ]
+            },
+            {"items": [{"index": {"_id": "1", "status": 201}}]},
+        ]
+
+        results = list(
+            self.indexer.bulk(self.client, self.actions, raise_on_error=False)
+        )
+
+        self.assertEqual(
+            sorted((info["index"]["_id"], ok) for ok, info in results),
+            [("0", True), ("1", True), ("2", False)],
+        )
+        self.assertEqual(self.client.bulk.call_count, 2)
+        retried = self.client.bulk.call_args_list[1].kwargs["operations"]
+        self.assertEqual(len(retried), 2)
+        self.assertEqual(json.loads(retried[0])["index"]["_id"], 1)
+        # Halved after the rejection, then grown after the retry succeeded.
+        self.assertEqual(self.indexer.chunk_bytes, 300)
+
+    def test_raise_bulk_index_error_on_failed_items(self) -> None:
+        """Is a BulkIndexError raised with the failed items by default, like
+        the elasticsearch bulk helpers do?
+        """
+        self.indexer.chunk_bytes = 400
+        self.client.bulk.return_value = {
+            "items": [
+                {"index": {"_id": "0", "status": 201}},
+                {"index": {"_id": "1", "status": 400}},
+                {"index": {"_id": "2", "status": 201}},
+            ]
+        }
+
+        with self.assertRaises(BulkIndexError) as ctx:
+            list(self.indexer.bulk(self.client, self.actions))
+        self.assertEqual(
+            ctx.exception.errors, [{"index": {"_id": "1", "status": 400}}]
+        )
+
+
+class TestESUpdateBuffer(SimpleTestCase):
+    """Test the coalescing of ES updates triggered by signals."""
+
+    def test_merge_updates_of_the_same_document(self) -> None:
+        """Are updates to the same document merged, and the ones that don't
+        need percolation sent in a single bulk task?
+        """
+        fields_map = {"assigned_to_str": {"assigned_to_str": "assignedTo"}}
+        buffer = ESUpdateBuffer()
+        for fields in (["case_name"], ["docket_number"], ["case_name"]):
+            buffer.add_update(
+                "DocketDocument",
+                fields,
+                ("search.Docket", 1),
+                ("search.Docket", 1),
+                None,
+                percolate=True,
+            )
+        for docket_id in (1, 2):
+            buffer.add_update(
+                "DocketDocument",
+                ["assigned_to_str"],
+                ("search.Docket", docket_id),
+                ("people_db.Person", 3),
+                fields_map,
+            )
+        for fields in (["case_name"], ["docket_number"]):
+            buffer.add_children_update("ESRECAPDocument", 1, fields)
+
+        with (
+            patch("cl.lib.es_signal_processor.chain") as mock_chain,
+            patch(
+                "cl.lib.es_signal_processor.update_es_document"
+            ) as mock_update,
+            patch(
+                "cl.lib.es_signal_processor.update_es_documents_in_bulk"
+            ) as mock_bulk_update,
+            patch(
+                "cl.lib.es_signal_processor.update_children_docs_by_query"
+            ) as mock_children_update,
+        ):
+            buffer.flush()
+
+        mock_update.si.assert_called_once_with(
+            "DocketDocument",
+            ["case_name", "docket_number"],
+            ("search.Docket", 1),
+            ("search.Docket", 1),
+            None,
+            False,
+            False,
+        )
+        mock_chain.return_value.apply_async.assert_called_once()
+        mock_update.delay.assert_not_called()
+        mock_bulk_update.delay.assert_called_once_with(
+            [
+                (
+                    "DocketDocument",
+                    ["assigned_to_str"],
+                    ("search.Docket", docket_id),
+                    ("people_db.Person", 3),
+                    fields_map,
+                )
+                for docket_id in (1, 2)
+            ]
+        )
+        mock_children_update.delay.assert_called_once_with(
+            "ESRECAPDocument", 1, ["case_name", "docket_number"], None
+        )
+        self.assertEqual(buffer.updates, {})
+        self.assertEqual(buffer.children_updates, {})
+
+    def test_buffer_es_updates_block(self) -> None:
+        """Are the updates scheduled within a buffer_es_updates block
+        dispatched once when it exits?
+        """
+        with (
+            patch(
+                "cl.lib.es_signal_processor.update_children_docs_by_query"
+            ) as mock_children_update,
+            # Not within a transaction, run the callbacks right away.
+            patch(
+                "cl.lib.es_signal_processor.transaction.on_commit",
+                side_effect=lambda func: func(),
+            ),
+        ):
+            with buffer_es_updates():
+                schedule_children_docs_update("ESRECAPDocument", 1, ["a"])
+                with buffer_es_updates():
+                    schedule_children_docs_update("ESRECAPDocument", 1, ["b"])
+                mock_children_update.delay.assert_not_called()
+
+            mock_children_update.delay.assert_called_once_with(
+                "ESRECAPDocument", 1, ["a", "b"], None
+            )
+
+
+class TestESUpdateBufferTransactions(TestCase):
+    """Test the coalescing of ES updates within transactions."""
+
+    def test_coalesce_es_updates_async(self) -> None:
+        """Are the updates scheduled within an async function decorated with
+        coalesce_es_updates registered on commit from the sync thread, along
+        with the ones of the transactions within it?
+        """
+
+        @coalesce_es_updates
+        async def schedule_updates() -> None:
+            schedule_children_docs_update("ESRECAPDocument", 1, ["a"])
+            await sync_to_async(schedule_children_docs_update)(
+                "ESRECAPDocument", 1, ["b"]
+            )
+
+            def schedule_in_transaction() -> None:
+                with transaction.atomic():
+                    schedule_children_docs_update("ESRECAPDocument", 1, ["c"])
+
+            await sync_to_async(schedule_in_transaction)()
+
+        with (
+            patch(
+                "cl.lib.es_signal_processor.update_children_docs_by_query"
+            ) as mock_children_update,
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+        ):
+            async_to_sync(schedule_updates)()
+            mock_children_update.delay.assert_not_called()
+
+        self.assertEqual(len(callbacks), 2)
+        mock_children_update.delay.assert_called_once_with(
+            "ESRECAPDocument", 1, ["a", "b", "c"], None
+        )
+
+    def test_drop_updates_of_rolled_back_savepoints(self) -> None:
+        """Are the updates scheduled within a savepoint that is rolled back
+        dropped, while the other updates of the transaction are dispatched?
+        """
+        with (
+            patch(
+                "cl.lib.es_signal_processor.update_children_docs_by_query"
+            ) as mock_children_update,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            schedule_children_docs_update("ESRECAPDocument", 1, ["a"])
+            with buffer_es_updates():
+                schedule_children_docs_update("ESRECAPDocument", 2, ["a"])
+                with self.assertRaises(ValueError):
+                    with transaction.atomic():
+                        schedule_children_docs_update(
+                            "ESRECAPDocument", 1, ["b"]
+                        )
+                        schedule_children_docs_update(
+                            "ESRECAPDocument", 2, ["b"]
+                        )
+                        raise ValueError
+            schedule_children_docs_update("ESRECAPDocument", 1, ["c"])
+
+        self.assertEqual(
+            mock_children_update.delay.call_args_list,
+            [
+                call("ESRECAPDocument", 1, ["a", "c"], None),
+                call("ESRECAPDocument", 2, ["a"], None),
+            ],
+        )
+
+
 class TestRedisUtils(SimpleTestCase):
     """Test Redis utils functions."""
 
@@ -2337,3 +2630,285 @@ class TestS3CacheHelpers(TestCase):
         base_key = "clusters-mlt-es:123"
         result = make_s3_cache_key(base_key, None)
         self.assertEqual(result, base_key)
+
+
+class TestMicroserviceClients(SimpleTestCase):
+    @mock.patch.object(
+        AsyncClient,
+        "send",
+        autospec=True,
+        return_value=Response(200, text="3"),
+    )
+    def test_microservice_sync_reuses_pooled_client(self, mock_send):
+        """Do sync microservice calls reuse the worker event loop and the
+        pooled client of the service?
+        """
+        responses = [
+            microservice_sync(
+                service="page-count", file_type="pdf", file=b"%PDF-1.4"
+            )
+            for _ in range(2)
+        ]
+
+        self.assertEqual([r.text for r in responses], ["3", "3"])
+        self.assertEqual(mock_send.await_count, 2)
+        first_client = mock_send.await_args_list[0].args[0]
+        second_client = mock_send.await_args_list[1].args[0]
+        self.assertIs(first_client, second_client)
+        self.assertFalse(first_client.is_closed)
+        self.assertTrue(get_worker_event_loop().is_running())
+
+    @mock.patch.object(
+        AsyncClient,
+        "send",
+        autospec=True,
+        return_value=Response(200, text="3"),
+    )
+    def test_microservice_on_other_event_loops(self, mock_send):
+        """Are microservice calls awaited on other event loops, like the ones
+        async_to_sync creates, sent through the pooled client too?
+        """
+        for _ in range(2):
+            async_to_sync(microservice)(
+                service="page-count", file_type="pdf", file=b"%PDF-1.4"
+            )
+        microservice_sync(
+            service="page-count", file_type="pdf", file=b"%PDF-1.4"
+        )
+
+        clients = {args[0] for args, _ in mock_send.await_args_list}
+        self.assertEqual(len(clients), 1)
+        self.assertFalse(clients.pop().is_closed)
+
+
+class TestSearchResultsCache(SimpleTestCase):
+    results = {
+        "es_results_items": [{"caseName": "Lorem v. Ipsum"}] * 20,
+        "main_query_hits": None,
+        "cardinality_count_response": 20,
+        "child_cardinality_count_response": None,
+    }
+
+    def test_serialize_search_results(self):
+        """Are search results compressed and loaded back unchanged?"""
+        data = serialize_search_results(self.results)
+        self.assertTrue(data.startswith(SEARCH_CACHE_MAGIC))
+        self.assertLess(len(data), len(pickle.dumps(self.results)))
+        self.assertEqual(deserialize_search_results(data), self.results)
+
+    def test_project_cached_search_responses(self):
+        """Are ES responses cached with only the hit fields, inner hits and
+        aggregations that templates and serializers read, and without the
+        query of the search?
+        """
+        search = DocketDocument.search().query(Q("match", caseName="Lorem"))
+        search.aggs.bucket("status", A("terms", field="status.raw"))
+        inner_hit = {
+            "_index": DocketDocument._index._name,
+            "_id": "rd_2",
+            "_routing": "1",
+            "_seq_no": 3,
+            "_source": {"id": 2},
+            "highlight": {"plain_text": ["<mark>Lorem</mark>"]},
+        }
+        hit = {
+            "_index": DocketDocument._index._name,
+            "_id": "1",
+            "_score": 1.5,
+            "_seq_no": 3,
+            "_source": {"caseName": "Lorem v. Ipsum", "docket_id": 1},
+            "highlight": {"caseName": ["<mark>Lorem</mark> v. Ipsum"]},
+            "inner_hits": {
+                "filter_query_inner_recap_document": {
+                    "hits": {"total": {"value": 1}, "hits": [inner_hit]}
+                }
+            },
+        }
+        response = ESResponse(
+            search,
+            {
+                "took": 5,
+                "_shards": {"total": 1},
+                "hits": {
+                    "total": {"value": 1},
+                    "max_score": 1.5,
+                    "hits": [hit],
+                },
+                "aggregations": {
+                    "status": {"buckets": [{"key": 1, "doc_count": 1}]}
+                },
+            },
+        )
+        # Reading the hits replaces the inner hits by Response objects.
+        self.assertEqual(response[0].meta.id, "1")
+
+        cached = deserialize_search_results(
+            serialize_search_results(
+                {**self.results, "es_results_items": response}
+            )
+        )["es_results_items"]
+
+        self.assertNotIn("took", cached.to_dict())
+        self.assertEqual(cached._search.to_dict().get("query"), None)
+        self.assertEqual(cached.hits.total.value, 1)
+        self.assertEqual(cached.aggregations.status.buckets[0].doc_count, 1)
+        cached_hit = cached[0]
+        self.assertIsInstance(cached_hit, DocketDocument)
+        self.assertEqual(cached_hit.caseName, "Lorem v. Ipsum")
+        self.assertEqual(cached_hit.meta.score, 1.5)
+        self.assertNotIn("seq_no", cached_hit.meta)
+        self.assertEqual(cached_hit.meta.highlight.to_dict(), hit["highlight"])
+        inner_hits = (
+            cached_hit.meta.inner_hits.filter_query_inner_recap_document
+        )
+        self.assertEqual(inner_hits.hits.total.value, 1)
+        self.assertEqual(inner_hits[0].meta.routing, "1")
+        self.assertEqual(
+            inner_hits[0].meta.highlight.to_dict(), inner_hit["highlight"]
+        )
+        self.assertNotIn("seq_no", inner_hits[0].meta)
+
+    def test_project_cached_semantic_search_responses(self):
+        """Are the kNN scores of semantic searches still merged into the
+        results when they're served from the cache?
+        """
+        search = OpinionClusterDocument.search()
+        embedding_hit = {
+            "_index": OpinionClusterDocument._index._name,
+            "_id": "o_2",
+            "_nested": {"field": "embeddings", "offset": 0},
+            "_score": 0.8,
+            "_source": {"chunk": "Lorem ipsum"},
+        }
+        child_hit = {
+            "_index": OpinionClusterDocument._index._name,
+            "_id": "o_2",
+            "_routing": "1",
+            "_score": 0.8,
+            "_source": {"id": 2, "cluster_id": 1},
+            "inner_hits": {
+                "embeddings": {
+                    "hits": {
+                        "total": {"value": 1},
+                        "max_score": 0.8,
+                        "hits": [embedding_hit],
+                    }
+                }
+            },
+        }
+        hit = {
+            "_index": OpinionClusterDocument._index._name,
+            "_id": "1",
+            "_score": 1.5,
+            "_source": {"caseName": "Lorem v. Ipsum", "cluster_id": 1},
+            "inner_hits": {
+                "filter_query_inner_opinion": {
+                    "hits": {
+                        "total": {"value": 1},
+                        "max_score": 0.8,
+                        "hits": [child_hit],
+                    }
+                }
+            },
+        }
+        response = ESResponse(
+            search,
+            {
+                "hits": {
+                    "total": {"value": 1},
+                    "max_score": 1.5,
+                    "hits": [hit],
+                }
+            },
+        )
+
+        cached = deserialize_search_results(
+            serialize_search_results(
+                {**self.results, "es_results_items": response}
+            )
+        )["es_results_items"]
+        self.assertEqual(cached.hits.max_score, 1.5)
+
+        # As CursorESList.process_results does for v4 API searches.
+        limit_inner_hits({}, cached, SEARCH_TYPES.OPINION)
+        set_child_docs_and_score(cached, merge_score=True)
+        self.assertEqual(cached[0].bm25_score, 1.5)
+        self.assertEqual(cached[0].semantic_score, 0.8)
+
+    def test_deserialize_legacy_and_unknown_versions(self):
+        """Can plain pickles still be loaded, and are unknown versions
+        treated as cache misses?
+        """
+        self.assertEqual(
+            deserialize_search_results(pickle.dumps(self.results)),
+            self.results,
+        )
+        data = serialize_search_results(self.results)
+        future_data = SEARCH_CACHE_MAGIC + b"\xff" + data[5:]
+        self.assertIsNone(deserialize_search_results(future_data))
+
+    def test_search_cache_key_is_canonical(self):
+        """Is the cache key independent of the order of the params?"""
+        params = {
+            "q": "foo",
+            "type": "r",
+            "filed_after": datetime.date(2020, 1, 1),
+            "page": 1,
+        }
+        reversed_params = dict(reversed(params.items()))
+        self.assertEqual(
+            get_search_cache_key(params, "prefix:"),
+            get_search_cache_key(reversed_params, "prefix:"),
+        )
+        self.assertNotEqual(
+            get_search_cache_key(params, "prefix:"),
+            get_search_cache_key({**params, "page": 2}, "prefix:"),
+        )
+
+
+@override_settings(
+    ELASTICSEARCH_SINGLE_FLIGHT_ENABLED=True,
+    ELASTICSEARCH_SINGLE_FLIGHT_MAX_WAIT=0.2,
+)
+class TestSearchSingleFlight(SimpleTestCase):
+    cache_key = "search_results_cache_test:single_flight"
+    lock_key = f"{cache_key}:lock"
+
+    def setUp(self) -> None:
+        self.r = get_redis_interface("CACHE")
+        self.r.delete(self.lock_key)
+        cache.delete(self.cache_key)
+
+    def tearDown(self) -> None:
+        self.r.delete(self.lock_key)
+        cache.delete(self.cache_key)
+
+    def test_first_request_runs_the_search(self):
+        """Does the first request hold the lock while it runs the search and
+        release it afterward?
+        """
+        with search_single_flight(self.cache_key) as results:
+            self.assertIsNone(results)
+            self.assertIsNotNone(self.r.get(self.lock_key))
+        self.assertIsNone(self.r.get(self.lock_key))
+
+    def test_concurrent_request_reuses_cached_results(self):
+        """Does a request wait for an identical search in progress and reuse
+        its results?
+        """
+        self.r.set(self.lock_key, "another-request", px=10_000)
+        cached_results = {"es_results_items": [], "main_query_hits": 1}
+        cache.set(self.cache_key, serialize_search_results(cached_results))
+
+        with search_single_flight(self.cache_key) as results:
+            self.assertEqual(results, cached_results)
+        # The lock of the other request is left untouched.
+        self.assertEqual(self.r.get(self.lock_key), "another-request")
+
+    def test_concurrent_request_stops_waiting(self):
+        """Does a waiting request run the search itself once the max wait
+        elapses?
+        """
+        self.r.set(self.lock_key, "another-request", px=10_000)
+        with search_single_flight(self.cache_key) as results:
+            self.assertIsNone(results)
@@ -201,6 +201,17 @@ class EsMainQueries:
     child_query: QueryString | None = None
 
 
+@dataclass
+class EsSweepAlertQuery:
+    cd: CleanData
+    search_query: Search
+    child_search_query: Search
+    searches: list[Search]
+    parent_query: QueryString | None = None
+    child_query: QueryString | None = None
+    query_with_parties: bool = False
+
+
 @dataclass
 class EsJoinQueries:
     main_query: QueryString | list
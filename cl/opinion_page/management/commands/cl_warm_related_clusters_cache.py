@@ -0,0 +1,62 @@
+from cl.favorites.models import GenericCount
+from cl.lib.celery_utils import CeleryThrottle
+from cl.lib.command_utils import VerboseCommand, logger
+from cl.opinion_page.tasks import (
+    refresh_cited_clusters_cache,
+    refresh_related_clusters_cache,
+)
+
+
+def get_most_viewed_cluster_ids(count: int) -> list[int]:
+    """Get the IDs of the most viewed clusters from their view counters.
+
+    :param count: The number of cluster IDs to return.
+    :return: A list of cluster IDs, the most viewed first.
+    """
+    labels = (
+        GenericCount.objects.filter(
+            label__startswith="o.", label__endswith=":view"
+        )
+        .order_by("-value")
+        .values_list("label", flat=True)[:count]
+    )
+    return [int(label[2:].split(":", 1)[0]) for label in labels]
+
+
+class Command(VerboseCommand):
+    help = (
+        "Refresh the cached related and cited-by clusters of the most viewed "
+        "clusters, so their visitors never wait for the ES queries. Meant to "
+        "run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=5000,
+            help="The number of most viewed clusters to warm.",
+        )
+        parser.add_argument(
+            "--queue",
+            type=str,
+            default="celery",
+            help="The celery queue to use.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        queue = options["queue"]
+        throttle = CeleryThrottle(queue_name=queue)
+        cluster_ids = get_most_viewed_cluster_ids(options["count"])
+        for cluster_id in cluster_ids:
+            throttle.maybe_wait()
+            refresh_related_clusters_cache.si(cluster_id).set(
+                queue=queue
+            ).apply_async()
+            refresh_cited_clusters_cache.si(cluster_id).set(
+                queue=queue
+            ).apply_async()
+        logger.info(
+            "Scheduled the cache warming of %s clusters.", len(cluster_ids)
+        )
@@ -0,0 +1,38 @@
+from asgiref.sync import async_to_sync
+from elasticsearch.exceptions import ConnectionError as ESConnectionError
+
+from cl.celery_init import app
+from cl.opinion_page.utils import (
+    update_cited_clusters_cache,
+    update_related_clusters_cache,
+)
+
+
+@app.task(
+    autoretry_for=(ESConnectionError,),
+    max_retries=3,
+    retry_backoff=10,
+    ignore_result=True,
+)
+def refresh_related_clusters_cache(cluster_pk: int) -> None:
+    """Refresh the cached related clusters of a cluster.
+
+    :param cluster_pk: The cluster ID.
+    :return: None
+    """
+    async_to_sync(update_related_clusters_cache)(cluster_pk)
+
+
+@app.task(
+    autoretry_for=(ESConnectionError,),
+    max_retries=3,
+    retry_backoff=10,
+    ignore_result=True,
+)
+def refresh_cited_clusters_cache(cluster_pk: int) -> None:
+    """Refresh the cached clusters citing a cluster.
+
+    :param cluster_pk: The cluster ID.
+    :return: None
+    """
+    async_to_sync(update_cited_clusters_cache)(cluster_pk)
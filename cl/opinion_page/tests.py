@@ -3,6 +3,7 @@ import datetime
 import os
 import re
 import shutil
+import time
 from datetime import date
 from http import HTTPStatus
 from unittest import mock
@@ -13,6 +14,7 @@ from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
 from django.db import connection
@@ -47,6 +49,10 @@ from cl.opinion_page.forms import (
     TennWorkCompClUploadForm,
 )
 from cl.opinion_page.utils import (
+    cache_cited_clusters,
+    cache_related_clusters,
+    es_get_cited_clusters_with_cache,
+    es_get_related_clusters_with_cache,
     generate_docket_entries_csv_data,
     make_docket_title,
 )
@@ -2204,3 +2210,101 @@ class ClusterRedirectionTest(TestCase):
             expected_redirect_url,
             status_code=301,
         )
+
+
+@mock.patch("cl.opinion_page.utils.create_redis_semaphore", return_value=True)
+class RelatedClustersStaleCacheTest(TestCase):
+    """Are stale related and cited-by clusters served from the cache while
+    they're refreshed in the background?
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cluster = OpinionClusterWithParentsFactory()
+        OpinionFactory(cluster=cls.cluster)
+        cls.request = RequestFactory().get("/")
+
+    def setUp(self) -> None:
+        self.cache = caches["db_cache"]
+        self.mlt_key = f"clusters-mlt-es:{self.cluster.pk}"
+        self.cited_key = f"clusters-cited-es:{self.cluster.pk}"
+
+    def tearDown(self) -> None:
+        self.cache.delete_many([self.mlt_key, self.cited_key])
+
+    @mock.patch("cl.opinion_page.tasks.refresh_related_clusters_cache.delay")
+    def test_serve_stale_related_clusters(self, mock_refresh, mock_semaphore):
+        """Is a stale related clusters entry served as it is and refreshed
+        in the background, and a fresh one served without refreshing?
+        """
+        self.cache.set(self.mlt_key, (["stale"], False, time.time() - 1))
+        results = async_to_sync(es_get_related_clusters_with_cache)(
+            self.cluster, self.request
+        )
+        self.assertEqual(results.related_clusters, ["stale"])
+        mock_refresh.assert_called_once_with(self.cluster.pk)
+
+        mock_refresh.reset_mock()
+        self.cache.set(self.mlt_key, (["fresh"], False, time.time() + 60))
+        results = async_to_sync(es_get_related_clusters_with_cache)(
+            self.cluster, self.request
+        )
+        self.assertEqual(results.related_clusters, ["fresh"])
+        mock_refresh.assert_not_called()
+
+    @mock.patch("cl.opinion_page.tasks.refresh_cited_clusters_cache.delay")
+    def test_serve_stale_cited_clusters(self, mock_refresh, mock_semaphore):
+        """Is a stale cited-by clusters entry served as it is and refreshed
+        in the background?
+        """
+        self.cache.set(self.cited_key, (["stale"], 1, False, time.time() - 1))
+        results = async_to_sync(es_get_cited_clusters_with_cache)(
+            self.cluster, self.request
+        )
+        self.assertEqual(results.citing_clusters, ["stale"])
+        self.assertEqual(results.citing_cluster_count, 1)
+        mock_refresh.assert_called_once_with(self.cluster.pk)
+
+    @mock.patch("cl.opinion_page.tasks.refresh_related_clusters_cache.delay")
+    def test_legacy_entries_are_not_refreshed(
+        self, mock_refresh, mock_semaphore
+    ):
+        """Are entries cached before the fresh-until timestamp was added
+        still served without being refreshed?
+        """
+        self.cache.set(self.mlt_key, (["legacy"], False))
+        results = async_to_sync(es_get_related_clusters_with_cache)(
+            self.cluster, self.request
+        )
+        self.assertEqual(results.related_clusters, ["legacy"])
+        mock_refresh.assert_not_called()
+
+    @override_settings(
+        DEVELOPMENT=False,
+        TESTING=False,
+        RELATED_CACHE_TIMEOUT=60 * 60 * 24 * 7,
+        RELATED_CACHE_STALE_TIMEOUT=60 * 60 * 24 * 7,
+    )
+    @mock.patch("cl.lib.s3_cache.switch_is_active", return_value=True)
+    @mock.patch("cl.opinion_page.utils.get_s3_cache")
+    def test_s3_prefix_matches_stale_timeout(
+        self, mock_get_s3_cache, mock_switch, mock_semaphore
+    ):
+        """Are entries stored in S3 under the prefix of their TTL, so they
+        aren't expired before their stale period ends?
+        """
+        mock_cache = mock_get_s3_cache.return_value
+        mock_cache.aset = mock.AsyncMock()
+        async_to_sync(cache_related_clusters)(self.cluster.pk, [])
+        async_to_sync(cache_cited_clusters)(self.cluster.pk, [], 0)
+
+        keys_and_timeouts = [
+            (c.args[0], c.args[2]) for c in mock_cache.aset.call_args_list
+        ]
+        self.assertEqual(
+            keys_and_timeouts,
+            [
+                (f"14-days:{self.mlt_key}", 60 * 60 * 24 * 14),
+                (f"14-days:{self.cited_key}", 60 * 60 * 24 * 14),
+            ],
+        )
@@ -1,5 +1,6 @@
 import csv
 import logging
+import time
 import traceback
 from dataclasses import dataclass, field
 from io import StringIO
@@ -13,6 +14,7 @@ from django.shortcuts import aget_object_or_404  # type: ignore[attr-defined]
 from django_elasticsearch_dsl.search import Search
 from elasticsearch.exceptions import ApiError, ConnectionTimeout, RequestError
 from elasticsearch_dsl import Q
+from elasticsearch_dsl.response import Response
 
 from cl.alerts.models import DocketAlert
 from cl.custom_filters.templatetags.text_filters import best_case_name
@@ -24,6 +26,7 @@ from cl.lib.elasticsearch_utils import (
     build_join_es_filters,
     build_more_like_this_query,
 )
+from cl.lib.redis_utils import create_redis_semaphore
 from cl.lib.s3_cache import get_s3_cache, make_s3_cache_key
 from cl.lib.string_utils import trunc
 from cl.lib.types import CleanData
@@ -33,6 +36,7 @@ from cl.search.models import (
     PRECEDENTIAL_STATUS,
     SEARCH_TYPES,
     Docket,
+    Opinion,
     OpinionCluster,
 )
 
@@ -241,19 +245,154 @@ class RelatedClusterResults:
     timeout: bool = False
 
 
+def get_related_cache_timeout() -> int:
+    """Get how long related and cited-by cluster entries are kept in the
+    cache. Entries are fresh for RELATED_CACHE_TIMEOUT seconds and can be
+    served stale, while they're refreshed, for RELATED_CACHE_STALE_TIMEOUT
+    seconds more. Cache keys are built from this timeout too, since the
+    "<days>-days:" prefix of S3 keys decides when S3 expires them.
+
+    :return: The cache timeout in seconds.
+    """
+    return (
+        settings.RELATED_CACHE_TIMEOUT + settings.RELATED_CACHE_STALE_TIMEOUT
+    )
+
+
+def is_related_cache_entry_stale(
+    cached_value: tuple, expected_length: int
+) -> bool:
+    """Check whether a related or cited-by cache entry is past its fresh
+    period. The fresh-until timestamp is the last item of the entry; entries
+    stored before it was added are never considered stale.
+
+    :param cached_value: The tuple retrieved from the cache.
+    :param expected_length: The length of the tuple including the timestamp.
+    :return: True if the entry should be refreshed, otherwise False.
+    """
+    fresh_until = (
+        cached_value[-1] if len(cached_value) == expected_length else None
+    )
+    return fresh_until is not None and time.time() > fresh_until
+
+
+def schedule_related_cache_refresh(base_key: str, cluster_pk: int) -> None:
+    """Refresh a stale related or cited-by cache entry in the background.
+    Visitors of the same stale entry only enqueue a single refresh.
+
+    :param base_key: The cache key of the entry, without the S3 prefix.
+    :param cluster_pk: The cluster whose entry should be refreshed.
+    :return: None
+    """
+    from cl.opinion_page.tasks import (
+        refresh_cited_clusters_cache,
+        refresh_related_clusters_cache,
+    )
+
+    if not create_redis_semaphore("CACHE", f"{base_key}:refresh", ttl=60 * 10):
+        return
+    if base_key.startswith("clusters-mlt-es:"):
+        refresh_related_clusters_cache.delay(cluster_pk)
+    else:
+        refresh_cited_clusters_cache.delay(cluster_pk)
+
+
+async def fetch_related_clusters(
+    sub_opinion_pks: list[str],
+) -> tuple[Response | None, bool] | None:
+    """Run the more-like-this query to find clusters related to a cluster.
+
+    :param sub_opinion_pks: The sub-opinion IDs of the cluster.
+    :return: A two-tuple of the ES response, or None if the query timed
+    out, and whether it timed out. None if the query failed.
+    """
+    cluster_search = OpinionClusterDocument.search()
+    related_query = await build_related_clusters_query(
+        cluster_search, sub_opinion_pks
+    )
+
+    related_query = related_query.params(
+        timeout=f"{settings.ELASTICSEARCH_FAST_QUERIES_TIMEOUT}s"
+    )
+    related_query = related_query.extra(
+        size=settings.RELATED_COUNT, track_total_hits=False
+    )
+    try:
+        # Execute the Related Query if needed
+        return related_query.execute(), False
+    except (ConnectionError, RequestError, ApiError) as e:
+        logger.warning("Error getting cited and related clusters: %s", e)
+        if settings.DEBUG is True:
+            traceback.print_exc()
+        return None
+    except ConnectionTimeout as e:
+        logger.warning(
+            "ConnectionTimeout getting cited and related clusters: %s", e
+        )
+        return None, True
+
+
+async def cache_related_clusters(
+    cluster_pk: int, related_clusters: Response | list
+) -> None:
+    """Store the related clusters of a cluster in the cache.
+
+    :param cluster_pk: The cluster ID.
+    :param related_clusters: The related clusters to store.
+    :return: None
+    """
+    cache = await sync_to_async(get_s3_cache)("db_cache")
+    mlt_cache_key = await sync_to_async(make_s3_cache_key)(
+        f"clusters-mlt-es:{cluster_pk}", get_related_cache_timeout()
+    )
+    await cache.aset(
+        mlt_cache_key,
+        (
+            related_clusters,
+            False,
+            time.time() + settings.RELATED_CACHE_TIMEOUT,
+        ),
+        get_related_cache_timeout(),
+    )
+
+
+async def update_related_clusters_cache(cluster_pk: int) -> None:
+    """Run the related clusters query for a cluster and cache the results.
+
+    :param cluster_pk: The cluster ID.
+    :return: None
+    """
+    sub_opinion_pks = [
+        str(pk)
+        async for pk in Opinion.objects.filter(
+            cluster_id=cluster_pk
+        ).values_list("pk", flat=True)
+    ]
+    if not sub_opinion_pks:
+        return
+    result = await fetch_related_clusters(sub_opinion_pks)
+    if result is None or result[1]:
+        return
+    await cache_related_clusters(cluster_pk, result[0])
+
+
 async def es_get_related_clusters_with_cache(
     cluster: OpinionCluster,
     request: HttpRequest,
 ) -> RelatedClusterResults:
     """Elastic Related Clusters Search or Cache
 
+    Stale cache entries are served as they are while a background task
+    refreshes them.
+
     :param cluster:The cluster to use
     :param request:The user request
     :return:Related Cluster Data
     """
     cache = await sync_to_async(get_s3_cache)("db_cache")
+    mlt_base_key = f"clusters-mlt-es:{cluster.pk}"
     mlt_cache_key = await sync_to_async(make_s3_cache_key)(
-        f"clusters-mlt-es:{cluster.pk}", settings.RELATED_CACHE_TIMEOUT
+        mlt_base_key, get_related_cache_timeout()
     )
     # By default, all statuses are included. Retrieve the PRECEDENTIAL_STATUS
     # attributes (since they're indexed in ES) instead of the NAMES values.
@@ -282,16 +421,15 @@ async def es_get_related_clusters_with_cache(
     if is_bot(request) or not sub_opinion_pks:
         return related_cluster_result
 
-    cached_related_clusters, timeout_related = (
-        await cache.aget(mlt_cache_key) or (None, False)
-        if settings.RELATED_USE_CACHE
-        else (None, False)
+    cached_value = (
+        await cache.aget(mlt_cache_key) if settings.RELATED_USE_CACHE else None
     )
-
-    # Prepare related cluster query if not cached results.
-    cluster_search = OpinionClusterDocument.search()
-
-    if cached_related_clusters is not None:
+    if cached_value is not None:
+        if is_related_cache_entry_stale(cached_value, 3):
+            await sync_to_async(schedule_related_cache_refresh)(
+                mlt_base_key, cluster.pk
+            )
+        cached_related_clusters, timeout_related = cached_value[:2]
         related_cluster_result.related_clusters = cached_related_clusters
         related_cluster_result.timeout = timeout_related
         related_cluster_result.sub_opinion_pks = list(
@@ -300,45 +438,99 @@ async def es_get_related_clusters_with_cache(
         related_cluster_result.url_search_params = url_search_params
         return related_cluster_result
 
-    related_query = await build_related_clusters_query(
-        cluster_search, sub_opinion_pks
-    )
+    result = await fetch_related_clusters(sub_opinion_pks)
+    if result is None:
+        return related_cluster_result
 
-    related_query = related_query.params(
-        timeout=f"{settings.ELASTICSEARCH_FAST_QUERIES_TIMEOUT}s"
+    response, timeout_related = result
+    related_cluster_result.related_clusters = (
+        response if response is not None else []
     )
-    related_query = related_query.extra(
-        size=settings.RELATED_COUNT, track_total_hits=False
+    related_cluster_result.timeout = False
+    related_cluster_result.sub_opinion_pks = list(map(int, sub_opinion_pks))
+
+    if not timeout_related:
+        await cache_related_clusters(
+            cluster.pk, related_cluster_result.related_clusters
+        )
+    return related_cluster_result
+
+
+async def fetch_cited_clusters(
+    sub_opinion_pks: list[str],
+) -> tuple[Response | None, bool] | None:
+    """Run the query to find clusters citing a cluster.
+
+    :param sub_opinion_pks: The sub-opinion IDs of the cluster.
+    :return: A two-tuple of the ES response, or None if the query timed
+    out, and whether it timed out. None if the query failed.
+    """
+    cluster_search = OpinionClusterDocument.search()
+    cited_query = await build_cites_clusters_query(
+        cluster_search, sub_opinion_pks
     )
     try:
         # Execute the Related Query if needed
-        response = related_query.execute()
-        timeout_related = False
+        return cited_query.execute(), False
     except (ConnectionError, RequestError, ApiError) as e:
         logger.warning("Error getting cited and related clusters: %s", e)
         if settings.DEBUG is True:
             traceback.print_exc()
-        return related_cluster_result
+        return None
     except ConnectionTimeout as e:
         logger.warning(
             "ConnectionTimeout getting cited and related clusters: %s", e
         )
-        response = None
-        timeout_related = True
+        return None, True
 
-    related_cluster_result.related_clusters = (
-        response if response is not None else cached_related_clusters or []
+
+async def cache_cited_clusters(
+    cluster_pk: int, citing_clusters: list, citing_cluster_count: int
+) -> None:
+    """Store the clusters citing a cluster in the cache.
+
+    :param cluster_pk: The cluster ID.
+    :param citing_clusters: The citing clusters to store.
+    :param citing_cluster_count: The total number of citing clusters.
+    :return: None
+    """
+    cache = await sync_to_async(get_s3_cache)("db_cache")
+    cache_citing_key = await sync_to_async(make_s3_cache_key)(
+        f"clusters-cited-es:{cluster_pk}", get_related_cache_timeout()
+    )
+    await cache.aset(
+        cache_citing_key,
+        (
+            citing_clusters,
+            citing_cluster_count,
+            False,
+            time.time() + settings.RELATED_CACHE_TIMEOUT,
+        ),
+        get_related_cache_timeout(),
     )
-    related_cluster_result.timeout = False
-    related_cluster_result.sub_opinion_pks = list(map(int, sub_opinion_pks))
 
-    if not timeout_related:
-        await cache.aset(
-            mlt_cache_key,
-            (related_cluster_result.related_clusters, timeout_related),
-            settings.RELATED_CACHE_TIMEOUT,
-        )
-    return related_cluster_result
+
+async def update_cited_clusters_cache(cluster_pk: int) -> None:
+    """Run the citing clusters query for a cluster and cache the results.
+
+    :param cluster_pk: The cluster ID.
+    :return: None
+    """
+    sub_opinion_pks = [
+        str(pk)
+        async for pk in Opinion.objects.filter(
+            cluster_id=cluster_pk
+        ).values_list("pk", flat=True)
+    ]
+    if not sub_opinion_pks:
+        return
+    result = await fetch_cited_clusters(sub_opinion_pks)
+    if result is None or result[1]:
+        return
+    response = result[0]
+    await cache_cited_clusters(
+        cluster_pk, list(response), response.hits.total.value
+    )
 
 
 async def es_get_cited_clusters_with_cache(
@@ -347,13 +539,17 @@ async def es_get_cited_clusters_with_cache(
 ) -> RelatedCitingResults:
     """Elastic cited by cluster search or cache
 
+    Stale cache entries are served as they are while a background task
+    refreshes them.
+
     :param cluster:The cluster to check
     :param request:The user request
     :return:The cited by data
     """
     cache = await sync_to_async(get_s3_cache)("db_cache")
+    cited_base_key = f"clusters-cited-es:{cluster.pk}"
     cache_citing_key = await sync_to_async(make_s3_cache_key)(
-        f"clusters-cited-es:{cluster.pk}", settings.RELATED_CACHE_TIMEOUT
+        cited_base_key, get_related_cache_timeout()
     )
 
     sub_opinion_pks = [
@@ -364,38 +560,29 @@ async def es_get_cited_clusters_with_cache(
     if is_bot(request) or not sub_opinion_pks:
         return cluster_results
 
-    cached_citing_results, cached_citing_clusters_count, timeout_cited = (
-        await cache.aget(cache_citing_key) or (None, False, False)
+    cached_value = (
+        await cache.aget(cache_citing_key)
         if settings.RELATED_USE_CACHE
-        else (None, False, False)
+        else None
     )
-
-    if cached_citing_results is not None:
+    if cached_value is not None:
+        if is_related_cache_entry_stale(cached_value, 4):
+            await sync_to_async(schedule_related_cache_refresh)(
+                cited_base_key, cluster.pk
+            )
+        cached_citing_results, cached_citing_clusters_count, timeout_cited = (
+            cached_value[:3]
+        )
         cluster_results.citing_clusters = cached_citing_results
         cluster_results.citing_cluster_count = cached_citing_clusters_count
         cluster_results.timeout = timeout_cited
         return cluster_results
 
-    cluster_search = OpinionClusterDocument.search()
-    cited_query = await build_cites_clusters_query(
-        cluster_search, sub_opinion_pks
-    )
-    try:
-        # Execute the Related Query if needed
-        response = cited_query.execute()
-        timeout_cited = False
-    except (ConnectionError, RequestError, ApiError) as e:
-        logger.warning("Error getting cited and related clusters: %s", e)
-        if settings.DEBUG is True:
-            traceback.print_exc()
+    result = await fetch_cited_clusters(sub_opinion_pks)
+    if result is None:
         return cluster_results
-    except ConnectionTimeout as e:
-        logger.warning(
-            "ConnectionTimeout getting cited and related clusters: %s", e
-        )
-        response = None
-        timeout_cited = True
 
+    response, timeout_cited = result
     citing_clusters = list(response) if not timeout_cited else []
     cluster_results.citing_clusters = citing_clusters
     cluster_results.citing_cluster_count = (
@@ -403,14 +590,10 @@ async def es_get_cited_clusters_with_cache(
     )
     cluster_results.timeout = False if citing_clusters else timeout_cited
     if not cluster_results.timeout:
-        await cache.aset(
-            cache_citing_key,
-            (
-                cluster_results.citing_clusters,
-                cluster_results.citing_cluster_count,
-                cluster_results.timeout,
-            ),
-            settings.RELATED_CACHE_TIMEOUT,
+        await cache_cited_clusters(
+            cluster.pk,
+            cluster_results.citing_clusters,
+            cluster_results.citing_cluster_count,
         )
     return cluster_results
 
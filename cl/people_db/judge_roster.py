@@ -0,0 +1,265 @@
+import copy
+import logging
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache import cache
+from nameparser import HumanName
+
+from cl.people_db.models import SUFFIX_LOOKUP, Person, Position
+
+logger = logging.getLogger(__name__)
+
+JUDGE_ROSTER_VERSION_KEY = "judge-roster-version"
+
+
+@dataclass(frozen=True)
+class RosterName:
+    """The lowercase name parts of a person or of one of their aliases."""
+
+    first: str
+    middle: str
+    last: str
+    suffix: str
+
+    @classmethod
+    def from_person(cls, person: Person) -> "RosterName":
+        return cls(
+            person.name_first.lower(),
+            person.name_middle.lower(),
+            person.name_last.lower(),
+            person.name_suffix.lower(),
+        )
+
+
+@dataclass(frozen=True)
+class RosterRow:
+    """A person, one of their positions in a court and one of their aliases,
+    like a row of the joins made by lookup_judge_by_full_name.
+    """
+
+    person_id: int
+    name: RosterName
+    alias: RosterName | None
+    date_dob: date | None
+    date_dod: date | None
+    date_start: date | None
+    date_termination: date | None
+
+
+def bump_judge_roster_version() -> None:
+    """Change the roster version so every process rebuilds its roster on its
+    next refresh.
+
+    :return: None
+    """
+    cache.set(JUDGE_ROSTER_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_judge_roster_version() -> str:
+    return cache.get_or_set(
+        JUDGE_ROSTER_VERSION_KEY, lambda: uuid.uuid4().hex, None
+    )
+
+
+def name_matches(
+    row: RosterRow, predicate: Callable[[RosterName], bool]
+) -> bool:
+    """Check a name condition against a row's person or its alias, like the
+    Q(name_x=...) | Q(aliases__name_x=...) filters do.
+    """
+    return predicate(row.name) or (
+        row.alias is not None and predicate(row.alias)
+    )
+
+
+class JudgeRoster:
+    """An in-memory index of the judges of every court, to look them up by
+    name without querying the database.
+
+    Lookups return the same person as lookup_judge_by_full_name does with the
+    database: the filters are applied to the rows of the same joins, and a
+    judge is only returned once a single row is left.
+    """
+
+    def __init__(self, version: str) -> None:
+        self.version = version
+        self.last_check = time.monotonic()
+        self.persons: dict[int, Person] = {}
+        # Court ID -> lowercase last name or alias last name -> rows
+        self.rows: defaultdict[str, defaultdict[str, list[RosterRow]]] = (
+            defaultdict(lambda: defaultdict(list))
+        )
+
+    def build(self) -> None:
+        """Load the persons, aliases and positions from the database.
+
+        :return: None
+        """
+        aliases = defaultdict(list)
+        for person in Person.objects.all().iterator(chunk_size=10_000):
+            self.persons[person.pk] = person
+            if person.is_alias_of_id:
+                aliases[person.is_alias_of_id].append(
+                    RosterName.from_person(person)
+                )
+
+        positions = Position.objects.filter(
+            court_id__isnull=False, person_id__isnull=False
+        ).values_list(
+            "person_id", "court_id", "date_start", "date_termination"
+        )
+        for person_id, court_id, date_start, date_termination in positions:
+            person = self.persons[person_id]
+            name = RosterName.from_person(person)
+            person_aliases = aliases.get(person_id, [])
+            # A person without aliases still has a row, with a NULL alias.
+            for alias in person_aliases or [None]:
+                row = RosterRow(
+                    person_id,
+                    name,
+                    alias,
+                    person.date_dob,
+                    person.date_dod,
+                    date_start,
+                    date_termination,
+                )
+                last_names = {name.last, *(a.last for a in person_aliases)}
+                for last_name in last_names:
+                    self.rows[court_id][last_name].append(row)
+
+    def lookup(
+        self,
+        name: HumanName,
+        court_id: str,
+        event_date: date | None = None,
+        require_living_judge: bool = True,
+    ) -> Person | None:
+        """Look up a judge like lookup_judge_by_full_name does.
+
+        :param name: The judge's name as a HumanName object.
+        :param court_id: The court where the judge did something
+        :param event_date: The date when the judge did something
+        :param require_living_judge: Whether to ensure that the judge found
+        was alive at the event date, with some slop for low granularity dates.
+        :return: A copy of the judge that matched, or None.
+        """
+        if isinstance(event_date, datetime):
+            event_date = event_date.date()
+        last = name.last.lower()
+        filter_sets: list[Callable[[RosterRow], bool]] = []
+
+        def living(row: RosterRow) -> bool:
+            if not require_living_judge or not event_date:
+                return True
+            return (
+                row.date_dod is None
+                or row.date_dod >= event_date - timedelta(days=365)
+            ) and (
+                row.date_dob is None
+                or row.date_dob <= event_date + timedelta(days=365)
+            )
+
+        filter_sets.append(
+            lambda row: (
+                name_matches(row, lambda n: n.last == last) and living(row)
+            )
+        )
+
+        if event_date is not None:
+            started_before = event_date + relativedelta(years=1)
+            terminated_after = event_date - relativedelta(years=1)
+            filter_sets.append(
+                lambda row: (
+                    (row.date_start is None or row.date_start < started_before)
+                    and (
+                        row.date_termination is None
+                        or row.date_termination > terminated_after
+                    )
+                )
+            )
+
+        if name.first:
+            first = name.first.lower()
+            filter_sets.append(
+                lambda row: name_matches(row, lambda n: n.first == first)
+            )
+
+        if name.middle:
+            stripped_middle = name.middle.strip(".,").lower()
+            if len(stripped_middle) == 1:
+                filter_sets.append(
+                    lambda row: name_matches(
+                        row, lambda n: n.middle.startswith(stripped_middle)
+                    )
+                )
+            else:
+                middle = name.middle.lower()
+                filter_sets.append(
+                    lambda row: name_matches(row, lambda n: n.middle == middle)
+                )
+
+        if name.suffix:
+            suffix = SUFFIX_LOOKUP.get(name.suffix.lower())
+            if suffix:
+                suffix = suffix.lower()
+                filter_sets.append(
+                    lambda row: name_matches(row, lambda n: n.suffix == suffix)
+                )
+
+        candidates = self.rows.get(court_id, {}).get(last, [])
+        for filter_set in filter_sets:
+            candidates = [row for row in candidates if filter_set(row)]
+            if not candidates:
+                return None
+            if len(candidates) == 1:
+                return copy.copy(self.persons[candidates[0].person_id])
+        return None
+
+
+_judge_roster: JudgeRoster | None = None
+
+
+def get_judge_roster() -> JudgeRoster | None:
+    """Get the per-process judge roster, building it on first use and
+    rebuilding it when the roster version changes.
+
+    The version is checked at most once every JUDGE_ROSTER_REFRESH_INTERVAL
+    seconds.
+
+    :return: The JudgeRoster, or None if the roster is disabled.
+    """
+    global _judge_roster
+    if not settings.JUDGE_ROSTER_ENABLED:
+        return None
+
+    roster = _judge_roster
+    interval = settings.JUDGE_ROSTER_REFRESH_INTERVAL
+    if roster is not None and time.monotonic() - roster.last_check < interval:
+        return roster
+
+    version = get_judge_roster_version()
+    if roster is None or roster.version != version:
+        start = time.monotonic()
+        roster = JudgeRoster(version)
+        roster.build()
+        logger.info(
+            "Built the judge roster with %s persons in %.2f seconds",
+            len(roster.persons),
+            time.monotonic() - start,
+        )
+        _judge_roster = roster
+    roster.last_check = time.monotonic()
+    return roster
+
+
+def reset_judge_roster() -> None:
+    """Drop the per-process roster so the next lookup builds it again."""
+    global _judge_roster
+    _judge_roster = None
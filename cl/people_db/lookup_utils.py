@@ -4,6 +4,7 @@ import re
 from datetime import date, timedelta
 from functools import reduce
 
+from asgiref.sync import sync_to_async
 from dateutil.relativedelta import relativedelta
 from django.db.models import Q, QuerySet
 from django.utils.html import strip_tags
@@ -11,6 +12,7 @@ from nameparser import HumanName
 from unidecode import unidecode
 
 from cl.lib.utils import wrap_text
+from cl.people_db.judge_roster import get_judge_roster
 from cl.people_db.models import SUFFIX_LOOKUP, Person
 
 # list of words that aren't judge names
@@ -445,11 +447,16 @@ async def lookup_judge_by_full_name(
     there's some slop in here to allow for date fields with low granularity
     (like those with DATE_GRANULARITY = "%Y").
     :return Either the judge that matched the name in the court at the right
-    time, or None.
+    time, or None. If JUDGE_ROSTER_ENABLED, the judge is looked up in the
+    in-memory judge roster instead of the database.
     """
     if isinstance(name, str):
         name = HumanName(name)
 
+    roster = await sync_to_async(get_judge_roster)()
+    if roster is not None:
+        return roster.lookup(name, court_id, event_date, require_living_judge)
+
     filter_sets = []
 
     # check based on last name, court, and functioning flesh and blood first
@@ -1,12 +1,20 @@
 import datetime
 
+from asgiref.sync import async_to_sync
 from django.core.management import call_command
 from django.urls import reverse
 from factory import RelatedFactory
+from nameparser import HumanName
 
 from cl.audio.factories import AudioFactory
-from cl.people_db.factories import PersonFactory, PersonWithChildrenFactory
-from cl.people_db.models import Person, Position
+from cl.people_db.factories import (
+    PersonFactory,
+    PersonWithChildrenFactory,
+    PositionFactory,
+)
+from cl.people_db.judge_roster import get_judge_roster, reset_judge_roster
+from cl.people_db.lookup_utils import lookup_judge_by_full_name
+from cl.people_db.models import GRANULARITY_DAY, Person, Position
 from cl.search.factories import (
     CourtFactory,
     DocketEntryFactory,
@@ -146,3 +154,132 @@ class PersonPageRelatedCases(ESIndexTestCase, TestCase):
         )
         self.assertIn("Oral Argument Ipsum", response.content.decode())
         self.assertIn("1:21-bk-1234", response.content.decode())
+
+
+class JudgeRosterTest(TestCase):
+    """Does the in-memory judge roster find the same judges as the database
+    lookups?"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.court = CourtFactory(id="test")
+        cls.john_smith = PersonFactory(
+            name_first="John",
+            name_middle="Quincy",
+            name_last="Smith",
+            name_suffix="",
+            date_dob=datetime.date(1950, 1, 1),
+            date_granularity_dob=GRANULARITY_DAY,
+        )
+        PositionFactory(
+            person=cls.john_smith,
+            court=cls.court,
+            date_start=datetime.date(2000, 1, 1),
+            date_granularity_start=GRANULARITY_DAY,
+            date_termination=datetime.date(2010, 1, 1),
+            date_granularity_termination=GRANULARITY_DAY,
+        )
+        cls.jane_smith = PersonFactory(
+            name_first="Jane",
+            name_middle="",
+            name_last="Smith",
+            name_suffix="",
+        )
+        PositionFactory(
+            person=cls.jane_smith,
+            court=cls.court,
+            date_start=datetime.date(1990, 1, 1),
+            date_granularity_start=GRANULARITY_DAY,
+            date_termination=datetime.date(1995, 1, 1),
+            date_granularity_termination=GRANULARITY_DAY,
+        )
+        PositionFactory(
+            person=cls.jane_smith,
+            court=cls.court,
+            date_start=datetime.date(2005, 1, 1),
+            date_granularity_start=GRANULARITY_DAY,
+        )
+        cls.robert_jones = PersonFactory(
+            name_first="Robert",
+            name_middle="",
+            name_last="Jones",
+            name_suffix="",
+        )
+        PositionFactory(person=cls.robert_jones, court=cls.court)
+        PersonFactory(
+            name_first="Bob",
+            name_middle="",
+            name_last="Jones",
+            name_suffix="",
+            is_alias_of=cls.robert_jones,
+        )
+        cls.doe = PersonFactory(
+            name_first="Richard",
+            name_middle="",
+            name_last="Doe",
+            name_suffix="",
+            date_dod=datetime.date(1980, 1, 1),
+            date_granularity_dod=GRANULARITY_DAY,
+        )
+        PositionFactory(person=cls.doe, court=cls.court)
+
+    def test_roster_lookups_match_database_lookups(self) -> None:
+        """Do roster lookups return the same judges as the database?"""
+
+        def last_name(name: str) -> HumanName:
+            hn = HumanName()
+            hn.last = name
+            return hn
+
+        lookups = [
+            (last_name("Smith"), datetime.date(2007, 1, 1), True, None),
+            ("John Smith", datetime.date(2007, 1, 1), True, self.john_smith),
+            ("John Q. Smith", None, True, self.john_smith),
+            ("Jane Smith", datetime.date(1992, 1, 1), True, self.jane_smith),
+            ("Jane Smith", None, True, None),
+            ("Bob Jones", None, True, self.robert_jones),
+            (
+                last_name("JONES"),
+                datetime.date(2007, 1, 1),
+                True,
+                self.robert_jones,
+            ),
+            (last_name("Doe"), datetime.date(2000, 1, 1), True, None),
+            (last_name("Doe"), datetime.date(2000, 1, 1), False, self.doe),
+            (last_name("Nobody"), None, True, None),
+        ]
+        self.addCleanup(reset_judge_roster)
+        for name, event_date, require_living_judge, expected in lookups:
+            args = (name, self.court.pk, event_date)
+            with self.subTest(name=str(name), event_date=event_date):
+                db_judge = async_to_sync(lookup_judge_by_full_name)(
+                    *args, require_living_judge
+                )
+                with self.settings(JUDGE_ROSTER_ENABLED=True):
+                    reset_judge_roster()
+                    get_judge_roster()
+                    with self.assertNumQueries(0):
+                        roster_judge = async_to_sync(
+                            lookup_judge_by_full_name
+                        )(*args, require_living_judge)
+                self.assertEqual(roster_judge, db_judge)
+                self.assertEqual(roster_judge, expected)
+
+    def test_roster_is_rebuilt_when_judges_change(self) -> None:
+        """Is the roster rebuilt after a judge is added?"""
+        self.addCleanup(reset_judge_roster)
+        with self.settings(
+            JUDGE_ROSTER_ENABLED=True, JUDGE_ROSTER_REFRESH_INTERVAL=0
+        ):
+            reset_judge_roster()
+            roster = get_judge_roster()
+            self.assertIsNone(
+                roster.lookup(HumanName("Ada Lovelace"), self.court.pk)
+            )
+
+            ada = PersonFactory(name_first="Ada", name_last="Lovelace")
+            PositionFactory(person=ada, court=self.court)
+            roster = get_judge_roster()
+            self.assertEqual(
+                roster.lookup(HumanName("Ada Lovelace"), self.court.pk), ada
+            )
@@ -2,15 +2,18 @@
 import json
 import logging
 import re
+from collections import defaultdict
 from copy import deepcopy
 from datetime import date, timedelta
 from typing import Any
 
 from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.db import IntegrityError, OperationalError, transaction
-from django.db.models import Count, Prefetch, Q, QuerySet
+from django.db.models import Count, Model, Prefetch, Q, QuerySet
+from django.db.models.signals import post_save
 from django.utils.timezone import now
 from juriscraper.lib.string_utils import CaseNameTweaker
 from juriscraper.pacer import AppellateAttachmentPage, AttachmentPage
@@ -21,11 +24,13 @@ from cl.alerts.utils import (
 )
 from cl.corpus_importer.utils import (
     ais_appellate_court,
+    is_appellate_court,
     is_long_appellate_document_number,
     mark_ia_upload_needed,
 )
 from cl.lib.courts import find_court_object_by_name
 from cl.lib.decorators import retry
+from cl.lib.es_signal_processor import coalesce_es_updates
 from cl.lib.filesizes import convert_size_to_bytes
 from cl.lib.model_helpers import (
     clean_docket_number,
@@ -876,6 +881,362 @@ async def clean_duplicate_documents(params: dict[str, Any]) -> RECAPDocument:
     return await keep_latest_rd_document(duplicate_rd_queryset)
 
 
+def matches_lookup(instance: Model, lookup: dict[str, Any]) -> bool:
+    """Check in memory whether a model instance matches exact field lookups,
+    casting the lookup values the same way the database would.
+
+    :param instance: The model instance to check.
+    :param lookup: A dict of field names and values to compare.
+    :return: True if all the field values match, False otherwise.
+    """
+    for field_name, value in lookup.items():
+        field = instance._meta.get_field(field_name)
+        if value is not None:
+            value = field.to_python(value)
+        if getattr(instance, field.attname) != value:
+            return False
+    return True
+
+
+def has_conflicting_rd(rd: RECAPDocument, de_rds: list[RECAPDocument]) -> bool:
+    """Check whether saving a RECAPDocument would collide with another one in
+    the same docket entry, which RECAPDocument.save either resolves by
+    deleting the other document or rejects.
+
+    :param rd: The RECAPDocument to be saved.
+    :param de_rds: The RECAPDocuments that belong to the same docket entry.
+    :return: True if another document has the same document and attachment
+    number, False otherwise.
+    """
+    return any(
+        other is not rd
+        and other.attachment_number == rd.attachment_number
+        and str(other.document_number) == str(rd.document_number)
+        for other in de_rds
+    )
+
+
+def send_bulk_post_save(
+    instances: list[DocketEntry] | list[RECAPDocument], created: bool
+) -> None:
+    """Send the post_save signal for instances saved with bulk queries, so
+    that ES updates and other receivers run as if they were saved one by one,
+    then reset their field trackers.
+
+    :param instances: The DocketEntry or RECAPDocument instances saved.
+    :param created: Whether the instances were created.
+    :return: None
+    """
+    for instance in instances:
+        post_save.send(
+            sender=instance.__class__,
+            instance=instance,
+            created=created,
+            update_fields=None,
+            raw=False,
+            using=instance._state.db,
+        )
+        instance.es_rd_field_tracker.set_saved_fields()
+
+
+@sync_to_async
+def add_docket_entries_in_bulk(
+    d: Docket,
+    docket_entries: list[dict[str, Any]],
+    tags: list[Tag] | None = None,
+) -> (
+    tuple[
+        tuple[list[DocketEntry], list[RECAPDocument]],
+        list[RECAPDocument],
+        bool,
+    ]
+    | None
+):
+    """Update or create numbered docket entries and their documents by
+    loading the docket entries and documents of the docket at once, matching
+    them in memory and saving them with bulk queries.
+
+    This follows the same matching rules as the one-by-one merge in
+    add_docket_entries. Entries that would require its duplicate handling,
+    like unnumbered entries, repeated entry numbers, multiple matching
+    entries or documents, or attachment data, make it bail out before any
+    change is saved, so the caller can fall back to merging them one by one.
+
+    :param d: The docket object to add things to and use for lookups.
+    :param docket_entries: A list of dicts containing docket entry data, with
+    their recap_sequence_number already computed.
+    :param tags: A list of tag objects to apply to the recap documents and
+    docket entries created or updated in this function.
+    :return: The same three tuple returned by add_docket_entries, or None if
+    the entries can't be merged in bulk.
+    """
+    if any(
+        not docket_entry["document_number"]
+        or docket_entry.get("attachments") is not None
+        for docket_entry in docket_entries
+    ):
+        return None
+    try:
+        entry_numbers = [
+            DocketEntry._meta.get_field("entry_number").to_python(
+                docket_entry["document_number"]
+            )
+            for docket_entry in docket_entries
+        ]
+    except ValidationError:
+        return None
+    if len(set(entry_numbers)) != len(entry_numbers):
+        return None
+
+    appellate_court_id_exists = is_appellate_court(d.court_id)
+    with transaction.atomic():
+        Docket.objects.select_for_update().get(pk=d.pk)
+        des_by_number = defaultdict(list)
+        for de in DocketEntry.objects.filter(
+            docket=d, entry_number__in=entry_numbers
+        ):
+            des_by_number[de.entry_number].append(de)
+        rds_by_de = defaultdict(list)
+        for rd in RECAPDocument.objects.filter(
+            docket_entry__docket=d,
+            docket_entry__entry_number__in=entry_numbers,
+        ):
+            rds_by_de[rd.docket_entry_id].append(rd)
+
+        rds_created = []
+        des_returned = []
+        rds_updated = []
+        content_updated = False
+        known_filing_dates = [d.date_last_filing]
+        des_to_create, des_to_update = [], []
+        rds_to_create, rds_to_update = [], {}
+        rds_to_tag = []
+        try:
+            for docket_entry, entry_number in zip(
+                docket_entries, entry_numbers
+            ):
+                pacer_seq_no = docket_entry.get("pacer_seq_no")
+                matched_des = des_by_number[entry_number]
+                if pacer_seq_no is not None:
+                    matched_des = [
+                        de
+                        for de in matched_des
+                        if matches_lookup(
+                            de, {"pacer_sequence_number": pacer_seq_no}
+                        )
+                    ]
+                if len(matched_des) > 1:
+                    return None
+                if matched_des:
+                    de, de_created = matched_des[0], False
+                    de_rds = rds_by_de[de.pk]
+                elif pacer_seq_no is not None and any(
+                    de.pacer_sequence_number is None
+                    for de in des_by_number[entry_number]
+                ):
+                    return None
+                else:
+                    de = DocketEntry(
+                        docket=d,
+                        entry_number=entry_number,
+                        pacer_sequence_number=pacer_seq_no,
+                    )
+                    de_created = True
+                    de_rds = []
+
+                de.description = docket_entry["description"] or de.description
+                date_filed, time_filed = localize_date_and_time(
+                    d.court_id, docket_entry["date_filed"]
+                )
+                if not time_filed:
+                    if de.date_filed != docket_entry["date_filed"]:
+                        de.time_filed = None
+                else:
+                    de.time_filed = time_filed
+                de.date_filed = date_filed
+                de.pacer_sequence_number = (
+                    docket_entry.get("pacer_seq_no")
+                    or de.pacer_sequence_number
+                )
+                de.recap_sequence_number = docket_entry[
+                    "recap_sequence_number"
+                ]
+                des_returned.append(de)
+                if de_created:
+                    des_to_create.append(de)
+                    content_updated = True
+                    known_filing_dates.append(de.date_filed)
+                else:
+                    des_to_update.append(de)
+
+                params = {}
+                if docket_entry.get("attachment_number"):
+                    params["document_type"] = RECAPDocument.ATTACHMENT
+                    params["attachment_number"] = docket_entry[
+                        "attachment_number"
+                    ]
+                else:
+                    params["document_type"] = RECAPDocument.PACER_DOCUMENT
+                if (
+                    de_created is False
+                    and appellate_court_id_exists
+                    and any(
+                        rd.document_type == RECAPDocument.ATTACHMENT
+                        for rd in de_rds
+                    )
+                ):
+                    params["document_type"] = RECAPDocument.ATTACHMENT
+                    params["pacer_doc_id"] = docket_entry["pacer_doc_id"]
+
+                rd = None
+                if de_created is False:
+                    get_params = deepcopy(params)
+                    del get_params["document_type"]
+                    if not appellate_court_id_exists:
+                        get_params["pacer_doc_id"] = docket_entry[
+                            "pacer_doc_id"
+                        ]
+                    matched_rds = [
+                        rd for rd in de_rds if matches_lookup(rd, get_params)
+                    ]
+                    if len(matched_rds) > 1:
+                        return None
+                    if matched_rds:
+                        rd = matched_rds[0]
+                        rds_updated.append(rd)
+                    elif not appellate_court_id_exists:
+                        # Check for documents with a bad pacer_doc_id
+                        matched_rds = [
+                            rd for rd in de_rds if matches_lookup(rd, params)
+                        ]
+                        if len(matched_rds) > 1:
+                            return None
+                        rd = matched_rds[0] if matched_rds else None
+                if rd is None:
+                    params["pacer_doc_id"] = docket_entry["pacer_doc_id"]
+                    rd = RECAPDocument(
+                        docket_entry=de,
+                        document_number=docket_entry["document_number"] or "",
+                        is_available=False,
+                        **params,
+                    )
+                    try:
+                        rd.clean()
+                    except ValidationError:
+                        continue
+                    if has_conflicting_rd(rd, de_rds):
+                        return None
+                    if rd.pacer_doc_id is None:
+                        rd.pacer_doc_id = ""
+                    rds_to_create.append(rd)
+                    rds_created.append(rd)
+
+                if docket_entry["pacer_doc_id"]:
+                    rd.pacer_doc_id = docket_entry["pacer_doc_id"]
+                description = docket_entry.get("short_description")
+                if (
+                    rd.document_type == RECAPDocument.PACER_DOCUMENT
+                    and description
+                ):
+                    rd.description = description
+                elif description:
+                    main_rds = sorted(
+                        (
+                            main_rd
+                            for main_rd in de_rds
+                            if main_rd.document_type
+                            == RECAPDocument.PACER_DOCUMENT
+                        ),
+                        key=lambda main_rd: main_rd.document_number,
+                    )
+                    if main_rds:
+                        rd_pd = main_rds[0]
+                        if rd_pd.attachment_number is not None:
+                            continue
+                        if rd_pd.description != description:
+                            rd_pd.description = description
+                            if has_conflicting_rd(rd_pd, de_rds):
+                                return None
+                            if rd_pd.pacer_doc_id is None:
+                                rd_pd.pacer_doc_id = ""
+                            rds_to_update[rd_pd.pk] = rd_pd
+                rd.document_number = docket_entry["document_number"] or ""
+                if rd.pk:
+                    try:
+                        rd.clean()
+                    except ValidationError:
+                        continue
+                    if has_conflicting_rd(rd, de_rds):
+                        return None
+                    rds_to_update[rd.pk] = rd
+                else:
+                    de_rds.append(rd)
+                if rd.pacer_doc_id is None:
+                    rd.pacer_doc_id = ""
+                rds_to_tag.append(rd)
+        except ValidationError:
+            # A value that can't be cast to the field type.
+            return None
+
+        modified = now()
+        for instance in [*des_to_update, *rds_to_update.values()]:
+            instance.date_modified = modified
+        DocketEntry.objects.bulk_create(des_to_create)
+        DocketEntry.objects.bulk_update(
+            des_to_update,
+            [
+                "description",
+                "time_filed",
+                "date_filed",
+                "pacer_sequence_number",
+                "recap_sequence_number",
+                "date_modified",
+            ],
+        )
+        RECAPDocument.objects.bulk_create(rds_to_create)
+        RECAPDocument.objects.bulk_update(
+            rds_to_update.values(),
+            [
+                "pacer_doc_id",
+                "description",
+                "document_number",
+                "date_modified",
+            ],
+        )
+        for tag in tags or []:
+            tag.docket_entries.through.objects.bulk_create(
+                [
+                    tag.docket_entries.through(
+                        docketentry_id=de.pk, tag_id=tag.pk
+                    )
+                    for de in des_returned
+                ],
+                ignore_conflicts=True,
+            )
+            tag.recap_documents.through.objects.bulk_create(
+                [
+                    tag.recap_documents.through(
+                        recapdocument_id=rd.pk, tag_id=tag.pk
+                    )
+                    for rd in rds_to_tag
+                ],
+                ignore_conflicts=True,
+            )
+        send_bulk_post_save(des_to_create, created=True)
+        send_bulk_post_save(des_to_update, created=False)
+        send_bulk_post_save(rds_to_create, created=True)
+        send_bulk_post_save(list(rds_to_update.values()), created=False)
+
+        known_filing_dates = set(filter(None, known_filing_dates))
+        if known_filing_dates:
+            Docket.objects.filter(pk=d.pk).update(
+                date_last_filing=max(known_filing_dates)
+            )
+
+    return (des_returned, rds_updated), rds_created, content_updated
+
+
+@coalesce_es_updates
 async def add_docket_entries(
     d: Docket,
     docket_entries: list[dict[str, Any]],
@@ -908,6 +1269,17 @@ async def add_docket_entries(
     calculate_recap_sequence_numbers(docket_entries, d.court_id)
 
     is_scotus = d.court_id == "scotus"
+    bulk_merge_min_entries = settings.RECAP_BULK_MERGE_MIN_ENTRIES
+    if (
+        bulk_merge_min_entries
+        and len(docket_entries) >= bulk_merge_min_entries
+        and not do_not_update_existing
+        and not is_scotus
+    ):
+        response = await add_docket_entries_in_bulk(d, docket_entries, tags)
+        if response is not None:
+            return response
+
     known_filing_dates = [d.date_last_filing]
     for docket_entry in docket_entries:
         response = await get_or_make_docket_entry(d, docket_entry)
@@ -1275,6 +1647,326 @@ def disassociate_extraneous_entities(
     ).delete()
 
 
+def get_or_create_docket_parties(d, parties):
+    """Get the Party objects for the party names in the docket data, creating
+    the ones that aren't on the docket yet.
+
+    Like add_attorney does for attorneys, a name is matched to the parties
+    with that name on the docket, picking the earliest if there are many.
+
+    :param d: The docket to update
+    :param parties: The normalized parties from the docket data.
+    :return: A dict mapping each party name to its Party object.
+    """
+    names = list(dict.fromkeys(party["name"] for party in parties))
+    parties_by_name = {}
+    existing_parties = (
+        Party.objects.filter(name__in=names, party_types__docket=d)
+        .distinct()
+        .order_by("date_created", "pk")
+    )
+    for p in existing_parties:
+        parties_by_name.setdefault(p.name, p)
+    new_parties = Party.objects.bulk_create(
+        [Party(name=name) for name in names if name not in parties_by_name]
+    )
+    parties_by_name.update({p.name: p for p in new_parties})
+    return parties_by_name
+
+
+def update_party_types_in_bulk(d, parties, parties_by_name):
+    """Create or update the PartyType of every party in the docket data.
+
+    When a party appears more than once with the same type, the values of its
+    last appearance win, as they would if the parties were saved one by one.
+
+    :param d: The docket to update
+    :param parties: The normalized parties from the docket data.
+    :param parties_by_name: A dict mapping party names to Party objects.
+    :return: A dict mapping (party ID, type name) keys to PartyType objects.
+    """
+    party_types = {
+        (pt.party_id, pt.name): pt
+        for pt in PartyType.objects.filter(
+            docket=d, party__in=parties_by_name.values()
+        )
+    }
+    pts_to_create = {}
+    pts_to_update = {}
+    for party in parties:
+        key = (parties_by_name[party["name"]].pk, party["type"])
+        update_dict = {
+            "extra_info": party.get("extra_info", ""),
+            "date_terminated": party.get("date_terminated"),
+        }
+        criminal_data = party.get("criminal_data")
+        if criminal_data:
+            update_dict["highest_offense_level_opening"] = criminal_data[
+                "highest_offense_level_opening"
+            ]
+            update_dict["highest_offense_level_terminated"] = criminal_data[
+                "highest_offense_level_terminated"
+            ]
+
+        pt = party_types.get(key)
+        if pt is None:
+            pt = PartyType(
+                docket=d, party_id=key[0], name=party["type"], **update_dict
+            )
+            party_types[key] = pts_to_create[key] = pt
+        elif any(getattr(pt, k) != v for k, v in update_dict.items()):
+            for k, v in update_dict.items():
+                setattr(pt, k, v)
+            if pt.pk:
+                pts_to_update[key] = pt
+
+    PartyType.objects.bulk_create(pts_to_create.values())
+    PartyType.objects.bulk_update(
+        pts_to_update.values(),
+        [
+            "extra_info",
+            "date_terminated",
+            "highest_offense_level_opening",
+            "highest_offense_level_terminated",
+        ],
+    )
+    return party_types
+
+
+def update_criminal_data_in_bulk(parties, parties_by_name, party_types):
+    """Replace the criminal counts and complaints of the party types that have
+    them in the docket data.
+
+    Counts and complaints that are identical to the ones in the database are
+    left alone.
+
+    :param parties: The normalized parties from the docket data.
+    :param parties_by_name: A dict mapping party names to Party objects.
+    :param party_types: A dict mapping (party ID, type name) keys to
+    PartyType objects, as returned by update_party_types_in_bulk.
+    :return: None
+    """
+    new_counts = {}
+    new_complaints = {}
+    for party in parties:
+        criminal_data = party.get("criminal_data")
+        if not criminal_data:
+            continue
+        pt = party_types[(parties_by_name[party["name"]].pk, party["type"])]
+        if criminal_data["counts"]:
+            new_counts[pt.pk] = [
+                CriminalCount(
+                    party_type=pt,
+                    name=criminal_count["name"],
+                    disposition=criminal_count["disposition"],
+                    status=CriminalCount.normalize_status(
+                        criminal_count["status"]
+                    ),
+                )
+                for criminal_count in criminal_data["counts"]
+            ]
+        if criminal_data["complaints"]:
+            new_complaints[pt.pk] = [
+                CriminalComplaint(
+                    party_type=pt,
+                    name=complaint["name"],
+                    disposition=complaint["disposition"],
+                )
+                for complaint in criminal_data["complaints"]
+            ]
+
+    for model, new_objects, fields in (
+        (CriminalCount, new_counts, ["name", "disposition", "status"]),
+        (CriminalComplaint, new_complaints, ["name", "disposition"]),
+    ):
+        if not new_objects:
+            continue
+        old_values = defaultdict(list)
+        for values in (
+            model.objects.filter(party_type_id__in=new_objects.keys())
+            .order_by("pk")
+            .values_list("party_type_id", *fields)
+        ):
+            old_values[values[0]].append(values[1:])
+        changed_pt_ids = [
+            pt_id
+            for pt_id, objects in new_objects.items()
+            if old_values[pt_id]
+            != [tuple(getattr(o, f) for f in fields) for o in objects]
+        ]
+        model.objects.filter(party_type_id__in=changed_pt_ids).delete()
+        model.objects.bulk_create(
+            [o for pt_id in changed_pt_ids for o in new_objects[pt_id]]
+        )
+
+
+def get_or_create_attorney_organizations(orgs_info):
+    """Get the AttorneyOrganization objects for a list of lookup keys,
+    creating the ones that don't exist yet.
+
+    :param orgs_info: A dict mapping lookup keys to the organization info
+    returned by normalize_attorney_contact.
+    :return: A dict mapping lookup keys to AttorneyOrganization IDs.
+    """
+    org_ids = dict(
+        AttorneyOrganization.objects.filter(
+            lookup_key__in=orgs_info.keys()
+        ).values_list("lookup_key", "pk")
+    )
+    missing_keys = orgs_info.keys() - org_ids.keys()
+    if missing_keys:
+        # Organizations may be created by another process in the meantime.
+        AttorneyOrganization.objects.bulk_create(
+            [AttorneyOrganization(**orgs_info[key]) for key in missing_keys],
+            ignore_conflicts=True,
+        )
+        org_ids.update(
+            AttorneyOrganization.objects.filter(
+                lookup_key__in=missing_keys
+            ).values_list("lookup_key", "pk")
+        )
+    return org_ids
+
+
+def add_attorneys_in_bulk(d, parties, parties_by_name):
+    """Add or update the attorneys of every party in the docket data.
+
+    This does the same as calling add_attorney for every attorney of every
+    party, with a fixed number of queries: attorneys are matched by name
+    among the attorneys on the docket, their contact info is updated with
+    their last appearance, and the roles of every attorney and party pair are
+    replaced with the roles of its last appearance. Only the roles that
+    changed are deleted or created.
+
+    :param d: The docket to update
+    :param parties: The normalized parties from the docket data.
+    :param parties_by_name: A dict mapping party names to Party objects.
+    :return: A set of the IDs of the attorneys in the docket data.
+    """
+    attorney_entries = [
+        (atty, parties_by_name[party["name"]])
+        for party in parties
+        for atty in party.get("attorneys", [])
+    ]
+    if not attorney_entries:
+        return set()
+
+    names = list(dict.fromkeys(atty["name"] for atty, _ in attorney_entries))
+    attorneys_by_name = {}
+    existing_attorneys = (
+        Attorney.objects.filter(name__in=names, roles__docket=d)
+        .distinct()
+        .order_by("date_created", "pk")
+    )
+    for a in existing_attorneys:
+        attorneys_by_name.setdefault(a.name, a)
+
+    contact_fields = ["contact_raw", "email", "phone", "fax"]
+    attorneys_to_update = {}
+    orgs_info = {}
+    new_associations = set()
+    new_roles = {}
+    for atty, p in attorney_entries:
+        atty_org_info, atty_info = normalize_attorney_contact(
+            atty["contact"], fallback_name=atty["name"]
+        )
+        a = attorneys_by_name.get(atty["name"])
+        if a is None:
+            # Couldn't find the attorney. Make one.
+            a = Attorney(name=atty["name"], contact_raw=atty["contact"])
+            attorneys_by_name[atty["name"]] = a
+
+        if atty["contact"]:
+            if atty_org_info:
+                orgs_info.setdefault(
+                    atty_org_info["lookup_key"], atty_org_info
+                )
+                new_associations.add(
+                    (atty["name"], atty_org_info["lookup_key"])
+                )
+            contact = {"contact_raw": atty["contact"], **atty_info}
+            if any(getattr(a, f) != contact[f] for f in contact_fields):
+                for f in contact_fields:
+                    setattr(a, f, contact[f])
+                if a.pk:
+                    attorneys_to_update[a.pk] = a
+
+        roles = atty["roles"] or [{"role": Role.UNKNOWN, "date_action": None}]
+        new_roles[(atty["name"], p.pk)] = roles
+
+    Attorney.objects.bulk_create(
+        [a for a in attorneys_by_name.values() if a.pk is None]
+    )
+    modified = now()
+    for a in attorneys_to_update.values():
+        a.date_modified = modified
+    Attorney.objects.bulk_update(
+        attorneys_to_update.values(), [*contact_fields, "date_modified"]
+    )
+    attorney_ids = {a.pk for a in attorneys_by_name.values()}
+
+    # Associate the attorneys with their organizations.
+    org_ids = get_or_create_attorney_organizations(orgs_info)
+    existing_associations = set(
+        AttorneyOrganizationAssociation.objects.filter(
+            docket=d, attorney_id__in=attorney_ids
+        ).values_list("attorney_id", "attorney_organization_id")
+    )
+    AttorneyOrganizationAssociation.objects.bulk_create(
+        [
+            AttorneyOrganizationAssociation(
+                attorney_id=attorney_id,
+                attorney_organization_id=org_id,
+                docket=d,
+            )
+            for attorney_id, org_id in {
+                (attorneys_by_name[name].pk, org_ids[lookup_key])
+                for name, lookup_key in new_associations
+                if lookup_key in org_ids
+            }
+            - existing_associations
+        ],
+        ignore_conflicts=True,
+    )
+
+    # Replace the roles of every attorney and party pair, keeping the ones
+    # that didn't change.
+    role_fields = ["role", "date_action", "role_raw"]
+    new_roles = {
+        (attorneys_by_name[name].pk, party_id): [
+            Role(
+                attorney_id=attorneys_by_name[name].pk,
+                party_id=party_id,
+                docket=d,
+                **atty_role,
+            )
+            for atty_role in roles
+        ]
+        for (name, party_id), roles in new_roles.items()
+    }
+    old_roles = defaultdict(lambda: defaultdict(list))
+    for role in Role.objects.filter(docket=d, attorney_id__in=attorney_ids):
+        key = (role.attorney_id, role.party_id)
+        if key in new_roles:
+            values = tuple(getattr(role, f) for f in role_fields)
+            old_roles[key][values].append(role.pk)
+    roles_to_delete = []
+    roles_to_create = []
+    for key, roles in new_roles.items():
+        unmatched_roles = old_roles[key]
+        for role in roles:
+            values = tuple(getattr(role, f) for f in role_fields)
+            if unmatched_roles[values]:
+                unmatched_roles[values].pop()
+            else:
+                roles_to_create.append(role)
+        for pks in unmatched_roles.values():
+            roles_to_delete.extend(pks)
+    Role.objects.filter(pk__in=roles_to_delete).delete()
+    Role.objects.bulk_create(roles_to_create)
+    return attorney_ids
+
+
 @transaction.atomic
 # Retry on transaction deadlocks; see #814.
 @retry(OperationalError, tries=2, delay=1, backoff=1, logger=logger)
@@ -1305,84 +1997,13 @@ def add_parties_and_attorneys(d, parties):
 
     normalize_attorney_roles(local_parties)
 
-    updated_parties = set()
-    updated_attorneys = set()
-    for party in local_parties:
-        ps = Party.objects.filter(
-            name=party["name"], party_types__docket=d
-        ).distinct()
-        count = ps.count()
-        if count == 0:
-            try:
-                p = Party.objects.create(name=party["name"])
-            except IntegrityError:
-                # Race condition. Object was created after our get and before
-                # our create. Try to get it again.
-                ps = Party.objects.filter(
-                    name=party["name"], party_types__docket=d
-                ).distinct()
-                count = ps.count()
-        if count == 1:
-            p = ps[0]
-        elif count >= 2:
-            p = ps.earliest("date_created")
-        updated_parties.add(p.pk)
-
-        # If the party type doesn't exist, make a new one.
-        pts = p.party_types.filter(docket=d, name=party["type"])
-        criminal_data = party.get("criminal_data")
-        update_dict = {
-            "extra_info": party.get("extra_info", ""),
-            "date_terminated": party.get("date_terminated"),
-        }
-        if criminal_data:
-            update_dict["highest_offense_level_opening"] = criminal_data[
-                "highest_offense_level_opening"
-            ]
-            update_dict["highest_offense_level_terminated"] = criminal_data[
-                "highest_offense_level_terminated"
-            ]
-        if pts.exists():
-            pts.update(**update_dict)
-            pt = pts[0]
-        else:
-            pt = PartyType.objects.create(
-                docket=d, party=p, name=party["type"], **update_dict
-            )
-
-        # Criminal counts and complaints
-        if criminal_data and criminal_data["counts"]:
-            CriminalCount.objects.filter(party_type=pt).delete()
-            CriminalCount.objects.bulk_create(
-                [
-                    CriminalCount(
-                        party_type=pt,
-                        name=criminal_count["name"],
-                        disposition=criminal_count["disposition"],
-                        status=CriminalCount.normalize_status(
-                            criminal_count["status"]
-                        ),
-                    )
-                    for criminal_count in criminal_data["counts"]
-                ]
-            )
-
-        if criminal_data and criminal_data["complaints"]:
-            CriminalComplaint.objects.filter(party_type=pt).delete()
-            CriminalComplaint.objects.bulk_create(
-                [
-                    CriminalComplaint(
-                        party_type=pt,
-                        name=complaint["name"],
-                        disposition=complaint["disposition"],
-                    )
-                    for complaint in criminal_data["complaints"]
-                ]
-            )
-
-        # Attorneys
-        for atty in party.get("attorneys", []):
-            updated_attorneys.add(add_attorney(atty, p, d))
+    parties_by_name = get_or_create_docket_parties(d, local_parties)
+    party_types = update_party_types_in_bulk(d, local_parties, parties_by_name)
+    update_criminal_data_in_bulk(local_parties, parties_by_name, party_types)
+    updated_attorneys = add_attorneys_in_bulk(
+        d, local_parties, parties_by_name
+    )
+    updated_parties = {p.pk for p in parties_by_name.values()}
 
     disassociate_extraneous_entities(
         d, local_parties, updated_parties, updated_attorneys
@@ -1692,6 +2313,7 @@ async def clean_duplicate_attachment_entries(
         await keep_latest_rd_document(duplicate_rd_queryset)
 
 
+@coalesce_es_updates
 async def merge_attachment_page_data(
     court: Court,
     pacer_case_id: int,
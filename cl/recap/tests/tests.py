@@ -19,8 +19,9 @@ from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
-from django.db import transaction
+from django.db import connection, transaction
 from django.test import RequestFactory, SimpleTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now
 from juriscraper.pacer import PacerRssFeed
@@ -89,11 +90,14 @@ from cl.recap.mergers import (
     add_attorney,
     add_docket_entries,
     add_parties_and_attorneys,
+    disassociate_extraneous_entities,
     find_docket_object,
     get_data_from_appellate_att_report,
     get_data_from_att_report,
+    get_or_make_docket_entry,
     get_order_of_docket,
     merge_attachment_page_data,
+    normalize_attorney_roles,
     normalize_long_description,
     update_case_names,
     update_docket_appellate_metadata,
@@ -141,6 +145,7 @@ from cl.search.models import (
     DocketEntry,
     OriginatingCourtInformation,
     RECAPDocument,
+    Tag,
 )
 from cl.tests import fakes
 from cl.tests.cases import TestCase
@@ -4530,6 +4535,342 @@ class TerminatedEntitiesTest(TestCase):
         self.assertEqual(self.d.parties.count(), count_before)
 
 
+class AddPartiesAndAttorneysInBulkTest(TestCase):
+    """Does the set-based party and attorney merge produce the same records
+    as adding parties and attorneys one by one?"""
+
+    def setUp(self) -> None:
+        contact = (
+            "Lane Powell LLC\n"
+            "301 W. Nothern Lights Blvd., Suite 301\n"
+            "Anchorage, AK 99503-2648\n"
+            "907-276-2631\n"
+            "Email: jamiesonb@lanepowell.com\n"
+        )
+        self.parties = [
+            {
+                "name": "Acme Corp",
+                "type": "Plaintiff",
+                "extra_info": "",
+                "date_terminated": None,
+                "attorneys": [
+                    {
+                        "name": "Brewster H. Jamieson",
+                        "contact": contact,
+                        "roles": ["LEAD ATTORNEY", "ATTORNEY TO BE NOTICED"],
+                    },
+                    {"name": "Jane Doe", "contact": "", "roles": []},
+                ],
+            },
+            {
+                "name": "John Smith",
+                "type": "Defendant",
+                "extra_info": "An individual",
+                "date_terminated": None,
+                "attorneys": [
+                    {
+                        "name": "Brewster H. Jamieson",
+                        "contact": "",
+                        "roles": ["TERMINATED: 03/12/2013"],
+                    },
+                ],
+                "criminal_data": {
+                    "highest_offense_level_opening": "Felony",
+                    "highest_offense_level_terminated": "",
+                    "counts": [
+                        {
+                            "name": "21:846=MD.F",
+                            "disposition": "",
+                            "status": "pending",
+                        },
+                    ],
+                    "complaints": [
+                        {"name": "8:1326 Reentry", "disposition": ""},
+                    ],
+                },
+            },
+            {
+                "name": "Acme Corp",
+                "type": "Counter-Defendant",
+                "extra_info": "",
+                "date_terminated": None,
+                "attorneys": [
+                    {
+                        "name": "Jane Doe",
+                        "contact": contact.replace("jamiesonb", "doej"),
+                        "roles": ["PRO HAC VICE"],
+                    },
+                ],
+            },
+            # The same party and type again. Its values and criminal data
+            # replace the ones above.
+            {
+                "name": "John Smith",
+                "type": "Defendant",
+                "extra_info": "An individual, pro se",
+                "date_terminated": None,
+                "attorneys": [],
+                "criminal_data": {
+                    "highest_offense_level_opening": "Felony",
+                    "highest_offense_level_terminated": "Felony",
+                    "counts": [
+                        {
+                            "name": "21:846=MD.F",
+                            "disposition": "Dismissed",
+                            "status": "terminated",
+                        },
+                        {
+                            "name": "18:924C.F",
+                            "disposition": "Imprisonment: 60 months",
+                            "status": "terminated",
+                        },
+                    ],
+                    "complaints": [],
+                },
+            },
+        ]
+
+    def make_docket(self) -> Docket:
+        """Make a docket where Acme Corp has a plaintiff type and a disbarred
+        attorney that is in the new data, and John Smith has a criminal count
+        and complaint that are not.
+        """
+        d = Docket.objects.create(
+            source=0, court_id="scotus", pacer_case_id="asdf"
+        )
+        p = Party.objects.create(name="Acme Corp")
+        PartyType.objects.create(docket=d, party=p, name="Plaintiff")
+        a = Attorney.objects.create(name="Brewster H. Jamieson")
+        Role.objects.create(attorney=a, party=p, docket=d, role=Role.DISBARRED)
+        p = Party.objects.create(name="John Smith")
+        pt = PartyType.objects.create(docket=d, party=p, name="Defendant")
+        CriminalCount.objects.create(
+            party_type=pt,
+            name="18:2113A.F",
+            disposition="",
+            status=CriminalCount.PENDING,
+        )
+        CriminalComplaint.objects.create(
+            party_type=pt, name="18:2113A", disposition=""
+        )
+        return d
+
+    def add_parties_and_attorneys_by_row(self, d: Docket) -> None:
+        """Add the parties to a docket one by one, as add_parties_and_attorneys
+        used to do.
+        """
+        parties = deepcopy(self.parties)
+        normalize_attorney_roles(parties)
+        updated_parties = set()
+        updated_attorneys = set()
+        for party in parties:
+            ps = Party.objects.filter(
+                name=party["name"], party_types__docket=d
+            ).distinct()
+            if ps.exists():
+                p = ps.earliest("date_created")
+            else:
+                p = Party.objects.create(name=party["name"])
+            updated_parties.add(p.pk)
+
+            pts = p.party_types.filter(docket=d, name=party["type"])
+            criminal_data = party.get("criminal_data")
+            update_dict = {
+                "extra_info": party.get("extra_info", ""),
+                "date_terminated": party.get("date_terminated"),
+            }
+            if criminal_data:
+                update_dict["highest_offense_level_opening"] = criminal_data[
+                    "highest_offense_level_opening"
+                ]
+                update_dict["highest_offense_level_terminated"] = (
+                    criminal_data["highest_offense_level_terminated"]
+                )
+            if pts.exists():
+                pts.update(**update_dict)
+                pt = pts[0]
+            else:
+                pt = PartyType.objects.create(
+                    docket=d, party=p, name=party["type"], **update_dict
+                )
+
+            if criminal_data and criminal_data["counts"]:
+                CriminalCount.objects.filter(party_type=pt).delete()
+                for criminal_count in criminal_data["counts"]:
+                    CriminalCount.objects.create(
+                        party_type=pt,
+                        name=criminal_count["name"],
+                        disposition=criminal_count["disposition"],
+                        status=CriminalCount.normalize_status(
+                            criminal_count["status"]
+                        ),
+                    )
+            if criminal_data and criminal_data["complaints"]:
+                CriminalComplaint.objects.filter(party_type=pt).delete()
+                for complaint in criminal_data["complaints"]:
+                    CriminalComplaint.objects.create(
+                        party_type=pt,
+                        name=complaint["name"],
+                        disposition=complaint["disposition"],
+                    )
+
+            for atty in party.get("attorneys", []):
+                updated_attorneys.add(add_attorney(atty, p, d))
+
+        disassociate_extraneous_entities(
+            d, parties, updated_parties, updated_attorneys
+        )
+
+    @staticmethod
+    def get_records(d: Docket) -> dict[str, set[tuple]]:
+        return {
+            "party_types": set(
+                PartyType.objects.filter(docket=d).values_list(
+                    "party__name",
+                    "name",
+                    "extra_info",
+                    "date_terminated",
+                    "highest_offense_level_opening",
+                    "highest_offense_level_terminated",
+                )
+            ),
+            "criminal_counts": set(
+                CriminalCount.objects.filter(party_type__docket=d).values_list(
+                    "party_type__party__name",
+                    "party_type__name",
+                    "name",
+                    "disposition",
+                    "status",
+                )
+            ),
+            "criminal_complaints": set(
+                CriminalComplaint.objects.filter(
+                    party_type__docket=d
+                ).values_list(
+                    "party_type__party__name",
+                    "party_type__name",
+                    "name",
+                    "disposition",
+                )
+            ),
+            "roles": set(
+                Role.objects.filter(docket=d).values_list(
+                    "party__name",
+                    "attorney__name",
+                    "role",
+                    "date_action",
+                    "role_raw",
+                )
+            ),
+            "attorneys": set(
+                Attorney.objects.filter(roles__docket=d).values_list(
+                    "name", "contact_raw", "email", "phone", "fax"
+                )
+            ),
+            "associations": set(
+                AttorneyOrganizationAssociation.objects.filter(
+                    docket=d
+                ).values_list(
+                    "attorney__name", "attorney_organization__lookup_key"
+                )
+            ),
+        }
+
+    def test_parity_with_adding_by_row(self) -> None:
+        """Are the records the same as when adding parties one by one?"""
+        d_by_row = self.make_docket()
+        self.add_parties_and_attorneys_by_row(d_by_row)
+        d_in_bulk = self.make_docket()
+        add_parties_and_attorneys(d_in_bulk, self.parties)
+
+        self.assertEqual(
+            self.get_records(d_in_bulk), self.get_records(d_by_row)
+        )
+        # The existing party and attorney are reused.
+        self.assertEqual(d_in_bulk.parties.distinct().count(), 2)
+        self.assertEqual(
+            Attorney.objects.filter(roles__docket=d_in_bulk)
+            .distinct()
+            .count(),
+            2,
+        )
+        self.assertFalse(
+            Role.objects.filter(docket=d_in_bulk, role=Role.DISBARRED).exists()
+        )
+        # The counts of the last appearance of John Smith replace the old
+        # count, while the complaint of its first appearance is kept.
+        records = self.get_records(d_in_bulk)
+        self.assertEqual(
+            {count[2] for count in records["criminal_counts"]},
+            {"21:846=MD.F", "18:924C.F"},
+        )
+        self.assertEqual(
+            {complaint[2] for complaint in records["criminal_complaints"]},
+            {"8:1326 Reentry"},
+        )
+
+    def test_unchanged_records_are_kept(self) -> None:
+        """Are unchanged records left alone when the same data is merged
+        again?"""
+        d = self.make_docket()
+        add_parties_and_attorneys(d, self.parties)
+        role_ids = set(Role.objects.filter(docket=d).values_list("pk"))
+        party_type_ids = set(
+            PartyType.objects.filter(docket=d).values_list("pk")
+        )
+        count_ids = set(
+            CriminalCount.objects.filter(party_type__docket=d).values_list(
+                "pk"
+            )
+        )
+
+        add_parties_and_attorneys(d, self.parties)
+        self.assertEqual(
+            set(Role.objects.filter(docket=d).values_list("pk")), role_ids
+        )
+        self.assertEqual(
+            set(PartyType.objects.filter(docket=d).values_list("pk")),
+            party_type_ids,
+        )
+        self.assertEqual(
+            set(
+                CriminalCount.objects.filter(party_type__docket=d).values_list(
+                    "pk"
+                )
+            ),
+            count_ids,
+        )
+
+    def test_query_count_does_not_grow_with_parties(self) -> None:
+        """Is the number of queries independent of the number of parties?"""
+        query_counts = []
+        for party_count in (1, 20):
+            d = Docket.objects.create(
+                source=0, court_id="scotus", pacer_case_id="asdf"
+            )
+            parties = [
+                {
+                    "name": f"Party {i}",
+                    "type": "Plaintiff",
+                    "extra_info": "",
+                    "date_terminated": None,
+                    "attorneys": [
+                        {
+                            "name": f"Attorney {i}",
+                            "contact": "",
+                            "roles": ["LEAD ATTORNEY"],
+                        }
+                    ],
+                }
+                for i in range(party_count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                add_parties_and_attorneys(d, parties)
+            query_counts.append(len(queries))
+            self.assertEqual(d.parties.count(), party_count)
+        self.assertEqual(query_counts[0], query_counts[1])
+
+
 @mock.patch(
     "cl.recap_rss.tasks.rss_cache_prefix",
     return_value="rss_hash_test",
@@ -7670,6 +8011,205 @@ class RecapFetchWebhooksTest(TestCase):
         self.assertNotEqual(content["payload"]["date_completed"], None)
 
 
+class BulkDocketEntriesMergeTest(TestCase):
+    """Confirm that merging docket entries in bulk produces the same results
+    as merging them one by one.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.court = CourtFactory(id="canb", jurisdiction="FB")
+        cls.court_appellate = CourtFactory(id="ca1", jurisdiction="F")
+        cls.tag = Tag.objects.create(name="bulk-merge-test")
+        cls.initial_entries = [
+            DocketEntryDataFactory(
+                date_filed=date(2021, 10, 15),
+                document_number=1,
+                pacer_doc_id="04505578691",
+                short_description="Complaint",
+            ),
+            DocketEntryDataFactory(
+                date_filed=date(2021, 10, 16),
+                document_number=2,
+                pacer_doc_id="04505578692",
+                short_description="Motion",
+            ),
+        ]
+        cls.updated_entries = [
+            DocketEntryDataFactory(
+                date_filed=date(2021, 10, 15),
+                document_number=1,
+                pacer_doc_id="04505578691",
+                short_description="Amended Complaint",
+            ),
+            # A bad pacer_doc_id is fixed.
+            DocketEntryDataFactory(
+                date_filed=date(2021, 10, 17),
+                document_number=2,
+                pacer_doc_id="04505578699",
+                short_description="Motion",
+            ),
+            DocketEntryDataFactory(
+                date_filed=date(2021, 10, 18),
+                document_number=3,
+                pacer_doc_id="04505578693",
+                short_description="Order",
+            ),
+        ]
+
+    def merge_and_snapshot(
+        self,
+        court: Court,
+        docket_entries: list[dict],
+        bulk_merge_min_entries: int,
+        initial_entries: list[dict] | None = None,
+    ) -> tuple[dict, int]:
+        """Merge docket entries into a new docket and take a snapshot of the
+        merged content.
+
+        :param court: The court of the docket.
+        :param docket_entries: The docket entries to merge.
+        :param bulk_merge_min_entries: The RECAP_BULK_MERGE_MIN_ENTRIES value.
+        :param initial_entries: Docket entries to merge one by one before.
+        :return: A two tuple of the snapshot and the number of entries merged
+        one by one.
+        """
+        d = DocketFactory(
+            source=Docket.RECAP, court=court, pacer_case_id="104490"
+        )
+        if initial_entries:
+            async_to_sync(add_docket_entries)(d, deepcopy(initial_entries))
+            RECAPDocumentFactory(
+                docket_entry=DocketEntry.objects.get(docket=d, entry_number=1),
+                document_type=RECAPDocument.ATTACHMENT,
+                attachment_number=1,
+                pacer_doc_id="04505578694",
+                document_number="1",
+                description="Exhibit",
+            )
+
+        with (
+            self.settings(RECAP_BULK_MERGE_MIN_ENTRIES=bulk_merge_min_entries),
+            mock.patch(
+                "cl.recap.mergers.get_or_make_docket_entry",
+                wraps=get_or_make_docket_entry,
+            ) as mock_get_or_make_de,
+        ):
+            (des_returned, rds_updated), rds_created, content_updated = (
+                async_to_sync(add_docket_entries)(
+                    d, deepcopy(docket_entries), tags=[self.tag]
+                )
+            )
+
+        d.refresh_from_db()
+        snapshot = {
+            "date_last_filing": d.date_last_filing,
+            "des_returned": [de.entry_number for de in des_returned],
+            "rds_updated": [str(rd.document_number) for rd in rds_updated],
+            "rds_created": [str(rd.document_number) for rd in rds_created],
+            "content_updated": content_updated,
+            "docket_entries": list(
+                DocketEntry.objects.filter(docket=d)
+                .order_by("entry_number")
+                .values(
+                    "entry_number",
+                    "description",
+                    "date_filed",
+                    "time_filed",
+                    "pacer_sequence_number",
+                    "recap_sequence_number",
+                )
+            ),
+            "recap_documents": list(
+                RECAPDocument.objects.filter(docket_entry__docket=d)
+                .order_by(
+                    "docket_entry__entry_number",
+                    "document_type",
+                    "attachment_number",
+                )
+                .values(
+                    "docket_entry__entry_number",
+                    "document_number",
+                    "attachment_number",
+                    "document_type",
+                    "pacer_doc_id",
+                    "description",
+                    "is_available",
+                )
+            ),
+            "tagged_des": DocketEntry.objects.filter(
+                docket=d, tags=self.tag
+            ).count(),
+            "tagged_rds": RECAPDocument.objects.filter(
+                docket_entry__docket=d, tags=self.tag
+            ).count(),
+        }
+        return snapshot, mock_get_or_make_de.call_count
+
+    def test_bulk_merge_new_entries(self):
+        """Can we create docket entries in bulk?"""
+        one_by_one, _ = self.merge_and_snapshot(
+            self.court, self.updated_entries, 0
+        )
+        in_bulk, one_by_one_count = self.merge_and_snapshot(
+            self.court, self.updated_entries, 1
+        )
+        self.assertEqual(one_by_one_count, 0, msg="Entries not merged in bulk")
+        self.assertEqual(len(in_bulk["recap_documents"]), 3)
+        self.assertEqual(in_bulk["tagged_rds"], 3)
+        self.assertEqual(one_by_one, in_bulk)
+
+    def test_bulk_merge_existing_entries(self):
+        """Can we update existing docket entries and documents in bulk,
+        including documents matched by a bad pacer_doc_id?
+        """
+        one_by_one, _ = self.merge_and_snapshot(
+            self.court, self.updated_entries, 0, self.initial_entries
+        )
+        in_bulk, one_by_one_count = self.merge_and_snapshot(
+            self.court, self.updated_entries, 1, self.initial_entries
+        )
+        self.assertEqual(one_by_one_count, 0, msg="Entries not merged in bulk")
+        self.assertEqual(in_bulk["rds_updated"], ["1"])
+        self.assertEqual(in_bulk["rds_created"], ["3"])
+        self.assertEqual(one_by_one, in_bulk)
+
+    def test_bulk_merge_appellate_entries(self):
+        """Can we merge appellate entries whose main document was converted
+        into an attachment in bulk?
+        """
+        one_by_one, _ = self.merge_and_snapshot(
+            self.court_appellate, self.updated_entries, 0, self.initial_entries
+        )
+        in_bulk, one_by_one_count = self.merge_and_snapshot(
+            self.court_appellate, self.updated_entries, 1, self.initial_entries
+        )
+        self.assertEqual(one_by_one_count, 0, msg="Entries not merged in bulk")
+        self.assertEqual(one_by_one, in_bulk)
+
+    def test_bulk_merge_falls_back_to_one_by_one(self):
+        """Are entries that need duplicate handling or have no entry number
+        merged one by one with the same results?
+        """
+        docket_entries = [
+            *self.updated_entries,
+            DocketEntryDataFactory(
+                date_filed=date(2021, 10, 19),
+                document_number=None,
+                pacer_doc_id=None,
+                short_description="Minute Entry",
+            ),
+        ]
+        one_by_one, _ = self.merge_and_snapshot(
+            self.court, docket_entries, 0, self.initial_entries
+        )
+        in_bulk, one_by_one_count = self.merge_and_snapshot(
+            self.court, docket_entries, 1, self.initial_entries
+        )
+        self.assertEqual(one_by_one_count, len(docket_entries))
+        self.assertEqual(one_by_one, in_bulk)
+
+
 class CalculateRecapsSequenceNumbersTest(TestCase):
     """Test calculate_recap_sequence_numbers considering docket entries court
     timezone.
@@ -1,8 +1,10 @@
 import itertools
 import re
+from bisect import bisect_left
 from collections import defaultdict
 from difflib import Differ, SequenceMatcher
 
+import numpy as np
 from django.db import transaction
 from django.db.models import Count, F, Q, QuerySet
 from eyecite import clean_text
@@ -43,6 +45,16 @@ from cl.search.tasks import remove_document_from_es_index
 
 MIN_SEQUENCE_SIMILARITY_STRICT = 0.9
 MIN_SEQUENCE_SIMILARITY_LOOSE = 0.7
+# The number of words in a shingle
+SHINGLE_SIZE = 3
+# Shingle Jaccard similarities at or above MIN_SHINGLE_SIMILARITY are strictly
+# similar, if their shingle order similarity is too, and below
+# MAX_SHINGLE_DISSIMILARITY are too different. Only the texts in between are
+# compared with SequenceMatcher
+MIN_SHINGLE_SIMILARITY = 0.9
+MAX_SHINGLE_DISSIMILARITY = 0.2
+# The number of opinion texts whose MinHash signatures are computed at once
+MINHASH_BATCH_SIZE = 1000
 DRY_RUN = False
 
 
@@ -386,7 +398,88 @@ def clean_opinion_text(opinion: Opinion) -> str:
     return re.sub(r"\s+", " ", opinion.plain_text)
 
 
-def get_text_similarity(text1: str, text2: str) -> tuple[bool, float, float]:
+def get_shingle_list(text: str) -> list[str]:
+    """Get the word shingles of a cleaned opinion's text, in order
+
+    :param text: a cleaned opinion's text
+    :return: a list of SHINGLE_SIZE consecutive lowercase words. Texts shorter
+        than that are a single shingle
+    """
+    words = text.lower().split()
+    return [
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    ]
+
+
+def get_shingles(text: str) -> set[str]:
+    """Get the set of word shingles of a cleaned opinion's text
+
+    :param text: a cleaned opinion's text
+    :return: a set of SHINGLE_SIZE consecutive lowercase words. Texts shorter
+        than that are a single shingle
+    """
+    return set(get_shingle_list(text))
+
+
+def get_shingle_similarity(text1: str, text2: str) -> float:
+    """Compute the Jaccard similarity of the word shingles of 2 texts
+
+    Unlike SequenceMatcher, this takes linear time in the length of the texts
+    and doesn't depend on argument order
+
+    :param text1: a cleaned opinion's text
+    :param text2: another cleaned opinion's text
+    :return: the similarity, between 0 and 1
+    """
+    shingles1 = get_shingles(text1)
+    shingles2 = get_shingles(text2)
+    return len(shingles1 & shingles2) / len(shingles1 | shingles2)
+
+
+def get_shingle_order_similarity(text1: str, text2: str) -> float:
+    """Compute how many word shingles of 2 texts appear in the same order
+
+    Shingle Jaccard similarity ignores order and repetition, so a text that
+    repeats or moves around sections of another one looks the same as it.
+    The nth occurrence of a shingle in a text is matched to its nth
+    occurrence in the other, and the longest run of matches that keeps the
+    order of both texts is measured against the longest text. This takes
+    O(n log n) time in the number of shingles
+
+    :param text1: a cleaned opinion's text
+    :param text2: another cleaned opinion's text
+    :return: the similarity, between 0 and 1
+    """
+    shingles1 = get_shingle_list(text1)
+    shingles2 = get_shingle_list(text2)
+    # the position in text2 of each (shingle, occurrence number) pair
+    positions = {}
+    occurrences: defaultdict[str, int] = defaultdict(int)
+    for position, shingle in enumerate(shingles2):
+        positions[(shingle, occurrences[shingle])] = position
+        occurrences[shingle] += 1
+
+    occurrences.clear()
+    # tails[i] is the smallest last position in text2 of an ordered run of
+    # i + 1 matches
+    tails: list[int] = []
+    for shingle in shingles1:
+        position = positions.get((shingle, occurrences[shingle]))
+        occurrences[shingle] += 1
+        if position is None:
+            continue
+        i = bisect_left(tails, position)
+        if i == len(tails):
+            tails.append(position)
+        else:
+            tails[i] = position
+    return len(tails) / max(len(shingles1), len(shingles2))
+
+
+def get_text_similarity(
+    text1: str, text2: str
+) -> tuple[bool, bool, float, float, str]:
     """Check if the text from both opinions is the same or very similar
 
     A single character difference yields a 0.999 ratio
@@ -397,6 +490,13 @@ def get_text_similarity(text1: str, text2: str) -> tuple[bool, float, float]:
     Note that this in sensible to argument order, so we retry with inverted
     order if the first run fails
 
+    SequenceMatcher is quadratic in the worst case, so it only runs when the
+    shingle similarity of the texts is between MAX_SHINGLE_DISSIMILARITY and
+    MIN_SHINGLE_SIMILARITY, or when it is above but the shingles are repeated
+    or out of order. Otherwise, the shingle similarity is returned as both
+    ratios. Shingles are lowercased, so texts that only differ in case are
+    strictly similar
+
     :param text1: a cleaned opinion's text
     :param text2: another cleaned opinion's text
     :return: a tuple with:
@@ -405,20 +505,44 @@ def get_text_similarity(text1: str, text2: str) -> tuple[bool, float, float]:
         True in the second member if any of the ratios was greater than the
             loose threshold
         the ratios in the third and fourth member
+        the measure used for the ratios in the fifth member: "identical",
+            "shingle jaccard" or "sequence ratio"
     """
     if text1 == text2:
-        return True, True, 1.0, 1.0
+        return True, True, 1.0, 1.0, "identical"
+
+    shingle_similarity = get_shingle_similarity(text1, text2)
+    if (
+        shingle_similarity >= MIN_SHINGLE_SIMILARITY
+        and get_shingle_order_similarity(text1, text2)
+        >= MIN_SHINGLE_SIMILARITY
+    ):
+        return (
+            True,
+            True,
+            shingle_similarity,
+            shingle_similarity,
+            "shingle jaccard",
+        )
+    if shingle_similarity < MAX_SHINGLE_DISSIMILARITY:
+        return (
+            False,
+            False,
+            shingle_similarity,
+            shingle_similarity,
+            "shingle jaccard",
+        )
 
     ratio2 = 1.0
 
     ratio1 = SequenceMatcher(None, text1, text2).ratio()
     if ratio1 >= MIN_SEQUENCE_SIMILARITY_STRICT:
-        return True, True, ratio1, ratio2
+        return True, True, ratio1, ratio2, "sequence ratio"
 
     ratio2 = SequenceMatcher(None, text2, text1).ratio()
 
     if ratio2 >= MIN_SEQUENCE_SIMILARITY_STRICT:
-        return True, True, ratio1, ratio2
+        return True, True, ratio1, ratio2, "sequence ratio"
 
     return (
         False,
@@ -426,6 +550,7 @@ def get_text_similarity(text1: str, text2: str) -> tuple[bool, float, float]:
         or ratio2 > MIN_SEQUENCE_SIMILARITY_LOOSE,
         ratio1,
         ratio2,
+        "sequence ratio",
     )
 
 
@@ -754,6 +879,104 @@ def merge_versions_by_download_url(
     logger.info(stats)
 
 
+def merge_versions_by_minhash(
+    url_start: str, court_id: str, limit: int | None = None
+) -> None:
+    """Get opinion version candidates by the similarity of their text
+
+    Unlike `merge_versions_by_download_url`, this finds versions whose
+    download_url changed. The MinHash signatures of the shingles of every
+    candidate opinion are bucketed with LSH. The opinions connected by shared
+    buckets are split by court and docket number, and each split is compared
+    with `merge_versions_by_text_similarity`
+
+    :param url_start: the general domain and directory parts of the URL as
+        found on Opinion.download_url. If empty, opinions are not filtered
+        by URL
+    :param court_id: the court of the opinions. If empty, opinions are not
+        filtered by court
+    :param limit: max number of groups to correct
+    :return None
+    """
+    # We import these inside the function to avoid initializing the MinHash
+    # parameters if they are not required
+    from cl.citations.group_parentheticals import (
+        SimilarityIndex,
+        compute_minhash_signatures,
+    )
+
+    query = Q(cluster__source=SOURCES.COURT_WEBSITE) & Q(
+        main_version__isnull=True
+    )
+    if url_start:
+        query &= get_query_from_url(url_start, "startswith")
+    if court_id:
+        query &= Q(cluster__docket__court_id=court_id)
+    opinions = (
+        Opinion.objects.filter(query)
+        .only("id", "html", "plain_text")
+        .order_by("-date_created")
+    )
+
+    # Opinions are ordered by descending date_created, so the first opinion
+    # of each group is the latest one and is kept as the main version
+    opinion_ids: list[int] = []
+    signatures = []
+    for batch in itertools.batched(
+        opinions.iterator(chunk_size=MINHASH_BATCH_SIZE), MINHASH_BATCH_SIZE
+    ):
+        ids, texts = [], []
+        for opinion in batch:
+            text = clean_opinion_text(opinion)
+            if text:
+                ids.append(opinion.id)
+                texts.append(text)
+        if texts:
+            opinion_ids.extend(ids)
+            signatures.append(compute_minhash_signatures(texts, get_shingles))
+    if not opinion_ids:
+        return
+
+    labels = SimilarityIndex(np.concatenate(signatures)).get_component_labels()
+    groups = defaultdict(list)
+    for opinion_id, label in zip(opinion_ids, labels):
+        groups[label].append(opinion_id)
+
+    stats = defaultdict(lambda: 0)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        if limit and stats["groups"] >= limit:
+            break
+        stats["groups"] += 1
+
+        versions_by_id = (
+            Opinion.objects.filter(id__in=group, main_version__isnull=True)
+            .select_related("cluster", "cluster__docket")
+            .in_bulk()
+        )
+        # an opinion may have been merged as a version of another group
+        candidates = [
+            versions_by_id[pk] for pk in group if pk in versions_by_id
+        ]
+
+        # versions must share the court and docket number. Split the group
+        # before picking the main version, so opinions from other dockets
+        # are not compared to it
+        candidates_by_docket = defaultdict(list)
+        for candidate in candidates:
+            docket = candidate.cluster.docket
+            key = (docket.court_id, docket.docket_number)
+            candidates_by_docket[key].append(candidate)
+        for docket_candidates in candidates_by_docket.values():
+            if len(docket_candidates) < 2:
+                continue
+            main, *versions = docket_candidates
+            merge_versions_by_text_similarity(main, versions, stats)
+
+    logger.info(stats)
+
+
 def comparable_dockets(docket: Docket, version_docket: Docket) -> bool:
     """
     Make sure that the dockets have at least the same court_id and docket number
@@ -808,9 +1031,13 @@ def merge_versions_by_text_similarity(
             continue
 
         version_text = clean_opinion_text(version)
-        text_is_strictly_similar, text_is_loosely_similar, ratio1, ratio2 = (
-            get_text_similarity(main_text, version_text)
-        )
+        (
+            text_is_strictly_similar,
+            text_is_loosely_similar,
+            ratio1,
+            ratio2,
+            measure,
+        ) = get_text_similarity(main_text, version_text)
 
         if text_is_strictly_similar or text_is_loosely_similar:
             if text_is_loosely_similar:
@@ -845,7 +1072,7 @@ def merge_versions_by_text_similarity(
                 "Opinions grouped by URL have dissimilar text. Main: %s. Version %s",
                 main_opinion.id,
                 version.id,
-                extra={"ratio1": ratio1, "ratio2": ratio2},
+                extra={"ratio1": ratio1, "ratio2": ratio2, "measure": measure},
             )
 
 
@@ -856,14 +1083,23 @@ class Command(VerboseCommand):
         super().add_arguments(parser)
         parser.add_argument(
             "method",
-            choices=["download_url", "docket"],
-            help="""Currently we have researched 2 methods
+            choices=["download_url", "minhash", "docket"],
+            help="""Currently we have researched 3 methods
             - `download_url`: group opinions by exact `download_url` match
             and confirm their text similarity
+            - `minhash`: group opinions by the MinHash LSH buckets of their
+            text and confirm their text similarity
             - `docket`: group opinions by dockets, match by metadata and text
             similarity
             """,
         )
+        parser.add_argument(
+            "--court",
+            default="",
+            help="""The court ID of the opinions to group with the `minhash`
+            method. If empty, will group the opinions of all courts
+            """,
+        )
         parser.add_argument(
             "--url_template",
             default="",
@@ -901,3 +1137,9 @@ class Command(VerboseCommand):
             merge_versions_by_download_url(
                 options["url_template"].strip(), options.get("limit")
             )
+        elif options["method"] == "minhash":
+            merge_versions_by_minhash(
+                options["url_template"].strip(),
+                options["court"].strip(),
+                options.get("limit"),
+            )
@@ -28,7 +28,7 @@ from cl.lib.celery_utils import throttle_task
 from cl.lib.exceptions import ScrapeFailed
 from cl.lib.juriscraper_utils import get_scraper_object_by_name
 from cl.lib.llm import call_llm_transcription
-from cl.lib.microservice_utils import microservice
+from cl.lib.microservice_utils import microservice, microservice_sync
 from cl.lib.pacer import map_cl_to_pacer_id
 from cl.lib.pacer_session import ProxyPacerSession, get_or_cache_pacer_cookies
 from cl.lib.privacy_tools import anonymize, set_blocked_status
@@ -163,7 +163,7 @@ def extract_opinion_content(
     opinion = Opinion.objects.get(pk=pk)
 
     # Try to extract opinion content without using OCR.
-    response = async_to_sync(microservice)(
+    response = microservice_sync(
         service="document-extract",
         item=opinion,
     )
@@ -191,7 +191,7 @@ def extract_opinion_content(
         and needs_ocr(content)
         and ".pdf" in str(opinion.local_path)
     ):
-        response = async_to_sync(microservice)(
+        response = microservice_sync(
             service="document-extract-ocr",
             item=opinion,
             params={"ocr_available": ocr_available},
@@ -302,7 +302,7 @@ def extract_doc_content(
     opinion = Opinion.objects.get(pk=pk)
 
     # Try to extract opinion content without using OCR.
-    response = async_to_sync(microservice)(
+    response = microservice_sync(
         service="document-extract",
         item=opinion,
     )
@@ -330,7 +330,7 @@ def extract_doc_content(
         and needs_ocr(content)
         and ".pdf" in str(opinion.local_path)
     ):
-        response = async_to_sync(microservice)(
+        response = microservice_sync(
             service="document-extract-ocr",
             item=opinion,
             params={"ocr_available": ocr_available},
@@ -580,7 +580,7 @@ def process_audio_file(self, pk) -> None:
         "case_name_short": audio_obj.case_name_short,
         "download_url": audio_obj.download_url,
     }
-    audio_response: Response = async_to_sync(microservice)(
+    audio_response: Response = microservice_sync(
         service="convert-audio",
         item=audio_obj,
         params=audio_data,
@@ -591,7 +591,7 @@ def process_audio_file(self, pk) -> None:
     audio_obj.file_with_date = audio_obj.docket.date_argued
     audio_obj.local_path_mp3.save(file_name, cf, save=False)
     audio_obj.duration = float(
-        async_to_sync(microservice)(
+        microservice_sync(
             service="audio-duration",
             file=audio_response.content,
             file_type="mp3",
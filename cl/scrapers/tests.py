@@ -2,6 +2,7 @@ import json
 import os
 from collections import defaultdict
 from datetime import date, datetime, timedelta
+from difflib import SequenceMatcher
 from http import HTTPStatus
 from pathlib import Path
 from unittest import mock
@@ -41,8 +42,10 @@ from cl.scrapers.management.commands import (
     update_from_text,
 )
 from cl.scrapers.management.commands.merge_opinion_versions import (
+    get_text_similarity,
     merge_judge_names,
     merge_versions_by_download_url,
+    merge_versions_by_minhash,
 )
 from cl.scrapers.models import UrlHash
 from cl.scrapers.tasks import (
@@ -1718,7 +1721,13 @@ class OpinionVersionTest(ESIndexTestCase, TransactionTestCase):
                 f"{base_path}.merge_opinion_versions"
             ) as patched_merge_opinion_versions,
         ):
-            patched_get_text_similarity.return_value = (False, True, 0.75, 0.8)
+            patched_get_text_similarity.return_value = (
+                False,
+                True,
+                0.75,
+                0.8,
+                "sequence ratio",
+            )
             merge_versions_by_download_url(download_url.rsplit("/", 1)[0])
             # assert that merging was attempted
             patched_get_text_similarity.assert_called()
@@ -1730,6 +1739,105 @@ class OpinionVersionTest(ESIndexTestCase, TransactionTestCase):
             "Loose versioning should not pass when metadata differs ",
         )
 
+    def test_text_similarity_shingle_prefilter(self):
+        """Is SequenceMatcher only used when the shingle similarity is not
+        conclusive?"""
+        text = (
+            "the court affirmed the judgment of the district court because "
+            "the appellant waived the argument"
+        )
+        base_path = "cl.scrapers.management.commands.merge_opinion_versions"
+        with mock.patch(
+            f"{base_path}.SequenceMatcher", wraps=SequenceMatcher
+        ) as patched_sequence_matcher:
+            # shingles are lowercased, so a case-only difference is strictly
+            # similar
+            self.assertEqual(
+                get_text_similarity(text, text.upper()),
+                (True, True, 1.0, 1.0, "shingle jaccard"),
+            )
+            strict, loose, _, _, measure = get_text_similarity(
+                text, "an unrelated order granting the motion to dismiss"
+            )
+            self.assertFalse(strict or loose)
+            self.assertEqual(measure, "shingle jaccard")
+            patched_sequence_matcher.assert_not_called()
+
+            *_, measure = get_text_similarity(
+                text, text.replace("waived", "forfeited")
+            )
+            patched_sequence_matcher.assert_called()
+            self.assertEqual(measure, "sequence ratio")
+
+        # Repeating the text or moving its sections around keeps the same
+        # shingles, but the pair is still compared with SequenceMatcher
+        words = [f"word{i}" for i in range(300)]
+        long_text = " ".join(words)
+        first_half, second_half = " ".join(words[:150]), " ".join(words[150:])
+        for other_text in [
+            f"{long_text} {long_text}",
+            f"{second_half} {first_half}",
+        ]:
+            with mock.patch(
+                f"{base_path}.SequenceMatcher", wraps=SequenceMatcher
+            ) as patched_sequence_matcher:
+                strict, _, _, _, measure = get_text_similarity(
+                    long_text, other_text
+                )
+            self.assertFalse(strict)
+            self.assertEqual(measure, "sequence ratio")
+            patched_sequence_matcher.assert_called()
+
+    def test_merge_versions_by_minhash(self):
+        """Can we find versions with different download URLs, and only
+        compare them within the same docket?"""
+        court = CourtFactory.create(id="nev")
+        docket = DocketFactory.create(court=court, docket_number="CV-33333")
+        other_docket = DocketFactory.create(
+            court=court, docket_number="CV-44444"
+        )
+        plain_text = (
+            "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do "
+            "eiusmod tempor incididunt ut labore et dolore magna aliqua. "
+        ) * 3
+        opinions = [
+            OpinionFactory.create(
+                cluster=OpinionClusterFactory(
+                    docket=opinion_docket, source=SOURCES.COURT_WEBSITE
+                ),
+                download_url=f"http://caseinfo.nvsupreme/{i}.pdf",
+                plain_text=text,
+                html="",
+                sha1=str(i),
+            )
+            for i, (opinion_docket, text) in enumerate(
+                [
+                    (docket, plain_text),
+                    (
+                        docket,
+                        "Something completely different about a motion to "
+                        "dismiss that was granted by the district court.",
+                    ),
+                    (docket, f"100 Nev 2 {plain_text}"),
+                    # the latest opinion, but on another docket
+                    (other_docket, plain_text),
+                ]
+            )
+        ]
+
+        base_path = "cl.scrapers.management.commands.merge_opinion_versions"
+        with mock.patch(
+            f"{base_path}.merge_versions_by_text_similarity"
+        ) as patched_merge:
+            merge_versions_by_minhash("http://caseinfo.nvsupreme", "nev")
+
+        # The latest opinion of the docket is the main version, and the
+        # opinion from the other docket is not compared
+        patched_merge.assert_called_once()
+        main, versions, _ = patched_merge.call_args.args
+        self.assertEqual(main.id, opinions[2].id)
+        self.assertEqual([v.id for v in versions], [opinions[0].id])
+
 
 class DeleteDuplicatesTest(TestCase):
     @classmethod
@@ -19,7 +19,7 @@ from requests import Response, Session
 from cl.citations.utils import map_reporter_db_cite_type
 from cl.corpus_importer.utils import winnow_case_name
 from cl.lib.decorators import retry
-from cl.lib.microservice_utils import microservice
+from cl.lib.microservice_utils import microservice_sync
 from cl.lib.storage import S3GlacierInstantRetrievalStorage
 from cl.recap.mergers import find_docket_object
 from cl.search.models import (
@@ -173,7 +173,7 @@ def test_for_meta_redirections(r: Response) -> tuple[bool, str | None]:
     :param r: A response object
     :return:  A boolean and value
     """
-    extension = async_to_sync(microservice)(
+    extension = microservice_sync(
         service="buffer-extension",
         file=r.content,
         params={"mime": True},
@@ -223,7 +223,7 @@ def follow_redirections(r: Response, s: Session) -> Response:
 )
 def get_extension(content: bytes) -> str:
     """A handful of workarounds for getting extensions we can trust."""
-    return async_to_sync(microservice)(
+    return microservice_sync(
         service="buffer-extension",
         file=content,
     ).text
@@ -1,6 +1,6 @@
 import logging
-import pickle
 from collections import defaultdict
+from contextlib import ExitStack
 
 from django.conf import settings
 from django.core.cache import cache
@@ -27,6 +27,8 @@ from cl.lib.elasticsearch_utils import (
 from cl.lib.search_utils import (
     get_micro_cache_key,
     retrieve_cached_search_results,
+    search_single_flight,
+    serialize_search_results,
     store_search_api_query,
 )
 from cl.search.constants import SEARCH_HL_TAG, cardinality_query_unique_ids
@@ -354,45 +356,54 @@ class CursorESList:
         results_dict_cached, micro_cache_key = retrieve_cached_search_results(
             clean_params_for_cache, key_prefix
         )
-        if results_dict_cached:
-            # Return results from cache.
-            self.results = results_dict_cached["es_results_items"]
-            self.process_results(self.results, cached_response=True)
-            es_results_items = [
-                defaultdict(lambda: None, result.to_dict(skip_empty=False))
-                for result in self.results
-            ]
-            return (
-                es_results_items,
-                results_dict_cached["main_query_hits"],
-                results_dict_cached["cardinality_count_response"],
-                results_dict_cached["child_cardinality_count_response"],
-                True,
-            )
+        with ExitStack() as stack:
+            if (
+                results_dict_cached is None
+                and settings.ELASTICSEARCH_API_MICRO_CACHE_ENABLED
+            ):
+                # Wait for an identical search in progress, if any.
+                results_dict_cached = stack.enter_context(
+                    search_single_flight(micro_cache_key)
+                )
+            if results_dict_cached:
+                # Return results from cache.
+                self.results = results_dict_cached["es_results_items"]
+                self.process_results(self.results, cached_response=True)
+                es_results_items = [
+                    defaultdict(lambda: None, result.to_dict(skip_empty=False))
+                    for result in self.results
+                ]
+                return (
+                    es_results_items,
+                    results_dict_cached["main_query_hits"],
+                    results_dict_cached["cardinality_count_response"],
+                    results_dict_cached["child_cardinality_count_response"],
+                    True,
+                )
 
-        # Execute ES query.
-        (
-            main_results,
-            cardinality_count_response,
-            child_cardinality_count_response,
-        ) = self.perform_es_query()
-        self.results = main_results
-
-        main_query_hits = self.results.hits.total.value
-        results_dict = {
-            "es_results_items": self.results,
-            "main_query_hits": main_query_hits,
-            "cardinality_count_response": cardinality_count_response,
-            "child_cardinality_count_response": child_cardinality_count_response,
-        }
-        if settings.ELASTICSEARCH_API_MICRO_CACHE_ENABLED:
-            # Cache ES hits and counts for all other search requests.
-            serialized_data = pickle.dumps(results_dict)
-            cache.set(
-                micro_cache_key,
-                serialized_data,
-                settings.SEARCH_RESULTS_MICRO_CACHE,
-            )
+            # Execute ES query.
+            (
+                main_results,
+                cardinality_count_response,
+                child_cardinality_count_response,
+            ) = self.perform_es_query()
+            self.results = main_results
+
+            main_query_hits = self.results.hits.total.value
+            results_dict = {
+                "es_results_items": self.results,
+                "main_query_hits": main_query_hits,
+                "cardinality_count_response": cardinality_count_response,
+                "child_cardinality_count_response": child_cardinality_count_response,
+            }
+            if settings.ELASTICSEARCH_API_MICRO_CACHE_ENABLED:
+                # Cache ES hits and counts for all other search requests.
+                serialized_data = serialize_search_results(results_dict)
+                cache.set(
+                    micro_cache_key,
+                    serialized_data,
+                    settings.SEARCH_RESULTS_MICRO_CACHE,
+                )
 
         self.process_results(self.results)
 
@@ -4,6 +4,7 @@ from functools import partial
 from typing import Any
 
 from django.conf import settings
+from django.db.models import Prefetch, QuerySet
 from django.http import QueryDict
 from django.utils.html import escape, strip_tags
 from django_elasticsearch_dsl import Document, fields
@@ -20,6 +21,7 @@ from cl.custom_filters.templatetags.text_filters import (
 )
 from cl.lib.command_utils import logger
 from cl.lib.elasticsearch_utils import (
+    BulkIndexingQuerysetMixin,
     CSVSerializableDocumentMixin,
     build_es_base_query,
 )
@@ -27,6 +29,7 @@ from cl.lib.fields import JoinField, PercolatorField
 from cl.lib.search_index_utils import (
     get_parties_from_case_name,
     get_parties_from_case_name_bankr,
+    get_related_values,
     null_map,
 )
 from cl.lib.utils import deepgetattr
@@ -34,8 +37,11 @@ from cl.people_db.models import (
     DATE_GRANULARITIES,
     Attorney,
     AttorneyOrganization,
+    AttorneyOrganizationAssociation,
+    Party,
     Person,
     Position,
+    Role,
 )
 from cl.search.constants import (
     PEOPLE_ES_HL_FIELDS,
@@ -59,16 +65,33 @@ from cl.search.forms import SearchForm
 from cl.search.models import (
     PRECEDENTIAL_STATUS,
     SOURCES,
-    BankruptcyInformation,
     Citation,
     Docket,
     Opinion,
     OpinionCluster,
+    OpinionsCited,
+    OpinionsCitedByRECAPDocument,
     ParentheticalGroup,
     RECAPDocument,
 )
 
 
+def get_first_citation_of_type(cluster: OpinionCluster, citation_type: int):
+    """Get the first citation of a type for a cluster, reading the prefetched
+    citations when they were prefetched for bulk indexing.
+
+    :param cluster: The OpinionCluster.
+    :param citation_type: The Citation type to look for.
+    :return: The Citation or None if the cluster has no citation of the type.
+    """
+    if "citations" in getattr(cluster, "_prefetched_objects_cache", {}):
+        return next(
+            (c for c in cluster.citations.all() if c.type == citation_type),
+            None,
+        )
+    return cluster.citations.filter(type=citation_type).first()
+
+
 class PreparePercolatorQueryMixin:
     def prepare_timestamp(self, instance):
         return datetime.utcnow()
@@ -95,7 +118,9 @@ class PreparePercolatorQueryMixin:
 
 
 @parenthetical_group_index.document
-class ParentheticalGroupDocument(CSVSerializableDocumentMixin, Document):
+class ParentheticalGroupDocument(
+    BulkIndexingQuerysetMixin, CSVSerializableDocumentMixin, Document
+):
     author_id = fields.IntegerField(attr="opinion.author_id")
     caseName = fields.TextField(attr="opinion.cluster.case_name")
     citeCount = fields.IntegerField(attr="opinion.cluster.citation_count")
@@ -231,7 +256,7 @@ class ParentheticalGroupDocument(CSVSerializableDocumentMixin, Document):
         return instance.opinion.cluster.precedential_status
 
 
-class AudioDocumentBase(Document):
+class AudioDocumentBase(BulkIndexingQuerysetMixin, Document):
     absolute_url = fields.KeywordField(index=False)
     caseName = fields.TextField(
         analyzer="text_en_splitting_cl",
@@ -378,6 +403,12 @@ class AudioDocument(CSVSerializableDocumentMixin, AudioDocumentBase):
         model = Audio
         ignore_signals = True
 
+    @classmethod
+    def get_bulk_indexing_queryset(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.select_related("docket__court").prefetch_related(
+            "panel"
+        )
+
     @classmethod
     def get_csv_headers(cls) -> list[str]:
         return [
@@ -431,7 +462,7 @@ class AudioDocument(CSVSerializableDocumentMixin, AudioDocumentBase):
         return best_case_name(instance)
 
     def prepare_panel_ids(self, instance):
-        return list(instance.panel.all().values_list("id", flat=True))
+        return get_related_values(instance, "panel", "id")
 
     def prepare_file_size_mp3(self, instance):
         if instance.local_path_mp3:
@@ -535,7 +566,7 @@ class ES_CHILD_ID:
         return f"o_{self.instance_id}"
 
 
-class PersonBaseDocument(Document):
+class PersonBaseDocument(BulkIndexingQuerysetMixin, Document):
     id = fields.IntegerField(attr="pk")
     alias_ids = fields.ListField(
         fields.IntegerField(multi=True),
@@ -831,6 +862,22 @@ class PositionDocument(PersonBaseDocument):
         model = Position
         ignore_signals = True
 
+    @classmethod
+    def get_bulk_indexing_queryset(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.select_related(
+            "person",
+            "court",
+            "appointer__person",
+            "predecessor",
+            "supervisor",
+        ).prefetch_related(
+            "person__political_affiliations",
+            "person__aliases",
+            "person__aba_ratings",
+            "person__educations__school",
+            "person__race",
+        )
+
     def prepare_appointer(self, instance):
         if instance.appointer:
             return instance.appointer.person.name_full_reverse
@@ -1009,7 +1056,7 @@ class PersonDocument(CSVSerializableDocumentMixin, PersonBaseDocument):
 
 
 # RECAP
-class RECAPBaseDocument(Document):
+class RECAPBaseDocument(BulkIndexingQuerysetMixin, Document):
     docket_child = JoinField(relations={"docket": ["recap_document"]})
     timestamp = fields.DateField()
 
@@ -1262,6 +1309,22 @@ class ESRECAPDocument(
         model = RECAPDocument
         ignore_signals = True
 
+    @classmethod
+    def get_bulk_indexing_queryset(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.select_related(
+            "docket_entry__docket__court",
+            "docket_entry__docket__assigned_to",
+            "docket_entry__docket__referred_to",
+            "docket_entry__docket__bankruptcy_information",
+        ).prefetch_related(
+            Prefetch(
+                "cited_opinions",
+                queryset=OpinionsCitedByRECAPDocument.objects.only(
+                    "citing_document", "cited_opinion"
+                ),
+            )
+        )
+
     @classmethod
     def get_csv_headers(cls) -> list[str]:
         return [
@@ -1420,10 +1483,8 @@ class ESRECAPDocument(
         return escape(instance.plain_text.translate(null_map))
 
     def prepare_cites(self, instance):
-        return list(
-            instance.cited_opinions.all().values_list(
-                "cited_opinion_id", flat=True
-            )
+        return get_related_values(
+            instance, "cited_opinions", "cited_opinion_id"
         )
 
     def prepare_pacer_case_id(self, instance):
@@ -1536,6 +1597,36 @@ class DocketDocument(
         )
         return transformations
 
+    @classmethod
+    def get_bulk_indexing_queryset(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.select_related(
+            "court", "assigned_to", "referred_to", "bankruptcy_information"
+        ).prefetch_related(
+            Prefetch(
+                "parties",
+                queryset=Party.objects.only("pk", "name"),
+                to_attr="bulk_parties",
+            ),
+            Prefetch(
+                "role_set",
+                queryset=Role.objects.select_related("attorney").only(
+                    "docket", "attorney", "attorney__name"
+                ),
+                to_attr="bulk_roles",
+            ),
+            Prefetch(
+                "attorneyorganizationassociation_set",
+                queryset=AttorneyOrganizationAssociation.objects.select_related(
+                    "attorney_organization"
+                ).only(
+                    "docket",
+                    "attorney_organization",
+                    "attorney_organization__name",
+                ),
+                to_attr="bulk_firm_associations",
+            ),
+        )
+
     def prepare_caseName(self, instance):
         return best_case_name(instance)
 
@@ -1552,11 +1643,11 @@ class DocketDocument(
             return instance.referred_to_str
 
     def prepare_chapter(self, instance):
-        if BankruptcyInformation.objects.filter(docket=instance).exists():
+        if hasattr(instance, "bankruptcy_information"):
             return instance.bankruptcy_information.chapter
 
     def prepare_trustee_str(self, instance):
-        if BankruptcyInformation.objects.filter(docket=instance).exists():
+        if hasattr(instance, "bankruptcy_information"):
             return instance.bankruptcy_information.trustee_str
 
     def prepare_docket_child(self, instance):
@@ -1575,9 +1666,38 @@ class DocketDocument(
             "firm": set(),
         }
 
-        # Extract only required parties values.
-        party_values = instance.parties.values_list("pk", "name")
-        for pk, name in party_values.iterator():
+        if hasattr(instance, "bulk_parties"):
+            # Use the parties, attorneys and firms prefetched in bulk.
+            party_values = [(p.pk, p.name) for p in instance.bulk_parties]
+            atty_values = [
+                (role.attorney.pk, role.attorney.name)
+                for role in instance.bulk_roles
+            ]
+            firms_values = [
+                (a.attorney_organization.pk, a.attorney_organization.name)
+                for a in instance.bulk_firm_associations
+            ]
+        else:
+            # Extract only required parties, attorney and firm values.
+            party_values = instance.parties.values_list(
+                "pk", "name"
+            ).iterator()
+            atty_values = (
+                Attorney.objects.filter(roles__docket=instance)
+                .distinct()
+                .values_list("pk", "name")
+                .iterator()
+            )
+            firms_values = (
+                AttorneyOrganization.objects.filter(
+                    attorney_organization_associations__docket=instance
+                )
+                .distinct()
+                .values_list("pk", "name")
+                .iterator()
+            )
+
+        for pk, name in party_values:
             out["party_id"].add(pk)
             out["party"].add(name)
 
@@ -1591,25 +1711,11 @@ class DocketDocument(
             )
             out["party"] = party_from_case_name if party_from_case_name else []
 
-        # Extract only required attorney values.
-        atty_values = (
-            Attorney.objects.filter(roles__docket=instance)
-            .distinct()
-            .values_list("pk", "name")
-        )
-        for pk, name in atty_values.iterator():
+        for pk, name in atty_values:
             out["attorney_id"].add(pk)
             out["attorney"].add(name)
 
-        # Extract only required firm values.
-        firms_values = (
-            AttorneyOrganization.objects.filter(
-                attorney_organization_associations__docket=instance
-            )
-            .distinct()
-            .values_list("pk", "name")
-        )
-        for pk, name in firms_values.iterator():
+        for pk, name in firms_values:
             out["firm_id"].add(pk)
             out["firm"].add(name)
 
@@ -1628,7 +1734,7 @@ class DocketDocument(
 
 
 # Opinions
-class OpinionBaseDocument(Document):
+class OpinionBaseDocument(BulkIndexingQuerysetMixin, Document):
     absolute_url = fields.KeywordField(index=False)
     cluster_id = fields.IntegerField(
         attr="pk", fields={"raw": fields.KeywordField(attr="pk")}
@@ -1874,10 +1980,10 @@ class OpinionBaseDocument(Document):
         return instance.syllabus
 
     def prepare_sibling_ids(self, instance):
-        return list(instance.sub_opinions.all().values_list("id", flat=True))
+        return get_related_values(instance, "sub_opinions", "id")
 
     def prepare_panel_ids(self, instance):
-        return list(instance.panel.all().values_list("id", flat=True))
+        return get_related_values(instance, "panel", "id")
 
     def prepare_dateFiled(self, instance):
         if instance.date_filed is None:
@@ -1928,16 +2034,12 @@ class OpinionBaseDocument(Document):
         return instance.docket.date_reargument_denied
 
     def prepare_neutralCite(self, instance):
-        neutral_citations = instance.citations.filter(type=Citation.NEUTRAL)
-        if neutral_citations.count():
-            return str(neutral_citations[0])
-        return ""
+        citation = get_first_citation_of_type(instance, Citation.NEUTRAL)
+        return str(citation) if citation else ""
 
     def prepare_lexisCite(self, instance):
-        lexis_citations = instance.citations.filter(type=Citation.LEXIS)
-        if lexis_citations.count():
-            return str(lexis_citations[0])
-        return ""
+        citation = get_first_citation_of_type(instance, Citation.LEXIS)
+        return str(citation) if citation else ""
 
     def prepare_timestamp(self, instance):
         return datetime.utcnow()
@@ -2004,6 +2106,25 @@ class OpinionDocument(CSVSerializableDocumentMixin, OpinionBaseDocument):
         model = Opinion
         ignore_signals = True
 
+    @classmethod
+    def get_bulk_indexing_queryset(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.select_related(
+            "cluster__docket__court", "author"
+        ).prefetch_related(
+            Prefetch(
+                "cited_opinions",
+                queryset=OpinionsCited.objects.only(
+                    "citing_opinion", "cited_opinion"
+                ),
+            ),
+            Prefetch("joined_by", queryset=Person.objects.only("pk")),
+            "cluster__panel",
+            Prefetch(
+                "cluster__sub_opinions", queryset=Opinion.objects.only("pk")
+            ),
+            "cluster__citations",
+        )
+
     @classmethod
     def get_csv_headers(cls) -> list[str]:
         return [
@@ -2049,14 +2170,12 @@ class OpinionDocument(CSVSerializableDocumentMixin, OpinionBaseDocument):
             return instance.local_path.name
 
     def prepare_cites(self, instance):
-        return list(
-            instance.cited_opinions.all().values_list(
-                "cited_opinion_id", flat=True
-            )
+        return get_related_values(
+            instance, "cited_opinions", "cited_opinion_id"
         )
 
     def prepare_joined_by_ids(self, instance):
-        return list(instance.joined_by.all().values_list("id", flat=True))
+        return get_related_values(instance, "joined_by", "id")
 
     def prepare_text(self, instance):
         if instance.html_columbia:
@@ -2090,12 +2209,10 @@ class OpinionDocument(CSVSerializableDocumentMixin, OpinionBaseDocument):
         return instance.cluster.scdb_id
 
     def prepare_sibling_ids(self, instance):
-        return list(
-            instance.cluster.sub_opinions.all().values_list("id", flat=True)
-        )
+        return get_related_values(instance.cluster, "sub_opinions", "id")
 
     def prepare_panel_ids(self, instance):
-        return list(instance.cluster.panel.all().values_list("id", flat=True))
+        return get_related_values(instance.cluster, "panel", "id")
 
     def prepare_dateFiled(self, instance):
         if instance.cluster.date_filed is None:
@@ -2146,20 +2263,14 @@ class OpinionDocument(CSVSerializableDocumentMixin, OpinionBaseDocument):
         return instance.cluster.docket.date_reargument_denied
 
     def prepare_neutralCite(self, instance):
-        neutral_citations = instance.cluster.citations.filter(
-            type=Citation.NEUTRAL
+        citation = get_first_citation_of_type(
+            instance.cluster, Citation.NEUTRAL
         )
-        if neutral_citations.count():
-            return str(neutral_citations[0])
-        return ""
+        return str(citation) if citation else ""
 
     def prepare_lexisCite(self, instance):
-        lexis_citations = instance.cluster.citations.filter(
-            type=Citation.LEXIS
-        )
-        if lexis_citations.count():
-            return str(lexis_citations[0])
-        return ""
+        citation = get_first_citation_of_type(instance.cluster, Citation.LEXIS)
+        return str(citation) if citation else ""
 
     def prepare_citeCount(self, instance):
         return instance.cluster.citation_count
@@ -2294,13 +2405,18 @@ class OpinionClusterDocument(
         ).get(x, x)
         return transformations
 
-    def prepare_non_participating_judge_ids(self, instance):
-        return list(
-            instance.non_participating_judges.all().values_list(
-                "id", flat=True
-            )
+    @classmethod
+    def get_bulk_indexing_queryset(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.select_related("docket__court").prefetch_related(
+            "panel",
+            "citations",
+            "non_participating_judges",
+            Prefetch("sub_opinions", queryset=Opinion.objects.only("pk")),
         )
 
+    def prepare_non_participating_judge_ids(self, instance):
+        return get_related_values(instance, "non_participating_judges", "id")
+
     def prepare_cluster_child(self, instance):
         return "opinion_cluster"
 
@@ -2466,11 +2582,13 @@ class ESOpinionDocumentPlain(OpinionClusterDocument, OpinionDocument):
     OpinionPercolator index.
     """
 
+    @classmethod
+    def get_bulk_indexing_queryset(cls, queryset: QuerySet) -> QuerySet:
+        return OpinionDocument.get_bulk_indexing_queryset(queryset)
+
     def prepare_non_participating_judge_ids(self, instance):
-        return list(
-            instance.cluster.non_participating_judges.all().values_list(
-                "id", flat=True
-            )
+        return get_related_values(
+            instance.cluster, "non_participating_judges", "id"
         )
 
     def prepare_source(self, instance):
@@ -0,0 +1,118 @@
+import pickle
+import time
+from statistics import median
+
+from django.core.cache import cache
+from django.http import QueryDict
+
+from cl.lib.command_utils import VerboseCommand
+from cl.lib.elasticsearch_utils import build_es_main_query, fetch_es_results
+from cl.lib.redis_utils import get_redis_interface
+from cl.lib.search_utils import (
+    deserialize_search_results,
+    serialize_search_results,
+)
+from cl.search.documents import (
+    AudioDocument,
+    DocketDocument,
+    OpinionClusterDocument,
+    ParentheticalGroupDocument,
+    PersonDocument,
+)
+from cl.search.forms import SearchForm
+from cl.search.models import SEARCH_TYPES, Court
+
+DOCUMENT_TYPES = {
+    SEARCH_TYPES.OPINION: OpinionClusterDocument,
+    SEARCH_TYPES.RECAP: DocketDocument,
+    SEARCH_TYPES.DOCKETS: DocketDocument,
+    SEARCH_TYPES.ORAL_ARGUMENT: AudioDocument,
+    SEARCH_TYPES.PEOPLE: PersonDocument,
+    SEARCH_TYPES.PARENTHETICAL: ParentheticalGroupDocument,
+}
+
+
+def time_ms(func, iterations: int) -> float:
+    """Get the median time in milliseconds that a callable takes to run.
+
+    :param func: The callable to time.
+    :param iterations: How many times to run it.
+    :return: The median time in milliseconds.
+    """
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings)
+
+
+class Command(VerboseCommand):
+    help = (
+        "Compare the size, Redis memory and (de)serialization latency of "
+        "cached search results in the plain pickle and the compressed format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--query",
+            action="append",
+            required=True,
+            help="A search query string, e.g. 'q=foo&type=r'. May be "
+            "repeated to benchmark several searches.",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=50,
+            help="How many times to (de)serialize each result set.",
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        r = get_redis_interface("CACHE")
+        courts = Court.objects.filter(in_use=True)
+        iterations = options["iterations"]
+        for query in options["query"]:
+            search_form = SearchForm(QueryDict(query), courts=courts)
+            if not search_form.is_valid():
+                self.stderr.write(f"Invalid query: {query}")
+                continue
+            cd = search_form.cleaned_data.copy()
+            search_query, child_docs_count_query, _ = build_es_main_query(
+                DOCUMENT_TYPES[cd["type"]].search(), cd
+            )
+            hits, _, error, main_total, child_total = fetch_es_results(
+                cd, search_query, child_docs_count_query
+            )
+            if error:
+                self.stderr.write(f"The search failed: {query}")
+                continue
+            results_dict = {
+                "es_results_items": hits,
+                "main_query_hits": None,
+                "cardinality_count_response": main_total,
+                "child_cardinality_count_response": child_total,
+            }
+
+            self.stdout.write(f"\n{query}")
+            for name, dumps, loads in (
+                ("pickle", pickle.dumps, pickle.loads),
+                (
+                    "compressed",
+                    serialize_search_results,
+                    deserialize_search_results,
+                ),
+            ):
+                data = dumps(results_dict)
+                key = f"search_cache_benchmark:{name}"
+                cache.set(key, data, 60)
+                memory = r.memory_usage(cache.make_key(key))
+                cache.delete(key)
+                dumps_ms = time_ms(lambda: dumps(results_dict), iterations)
+                loads_ms = time_ms(lambda: loads(data), iterations)
+                self.stdout.write(
+                    f"  {name:<10} size: {len(data):>9,} B  "
+                    f"redis: {memory:>9,} B  "
+                    f"dumps: {dumps_ms:7.2f} ms  loads: {loads_ms:7.2f} ms"
+                )
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.files.storage import Storage
+from django.utils import timezone
+
+from cl.lib.command_utils import VerboseCommand, logger
+from cl.lib.storage import S3SearchExportStorage
+from cl.search.tasks import SEARCH_EXPORTS_DIR
+
+
+def delete_old_search_exports(storage: Storage, older_than: datetime) -> int:
+    """Delete the streamed search exports saved before a date.
+
+    Each export is saved in its own directory under SEARCH_EXPORTS_DIR.
+
+    :param storage: The storage the exports are saved in.
+    :param older_than: Exports last modified before this date are deleted.
+    :return: The number of exports deleted.
+    """
+    count = 0
+    export_dirs, _ = storage.listdir(SEARCH_EXPORTS_DIR)
+    for export_dir in export_dirs:
+        dir_path = f"{SEARCH_EXPORTS_DIR}/{export_dir}"
+        _, file_names = storage.listdir(dir_path)
+        for file_name in file_names:
+            file_path = f"{dir_path}/{file_name}"
+            if storage.get_modified_time(file_path) < older_than:
+                storage.delete(file_path)
+                count += 1
+    return count
+
+
+class Command(VerboseCommand):
+    help = (
+        "Delete the streamed search exports whose download link has expired."
+    )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        older_than = timezone.now() - timedelta(
+            seconds=settings.SEARCH_EXPORT_URL_EXPIRATION
+        )
+        count = delete_old_search_exports(S3SearchExportStorage(), older_than)
+        logger.info(
+            "Deleted %s search exports saved before %s", count, older_than
+        )
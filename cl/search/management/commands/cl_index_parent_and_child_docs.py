@@ -1,9 +1,16 @@
+import multiprocessing
+import queue
+import threading
 from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import date
 from itertools import batched
 
+import django
 from django.conf import settings
+from django.core.management import CommandError
 from django.db.models import QuerySet
+from elasticsearch_dsl import connections
 
 from cl.lib.argparse_types import valid_date_time
 from cl.lib.celery_utils import CeleryThrottle
@@ -16,6 +23,7 @@ from cl.lib.indexing_utils import (
     get_last_parent_document_id_processed,
     log_last_document_indexed,
 )
+from cl.lib.search_index_utils import BulkItem, get_adaptive_bulk_indexer
 from cl.people_db.models import Person
 from cl.search.documents import (
     DocketDocument,
@@ -40,6 +48,7 @@ from cl.search.signals import recap_document_field_mapping
 from cl.search.tasks import (
     index_parent_and_child_docs,
     index_parent_or_child_docs_in_es,
+    prepare_serialized_bulk_actions,
     remove_parent_and_child_docs_by_query,
     update_children_docs_by_query,
 )
@@ -305,6 +314,15 @@ class Command(VerboseCommand):
             choices=["ordering_key"],
             help="Include only documents where this field is not Null.",
         )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=0,
+            help="Index the documents locally instead of using Celery: IDs "
+            "are read by this process, the documents of each chunk are "
+            "prepared by a pool of this many processes, and a sender thread "
+            "indexes them in bulk. Not supported with --missing.",
+        )
 
     def handle(self, *args, **options):
         super().handle(*args, **options)
@@ -314,6 +332,10 @@ class Command(VerboseCommand):
         chunk_size = self.options["chunk_size"]
         pk_offset = options["pk_offset"]
         auto_resume = options.get("auto_resume", False)
+        if options.get("processes") and options.get("missing"):
+            raise CommandError(
+                "The --processes option is not supported with --missing."
+            )
         update_from_event_tables = EventTable(
             options.get("update_from_event_tables", None)
         )
@@ -408,10 +430,133 @@ class Command(VerboseCommand):
             case _:
                 return
 
+        processes = options.get("processes", 0)
+        if processes and task_to_use in [
+            "index_parent_and_child_docs",
+            "index_parent_or_child_docs_in_es",
+        ]:
+            self.index_with_pipeline(
+                q, count, search_type, chunk_size, processes
+            )
+            return
+
         self.process_queryset(
             q, count, search_type, chunk_size, task_to_use, es_document
         )
 
+    def index_with_pipeline(
+        self,
+        items: Iterable,
+        count: int,
+        search_type: str,
+        chunk_size: int,
+        processes: int,
+    ) -> None:
+        """Index documents through a local pipeline of three stages: this
+        process reads the IDs from the DB, a pool of processes prepares and
+        serializes the documents of each chunk of IDs, and a sender thread
+        indexes them in bulk.
+
+        The stages are connected by a bounded queue of pending chunks, so
+        reading IDs pauses when the preparers or ES fall behind. Chunks are
+        sent in order, so the last ID logged for --auto-resume has always
+        been indexed. Once a chunk fails, wholly or in part, the checkpoint
+        is no longer advanced, so a resumed run starts again from it.
+
+        :param items: Iterable of IDs, or of (ID, parent ID) tuples for child
+        documents.
+        :param count: Total number of items expected to process.
+        :param search_type: The search type of the documents to index.
+        :param chunk_size: The number of IDs prepared in a single job.
+        :param processes: The number of preparer processes.
+        :return: None
+        """
+        document_type = self.options.get("document_type", None)
+        pk_offset = self.options["pk_offset"]
+        redis_key = compose_redis_key(search_type)
+        client = connections.get_connection()
+        indexer = get_adaptive_bulk_indexer()
+        # Chunks being prepared or waiting to be sent, None ends the sender.
+        pending: queue.Queue[
+            tuple[Future[list[BulkItem]], list[int]] | None
+        ] = queue.Queue(maxsize=processes * 2)
+        processed_count = 0
+        first_failed_id: int | None = None
+
+        def send_chunks() -> None:
+            nonlocal processed_count, first_failed_id
+            while (job := pending.get()) is not None:
+                future, chunk_ids = job
+                failed_docs = []
+                try:
+                    for success, info in indexer.bulk_items(
+                        client,
+                        future.result(),
+                        thread_count=settings.ELASTICSEARCH_PARALLEL_BULK_THREADS,
+                        raise_on_error=False,
+                    ):
+                        if not success:
+                            failed_docs.append(info["index"]["_id"])
+                except Exception:
+                    logger.exception(
+                        "Error indexing documents with IDs from %s to %s.",
+                        chunk_ids[0],
+                        chunk_ids[-1],
+                    )
+                    if first_failed_id is None:
+                        first_failed_id = chunk_ids[0]
+                    continue
+                if failed_docs:
+                    logger.error(
+                        "Error indexing documents, failed Doc IDs are: %s",
+                        failed_docs,
+                    )
+                    if first_failed_id is None:
+                        first_failed_id = chunk_ids[0]
+                processed_count += len(chunk_ids)
+                progress = processed_count / count
+                self.stdout.write(
+                    f"\rProcessed {processed_count}/{count}, ({progress:.0%}), "
+                    f"last PK indexed: {chunk_ids[-1]},"
+                )
+                if first_failed_id is None:
+                    # Chunks are sent in order, so every ID up to this one
+                    # has been indexed.
+                    log_last_document_indexed(chunk_ids[-1], redis_key)
+
+        ids = (item[0] if isinstance(item, tuple) else item for item in items)
+        sender = threading.Thread(target=send_chunks)
+        sender.start()
+        # Preparers are spawned rather than forked so they don't inherit the
+        # DB connection this process reads IDs from.
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as executor:
+            try:
+                for chunk in batched(ids, chunk_size):
+                    chunk_ids = list(chunk)
+                    future = executor.submit(
+                        prepare_serialized_bulk_actions,
+                        chunk_ids,
+                        search_type,
+                        document_type,
+                    )
+                    pending.put((future, chunk_ids))
+            finally:
+                pending.put(None)
+                sender.join()
+        if first_failed_id is not None:
+            logger.error(
+                "Indexing failed from ID %s, --auto-resume will continue "
+                "from there.",
+                first_failed_id,
+            )
+        self.stdout.write(
+            f"Successfully indexed {processed_count} items from pk {pk_offset}."
+        )
+
     def process_queryset(
         self,
         items: Iterable,
@@ -1,5 +1,18 @@
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from itertools import batched
+
 from celery import chain
 from django.conf import settings
+from django.db.models import QuerySet
 
 from cl.lib.celery_utils import CeleryThrottle
 from cl.lib.command_utils import VerboseCommand, logger
@@ -7,8 +20,13 @@ from cl.lib.indexing_utils import (
     get_last_parent_document_id_processed,
     log_last_document_indexed,
 )
+from cl.lib.string_utils import get_token_count_from_string
 from cl.search.models import SEARCH_TYPES, Opinion
-from cl.search.tasks import create_opinion_text_embeddings, save_embeddings
+from cl.search.tasks import (
+    create_opinion_text_embeddings,
+    embed_and_store_opinions,
+    save_embeddings,
+)
 
 
 def compose_redis_key() -> str:
@@ -18,12 +36,48 @@ def compose_redis_key() -> str:
     return f"{SEARCH_TYPES.OPINION}_inception_embedding:log"
 
 
+@dataclass
+class EmbeddingDocument:
+    id: int
+    text: str
+    token_count: int
+
+
+def pack_by_tokens(
+    documents: Iterable[EmbeddingDocument], token_count_limit: int
+) -> Iterator[list[EmbeddingDocument]]:
+    """Greedily pack documents into batches of up to token_count_limit
+    tokens, keeping their order. A document that exceeds the limit on its own
+    is sent alone, after the batch before it.
+
+    :param documents: The EmbeddingDocuments to pack.
+    :param token_count_limit: The maximum number of tokens per batch.
+    :return: An iterator of batches of EmbeddingDocuments.
+    """
+    batch: list[EmbeddingDocument] = []
+    batch_size = 0
+    for document in documents:
+        if batch and batch_size + document.token_count > token_count_limit:
+            yield batch
+            batch = []
+            batch_size = 0
+        batch.append(document)
+        batch_size += document.token_count
+    if batch:
+        yield batch
+
+
 class Command(VerboseCommand):
     help = "Gets text embeddings for opinions and stores them in S3."
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.throttle = None
+        self.executor: ThreadPoolExecutor | None = None
+        self.max_in_flight = 1
+        self.in_flight: deque[tuple[int | None, Future]] = deque()
+        self.embedded_count = 0
+        self.processed_count = 0
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -89,6 +143,36 @@ class Command(VerboseCommand):
             May be more than one. If this argument is used,
             other filters will be ignored""",
         )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            default=False,
+            help="Request embeddings and upload them to S3 from this process, "
+            "overlapping the DB fetch, inference and upload of different "
+            "batches instead of chaining Celery tasks through the cache.",
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            type=int,
+            default=4,
+            help="When streaming, the maximum number of batches being "
+            "embedded or uploaded at once.",
+        )
+        parser.add_argument(
+            "--sort-window",
+            type=int,
+            default=0,
+            help="Sort every N opinions by token count before packing them "
+            "into batches, so each batch holds texts of similar length. "
+            "0 keeps the ID order.",
+        )
+        parser.add_argument(
+            "--isolate-outliers",
+            action="store_true",
+            default=False,
+            help="Embed opinions that exceed the token count on their own "
+            "instead of skipping them.",
+        )
 
     def send_batch(
         self,
@@ -97,6 +181,7 @@ class Command(VerboseCommand):
         upload_queue: str,
         database: str,
         device: str,
+        token_count: int | None = None,
     ) -> None:
         """Send a batch of items for embedding creation and saving to S3.
 
@@ -104,16 +189,64 @@ class Command(VerboseCommand):
         :param embedding_queue: The name of the queue to process the embedding task.
         :param upload_queue: The name of the queue to process the saving task.
         :param database: The database to be used during processing.
+        :param token_count: Optional, the number of tokens in the batch, to
+        log the throughput of the request.
         :return: None.
         """
         self.throttle.maybe_wait()
         chain(
-            create_opinion_text_embeddings.si(batch, database, device).set(
-                queue=embedding_queue
-            ),
+            create_opinion_text_embeddings.si(
+                batch, database, device, token_count
+            ).set(queue=embedding_queue),
             save_embeddings.s().set(queue=upload_queue),
         ).apply_async()
 
+    def stream_batch(
+        self,
+        batch: list[EmbeddingDocument],
+        cursor: int | None,
+        device: str,
+    ) -> None:
+        """Embed and upload a batch in a worker thread, so the next batch can
+        be fetched meanwhile. Blocks while max_in_flight batches are pending.
+
+        :param batch: The EmbeddingDocuments to embed.
+        :param cursor: The opinion ID to log as the resume cursor once this
+        batch and the ones before it are done, if any.
+        :param device: The device to run the embedding generation on.
+        :return: None.
+        """
+        documents = [{"id": d.id, "text": d.text} for d in batch]
+        future = self.executor.submit(
+            embed_and_store_opinions,
+            documents,
+            device,
+            sum(d.token_count for d in batch),
+        )
+        self.in_flight.append((cursor, future))
+        while True:
+            pending = [f for _, f in self.in_flight if not f.done()]
+            if len(pending) < self.max_in_flight:
+                break
+            wait(pending, return_when=FIRST_COMPLETED)
+        self.advance_cursor()
+
+    def advance_cursor(self) -> None:
+        """Log the last opinion ID of the oldest completed batches, so that
+        --auto-resume never skips a batch that is still in flight.
+
+        Batches can finish out of order; a batch is only logged once every
+        batch sent before it has finished too. A failed batch raises here and
+        stops the command with the cursor right before it.
+
+        :return: None.
+        """
+        while self.in_flight and self.in_flight[0][1].done():
+            cursor, future = self.in_flight.popleft()
+            self.embedded_count += future.result()
+            if cursor is not None:
+                log_last_document_indexed(cursor, compose_redis_key())
+
     def handle(self, *args, **options):
         embedding_queue = options["embedding_queue"]
         upload_queue = options["upload_queue"]
@@ -125,6 +258,10 @@ class Command(VerboseCommand):
         start_id = options["start_id"]
         throttle_min_items = options["throttle_min_items"]
         device = options["device"]
+        stream = options["stream"]
+        sort_window = options["sort_window"]
+        isolate_outliers = options["isolate_outliers"]
+        self.max_in_flight = max(options["max_in_flight"], 1)
         self.throttle = CeleryThrottle(
             queue_name=embedding_queue, min_items=throttle_min_items
         )
@@ -157,7 +294,9 @@ class Command(VerboseCommand):
             )
         opinions_with_best_text = opinions.with_best_text()
         opinions_with_best_text = (
-            opinions_with_best_text[:count] if count is not None else opinions
+            opinions_with_best_text[:count]
+            if count is not None
+            else opinions_with_best_text
         )
 
         logger.info("Getting count of opinions to process.")
@@ -167,56 +306,135 @@ class Command(VerboseCommand):
             else opinions_to_process.count()
         )
         logger.info("Count finished.")
-        current_batch: list[int] = []
-        current_batch_size = 0
-        processed_count = 0
-        for opinion in opinions_with_best_text.iterator(chunk_size=1000):
+        documents = self.iter_documents(
+            opinions_with_best_text,
+            count,
+            token_count_limit,
+            min_opinion_size,
+            isolate_outliers,
+        )
+        batches = self.iter_batches(documents, token_count_limit, sort_window)
+        if stream:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+            start_time = time.monotonic()
+            try:
+                for batch, cursor in batches:
+                    self.stream_batch(batch, cursor, device)
+                wait([f for _, f in self.in_flight])
+                self.advance_cursor()
+            finally:
+                self.executor.shutdown(cancel_futures=True)
+            elapsed = time.monotonic() - start_time
+            logger.info(
+                "Successfully embedded %s of %s items from pk %s in %.1fs, "
+                "%.1f embeddings/s.",
+                self.embedded_count,
+                self.processed_count,
+                start_id,
+                elapsed,
+                self.embedded_count / elapsed if elapsed else 0,
+            )
+            return
+
+        for batch, cursor in batches:
+            self.send_batch(
+                [d.id for d in batch],
+                embedding_queue,
+                upload_queue,
+                database,
+                device,
+                sum(d.token_count for d in batch),
+            )
+            if cursor is not None:
+                # Every opinion up to the cursor has been requested.
+                log_last_document_indexed(cursor, compose_redis_key())
+        logger.info(
+            "Successfully requested for embedding %s items from pk %s.",
+            self.processed_count,
+            start_id,
+        )
+
+    def iter_documents(
+        self,
+        opinions: QuerySet,
+        count: int,
+        token_count_limit: int,
+        min_opinion_size: int,
+        isolate_outliers: bool,
+    ) -> Iterator[EmbeddingDocument]:
+        """Get the text and token count of the opinions to embed, skipping
+        the ones too short to embed.
+
+        :param opinions: The Opinion queryset annotated with the best text.
+        :param count: The number of opinions to process, for progress logs.
+        :param token_count_limit: The maximum number of tokens per batch.
+        :param min_opinion_size: Opinions with fewer tokens are skipped.
+        :param isolate_outliers: Whether to keep opinions that exceed the
+        token_count_limit, to be embedded on their own, instead of skipping
+        them.
+        :return: An iterator of EmbeddingDocuments, in ID order.
+        """
+        start_time = time.monotonic()
+        for opinion in opinions.iterator(chunk_size=1000):
             opinion_id = opinion.pk
-            processed_count += 1
-            token_count = opinion.token_count
+            self.processed_count += 1
+            text = opinion.clean_text
+            token_count = get_token_count_from_string(text)
             if token_count < min_opinion_size:
                 continue
-            if token_count > token_count_limit:
+            if token_count > token_count_limit and not isolate_outliers:
                 # Log documents that individually exceed the batch size.
                 logger.error(
                     "The opinion ID:%s exceeds the batch size limit.",
                     opinion_id,
                 )
                 continue
-            # Check if adding this opinion would exceed the batch size.
-            if current_batch_size + token_count > token_count_limit:
-                # Send the current batch since adding this opinion would break the limit.
-                self.send_batch(
-                    current_batch,
-                    embedding_queue,
-                    upload_queue,
-                    database,
-                    device,
-                )
-                current_batch = []
-                current_batch_size = 0
-
-            current_batch.append(opinion_id)
-            current_batch_size += token_count
-            if not processed_count % 1000:
-                # Log every 1000 documents processed.
-                log_last_document_indexed(opinion_id, compose_redis_key())
+            yield EmbeddingDocument(opinion_id, text, token_count)
+            if not self.processed_count % 1000:
+                # Log every 1000 documents processed. The resume cursor is
+                # logged as batches are sent instead, since documents are
+                # read ahead of their batch.
+                elapsed = time.monotonic() - start_time
                 logger.info(
-                    "Processed %s/%s, (%s), last ID requested for embedding: %s",
-                    processed_count,
+                    "Processed %s/%s, (%s), last ID requested for embedding: "
+                    "%s, %.1f opinions/s",
+                    self.processed_count,
                     count,
-                    f"{processed_count * 1.0 / count:.0%}",
+                    f"{self.processed_count * 1.0 / count:.0%}",
                     opinion_id,
+                    self.processed_count / elapsed if elapsed else 0,
                 )
 
-        # Send any remainder
-        if current_batch:
-            self.send_batch(
-                current_batch, embedding_queue, upload_queue, database, device
-            )
+    @staticmethod
+    def iter_batches(
+        documents: Iterable[EmbeddingDocument],
+        token_count_limit: int,
+        sort_window: int,
+    ) -> Iterator[tuple[list[EmbeddingDocument], int | None]]:
+        """Pack documents into batches, optionally sorting each window of
+        sort_window documents by length first, so that each batch holds
+        texts of similar length and inception wastes less work on padding.
 
-        logger.info(
-            "Successfully requested for embedding %s items from pk %s.",
-            processed_count,
-            start_id,
-        )
+        :param documents: The EmbeddingDocuments to batch, in ID order.
+        :param token_count_limit: The maximum number of tokens per batch.
+        :param sort_window: The number of documents sorted together. 0 keeps
+        the ID order.
+        :return: An iterator of two tuples: a batch and the ID up to which
+        every document has been batched once that batch and all the previous
+        ones are done, or None if the batch doesn't complete a window.
+        """
+        if not sort_window:
+            for batch in pack_by_tokens(documents, token_count_limit):
+                yield batch, batch[-1].id
+            return
+
+        for window in batched(documents, sort_window):
+            batches = list(
+                pack_by_tokens(
+                    sorted(window, key=lambda d: d.token_count),
+                    token_count_limit,
+                )
+            )
+            for batch in batches[:-1]:
+                yield batch, None
+            yield batches[-1], window[-1].id
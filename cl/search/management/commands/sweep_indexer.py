@@ -1,11 +1,14 @@
 import time
-from collections.abc import Iterable, Mapping
-from datetime import datetime
+from collections.abc import Generator, Iterable, Mapping
+from datetime import UTC, datetime, timedelta
+from itertools import batched
 from typing import Literal, cast
 
 from django.apps import apps
 from django.conf import settings
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from elasticsearch_dsl import connections
 
 from cl.audio.models import Audio
 from cl.lib.celery_utils import CeleryThrottle
@@ -21,7 +24,13 @@ from cl.search.documents import (
     OpinionDocument,
     PersonDocument,
 )
-from cl.search.models import SEARCH_TYPES, Docket, Opinion, RECAPDocument
+from cl.search.models import (
+    SEARCH_TYPES,
+    Docket,
+    Opinion,
+    OpinionCluster,
+    RECAPDocument,
+)
 from cl.search.tasks import (
     index_parent_and_child_docs,
     index_parent_or_child_docs_in_es,
@@ -84,6 +93,96 @@ def get_last_document_processed() -> tuple[str, int]:
     return model_name, last_document_id
 
 
+def compose_watermarks_redis_key() -> str:
+    """Compose the redis key for the delta sweep watermarks
+    :return: A Redis key as a string.
+    """
+    return "es_sweep_indexer:watermarks"
+
+
+def start_delta_sweep(
+    app_label: str, document_type: str, resume: bool
+) -> datetime:
+    """Get the watermark of a model and document type and record when its
+    delta sweep started, which becomes the new watermark once the sweep is
+    completed.
+
+    :param app_label: The app label and model being swept.
+    :param document_type: The document type, 'parent' or 'child'.
+    :param resume: Whether an interrupted sweep of the model is resumed, in
+    which case its original start time is kept.
+    :return: The watermark; only rows modified since then are checked.
+    """
+    key = compose_watermarks_redis_key()
+    field = f"{app_label}:{document_type}"
+    stored_values = r.hgetall(key)
+    next_watermark = stored_values.get(f"{field}:next")
+    if not resume or not next_watermark:
+        r.hset(key, f"{field}:next", timezone.now().isoformat())
+
+    watermark = stored_values.get(field)
+    if not watermark:
+        lookback = settings.ELASTICSEARCH_SWEEP_INDEXER_DELTA_LOOKBACK
+        return timezone.now() - timedelta(hours=lookback)
+    return datetime.fromisoformat(watermark)
+
+
+def complete_delta_sweep(app_label: str, document_type: str) -> None:
+    """Move the watermark of a model and document type to the moment its
+    delta sweep started.
+
+    :param app_label: The app label and model being swept.
+    :param document_type: The document type, 'parent' or 'child'.
+    :return: None
+    """
+    key = compose_watermarks_redis_key()
+    field = f"{app_label}:{document_type}"
+    next_watermark = r.hget(key, f"{field}:next")
+    if next_watermark:
+        r.hset(key, field, next_watermark)
+        r.hdel(key, f"{field}:next")
+
+
+def get_drifted_items(
+    items: Iterable[tuple[int, int, datetime]],
+    es_document: ESDocumentClassType,
+    batch_size: int,
+) -> Generator[tuple[int, int, bool]]:
+    """Check in mget batches whether the ES documents of the given rows are
+    missing or were indexed before the row was last modified.
+
+    :param items: An iterable of (ID, parent ID, date_modified) tuples.
+    :param es_document: The ES document class of the rows.
+    :param batch_size: The number of documents to request in each mget.
+    :return: Yields a (ID, parent ID, drifted) tuple for each item.
+    """
+    client = connections.get_connection()
+    for batch in batched(items, batch_size):
+        response = client.mget(
+            index=es_document._index._name,
+            docs=[
+                {
+                    "_id": get_es_doc_id(es_document, item_id),
+                    "routing": parent_id,
+                }
+                for item_id, parent_id, _ in batch
+            ],
+            source=["timestamp"],
+        )
+        for (item_id, parent_id, date_modified), doc in zip(
+            batch, response["docs"]
+        ):
+            timestamp = doc.get("_source", {}).get("timestamp")
+            if not doc.get("found") or not timestamp:
+                yield item_id, parent_id, True
+                continue
+            # Timestamps are stored in UTC without an offset.
+            indexed_at = datetime.fromisoformat(timestamp)
+            if indexed_at.tzinfo is None:
+                indexed_at = indexed_at.replace(tzinfo=UTC)
+            yield item_id, parent_id, indexed_at < date_modified
+
+
 def get_documents_processed_count_and_restart() -> dict[str, int]:
     """Retrieve the number of documents processed and delete the Redis key to
      start a new indexing cycle.
@@ -197,6 +296,8 @@ class Command(VerboseCommand):
             if testing_mode:
                 # Only execute one cycle for testing purposes.
                 break
+            if self.sweep_indexer_action == "delta":
+                time.sleep(settings.ELASTICSEARCH_SWEEP_INDEXER_DELTA_INTERVAL)
 
     def execute_sweep_indexer_cycle(self) -> None:
         """Executes a sweep indexing cycle by processing documents starting
@@ -236,6 +337,10 @@ class Command(VerboseCommand):
         while models_stack:
             app_label = models_stack.pop()
             task_to_use = "index_parent_or_child_docs_in_es"
+            if self.sweep_indexer_action == "delta":
+                self.process_model_delta(app_label, last_document_id)
+                last_document_id = 0
+                continue
 
             match app_label:
                 case "people_db.Person":
@@ -330,6 +435,111 @@ class Command(VerboseCommand):
             # from the ID 0 in the next model.
             last_document_id = 0
 
+    def process_model_delta(
+        self, app_label: str, last_document_id: int = 0
+    ) -> None:
+        """Index the rows of a model that were modified since its watermark
+        and whose ES document is missing or older than the row.
+
+        :param app_label: The app label and model to process.
+        :param last_document_id: The last document ID processed, to resume an
+        interrupted sweep of the model.
+        :return: None
+        """
+
+        parent: Literal["parent", "child"] = "parent"
+        child: Literal["parent", "child"] = "child"
+        task_to_use = "index_parent_or_child_docs_in_es"
+        match app_label:
+            case "people_db.Person":
+                queryset = Person.objects.prefetch_related("positions").filter(
+                    is_alias_of=None
+                )
+                parent_field = "pk"
+                task_to_use = "index_parent_and_child_docs"
+                task_params = (parent, SEARCH_TYPES.PEOPLE, PersonDocument)
+            case "search.Opinion":
+                queryset = Opinion.objects.all()
+                parent_field = "cluster_id"
+                task_params = (child, SEARCH_TYPES.OPINION, OpinionDocument)
+            case "search.RECAPDocument":
+                queryset = RECAPDocument.objects.all()
+                parent_field = "docket_entry__docket_id"
+                task_params = (child, SEARCH_TYPES.RECAP, ESRECAPDocument)
+            case "audio.Audio":
+                queryset = Audio.objects.filter(processing_complete=True)
+                parent_field = "pk"
+                task_params = (
+                    parent,
+                    SEARCH_TYPES.ORAL_ARGUMENT,
+                    AudioDocument,
+                )
+            case "search.OpinionCluster":
+                queryset = OpinionCluster.objects.all()
+                parent_field = "pk"
+                task_params = (
+                    parent,
+                    SEARCH_TYPES.OPINION,
+                    OpinionClusterDocument,
+                )
+            case "search.Docket":
+                queryset = Docket.objects.filter(
+                    source__in=Docket.RECAP_SOURCES()
+                )
+                parent_field = "pk"
+                task_params = (parent, SEARCH_TYPES.RECAP, DocketDocument)
+            case _:
+                return
+
+        document_type, _, es_document = task_params
+        watermark = start_delta_sweep(
+            app_label, document_type, resume=bool(last_document_id)
+        )
+        if app_label == "people_db.Person":
+            # Positions are indexed as children of the person, so a person is
+            # also checked when only one of their positions was modified.
+            queryset = (
+                queryset.filter(
+                    Q(date_modified__gte=watermark)
+                    | Q(positions__date_modified__gte=watermark),
+                    pk__gte=last_document_id,
+                )
+                .distinct()
+                .order_by("pk")
+            )
+            rows: Iterable = [
+                (
+                    item.pk,
+                    item.pk,
+                    max(
+                        item.date_modified,
+                        *(p.date_modified for p in item.positions.all()),
+                    ),
+                )
+                for item in queryset
+                if item.is_judge
+            ]
+            count = len(rows)
+        else:
+            queryset = queryset.filter(
+                pk__gte=last_document_id, date_modified__gte=watermark
+            ).order_by("pk")
+            rows = queryset.values_list(
+                "pk", parent_field, "date_modified"
+            ).iterator()
+            count = queryset.count()
+
+        if count:
+            q = get_drifted_items(
+                rows,
+                es_document,
+                settings.ELASTICSEARCH_SWEEP_INDEXER_MGET_BATCH_SIZE,
+            )
+            self.process_queryset(
+                q, count, app_label, task_to_use, task_params
+            )
+        complete_delta_sweep(app_label, document_type)
+
     def process_queryset(
         self,
         items: Iterable,
@@ -345,7 +555,7 @@ class Command(VerboseCommand):
 
         :param items: Iterable of items to process. Items can be a simple
         iterable of IDs or a tuple of (ID, changed_fields) for cases requiring
-        field changes.
+        field changes, or (ID, parent ID, drifted) tuples in delta sweeps.
         :param count: Total number of items expected to process.
         :param app_label: The app label and model that belongs to the queryset
         being indexed.
@@ -376,7 +586,11 @@ class Command(VerboseCommand):
 
             processed_count += 1
             last_item = count == processed_count
-            if es_document and self.sweep_indexer_action == "missing":
+            if self.sweep_indexer_action == "delta":
+                # Items were already checked against ES by get_drifted_items.
+                if item[2]:
+                    chunk.append(item_id)
+            elif es_document and self.sweep_indexer_action == "missing":
                 doc_id = get_es_doc_id(es_document, item_id)
                 if not es_document.exists(
                     id=doc_id, routing=parent_document_id
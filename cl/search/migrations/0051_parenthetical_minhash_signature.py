@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0050_alter_opinion_opinions_cited'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parenthetical',
+            name='minhash_signature',
+            field=models.BinaryField(blank=True, help_text='The MinHash signature of the tokens of the text, stored as little-endian unsigned 64-bit integers. Used to group similar parentheticals without hashing their text again.', null=True),
+        ),
+    ]
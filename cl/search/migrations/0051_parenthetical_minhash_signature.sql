@@ -0,0 +1,6 @@
+BEGIN;
+--
+-- Add field minhash_signature to parenthetical
+--
+ALTER TABLE "search_parenthetical" ADD COLUMN "minhash_signature" bytea NULL;
+COMMIT;
@@ -3600,6 +3600,13 @@ class Parenthetical(models.Model):
         help_text="A score between 0 and 1 representing how descriptive the "
         "parenthetical is",
     )
+    minhash_signature = models.BinaryField(
+        blank=True,
+        null=True,
+        help_text="The MinHash signature of the tokens of the text, stored as "
+        "little-endian unsigned 64-bit integers. Used to group similar "
+        "parentheticals without hashing their text again.",
+    )
     es_pa_field_tracker = FieldTracker(fields=["score", "text"])
 
     def __str__(self) -> str:
@@ -2,7 +2,7 @@ import logging
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from cl.audio.models import Audio
@@ -13,6 +13,7 @@ from cl.citations.tasks import (
 from cl.favorites.utils import send_prayer_emails
 from cl.lib.courts import get_cache_key_for_court_list
 from cl.lib.es_signal_processor import ESSignalProcessor
+from cl.people_db.judge_roster import bump_judge_roster_version
 from cl.people_db.models import (
     ABARating,
     Education,
@@ -661,6 +662,23 @@ def update_court_cache(sender, instance: Court, created: bool, **kwargs):
         logger.error("Create a courthouse for new court '%s'", instance.id)
 
 
+@receiver(
+    [post_save, post_delete],
+    sender=Person,
+    dispatch_uid="handle_person_judge_roster_uid",
+)
+@receiver(
+    [post_save, post_delete],
+    sender=Position,
+    dispatch_uid="handle_position_judge_roster_uid",
+)
+def update_judge_roster_version(sender, instance, **kwargs):
+    """Invalidates the in-memory judge rosters when a Person or Position
+    instance is saved or deleted.
+    """
+    bump_judge_roster_version()
+
+
 @receiver(
     post_save,
     sender=Docket,
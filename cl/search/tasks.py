@@ -1,13 +1,14 @@
-import asyncio
 import concurrent.futures
-import csv
 import io
 import json
 import logging
+import time
 import uuid
+from collections import defaultdict
 from collections.abc import Generator
-from datetime import UTC, date, datetime
+from datetime import UTC, date, datetime, timedelta
 from importlib import import_module
+from itertools import batched
 from pathlib import PurePosixPath
 from random import randint
 from typing import Any
@@ -25,6 +26,8 @@ from django.core.mail import EmailMessage
 from django.db.models import Prefetch, QuerySet
 from django.http import QueryDict
 from django.template import loader
+from django.utils import timezone
+from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import (
     ApiError,
     ConflictError,
@@ -32,8 +35,8 @@ from elasticsearch.exceptions import (
     ConnectionTimeout,
     NotFoundError,
     RequestError,
+    TransportError,
 )
-from elasticsearch.helpers import parallel_bulk, streaming_bulk
 from elasticsearch_dsl import Document, Q, UpdateByQuery, connections
 from httpx import (
     HTTPStatusError,
@@ -50,11 +53,17 @@ from openai import (
 from openai import APIError as OpenAIApiError
 from openai import ConflictError as OpenAIApiConflictError
 from redis import Redis
+from redis.exceptions import ResponseError
 
 from cl.alerts.tasks import (
     percolator_response_processing,
     send_or_schedule_search_alerts,
 )
+from cl.alerts.utils import (
+    compute_estimated_remaining_time,
+    get_task_status,
+    retrieve_task_info,
+)
 from cl.audio.models import Audio
 from cl.celery_init import app
 from cl.corpus_importer.utils import is_bankruptcy_court
@@ -62,20 +71,28 @@ from cl.lib.db_tools import log_db_connection_info
 from cl.lib.elasticsearch_utils import build_daterange_query
 from cl.lib.microservice_utils import (
     log_invalid_embedding_errors,
-    microservice,
+    microservice_sync,
 )
 from cl.lib.redis_utils import get_redis_interface
 from cl.lib.search_index_utils import (
+    BulkItem,
+    get_adaptive_bulk_indexer,
     get_parties_from_case_name,
     get_parties_from_case_name_bankr,
     index_documents_in_bulk,
+    serialize_bulk_action,
 )
 from cl.lib.search_utils import (
+    STREAMING_EXPORT_DOCUMENT_TYPES,
+    export_es_results_to_storage,
     fetch_es_results_for_csv,
-    get_headers_and_transformations_for_search_export,
+    write_search_results_csv,
+)
+from cl.lib.storage import (
+    AWSMediaStorage,
+    S3IntelligentTieringStorage,
+    S3SearchExportStorage,
 )
-from cl.lib.storage import AWSMediaStorage, S3IntelligentTieringStorage
-from cl.lib.string_utils import camel_to_snake
 from cl.people_db.models import Person, Position
 from cl.search.docket_number_cleaner import (
     call_models_and_compare_results,
@@ -93,6 +110,7 @@ from cl.search.documents import (
     PersonDocument,
     PositionDocument,
 )
+from cl.search.exception import SyntaxQueryError
 from cl.search.forms import SearchForm
 from cl.search.models import (
     SEARCH_TYPES,
@@ -121,6 +139,9 @@ logger = logging.getLogger(__name__)
 
 es_document_module = import_module("cl.search.documents")
 
+# The directory of S3SearchExportStorage where streamed exports are saved.
+SEARCH_EXPORTS_DIR = "search-exports"
+
 
 def person_first_time_indexing(parent_id: int, position: Position) -> None:
     """Index a person and their no judiciary positions into Elasticsearch.
@@ -409,6 +430,9 @@ def document_fields_to_update(
 def email_search_results(self: Task, user_id: int, query: str):
     """Sends an email to the user with their search results as a CSV attachment.
 
+    Members get a link to a gzipped CSV file with all the results instead, if
+    streaming exports are enabled and the search type supports them.
+
     :param user_id: The ID of the user to send the email to.
     :param query: The user's search query string.
     """
@@ -424,6 +448,56 @@ def email_search_results(self: Task, user_id: int, query: str):
     # Get the cleaned data from the validated form
     cd = search_form.cleaned_data
 
+    if (
+        settings.SEARCH_EXPORT_STREAMING_ENABLED
+        and cd["type"] in STREAMING_EXPORT_DOCUMENT_TYPES
+        and user.profile.is_member
+    ):
+        storage = S3SearchExportStorage()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_path = str(
+            PurePosixPath(
+                SEARCH_EXPORTS_DIR,
+                uuid.uuid4().hex,
+                f"search_results_{timestamp}.csv.gz",
+            )
+        )
+        try:
+            rows_count = export_es_results_to_storage(
+                cd,
+                storage,
+                file_path,
+                max_rows=settings.SEARCH_EXPORT_STREAMING_MAX_ROWS,
+            )
+        except SyntaxQueryError:
+            return
+        except (TransportError, ApiError):
+            # Retry task if an error occurred and retry limit not reached.
+            if self.request.retries == self.max_retries:
+                return None
+            raise self.retry()
+
+        if not rows_count:
+            return
+
+        txt_template = loader.get_template("search_results_link_email.txt")
+        email_context = {
+            "username": user.username,
+            "query_link": f"https://www.courtlistener.com/?{query}",
+            "download_link": storage.url(file_path),
+            "rows_count": rows_count,
+            "expires_at": timezone.now()
+            + timedelta(seconds=settings.SEARCH_EXPORT_URL_EXPIRATION),
+        }
+        message = EmailMessage(
+            subject="Your Search Results are Ready!",
+            body=txt_template.render(email_context),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[user.email],
+        )
+        message.send(fail_silently=False)
+        return
+
     # Fetch search results from Elasticsearch based on query and search type
     search_results, error = fetch_es_results_for_csv(
         queryset=qd, search_type=cd["type"]
@@ -438,34 +512,10 @@ def email_search_results(self: Task, user_id: int, query: str):
     if not search_results:
         return
 
-    # Get the headers and basic transformation for the CSV file based on the
-    # search type
-    csv_headers, csv_transformations = (
-        get_headers_and_transformations_for_search_export(cd["type"])
-    )
-    if not csv_headers:
-        return
-
     # Create the CSV content and store in a StringIO object
     with io.StringIO() as output:
-        csvwriter = csv.DictWriter(
-            output,
-            fieldnames=csv_headers,
-            extrasaction="ignore",
-            quotechar='"',
-            quoting=csv.QUOTE_ALL,
-        )
-        csvwriter.writeheader()
-        for row in search_results:
-            if csv_transformations:
-                for key, function in csv_transformations.items():
-                    row[key] = function(row[key] if key in row else row)
-
-            clean_dict = {
-                camel_to_snake(key): value for key, value in row.items()
-            }
-            csvwriter.writerow(clean_dict)
-
+        if not write_search_results_csv(output, search_results, cd["type"]):
+            return
         csv_content: str = output.getvalue()
 
     # Prepare email content
@@ -616,6 +666,100 @@ def update_es_document(
     return None
 
 
+@app.task(
+    bind=True,
+    autoretry_for=(ConnectionError, ConflictError, ConnectionTimeout),
+    max_retries=5,
+    retry_backoff=1 * 60,
+    retry_backoff_max=10 * 60,
+    retry_jitter=True,
+    queue=settings.CELERY_ETL_TASK_QUEUE,
+    ignore_result=True,
+)
+def update_es_documents_in_bulk(
+    self: Task,
+    updates: list[
+        tuple[
+            ESDocumentNameType,
+            list[str],
+            tuple[str, int],
+            tuple[str, int] | None,
+            dict | None,
+        ]
+    ],
+) -> None:
+    """Update several documents in Elasticsearch in a single bulk request.
+
+    :param self: The celery task
+    :param updates: A list of tuples with the es_document_name,
+    fields_to_update, main_instance_data, related_instance_data and
+    fields_map arguments of update_es_document. Updates whose instances no
+    longer exist are skipped.
+    :return: None
+    """
+
+    documents_to_update = []
+    es_documents = set()
+    for (
+        es_document_name,
+        fields_to_update,
+        (main_app_label, main_instance_id),
+        related_instance_data,
+        fields_map,
+    ) in updates:
+        es_document = getattr(es_document_module, es_document_name)
+        main_model_instance = get_instance_from_db(
+            main_instance_id, apps.get_model(main_app_label)
+        )
+        if not main_model_instance:
+            continue
+
+        related_instance = None
+        if related_instance_data:
+            related_instance_app_label, related_instance_id = (
+                related_instance_data
+            )
+            related_instance = get_instance_from_db(
+                related_instance_id, apps.get_model(related_instance_app_label)
+            )
+            if not related_instance:
+                continue
+
+        fields_values_to_update = document_fields_to_update(
+            es_document,
+            main_model_instance,
+            fields_to_update,
+            related_instance,
+            fields_map,
+        )
+        if not fields_values_to_update:
+            continue
+
+        doc_id, parent_id = get_es_doc_id_and_parent_id(
+            es_document, main_model_instance
+        )
+        doc_to_update = {
+            "_op_type": "update",
+            "_index": es_document._index._name,
+            "_id": doc_id,
+            "doc": fields_values_to_update,
+        }
+        if parent_id:
+            doc_to_update["_routing"] = parent_id
+        documents_to_update.append(doc_to_update)
+        es_documents.add(es_document)
+
+    if not documents_to_update:
+        return
+
+    # Documents that are not indexed are logged and skipped.
+    index_documents_in_bulk(documents_to_update)
+    if settings.ELASTICSEARCH_DSL_AUTO_REFRESH:
+        # Set auto-refresh, used for testing.
+        for es_document in es_documents:
+            es_document._index.refresh()
+
+
 def get_es_doc_id_and_parent_id(
     es_document: ESDocumentClassType, instance: ESModelType
 ) -> tuple[int | str, int | None]:
@@ -886,6 +1030,289 @@ def update_children_docs_by_query(
         es_document._index.refresh()
 
 
+# The parent document, parent model, join field and child type of the child
+# documents that can be updated in aggregated UpdateByQuery requests.
+children_ubq_relations: dict[
+    ESDocumentClassType, tuple[ESDocumentClassType, ESModelClassType, str, str]
+] = {
+    PositionDocument: (PersonDocument, Person, "person_child", "position"),
+    ESRECAPDocument: (
+        DocketDocument,
+        Docket,
+        "docket_child",
+        "recap_document",
+    ),
+    OpinionDocument: (
+        OpinionClusterDocument,
+        OpinionCluster,
+        "cluster_child",
+        "opinion",
+    ),
+    OpinionClusterDocument: (
+        OpinionClusterDocument,
+        OpinionCluster,
+        "cluster_child",
+        "opinion",
+    ),
+}
+
+# Child documents are routed to their parent, so the routing is used as the
+# key of the new values of their parent.
+CHILDREN_UBQ_SCRIPT = """
+def values = params.parents[ctx._routing];
+if (values == null) {
+  ctx.op = 'noop';
+} else {
+  for (entry in values.entrySet()) {
+    ctx._source[entry.getKey()] = entry.getValue();
+  }
+}
+"""
+
+
+def compose_children_ubq_redis_keys(
+    es_document_name: ESDocumentNameType,
+) -> tuple[str, str]:
+    """Compose the redis keys for the pending children updates of a document
+    type and for the lock of their scheduled flush.
+
+    :param es_document_name: The child Elasticsearch document type name.
+    :return: A two-tuple of the pending hash key and the scheduled flush key.
+    """
+    return (
+        f"es_children_ubq:{es_document_name}:pending",
+        f"es_children_ubq:{es_document_name}:scheduled",
+    )
+
+
+def schedule_children_docs_ubq_flush(
+    r: Redis, es_document_name: ESDocumentNameType
+) -> None:
+    """Schedule update_children_docs_by_query_in_bulk at the end of the
+    aggregation window, unless a flush is already scheduled.
+
+    :param r: The Redis interface.
+    :param es_document_name: The child Elasticsearch document type name.
+    :return: None
+    """
+    window = settings.ELASTICSEARCH_UBQ_AGGREGATION_WINDOW
+    _, scheduled_key = compose_children_ubq_redis_keys(es_document_name)
+    # The lock expires in case the scheduled task is lost.
+    if r.set(scheduled_key, 1, nx=True, ex=window + 60):
+        update_children_docs_by_query_in_bulk.apply_async(
+            args=(es_document_name,), countdown=window
+        )
+
+
+def queue_children_docs_update(
+    es_document_name: ESDocumentNameType,
+    parent_instance_id: int,
+    fields_to_update: list[str],
+    fields_map: dict | None = None,
+) -> None:
+    """Add a parent change to the pending children updates of its document
+    type, so that the changes of all the parents received during the
+    aggregation window are applied in a single UpdateByQuery request.
+
+    Pending changes are stored in a redis hash whose fields are
+    "{parent_id}:{es_field}" and whose values are the model field to get the
+    value from, so repeated changes of the same parent are merged.
+
+    :param es_document_name: The child Elasticsearch document type name.
+    :param parent_instance_id: The parent instance ID.
+    :param fields_to_update: List of field names to be updated.
+    :param fields_map: A mapping from model fields to Elasticsearch document
+    fields.
+    :return: None
+    """
+    pending = {}
+    for field_to_update in fields_to_update:
+        field_list = (
+            fields_map[field_to_update] if fields_map else [field_to_update]
+        )
+        for field_name in field_list:
+            pending[f"{parent_instance_id}:{field_name}"] = field_to_update
+    if not pending:
+        return
+
+    r = get_redis_interface("CACHE")
+    pending_key, _ = compose_children_ubq_redis_keys(es_document_name)
+    r.hset(pending_key, mapping=pending)
+    schedule_children_docs_ubq_flush(r, es_document_name)
+
+
+def wait_for_es_task(es: Elasticsearch, task_id: str) -> dict[str, Any]:
+    """Wait for an Elasticsearch task to complete, logging its progress.
+
+    :param es: The Elasticsearch client instance.
+    :param task_id: The ID of the task to wait for.
+    :return: The task response, or an empty dict if the task status couldn't
+    be retrieved.
+    """
+    initial_wait = settings.ELASTICSEARCH_UBQ_POLL_INTERVAL
+    failed_attempts = 0
+    while True:
+        task_status = get_task_status(task_id, es)
+        task_info = retrieve_task_info(task_status)
+        if task_info.completed:
+            return task_status.get("response", {})
+        if not task_status:
+            failed_attempts += 1
+            if failed_attempts > 10:
+                return {}
+        estimated_time_remaining = compute_estimated_remaining_time(
+            initial_wait, task_info
+        )
+        logger.info(
+            "Task %s progress: %s/%s documents. Estimated time to finish: %s "
+            "seconds.",
+            task_id,
+            task_info.created,
+            task_info.total,
+            estimated_time_remaining,
+        )
+        time.sleep(min(estimated_time_remaining, 900))
+
+
+@app.task(
+    bind=True,
+    queue=settings.CELERY_ETL_TASK_QUEUE,
+    ignore_result=True,
+)
+def update_children_docs_by_query_in_bulk(
+    self: Task,
+    es_document_name: ESDocumentNameType,
+) -> None:
+    """Update the child documents of all the parents queued by
+    queue_children_docs_update, using one throttled UpdateByQuery request per
+    batch of parents.
+
+    Each request uses a terms filter on the parent IDs and a painless script
+    that reads the new values of each parent from a params map. Parents whose
+    children had version conflicts, or whose request couldn't be sent, are
+    queued again for the next window.
+
+    :param self: The celery task
+    :param es_document_name: The child Elasticsearch document type name.
+    :return: None
+    """
+
+    es_document = getattr(es_document_module, es_document_name)
+    parent_doc_class, parent_model, join_field, child_type = (
+        children_ubq_relations[es_document]
+    )
+    r = get_redis_interface("CACHE")
+    pending_key, scheduled_key = compose_children_ubq_redis_keys(
+        es_document_name
+    )
+    # Changes queued from now on are applied by the next flush.
+    r.delete(scheduled_key)
+    processing_key = f"{pending_key}:{uuid.uuid4().hex}"
+    try:
+        r.rename(pending_key, processing_key)
+    except ResponseError:
+        # Nothing pending.
+        return
+    pending = r.hgetall(processing_key)
+
+    parents_fields: defaultdict[int, dict[str, str]] = defaultdict(dict)
+    for key, field_to_update in pending.items():
+        parent_id, field_name = key.split(":", 1)
+        parents_fields[int(parent_id)][field_name] = field_to_update
+
+    client = connections.get_connection(alias="no_retry_connection")
+    parent_doc = parent_doc_class()
+    to_requeue = []
+    for parent_ids in batched(
+        parents_fields, settings.ELASTICSEARCH_UBQ_BATCH_SIZE
+    ):
+        parents = parent_model.objects.in_bulk(parent_ids)
+        params = {}
+        for parent_id, parent_instance in parents.items():
+            values = {}
+            for field_name, field_to_update in parents_fields[
+                parent_id
+            ].items():
+                prepare_method = getattr(
+                    parent_doc, f"prepare_{field_name}", None
+                )
+                values[field_name] = (
+                    prepare_method(parent_instance)
+                    if prepare_method
+                    else getattr(parent_instance, field_to_update)
+                )
+            values["timestamp"] = parent_doc.prepare_timestamp(parent_instance)
+            params[str(parent_id)] = values
+        if not params:
+            continue
+
+        query = Q(
+            "bool",
+            filter=[
+                Q("terms", _routing=list(params)),
+                Q("match", **{join_field: child_type}),
+            ],
+        )
+        try:
+            task = client.update_by_query(
+                index=es_document._index._name,
+                query=query.to_dict(),
+                script={
+                    "source": CHILDREN_UBQ_SCRIPT,
+                    "params": {"parents": params},
+                },
+                conflicts="proceed",
+                requests_per_second=(
+                    settings.ELASTICSEARCH_UBQ_REQUESTS_PER_SECOND
+                ),
+                wait_for_completion=False,
+            )
+        except (ConnectionError, ConnectionTimeout, ApiError) as e:
+            logger.warning(
+                "Error updating %s children of %s parents by query: %s",
+                es_document_name,
+                len(params),
+                e,
+            )
+            to_requeue.extend(parent_ids)
+            continue
+
+        response = wait_for_es_task(client, task["task"])
+        if not response:
+            logger.error(
+                "Unable to get the status of the %s children update task %s",
+                es_document_name,
+                task["task"],
+            )
+        elif response.get("failures"):
+            logger.error(
+                "The %s children update task %s had failures: %s",
+                es_document_name,
+                task["task"],
+                response["failures"],
+            )
+        elif response.get("version_conflicts"):
+            to_requeue.extend(parent_ids)
+
+    if to_requeue:
+        r.hset(
+            pending_key,
+            mapping={
+                f"{parent_id}:{field_name}": field_to_update
+                for parent_id in to_requeue
+                for field_name, field_to_update in parents_fields[
+                    parent_id
+                ].items()
+            },
+        )
+        schedule_children_docs_ubq_flush(r, es_document_name)
+    r.delete(processing_key)
+
+    if settings.ELASTICSEARCH_DSL_AUTO_REFRESH:
+        # Set auto-refresh, used for testing.
+        es_document._index.refresh()
+
+
 @app.task(
     bind=True,
     autoretry_for=(
@@ -971,8 +1398,14 @@ def bulk_indexing_generator(
     parent_id_mappings = {
         "RECAP": lambda document: document.docket_entry.docket_id,
         "OPINION": lambda document: document.cluster_id,
+        "POSITION": lambda document: document.person_id,
     }
-    for doc in docs_query_set.iterator():
+    # Fetch the related objects each document needs along with every chunk
+    # of rows, instead of lazily for each document.
+    docs_query_set = es_document.get_bulk_indexing_queryset(docs_query_set)
+    for doc in docs_query_set.iterator(
+        chunk_size=settings.ELASTICSEARCH_BULK_QUERYSET_CHUNK_SIZE
+    ):
         es_doc = es_document().prepare(doc)
         if child_id_property:
             if not parent_id:
@@ -1006,8 +1439,9 @@ def index_documents_in_bulk_from_queryset(
     parent_instance_id: int | None = None,
     use_streaming_bulk: bool = False,
 ) -> list[str]:
-    """Index documents in bulk from a queryset into ES. Indexes documents
-    using either streaming or parallel bulk  operations, depending on the mode.
+    """Index documents in bulk from a queryset into ES. Documents are sent in
+    chunks sized by payload bytes that adapt to the ES latency and rejections,
+    either one chunk at a time or from a pool of threads, depending on the mode.
 
     :param docs_queryset: A queryset containing the documents to index.
     :param es_document: The Elasticsearch document class corresponding to
@@ -1027,44 +1461,105 @@ def index_documents_in_bulk_from_queryset(
 
     client = connections.get_connection()
     failed_child_docs = []
-
-    if use_streaming_bulk:
-        # Use streaming_bulk in TestCase based tests. Since parallel_bulk
-        # doesn't work on them. Or force the use of streaming_bulk to reduce
-        # memory usage.
-        for success, info in streaming_bulk(
-            client,
-            bulk_indexing_generator(
-                docs_queryset,
-                es_document,
-                base_doc,
-                child_id_property,
-                parent_instance_id,
-            ),
-            chunk_size=settings.ELASTICSEARCH_BULK_BATCH_SIZE,
-        ):
-            if not success:
-                failed_child_docs.append(info["index"]["_id"])
-    else:
-        # Use parallel_bulk in production and tests based on TransactionTestCase
-        for success, info in parallel_bulk(
-            client,
-            bulk_indexing_generator(
-                docs_queryset,
-                es_document,
-                base_doc,
-                child_id_property,
-                parent_instance_id,
-            ),
-            thread_count=settings.ELASTICSEARCH_PARALLEL_BULK_THREADS,
-            chunk_size=settings.ELASTICSEARCH_BULK_BATCH_SIZE,
-        ):
-            if not success:
-                failed_child_docs.append(info["index"]["_id"])
+    # Chunks are sent from a single thread in TestCase based tests or to
+    # reduce memory usage, and from a pool of threads otherwise.
+    thread_count = (
+        1
+        if use_streaming_bulk
+        else settings.ELASTICSEARCH_PARALLEL_BULK_THREADS
+    )
+    for success, info in get_adaptive_bulk_indexer().bulk(
+        client,
+        bulk_indexing_generator(
+            docs_queryset,
+            es_document,
+            base_doc,
+            child_id_property,
+            parent_instance_id,
+        ),
+        thread_count=thread_count,
+    ):
+        if not success:
+            failed_child_docs.append(info["index"]["_id"])
 
     return failed_child_docs
 
 
+def prepare_serialized_bulk_actions(
+    instance_ids: list[int],
+    search_type: str,
+    document_type: str | None,
+) -> list[BulkItem]:
+    """Prepare and serialize the bulk index actions of a chunk of instances.
+
+    Meant to run in the worker processes of the cl_index_parent_and_child_docs
+    pipeline mode, so the CPU-heavy document preparation and JSON
+    serialization are spread across cores.
+
+    :param instance_ids: The parent instance IDs, or the child instance IDs
+    if document_type is "child".
+    :param search_type: The Search Type of the documents.
+    :param document_type: The document type to prepare, 'parent' or 'child'.
+    If None, parent documents and all their child documents are prepared.
+    :return: A list of BulkItem, ready to be sent to ES.
+    """
+    match search_type:
+        case SEARCH_TYPES.PEOPLE:
+            parent_es_document = PersonDocument
+            child_es_document = PositionDocument
+            child_id_property = "POSITION"
+            parents = Person.objects.filter(pk__in=instance_ids)
+            children = Position.objects.filter(person_id__in=instance_ids)
+        case SEARCH_TYPES.RECAP:
+            parent_es_document = DocketDocument
+            child_es_document = ESRECAPDocument
+            child_id_property = "RECAP"
+            parents = Docket.objects.filter(pk__in=instance_ids)
+            children = RECAPDocument.objects.filter(
+                docket_entry__docket_id__in=instance_ids
+            )
+            if document_type == "child":
+                children = RECAPDocument.objects.filter(pk__in=instance_ids)
+        case SEARCH_TYPES.OPINION:
+            parent_es_document = OpinionClusterDocument
+            child_es_document = OpinionDocument
+            child_id_property = "OPINION"
+            parents = OpinionCluster.objects.filter(pk__in=instance_ids)
+            children = Opinion.objects.filter(cluster_id__in=instance_ids)
+            if document_type == "child":
+                children = Opinion.objects.filter(pk__in=instance_ids)
+        case _:
+            return []
+
+    base_doc = {
+        "_op_type": "index",
+        "_index": parent_es_document._index._name,
+    }
+    client = connections.get_connection()
+    serializer = client.transport.serializers.get_serializer(
+        "application/json"
+    )
+    items = []
+    if document_type != "child":
+        items.extend(
+            serialize_bulk_action(action, serializer)
+            for action in bulk_indexing_generator(
+                parents.order_by("pk"), parent_es_document, base_doc
+            )
+        )
+    if document_type != "parent":
+        items.extend(
+            serialize_bulk_action(action, serializer)
+            for action in bulk_indexing_generator(
+                children.order_by("pk"),
+                child_es_document,
+                base_doc,
+                child_id_property=child_id_property,
+            )
+        )
+    return items
+
+
 @app.task(
     bind=True,
     autoretry_for=(ConnectionError,),
@@ -1346,41 +1841,16 @@ def index_dockets_in_bulk(
 
     dockets = Docket.objects.filter(pk__in=instance_ids)
     # Index dockets in bulk.
-    client = connections.get_connection()
     base_doc = {
         "_op_type": "index",
         "_index": DocketDocument._index._name,
     }
-    failed_docs = []
-    if testing_mode:
-        # Use streaming_bulk in TestCase based tests. Since parallel_bulk
-        # doesn't work on them.
-        for success, info in streaming_bulk(
-            client,
-            bulk_indexing_generator(
-                dockets,
-                DocketDocument,
-                base_doc,
-            ),
-            chunk_size=settings.ELASTICSEARCH_BULK_BATCH_SIZE,
-        ):
-            if not success:
-                failed_docs.append(info["index"]["_id"])
-
-    else:
-        for success, info in parallel_bulk(
-            client,
-            bulk_indexing_generator(
-                dockets,
-                DocketDocument,
-                base_doc,
-            ),
-            thread_count=settings.ELASTICSEARCH_PARALLEL_BULK_THREADS,
-            chunk_size=settings.ELASTICSEARCH_BULK_BATCH_SIZE,
-        ):
-            if not success:
-                failed_docs.append(info["index"]["_id"])
-
+    failed_docs = index_documents_in_bulk_from_queryset(
+        dockets,
+        DocketDocument,
+        base_doc,
+        use_streaming_bulk=testing_mode,
+    )
     if failed_docs:
         logger.error("Error indexing Dockets in bulk IDs are: %s", failed_docs)
 
@@ -1796,12 +2266,10 @@ def request_embeddings_for_batch(batch: dict, service_name: str) -> list[dict]:
     corresponding opinion document as returned  by the inception microservice.
     """
     data = json.dumps(batch)
-    response = asyncio.run(
-        microservice(
-            service=service_name,
-            method="POST",
-            data=data,
-        )
+    response = microservice_sync(
+        service=service_name,
+        method="POST",
+        data=data,
     )
     return response.json()
 
@@ -1816,6 +2284,40 @@ def inception_cpu_batch_request(batch: dict) -> list[dict]:
     return request_embeddings_for_batch(batch, "inception-cpu-batch")
 
 
+def log_embedding_throughput(
+    batch_range: str,
+    document_count: int,
+    token_count: int | None,
+    elapsed: float,
+) -> None:
+    """Log how fast inception embedded a batch, to help tune the token
+    count per batch.
+
+    :param batch_range: The first and last IDs of the batch.
+    :param document_count: The number of documents in the batch.
+    :param token_count: The number of tokens in the batch, if known.
+    :param elapsed: The seconds the inception request took.
+    :return: None.
+    """
+    if token_count is None:
+        logger.info(
+            "Embedded batch %s with %s documents in %.2fs.",
+            batch_range,
+            document_count,
+            elapsed,
+        )
+        return
+    logger.info(
+        "Embedded batch %s with %s documents and %s tokens in %.2fs, "
+        "%.0f tokens/s.",
+        batch_range,
+        document_count,
+        token_count,
+        elapsed,
+        token_count / elapsed if elapsed else 0,
+    )
+
+
 def embeddings_cache_key():
     return "embeddings:"
 
@@ -1860,11 +2362,9 @@ def compute_single_opinion_embeddings(self, pk: int) -> None:
     if opinion.token_count < settings.MIN_OPINION_SIZE:
         return None
 
-    embeddings = asyncio.run(
-        microservice(
-            service="inception-text",
-            data=opinion.clean_text,
-        )
+    embeddings = microservice_sync(
+        service="inception-text",
+        data=opinion.clean_text,
     )
     # Exit early if the microservice call failed
     if not embeddings.is_success:
@@ -1901,7 +2401,11 @@ def compute_single_opinion_embeddings(self, pk: int) -> None:
     retry_backoff=10,
 )
 def create_opinion_text_embeddings(
-    self, batch: list[int], database: str, device: str = "cpu"
+    self,
+    batch: list[int],
+    database: str,
+    device: str = "cpu",
+    token_count: int | None = None,
 ) -> str | None:
     """Get embeddings for Opinion texts from inception.
 
@@ -1910,6 +2414,8 @@ def create_opinion_text_embeddings(
     :param database: The database to be used during processing.
     :param device: The device to run the embedding generation on (e.g., 'cpu'
         or 'gpu'). Defaults to 'cpu'.
+    :param token_count: Optional, the number of tokens in the batch, to log
+    the throughput of the request.
     :return: The cache key used to temporarily store embeddings.
     """
     opinions = (
@@ -1929,7 +2435,14 @@ def create_opinion_text_embeddings(
         if device == "gpu"
         else inception_cpu_batch_request
     )
+    start_time = time.monotonic()
     embeddings = inception_service(batch_request)
+    log_embedding_throughput(
+        batch_range,
+        len(opinions_to_vectorize),
+        token_count,
+        time.monotonic() - start_time,
+    )
     # Use a UUID to guarantee the uniqueness of this batch of stored embeddings
     batch_uuid = str(uuid.uuid4().hex)
     cache_key = get_embeddings_cache_key(batch_uuid, batch_range)
@@ -2009,6 +2522,20 @@ def save_embeddings(
         log_invalid_embedding_errors(embeddings)
         return None
 
+    store_embeddings(embeddings, directory)
+    # Delete the cache key after the saving process is complete.
+    cache.delete(cache_key)
+
+
+def store_embeddings(
+    embeddings: list[dict], directory: str = "opinions"
+) -> None:
+    """Upload each embedding record of an inception batch response to S3.
+
+    :param embeddings: The list of embedding records returned by inception.
+    :param directory: The directory where the embeddings will be stored.
+    :return: None.
+    """
     storage = S3IntelligentTieringStorage()
     for embedding_record in embeddings:
         record_id = embedding_record["id"]
@@ -2023,8 +2550,46 @@ def save_embeddings(
         )
         storage.save(file_path, ContentFile(file_contents))
 
-    # Delete the cache key after the saving process is complete.
-    cache.delete(cache_key)
+
+def embed_and_store_opinions(
+    documents: list[dict[str, Any]],
+    device: str = "cpu",
+    token_count: int | None = None,
+) -> int:
+    """Get embeddings for a batch of opinion texts and upload them straight
+    to S3, without holding the response in the cache.
+
+    Unlike create_opinion_text_embeddings, the texts are provided by the
+    caller, so this can run in a thread while the caller fetches the next
+    batch from the database.
+
+    :param documents: A list of dicts with the "id" and "text" of each
+    opinion to embed.
+    :param device: The device to run the embedding generation on (e.g., 'cpu'
+        or 'gpu'). Defaults to 'cpu'.
+    :param token_count: Optional, the number of tokens in the batch, to log
+    the throughput of the request.
+    :return: The number of embedding records uploaded.
+    """
+    inception_service = (
+        inception_batch_request
+        if device == "gpu"
+        else inception_cpu_batch_request
+    )
+    start_time = time.monotonic()
+    embeddings = inception_service({"documents": documents})
+    log_embedding_throughput(
+        f"{documents[0]['id']}_{documents[-1]['id']}",
+        len(documents),
+        token_count,
+        time.monotonic() - start_time,
+    )
+    if not isinstance(embeddings, list):
+        log_invalid_embedding_errors(embeddings)
+        return 0
+
+    store_embeddings(embeddings)
+    return len(embeddings)
 
 
 def download_embedding(
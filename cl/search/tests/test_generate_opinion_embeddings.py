@@ -329,3 +329,139 @@ class GenerateOpinionEmbeddingTest(TestCase):
             "The opinion ID:%s exceeds the batch size limit.",
             self.opinion_4.pk,
         )
+
+    @patch(
+        "cl.search.management.commands.generate_opinion_embeddings.log_last_document_indexed"
+    )
+    @patch("cl.search.tasks.S3IntelligentTieringStorage")
+    def test_stream_embeddings(
+        self,
+        mock_aws_media_storage,
+        mock_log_last_document_indexed,
+        mock_embeddings_cache_key,
+    ):
+        """Can the command embed opinions and upload them to S3 directly,
+        logging the resume cursor only once each batch is stored?
+        """
+        fake_storage = FakeS3IntelligentTieringStorage()
+        mock_aws_media_storage.return_value = fake_storage
+
+        with (
+            patch(
+                "cl.search.tasks.inception_batch_request",
+                side_effect=inception_batch_request_mock,
+            ) as mock_inception_batch_request,
+            patch("cl.search.tasks.cache") as mock_cache,
+        ):
+            call_command(
+                "generate_opinion_embeddings",
+                token_count=250,
+                start_id=0,
+                count=4,
+                stream=True,
+                max_in_flight=2,
+            )
+            self.assertEqual(mock_inception_batch_request.call_count, 2)
+            mock_cache.set.assert_not_called()
+
+        expected_embeddings = inception_batch_request_mock(
+            self._get_opinions_to_vectorize(
+                [self.opinion_1.pk, self.opinion_2.pk, self.opinion_3.pk]
+            )
+        )
+        self.assertEqual(len(fake_storage.saved_files), 3)
+        for embedding in fake_storage.saved_files.values():
+            with self.subTest(embedding):
+                self.assertIn(json.loads(embedding), expected_embeddings)
+
+        # The cursor is logged once per batch, in order.
+        self.assertEqual(
+            [
+                call.args[0]
+                for call in mock_log_last_document_indexed.call_args_list
+            ],
+            [self.opinion_2.pk, self.opinion_3.pk],
+        )
+
+    @patch(
+        "cl.search.management.commands.generate_opinion_embeddings.log_last_document_indexed"
+    )
+    @patch("cl.search.tasks.S3IntelligentTieringStorage")
+    def test_sort_by_length_and_isolate_outliers(
+        self,
+        mock_aws_media_storage,
+        mock_log_last_document_indexed,
+        mock_embeddings_cache_key,
+    ):
+        """Are opinions sorted by length before being packed into batches,
+        and are opinions that exceed the token count embedded on their own?
+        """
+        fake_storage = FakeS3IntelligentTieringStorage()
+        mock_aws_media_storage.return_value = fake_storage
+
+        with patch(
+            "cl.search.tasks.inception_batch_request",
+            side_effect=inception_batch_request_mock,
+        ) as mock_inception_batch_request:
+            call_command(
+                "generate_opinion_embeddings",
+                token_count=250,
+                start_id=0,
+                stream=True,
+                sort_window=10,
+                isolate_outliers=True,
+            )
+
+        batches = [
+            {document["id"] for document in call.args[0]["documents"]}
+            for call in mock_inception_batch_request.call_args_list
+        ]
+        # The two shortest opinions are packed together, the longest short
+        # opinion goes alone, and the outlier is sent last on its own.
+        self.assertEqual([len(batch) for batch in batches], [2, 1, 1])
+        self.assertEqual(
+            batches[0] | batches[1],
+            {self.opinion_1.pk, self.opinion_2.pk, self.opinion_3.pk},
+        )
+        self.assertEqual(batches[2], {self.opinion_4.pk})
+        self.assertEqual(len(fake_storage.saved_files), 4)
+        # The cursor is only logged once the whole window is stored.
+        mock_log_last_document_indexed.assert_called_once_with(
+            self.opinion_4.pk,
+            "o_inception_embedding:log",
+        )
+
+    @patch(
+        "cl.search.management.commands.generate_opinion_embeddings.log_last_document_indexed"
+    )
+    @patch("cl.search.tasks.S3IntelligentTieringStorage")
+    def test_sort_window_cursor_with_celery(
+        self,
+        mock_aws_media_storage,
+        mock_log_last_document_indexed,
+        mock_embeddings_cache_key,
+    ):
+        """Is the resume cursor of a sorted window only logged once all the
+        batches of the window were sent to Celery?
+        """
+        mock_aws_media_storage.return_value = FakeS3IntelligentTieringStorage()
+
+        with patch(
+            "cl.search.tasks.inception_batch_request",
+            side_effect=inception_batch_request_mock,
+        ) as mock_inception_batch_request:
+            mock_log_last_document_indexed.side_effect = lambda *args: (
+                self.assertEqual(mock_inception_batch_request.call_count, 3)
+            )
+            call_command(
+                "generate_opinion_embeddings",
+                token_count=250,
+                start_id=0,
+                sort_window=10,
+                isolate_outliers=True,
+            )
+
+        mock_log_last_document_indexed.assert_called_once_with(
+            self.opinion_4.pk,
+            "o_inception_embedding:log",
+        )
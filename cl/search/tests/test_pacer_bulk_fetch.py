@@ -793,7 +793,7 @@ class BulkFetchPacerIntegrationTest(TestCase):
         "cl.search.management.commands.pacer_bulk_fetch.enough_time_elapsed",
         return_value=True,
     )
-    @patch("cl.corpus_importer.tasks.microservice")
+    @patch("cl.corpus_importer.tasks.microservice_sync")
     def test_pacer_bulk_fetch_integration(
         self,
         microservice_mock,
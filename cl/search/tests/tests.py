@@ -44,6 +44,7 @@ from cl.lib.utils import (
     modify_court_id_queries,
 )
 from cl.people_db.factories import PersonFactory, PositionFactory
+from cl.people_db.models import Position
 from cl.recap.constants import COURT_TIMEZONES
 from cl.recap.factories import DocketEntriesDataFactory, DocketEntryDataFactory
 from cl.recap.mergers import add_docket_entries
@@ -3041,6 +3042,75 @@ class SweepIndexerCommandTest(
             int(response[0].meta.routing), self.opinion_cluster_2.pk
         )
 
+    @override_settings(ELASTICSEARCH_SWEEP_INDEXER_ACTION="delta")
+    @mock.patch(
+        "cl.search.management.commands.sweep_indexer.compose_watermarks_redis_key",
+        return_value="es_sweep_indexer:watermarks_test",
+    )
+    def test_sweep_indexer_delta(
+        self, mock_watermarks_key, mock_logging_prefix
+    ):
+        """Confirm the 'delta' sweep only checks the rows modified since the
+        last sweep and re-indexes the ones whose ES document is missing or
+        stale.
+        """
+        model_names = [
+            "audio.Audio",
+            "people_db.Person",
+            "search.OpinionCluster",
+            "search.Opinion",
+            "search.Docket",
+            "search.RECAPDocument",
+        ]
+        with mock.patch(
+            "cl.search.management.commands.sweep_indexer.logger"
+        ) as mock_logger:
+            # No watermarks yet, recently modified rows missing in ES are
+            # indexed.
+            call_command("sweep_indexer", testing_mode=True)
+            expected_dict = {
+                "audio.Audio": 2,
+                "people_db.Person": 2,
+                "search.OpinionCluster": 2,
+                "search.Opinion": 3,
+                "search.Docket": 2,
+                "search.RECAPDocument": 3,
+            }
+            mock_logger.info.assert_called_with(
+                f"\rDocuments Indexed: {expected_dict}"
+            )
+
+            # Nothing was modified since the previous sweep.
+            call_command("sweep_indexer", testing_mode=True)
+            expected_dict = {model: 0 for model in model_names}
+            mock_logger.info.assert_called_with(
+                f"\rDocuments Indexed: {expected_dict}"
+            )
+
+            # Modify a docket without updating its ES document.
+            Docket.objects.filter(pk=self.de.docket.pk).update(
+                date_modified=now()
+            )
+            call_command("sweep_indexer", testing_mode=True)
+            expected_dict["search.Docket"] = 1
+            mock_logger.info.assert_called_with(
+                f"\rDocuments Indexed: {expected_dict}"
+            )
+
+            # Modify a position without updating its person's ES document.
+            Position.objects.filter(pk=self.position_2.pk).update(
+                date_modified=now()
+            )
+            call_command("sweep_indexer", testing_mode=True)
+            expected_dict["search.Docket"] = 0
+            expected_dict["people_db.Person"] = 1
+            mock_logger.info.assert_called_with(
+                f"\rDocuments Indexed: {expected_dict}"
+            )
+
+        r = get_redis_interface("CACHE")
+        r.delete("es_sweep_indexer:watermarks_test")
+
     @override_settings(ELASTICSEARCH_SWEEP_INDEXER_ACTION="missing")
     def test_sweep_indexer_missing(self, mock_logging_prefix):
         """Confirm the sweep_indexer command works properly indexing 'missing'
@@ -1,15 +1,32 @@
 import csv
+import gzip
 import io
+from datetime import timedelta
+from unittest import mock
 
+import time_machine
 from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
 from django.core.management import call_command
 from django.http import QueryDict
 from django.urls import reverse
+from django.utils.timezone import now
 
-from cl.lib.search_utils import fetch_es_results_for_csv
+from cl.donate.models import (
+    MembershipPaymentStatus,
+    NeonMembership,
+    NeonMembershipLevel,
+)
+from cl.lib.search_utils import (
+    fetch_es_results_for_csv,
+    stream_es_results_for_csv,
+    write_search_results_csv,
+)
 from cl.lib.test_helpers import RECAPSearchTestCase
 from cl.search.documents import ESRECAPDocument
 from cl.search.factories import DocketFactory
+from cl.search.forms import SearchForm
 from cl.search.models import SEARCH_TYPES, Docket
 from cl.tests.cases import ESIndexTestCase, TestCase
 from cl.users.factories import UserProfileWithParentsFactory
@@ -168,3 +185,82 @@ class ExportSearchTest(RECAPSearchTestCase, ESIndexTestCase, TestCase):
         self.assertEqual(len(mail.outbox[0].attachments), 1)
         *_, attachment_type = mail.outbox[0].attachments[0]
         self.assertEqual(attachment_type, "text/csv")
+
+    def test_stream_results_match_capped_export(self) -> None:
+        """Confirms walking the results with a point in time and search_after
+        produces the same CSV rows as the capped export, across pages."""
+        query = "type=r&q=12-1235 OR Jackson"
+        qd = QueryDict(query.encode(), mutable=True)
+        search_form = SearchForm(qd)
+        self.assertTrue(search_form.is_valid())
+
+        def to_csv_lines(rows):
+            with io.StringIO() as output:
+                write_search_results_csv(output, rows, SEARCH_TYPES.RECAP)
+                return sorted(output.getvalue().splitlines())
+
+        results, _ = fetch_es_results_for_csv(qd, SEARCH_TYPES.RECAP)
+        # One docket per page, so the second docket comes from search_after.
+        streamed = list(
+            stream_es_results_for_csv(search_form.cleaned_data, page_size=1)
+        )
+        self.assertEqual(len(streamed), 3)
+        self.assertEqual(to_csv_lines(streamed), to_csv_lines(results))
+
+    @mock.patch("cl.search.tasks.S3SearchExportStorage")
+    def test_members_get_link_to_streamed_export(self, mock_storage) -> None:
+        """Confirms members get a link to a gzipped CSV file with all the
+        results instead of an attachment."""
+        storage = InMemoryStorage()
+        mock_storage.return_value = storage
+        NeonMembership.objects.create(
+            level=NeonMembershipLevel.LEGACY,
+            user=self.user_profile.user,
+            termination_date=now().date() + timedelta(weeks=4),
+            payment_status=MembershipPaymentStatus.SUCCEEDED,
+        )
+        self.client.login(
+            username=self.user_profile.user.username, password="password"
+        )
+        with self.settings(
+            SEARCH_EXPORT_STREAMING_ENABLED=True, SEARCH_EXPORT_PAGE_SIZE=1
+        ):
+            self.client.post(
+                reverse("export_search_results"),
+                {"query": "q=12-1235 OR Jackson&type=r"},
+            )
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(len(mail.outbox[0].attachments), 0)
+        export_dirs, _ = storage.listdir("search-exports")
+        self.assertEqual(len(export_dirs), 1)
+        _, files = storage.listdir(f"search-exports/{export_dirs[0]}")
+        file_path = f"search-exports/{export_dirs[0]}/{files[0]}"
+        self.assertTrue(file_path.endswith(".csv.gz"))
+        self.assertIn(storage.url(file_path), mail.outbox[0].body)
+
+        with storage.open(file_path, "rb") as f:
+            content = gzip.decompress(f.read()).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+
+
+class DeleteOldSearchExportsTest(TestCase):
+    def test_delete_exports_older_than_link_expiration(self) -> None:
+        """Are only the exports whose link has expired deleted?"""
+        storage = InMemoryStorage()
+        with time_machine.travel(now() - timedelta(days=8), tick=False):
+            storage.save("search-exports/old/results.csv.gz", ContentFile(b""))
+        storage.save("search-exports/new/results.csv.gz", ContentFile(b""))
+
+        with (
+            mock.patch(
+                "cl.search.management.commands.cl_delete_old_search_exports.S3SearchExportStorage",
+                return_value=storage,
+            ),
+            self.settings(SEARCH_EXPORT_URL_EXPIRATION=60 * 60 * 24 * 7),
+        ):
+            call_command("cl_delete_old_search_exports")
+
+        self.assertFalse(storage.exists("search-exports/old/results.csv.gz"))
+        self.assertTrue(storage.exists("search-exports/new/results.csv.gz"))
@@ -4414,7 +4414,7 @@ class EsOpinionsIndexingTest(
 
     @mock.patch("cl.search.tasks.download_embedding")
     @mock.patch("cl.search.tasks.S3IntelligentTieringStorage")
-    @mock.patch("cl.search.tasks.microservice")
+    @mock.patch("cl.search.tasks.microservice_sync")
     def test_updating_text_field_computes_embeddings(
         self, inception_mock, mock_aws_media_storage, mock_download_embeddings
     ) -> None:
@@ -4501,7 +4501,7 @@ class EsOpinionsIndexingTest(
 
     @mock.patch("cl.search.tasks.logging.error")
     @mock.patch("cl.search.tasks.download_embedding")
-    @mock.patch("cl.search.tasks.microservice")
+    @mock.patch("cl.search.tasks.microservice_sync")
     def test_missing_embeddings_log_error(
         self, inception_mock, download_mock, logger_mock
     ):
@@ -4559,7 +4559,7 @@ class EsOpinionsIndexingTest(
         self.assertFalse(es_doc.embeddings)
 
     @mock.patch("cl.search.tasks.download_embedding")
-    @mock.patch("cl.search.tasks.microservice")
+    @mock.patch("cl.search.tasks.microservice_sync")
     def test_skip_computing_embedding_for_opinion_below_token_threshold(
         self, inception_mock, download_mock
     ):
@@ -1,7 +1,9 @@
 import datetime
+import json
 import math
 import re
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 from unittest import mock
 
@@ -10,9 +12,11 @@ from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.contrib import admin
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.core.paginator import Paginator
+from django.db import connection
 from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now
 from elasticsearch_dsl import Q
@@ -88,9 +92,13 @@ from cl.search.models import (
     RECAPDocument,
 )
 from cl.search.tasks import (
+    bulk_indexing_generator,
+    compose_children_ubq_redis_keys,
     es_save_document,
     index_docket_parties_in_es,
     index_related_cites_fields,
+    prepare_serialized_bulk_actions,
+    update_children_docs_by_query_in_bulk,
     update_es_document,
 )
 from cl.search.types import EventTable
@@ -6968,6 +6976,130 @@ class IndexDocketRECAPDocumentsCommandTest(
         if keys:
             self.r.delete(*keys)
 
+    def test_bulk_indexing_generator_prefetches_related_objects(self):
+        """Does preparing RECAPDocuments in bulk produce the same documents
+        as preparing them one by one, with a number of queries that doesn't
+        grow with the number of documents?
+        """
+        base_doc = {"_op_type": "index", "_index": DocketDocument._index._name}
+
+        def generate_docs(rd_ids):
+            queryset = RECAPDocument.objects.filter(pk__in=rd_ids).order_by(
+                "pk"
+            )
+            with CaptureQueriesContext(connection) as ctx:
+                docs = list(
+                    bulk_indexing_generator(
+                        queryset,
+                        ESRECAPDocument,
+                        base_doc,
+                        child_id_property="RECAP",
+                    )
+                )
+            return docs, len(ctx.captured_queries)
+
+        _, single_doc_queries = generate_docs([self.rd_2.pk])
+        rds = [self.rd, self.rd_att, self.rd_2]
+        docs, queries = generate_docs([rd.pk for rd in rds])
+        self.assertEqual(queries, single_doc_queries)
+
+        self.assertEqual(len(docs), len(rds))
+        for doc, rd in zip(docs, rds):
+            self.assertEqual(doc["_routing"], str(rd.docket_entry.docket_id))
+            expected = ESRECAPDocument().prepare(rd)
+            for key in ("_op_type", "_index", "_id", "_routing", "timestamp"):
+                doc.pop(key)
+            expected.pop("timestamp")
+            self.assertEqual(doc, expected)
+
+    def test_prepare_serialized_bulk_actions(self):
+        """Are parent and child documents prepared and serialized for the
+        pipeline mode of cl_index_parent_and_child_docs?
+        """
+        docket_id = self.de.docket_id
+        items = prepare_serialized_bulk_actions(
+            [docket_id], SEARCH_TYPES.RECAP, None
+        )
+        actions = [json.loads(lines[0])["index"] for lines, _ in items]
+        self.assertEqual(
+            actions,
+            [
+                {"_index": DocketDocument._index._name, "_id": docket_id},
+                {
+                    "_index": DocketDocument._index._name,
+                    "_id": ES_CHILD_ID(self.rd.pk).RECAP,
+                    "routing": str(docket_id),
+                },
+                {
+                    "_index": DocketDocument._index._name,
+                    "_id": ES_CHILD_ID(self.rd_att.pk).RECAP,
+                    "routing": str(docket_id),
+                },
+            ],
+        )
+        for lines, size in items:
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(size, sum(len(line) + 1 for line in lines))
+
+        # Only child documents.
+        items = prepare_serialized_bulk_actions(
+            [self.rd_2.pk], SEARCH_TYPES.RECAP, "child"
+        )
+        self.assertEqual(len(items), 1)
+        source = json.loads(items[0][0][1])
+        self.assertEqual(source["id"], self.rd_2.pk)
+
+    def test_pipeline_checkpoint_stops_at_failed_chunk(self):
+        """Does the pipeline mode stop advancing the --auto-resume checkpoint
+        once a chunk fails, so a resumed run doesn't skip it? And is it
+        rejected with --missing?
+        """
+        command = (
+            "cl.search.management.commands.cl_index_parent_and_child_docs"
+        )
+        indexer = mock.MagicMock()
+        # Fail the first chunk only; the following ones are indexed.
+        indexer.bulk_items.side_effect = lambda *args, **kwargs: (
+            iter([])
+            if indexer.bulk_items.call_count > 1
+            else iter([(False, {"index": {"_id": "1"}})])
+        )
+        with (
+            mock.patch(
+                f"{command}.ProcessPoolExecutor",
+                lambda **kwargs: ThreadPoolExecutor(max_workers=1),
+            ),
+            mock.patch(
+                f"{command}.prepare_serialized_bulk_actions", return_value=[]
+            ),
+            mock.patch(
+                f"{command}.get_adaptive_bulk_indexer", return_value=indexer
+            ),
+        ):
+            call_command(
+                "cl_index_parent_and_child_docs",
+                search_type=SEARCH_TYPES.RECAP,
+                pk_offset=0,
+                chunk_size=1,
+                processes=1,
+            )
+        self.assertEqual(indexer.bulk_items.call_count, 2)
+        self.assertEqual(
+            get_last_parent_document_id_processed(
+                compose_redis_key(SEARCH_TYPES.RECAP)
+            ),
+            0,
+        )
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "cl_index_parent_and_child_docs",
+                search_type=SEARCH_TYPES.RECAP,
+                pk_offset=0,
+                processes=1,
+                missing=True,
+            )
+
     def test_index_dockets_in_bulk_task(self):
         """Confirm the command can properly index dockets in bulk from the
         ready_mix_cases_project command.
@@ -7943,6 +8075,59 @@ class RECAPIndexingTest(
                 DocketDocument.exists(id=ES_CHILD_ID(rd_pk).RECAP)
             )
 
+    @override_settings(
+        ELASTICSEARCH_UBQ_AGGREGATION_WINDOW=60,
+        ELASTICSEARCH_UBQ_POLL_INTERVAL=0.01,
+    )
+    def test_aggregate_docket_fields_updates_in_recap_documents(
+        self,
+    ) -> None:
+        """Confirm the docket changes received within the aggregation window
+        are applied to the RECAPDocuments of all the dockets at once.
+        """
+
+        rds = []
+        for i in range(2):
+            de = DocketEntryFactory(
+                docket=DocketFactory(
+                    court=self.court,
+                    case_name=f"Lorem vs Ipsum {i}",
+                    source=Docket.RECAP,
+                ),
+                description="MOTION for Leave to File Amicus Curiae Lorem",
+            )
+            rds.append(
+                RECAPDocumentFactory(docket_entry=de, document_number="1")
+            )
+
+        # Simulate a flush already scheduled, so the changes are only queued.
+        r = get_redis_interface("CACHE")
+        pending_key, scheduled_key = compose_children_ubq_redis_keys(
+            "ESRECAPDocument"
+        )
+        r.set(scheduled_key, 1)
+        self.addCleanup(r.delete, pending_key, scheduled_key)
+        for i, rd in enumerate(rds):
+            docket = rd.docket_entry.docket
+            docket.case_name = f"Dolor vs Amet {i}"
+            docket.save()
+
+        for i, rd in enumerate(rds):
+            rd_doc = ESRECAPDocument.get(id=ES_CHILD_ID(rd.pk).RECAP)
+            self.assertEqual(rd_doc.caseName, f"Lorem vs Ipsum {i}")
+        self.assertEqual(r.hlen(pending_key), 2)
+
+        update_children_docs_by_query_in_bulk.delay("ESRECAPDocument")
+
+        for i, rd in enumerate(rds):
+            rd_doc = ESRECAPDocument.get(id=ES_CHILD_ID(rd.pk).RECAP)
+            self.assertEqual(rd_doc.caseName, f"Dolor vs Amet {i}")
+        self.assertFalse(r.exists(pending_key))
+        self.assertFalse(r.exists(scheduled_key))
+
+        for rd in rds:
+            rd.docket_entry.docket.delete()
+
     def test_docket_indexing_and_tasks_count(self) -> None:
         """Confirm a Docket is properly indexed in ES with the right number of
         indexing tasks.
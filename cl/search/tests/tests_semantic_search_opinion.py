@@ -268,7 +268,7 @@ class OpinionEmbeddingIndexingTests(ESIndexTestCase, TestCase):
 
 @override_settings(KNN_SIMILARITY=0.3)
 @override_settings(KNN_SEARCH_ENABLED=True)
-@mock.patch("cl.lib.elasticsearch_utils.microservice")
+@mock.patch("cl.lib.elasticsearch_utils.microservice_sync")
 class SemanticSearchTests(ESIndexTestCase, TestCase):
     @classmethod
     def setUpTestData(cls):
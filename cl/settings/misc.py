@@ -65,6 +65,23 @@ CAP_R2_BUCKET_NAME = env("CAP_R2_BUCKET_NAME", default="cap-static")
 WEBHOOK_V1_DEPRECATION_DATE = env(
     "WEBHOOK_V1_DEPRECATION_DATE", default="2024-11-18"
 )
+# Send webhook events that fan out to many endpoints concurrently from an
+# asyncio event loop instead of one by one.
+WEBHOOK_DELIVERY_ENGINE_ENABLED = env.bool(
+    "WEBHOOK_DELIVERY_ENGINE_ENABLED", default=False
+)
+# The number of webhook events sent before their rows are updated, the
+# maximum number of requests in flight, and the maximum number of requests
+# in flight to the same endpoint.
+WEBHOOK_DELIVERY_BATCH_SIZE = env.int(
+    "WEBHOOK_DELIVERY_BATCH_SIZE", default=100
+)
+WEBHOOK_DELIVERY_MAX_CONCURRENCY = env.int(
+    "WEBHOOK_DELIVERY_MAX_CONCURRENCY", default=50
+)
+WEBHOOK_DELIVERY_MAX_CONCURRENCY_PER_ENDPOINT = env.int(
+    "WEBHOOK_DELIVERY_MAX_CONCURRENCY_PER_ENDPOINT", default=4
+)
 
 # OCR extraction
 # Minimum number of characters between common headers to consider that the page
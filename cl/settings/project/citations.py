@@ -2,3 +2,18 @@ import environ
 
 env = environ.FileAwareEnv()
 MAX_CITATIONS_PER_REQUEST = env.int("MAX_CITATIONS_PER_REQUEST", default=250)
+# The number of full citation lookups sent to ES in a single MultiSearch
+# request when resolving all the citations of an opinion at once.
+CITATION_RESOLUTION_MSEARCH_BATCH_SIZE = env.int(
+    "CITATION_RESOLUTION_MSEARCH_BATCH_SIZE", default=100
+)
+
+# Directory of the memory-mapped citation lookup index used by the citation
+# lookup API. Build it with the build_citation_lookup_index command. Leave
+# empty to disable the index and always query the database.
+CITATION_LOOKUP_INDEX_DIR = env("CITATION_LOOKUP_INDEX_DIR", default="")
+# Minimum number of seconds between refreshes of the index from the
+# CitationEvent table.
+CITATION_LOOKUP_INDEX_REFRESH_INTERVAL = env.int(
+    "CITATION_LOOKUP_INDEX_REFRESH_INTERVAL", default=60
+)
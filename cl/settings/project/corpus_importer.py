@@ -34,3 +34,16 @@ IQUERY_SWEEP_UPLOADS_SIGNAL_ENABLED = env.bool(
 )
 IQUERY_COURT_RATE = env("IQUERY_COURT_RATE", default="100/s")
 OPENAI_TRANSCRIPTION_KEY = env("OPENAI_TRANSCRIPTION_KEY", default=None)
+# The minimum number of docket entries in a docket merge to match them in
+# memory and save them with bulk queries. 0 always merges them one by one.
+RECAP_BULK_MERGE_MIN_ENTRIES = env.int(
+    "RECAP_BULK_MERGE_MIN_ENTRIES", default=0
+)
+# Whether judge lookups by name use a per-process in-memory roster of the
+# judges of every court instead of querying the database. The roster is
+# rebuilt when a Person or Position is saved or deleted, checking for changes
+# at most every JUDGE_ROSTER_REFRESH_INTERVAL seconds.
+JUDGE_ROSTER_ENABLED = env.bool("JUDGE_ROSTER_ENABLED", default=False)
+JUDGE_ROSTER_REFRESH_INTERVAL = env.int(
+    "JUDGE_ROSTER_REFRESH_INTERVAL", default=60
+)
@@ -22,6 +22,19 @@ INCEPTION_BATCH_TIMEOUT_MULTIPLIER = env.int(
     "INCEPTION_BATCH_TIMEOUT_MULTIPLIER", default=1
 )
 
+# Connection pool defaults for the long-lived clients used by Celery workers.
+# Each service in MICROSERVICE_URLS can override them with the
+# "max_connections", "max_keepalive_connections" and "keepalive_expiry" keys.
+MICROSERVICE_MAX_CONNECTIONS = env.int(
+    "MICROSERVICE_MAX_CONNECTIONS", default=10
+)
+MICROSERVICE_MAX_KEEPALIVE_CONNECTIONS = env.int(
+    "MICROSERVICE_MAX_KEEPALIVE_CONNECTIONS", default=5
+)
+MICROSERVICE_KEEPALIVE_EXPIRY = env.float(
+    "MICROSERVICE_KEEPALIVE_EXPIRY", default=60.0
+)
+
 MICROSERVICE_URLS = {
     # DOCTOR Endpoints
     "doctor-heartbeat": {
@@ -6,6 +6,25 @@ env = environ.FileAwareEnv()
 # Export setting #
 ###################
 MAX_SEARCH_RESULTS_EXPORTED = env("MAX_SEARCH_RESULTS_EXPORTED", default=250)
+# Stream the search exports of members to a gzipped CSV file in storage, with
+# no limit on the number of rows when SEARCH_EXPORT_STREAMING_MAX_ROWS is 0.
+SEARCH_EXPORT_STREAMING_ENABLED = env.bool(
+    "SEARCH_EXPORT_STREAMING_ENABLED", default=False
+)
+SEARCH_EXPORT_STREAMING_MAX_ROWS = env.int(
+    "SEARCH_EXPORT_STREAMING_MAX_ROWS", default=0
+)
+# The number of parent documents fetched per page, and how long the point in
+# time used to walk the results is kept alive between pages.
+SEARCH_EXPORT_PAGE_SIZE = env.int("SEARCH_EXPORT_PAGE_SIZE", default=500)
+SEARCH_EXPORT_PIT_KEEP_ALIVE = env.str(
+    "SEARCH_EXPORT_PIT_KEEP_ALIVE", default="2m"
+)
+# Seconds before the link to a streamed export expires. S3 allows 7 days max.
+# Run cl_delete_old_search_exports daily to delete exports whose link expired.
+SEARCH_EXPORT_URL_EXPIRATION = env.int(
+    "SEARCH_EXPORT_URL_EXPIRATION", default=60 * 60 * 24 * 7
+)
 
 ###################
 # Related content #
@@ -13,6 +32,11 @@ MAX_SEARCH_RESULTS_EXPORTED = env("MAX_SEARCH_RESULTS_EXPORTED", default=250)
 RELATED_COUNT = 20
 RELATED_USE_CACHE = True
 RELATED_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# How long related and cited-by clusters are served past RELATED_CACHE_TIMEOUT
+# while a background task refreshes them.
+RELATED_CACHE_STALE_TIMEOUT = env.int(
+    "RELATED_CACHE_STALE_TIMEOUT", default=60 * 60 * 24 * 7
+)
 RELATED_MLT_MAXQT = 10
 RELATED_MLT_MINTF = 5
 RELATED_MLT_MAXDF = 1000
@@ -21,6 +45,10 @@ RELATED_MLT_MAXWL = 0
 RELATED_FILTER_BY_STATUS = "Precedential"
 QUERY_RESULTS_CACHE = 60 * 60 * 6
 SEARCH_RESULTS_MICRO_CACHE = 60 * 10
+# The zlib level used to compress cached search results. 1 favors speed.
+SEARCH_RESULTS_CACHE_COMPRESSION_LEVEL = env.int(
+    "SEARCH_RESULTS_CACHE_COMPRESSION_LEVEL", default=1
+)
 
 #####################
 # Search pagination #
@@ -56,6 +84,17 @@ REAL_TIME_ALERTS_SENDING_RATE = env(
 PERCOLATOR_MISSING_DOCUMENT_MAX_RETRIES = env(
     "PERCOLATOR_MISSING_DOCUMENT_MAX_RETRIES", default=4
 )
+# Seconds to collect new documents before percolating them together. 0
+# percolates each document as soon as it's indexed.
+PERCOLATOR_BATCH_WINDOW = env.int("PERCOLATOR_BATCH_WINDOW", default=0)
+# The maximum number of documents percolated in a single request.
+PERCOLATOR_BATCH_SIZE = env.int("PERCOLATOR_BATCH_SIZE", default=100)
+# The number of unique RECAP alert queries sent per multi-search request when
+# querying the sweep index, and the number of those requests run at once.
+ALERTS_SWEEP_MSEARCH_BATCH_SIZE = env.int(
+    "ALERTS_SWEEP_MSEARCH_BATCH_SIZE", default=20
+)
+ALERTS_SWEEP_MAX_WORKERS = env.int("ALERTS_SWEEP_MAX_WORKERS", default=4)
 
 #################
 # VECTOR SEARCH #
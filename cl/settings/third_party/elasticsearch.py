@@ -232,6 +232,34 @@ ELASTICSEARCH_DSL_AUTO_REFRESH = env(
     "ELASTICSEARCH_DSL_AUTO_REFRESH", default=True
 )
 
+# Merge the ES updates triggered by signals within a transaction, or within a
+# buffer_es_updates block, and dispatch them once on commit.
+ELASTICSEARCH_COALESCE_SIGNAL_UPDATES = env.bool(
+    "ELASTICSEARCH_COALESCE_SIGNAL_UPDATES", default=True
+)
+
+#######################################################
+# Aggregated children documents updates by query     #
+#######################################################
+# Seconds to collect parent changes before updating all their children in a
+# single UpdateByQuery request. 0 disables the aggregation, and each parent
+# change is processed by its own update_children_docs_by_query task.
+ELASTICSEARCH_UBQ_AGGREGATION_WINDOW = env.int(
+    "ELASTICSEARCH_UBQ_AGGREGATION_WINDOW", default=0
+)
+# The maximum number of parents whose children are updated per request.
+ELASTICSEARCH_UBQ_BATCH_SIZE = env.int(
+    "ELASTICSEARCH_UBQ_BATCH_SIZE", default=500
+)
+# Throttle for aggregated UpdateByQuery requests. -1 disables the throttle.
+ELASTICSEARCH_UBQ_REQUESTS_PER_SECOND = env.float(
+    "ELASTICSEARCH_UBQ_REQUESTS_PER_SECOND", default=500.0
+)
+# Seconds to wait between checks of the UpdateByQuery task progress.
+ELASTICSEARCH_UBQ_POLL_INTERVAL = env.float(
+    "ELASTICSEARCH_UBQ_POLL_INTERVAL", default=5.0
+)
+
 #############################################################
 # Batch size for Elasticsearch queries utilizing pagination #
 # such as Percolator              #
@@ -266,6 +294,40 @@ ELASTICSEARCH_PARALLEL_BULK_THREADS = env(
     "ELASTICSEARCH_PARALLEL_BULK_THREADS", default=5
 )
 
+###################################################################
+# ES bulk indexing number of DB rows to prepare documents at once #
+###################################################################
+# Rows are fetched along with the related objects their documents need.
+ELASTICSEARCH_BULK_QUERYSET_CHUNK_SIZE = env.int(
+    "ELASTICSEARCH_BULK_QUERYSET_CHUNK_SIZE", default=500
+)
+
+##############################################################
+# ES bulk indexing chunk sizing, in bytes, and retry settings #
+##############################################################
+# Chunks start at the min size, grow by the min size while requests are
+# faster than the target latency (in seconds), and are halved when requests
+# are slow or rejected.
+ELASTICSEARCH_BULK_MIN_CHUNK_BYTES = env.int(
+    "ELASTICSEARCH_BULK_MIN_CHUNK_BYTES", default=1024 * 1024
+)
+ELASTICSEARCH_BULK_MAX_CHUNK_BYTES = env.int(
+    "ELASTICSEARCH_BULK_MAX_CHUNK_BYTES", default=20 * 1024 * 1024
+)
+ELASTICSEARCH_BULK_TARGET_LATENCY = env.float(
+    "ELASTICSEARCH_BULK_TARGET_LATENCY", default=5.0
+)
+# Rejected items are retried with an exponential backoff, in seconds.
+ELASTICSEARCH_BULK_MAX_RETRIES = env.int(
+    "ELASTICSEARCH_BULK_MAX_RETRIES", default=5
+)
+ELASTICSEARCH_BULK_INITIAL_BACKOFF = env.float(
+    "ELASTICSEARCH_BULK_INITIAL_BACKOFF", default=2.0
+)
+ELASTICSEARCH_BULK_MAX_BACKOFF = env.float(
+    "ELASTICSEARCH_BULK_MAX_BACKOFF", default=60.0
+)
+
 
 ##########################
 # Sweep indexer settings #
@@ -299,6 +361,19 @@ ELASTICSEARCH_SWEEP_INDEXER_MODELS = env(
         "search.RECAPDocument",
     ],
 )
+# With the "delta" action, only rows modified since the model's watermark are
+# checked, comparing ES timestamps to date_modified in mget batches.
+ELASTICSEARCH_SWEEP_INDEXER_MGET_BATCH_SIZE = env.int(
+    "ELASTICSEARCH_SWEEP_INDEXER_MGET_BATCH_SIZE", default=500
+)
+# How far back the first delta sweep of a model looks, in hours.
+ELASTICSEARCH_SWEEP_INDEXER_DELTA_LOOKBACK = env.int(
+    "ELASTICSEARCH_SWEEP_INDEXER_DELTA_LOOKBACK", default=24
+)
+# Seconds to wait between delta sweep cycles.
+ELASTICSEARCH_SWEEP_INDEXER_DELTA_INTERVAL = env.int(
+    "ELASTICSEARCH_SWEEP_INDEXER_DELTA_INTERVAL", default=60 * 60
+)
 
 
 ELASTICSEARCH_MAX_RESULT_COUNT = 10_000
@@ -310,3 +385,16 @@ ELASTICSEARCH_MICRO_CACHE_ENABLED = env(
 ELASTICSEARCH_API_MICRO_CACHE_ENABLED = env(
     "ELASTICSEARCH_API_MICRO_CACHE_ENABLED", default=False
 )
+# Let concurrent identical searches wait for the first one to fill the
+# micro-cache instead of all querying ES. Only used with the micro-cache.
+ELASTICSEARCH_SINGLE_FLIGHT_ENABLED = env.bool(
+    "ELASTICSEARCH_SINGLE_FLIGHT_ENABLED", default=False
+)
+# Milliseconds before the lock of a search in progress expires.
+ELASTICSEARCH_SINGLE_FLIGHT_LOCK_TTL = env.int(
+    "ELASTICSEARCH_SINGLE_FLIGHT_LOCK_TTL", default=10_000
+)
+# Seconds a request waits for an identical search before running its own.
+ELASTICSEARCH_SINGLE_FLIGHT_MAX_WAIT = env.float(
+    "ELASTICSEARCH_SINGLE_FLIGHT_MAX_WAIT", default=5.0
+)